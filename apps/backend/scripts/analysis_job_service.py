@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Shared analysis job service for several rigs.
+
+Runs the analysis job queue on this machine: backends whose
+system.analysis_service_endpoint points here submit their offline analyses,
+which run on a pool of worker processes (highest priority first) with
+progress streamed back to each backend. Sessions must be on a disk mounted
+at the same path on every rig.
+
+The status and submit commands talk to a running service, e.g. to try it on
+one host with several processes:
+
+Usage:
+    python scripts/analysis_job_service.py serve --bind tcp://*:5570 --workers 4
+    python scripts/analysis_job_service.py status --endpoint tcp://127.0.0.1:5570
+    python scripts/analysis_job_service.py submit data/sessions/my_session --priority 5
+"""
+
+import argparse
+import json
+import logging
+import signal
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from analysis.job_queue import (
+    DEFAULT_ANALYSIS_SERVICE_ENDPOINT,
+    DEFAULT_SERVICE_WORKERS,
+    AnalysisJobClient,
+    AnalysisJobService,
+)
+from analysis.pipeline import AnalysisPipeline
+from analysis.fourier import DEFAULT_CHUNK_FRAMES
+
+PARAMETERS_FILE = Path(__file__).resolve().parents[1] / "config" / "isi_parameters.json"
+
+
+def serve(args):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    service = AnalysisJobService(args.bind, max_workers=args.workers)
+    signal.signal(signal.SIGINT, lambda signum, frame: service.stop())
+    signal.signal(signal.SIGTERM, lambda signum, frame: service.stop())
+    service.serve_forever()
+
+
+def status(args):
+    pong = AnalysisJobClient(args.endpoint).service_status()
+    if pong is None:
+        print(f"No analysis service at {args.endpoint}")
+        sys.exit(1)
+    print(f"{args.endpoint}: {pong['running']} running, {pong['queued']} queued, {pong['workers']} workers")
+
+
+def submit(args):
+    with open(PARAMETERS_FILE) as f:
+        current = json.load(f)["current"]
+    parameter_groups = {"analysis": current["analysis"], "acquisition": current["acquisition"]}
+    pipeline_options = {
+        "fft_mode": args.fft_mode,
+        "chunk_frames": DEFAULT_CHUNK_FRAMES,
+        "max_direction_workers": 1,
+        "direction_memory_budget_bytes": 8 * 1024 ** 3,
+    }
+
+    def report(event):
+        message = event["message"]
+        if message["type"] == "analysis_progress":
+            print(f"  {message['progress'] * 100:5.1f}%  {message['stage']}")
+        elif message["type"] == "analysis_layer_ready":
+            print(f"          layer {message['layer_name']} ({message['width']}x{message['height']})")
+
+    # No local fallback: report the service's behaviour as is
+    client = AnalysisJobClient(args.endpoint)
+    start = time.perf_counter()
+    done = client.run_analysis(
+        str(Path(args.session).resolve()), parameter_groups, pipeline_options, report, priority=args.priority
+    )
+    elapsed = time.perf_counter() - start
+    if done["success"]:
+        print(f"Complete: {done['num_areas']} areas ({elapsed:.1f} s)")
+    else:
+        print(f"Not completed ({done['stage']}): {done['error']}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the service")
+    serve_parser.add_argument("--bind", default="tcp://*:5570", help="ZeroMQ endpoint to bind")
+    serve_parser.add_argument("--workers", type=int, default=DEFAULT_SERVICE_WORKERS, help="Concurrent analyses")
+    serve_parser.set_defaults(func=serve)
+
+    status_parser = commands.add_parser("status", help="Show queue status of a running service")
+    status_parser.add_argument("--endpoint", default=DEFAULT_ANALYSIS_SERVICE_ENDPOINT)
+    status_parser.set_defaults(func=status)
+
+    submit_parser = commands.add_parser("submit", help="Analyze a session on a running service")
+    submit_parser.add_argument("session", type=Path, help="Session directory")
+    submit_parser.add_argument("--endpoint", default=DEFAULT_ANALYSIS_SERVICE_ENDPOINT)
+    submit_parser.add_argument("--priority", type=int, default=0, help="Higher runs first")
+    submit_parser.add_argument("--fft-mode", choices=AnalysisPipeline.FFT_MODES, default="streaming")
+    submit_parser.set_defaults(func=submit)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Analyze many recorded sessions in parallel.
+
+Discovers sessions (directories with metadata.json) under a sessions directory
+- or takes them from the command line - and analyzes each in its own worker
+process with the parameters in config/isi_parameters.json. Sessions run
+concurrently while their estimated memory fits the budget. Sessions whose
+results are up to date are skipped, so an interrupted batch resumes where it
+stopped when run again.
+
+Usage:
+    python scripts/batch_analyze_sessions.py
+    python scripts/batch_analyze_sessions.py --sessions-dir /data/isi/sessions --workers 4
+    python scripts/batch_analyze_sessions.py data/sessions/a data/sessions/b --force
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from analysis.batch import (
+    DEFAULT_BATCH_MEMORY_BUDGET_BYTES,
+    DEFAULT_BATCH_WORKERS,
+    DEFAULT_SESSIONS_DIR,
+    discover_sessions,
+    run_batch_analysis,
+)
+from analysis.pipeline import AnalysisPipeline
+
+PARAMETERS_FILE = Path(__file__).resolve().parents[1] / "config" / "isi_parameters.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sessions", nargs="*", type=Path, help="Session directories (default: discover)")
+    parser.add_argument(
+        "--sessions-dir", type=Path, default=DEFAULT_SESSIONS_DIR, help="Directory to discover sessions in"
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS, help="Concurrent sessions")
+    parser.add_argument(
+        "--memory-budget-mb", type=float, default=DEFAULT_BATCH_MEMORY_BUDGET_BYTES / 1024 ** 2,
+        help="Estimated memory allowed across concurrent sessions",
+    )
+    parser.add_argument(
+        "--fft-mode", choices=AnalysisPipeline.FFT_MODES, default="streaming", help="Phase-map computation"
+    )
+    parser.add_argument("--force", action="store_true", help="Re-analyze up-to-date sessions")
+    args = parser.parse_args()
+
+    sessions = args.sessions or discover_sessions(args.sessions_dir)
+    if not sessions:
+        print(f"No sessions found in {args.sessions_dir}")
+        return
+
+    with open(PARAMETERS_FILE) as f:
+        current = json.load(f)["current"]
+    parameter_groups = {"analysis": current["analysis"], "acquisition": current["acquisition"]}
+
+    def report(finished, total, session):
+        name = Path(session["session_path"]).name
+        if session["status"] == "analyzed":
+            detail = f"{session['elapsed_s']:.1f} s, peak {session['peak_rss_mb']:.0f} MB"
+        elif session["status"] == "failed":
+            detail = session["error"]
+        else:
+            detail = ""
+        print(f"  [{finished:>3}/{total}] {name}: {session['status']} {detail}".rstrip())
+
+    print(f"Analyzing {len(sessions)} session(s) with up to {args.workers} worker(s)")
+    summary = run_batch_analysis(
+        sessions,
+        parameter_groups,
+        max_workers=args.workers,
+        memory_budget_bytes=int(args.memory_budget_mb * 1024 ** 2),
+        fft_mode=args.fft_mode,
+        force=args.force,
+        progress_callback=report,
+    )
+
+    print()
+    print("=" * 78)
+    print(f"{'Session':<32} {'Status':<11} {'Time (s)':>9} {'Peak (MB)':>10} {'Est. (MB)':>10} {'Areas':>5}")
+    print("-" * 78)
+    for session in summary["sessions"]:
+        def column(key, fmt):
+            value = session.get(key)
+            return format(value, fmt) if value is not None else "-"
+        print(
+            f"{Path(session['session_path']).name[:32]:<32} {session['status']:<11} "
+            f"{column('elapsed_s', '>9.1f'):>9} {column('peak_rss_mb', '>10.0f'):>10} "
+            f"{column('estimated_mb', '>10.0f'):>10} {column('num_areas', '>5d'):>5}"
+        )
+    print("=" * 78)
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(summary["counts"].items()))
+    print(f"Total: {summary['total_elapsed_s']:.1f} s ({counts})")
+    for session in summary["sessions"]:
+        if session["status"] == "failed":
+            print(f"  {Path(session['session_path']).name}: {session['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark HDF5 compression codecs on synthetic ISI camera data.
+
+Writes a synthetic (N, H, W) uint8 recording (vascular-like anatomy, slow
+retinotopic modulation, shot noise) with each codec using the recorder's
+chunk policy, then reads it back in analysis-sized time blocks.
+
+Reports write MB/s, read MB/s and compression ratio per codec. Codecs that
+need hdf5plugin are skipped when it is not installed.
+
+Usage:
+    python scripts/diagnostics/benchmark_hdf5_codecs.py
+    python scripts/diagnostics/benchmark_hdf5_codecs.py --frames 600 --height 1024 --width 1024
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from hdf5_codecs import CODECS, HDF5PLUGIN_AVAILABLE, PLUGIN_CODECS, compression_kwargs, time_series_chunks
+
+
+def make_synthetic_frames(n_frames: int, height: int, width: int, seed: int = 0) -> np.ndarray:
+    """Generate synthetic ISI frames: static anatomy + ~1% phase-shifted response + noise."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+
+    # Smooth illumination falloff with dark vessel-like streaks
+    anatomy = 160.0 - 40.0 * (((x - width / 2) / width) ** 2 + ((y - height / 2) / height) ** 2)
+    anatomy -= 30.0 * (np.sin(x / 23.0 + np.sin(y / 41.0) * 3.0) > 0.97)
+
+    phase = 2.0 * np.pi * x / width
+    period = max(n_frames // 10, 1)
+    frames = np.empty((n_frames, height, width), dtype=np.uint8)
+    for i in range(n_frames):
+        response = 1.6 * np.sin(2.0 * np.pi * i / period - phase)
+        noise = rng.normal(0.0, 2.0, size=(height, width)).astype(np.float32)
+        frames[i] = np.clip(anatomy + response + noise, 0, 255).astype(np.uint8)
+    return frames
+
+
+def benchmark_codec(codec: str, frames: np.ndarray, directory: Path, read_block: int):
+    """Write and read frames with one codec; return (write MB/s, read MB/s, ratio)."""
+    path = directory / f"bench_{codec}.h5"
+    raw_mb = frames.nbytes / 1e6
+    chunks = time_series_chunks(frames.shape[1:], frames.dtype, n_frames=len(frames))
+
+    start = time.perf_counter()
+    with h5py.File(path, "w") as f:
+        dataset = f.create_dataset(
+            "frames", shape=frames.shape, dtype=frames.dtype, chunks=chunks, **compression_kwargs(codec)
+        )
+        # Whole-chunk appends, as CameraStreamWriter does
+        for start_idx in range(0, len(frames), chunks[0]):
+            dataset[start_idx:start_idx + chunks[0]] = frames[start_idx:start_idx + chunks[0]]
+    write_sec = time.perf_counter() - start
+    file_mb = os.path.getsize(path) / 1e6
+
+    # Read back in time blocks, as AnalysisManager streams camera files
+    start = time.perf_counter()
+    checksum = 0
+    with h5py.File(path, "r") as f:
+        dataset = f["frames"]
+        for start_idx in range(0, dataset.shape[0], read_block):
+            checksum += int(dataset[start_idx:start_idx + read_block][:, 0, 0].sum())
+    read_sec = time.perf_counter() - start
+
+    path.unlink()
+    return raw_mb / write_sec, raw_mb / read_sec, raw_mb / file_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300, help="Number of frames")
+    parser.add_argument("--height", type=int, default=512, help="Frame height (px)")
+    parser.add_argument("--width", type=int, default=512, help="Frame width (px)")
+    parser.add_argument("--read-block", type=int, default=64, help="Frames per read block")
+    parser.add_argument("--codecs", nargs="+", default=list(CODECS), choices=CODECS, help="Codecs to test")
+    args = parser.parse_args()
+
+    print(f"Generating {args.frames} x {args.height} x {args.width} synthetic uint8 frames...")
+    frames = make_synthetic_frames(args.frames, args.height, args.width)
+    print(f"Raw size: {frames.nbytes / 1e6:.1f} MB, hdf5plugin available: {HDF5PLUGIN_AVAILABLE}")
+    print()
+    print(f"{'codec':<12} {'write MB/s':>12} {'read MB/s':>12} {'ratio':>8}")
+    print("-" * 48)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in args.codecs:
+            if codec in PLUGIN_CODECS and not HDF5PLUGIN_AVAILABLE:
+                print(f"{codec:<12} {'skipped (hdf5plugin not installed)':>34}")
+                continue
+            write_mbs, read_mbs, ratio = benchmark_codec(codec, frames, Path(tmp), args.read_block)
+            print(f"{codec:<12} {write_mbs:>12.1f} {read_mbs:>12.1f} {ratio:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Rewrite recorded sessions into the modern camera file layout.
+
+Older sessions were recorded as (N, H, W, 3) BGR stacks, non-square, with
+whatever chunk shape h5py picked, so every analysis run and playback request
+paid for float RGB->grayscale conversion, square cropping and decompressing
+oversized chunks. This tool converts each {direction}_camera.h5 once into the
+layout the recorder writes today:
+
+- frames: (N, S, S) uint8 grayscale, center-cropped square
+- time-blocked whole-frame chunks (same policy as the recorder)
+- the configured HDF5 codec (system.hdf5_codec, falls back to gzip)
+- mean_frame: (S, S) float32 per-pixel mean over all frames, used as the
+  anatomical reference (analysis and composite images) of sessions recorded
+  without anatomical.npy (see analysis.manager.camera_mean_frame)
+
+Timestamps, other datasets and file attributes are copied unchanged. A
+non-square anatomical.npy is cropped the same way. Files are rewritten
+through a .tmp file and atomically replaced; files already in the modern
+layout are skipped unless --force is given. Throughput is reported per file
+and for the whole run.
+
+Usage:
+    python scripts/optimize_sessions.py data/sessions/my_session
+    python scripts/optimize_sessions.py --all
+    python scripts/optimize_sessions.py --all --codec zstd --keep-original
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from hdf5_codecs import CODECS, DEFAULT_CODEC, compression_kwargs, resolve_codec, time_series_chunks
+from acquisition.recorder import CAMERA_CHUNK_TARGET_BYTES, CAMERA_MAX_CHUNK_FRAMES
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SESSIONS_DIR = BACKEND_ROOT / "data" / "sessions"
+PARAMETERS_FILE = BACKEND_ROOT / "config" / "isi_parameters.json"
+
+# Bumped whenever the target layout changes (stored as a file attribute)
+LAYOUT_VERSION = 1
+
+# BGR to grayscale: 0.114*B + 0.587*G + 0.299*R (same weights as analysis)
+BGR_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def configured_codec() -> str:
+    """HDF5 codec from system.hdf5_codec in the parameter file (DEFAULT_CODEC if unset)."""
+    try:
+        with open(PARAMETERS_FILE) as f:
+            return json.load(f)["current"]["system"].get("hdf5_codec", DEFAULT_CODEC)
+    except (OSError, KeyError, ValueError):
+        return DEFAULT_CODEC
+
+
+def square_crop(height: int, width: int):
+    """(y_start, x_start, size) of the centered square crop."""
+    size = min(height, width)
+    return (height - size) // 2, (width - size) // 2, size
+
+
+def target_chunks(size: int, n_frames: int):
+    """Chunk shape the recorder would use for (n_frames, size, size) uint8 frames."""
+    return time_series_chunks(
+        (size, size),
+        np.uint8,
+        target_bytes=CAMERA_CHUNK_TARGET_BYTES,
+        max_frames=CAMERA_MAX_CHUNK_FRAMES,
+        n_frames=n_frames,
+    )
+
+
+def is_optimized(camera_path: Path, codec: str) -> bool:
+    """True if the camera file already has the modern layout for codec."""
+    with h5py.File(camera_path, "r") as f:
+        if f.attrs.get("optimized_layout_version", 0) < LAYOUT_VERSION or "mean_frame" not in f:
+            return False
+        frames = f["frames"]
+        return (
+            frames.ndim == 3
+            and frames.shape[1] == frames.shape[2]
+            and frames.chunks == target_chunks(frames.shape[1], frames.shape[0])
+            and frames.attrs.get("codec") == resolve_codec(codec)
+        )
+
+
+def optimize_camera_file(camera_path: Path, codec: str, keep_original: bool) -> dict:
+    """Rewrite one camera file in the modern layout.
+
+    Args:
+        camera_path: {direction}_camera.h5 path
+        codec: Target HDF5 codec
+        keep_original: Keep the old file as {direction}_camera.legacy.h5
+
+    Returns:
+        Dict with frames, input/output sizes (bytes) and elapsed seconds
+    """
+    tmp_path = camera_path.with_name(camera_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    start = time.perf_counter()
+    with h5py.File(camera_path, "r") as src, h5py.File(tmp_path, "w") as dst:
+        frames = src["frames"]
+        n_frames = frames.shape[0]
+        color = frames.ndim == 4
+        if color and frames.shape[3] not in (3, 4):
+            raise ValueError(f"Unsupported channel count: {frames.shape[3]}")
+
+        y0, x0, size = square_crop(frames.shape[1], frames.shape[2])
+        chunks = target_chunks(size, max(n_frames, 1))
+        out = dst.create_dataset(
+            "frames",
+            shape=(n_frames, size, size),
+            dtype=np.uint8,
+            chunks=chunks,
+            **compression_kwargs(codec),
+        )
+        out.attrs["codec"] = resolve_codec(codec)
+
+        # Read whole source chunks along time, write whole target chunks
+        block_frames = chunks[0]
+        if frames.chunks:
+            block_frames = -(-block_frames // frames.chunks[0]) * frames.chunks[0]
+
+        frame_sum = np.zeros((size, size), dtype=np.float64)
+        for block_start in range(0, n_frames, block_frames):
+            block = frames[block_start:block_start + block_frames]
+            block = block[:, y0:y0 + size, x0:x0 + size]
+            if color:
+                block = (block[..., :3] @ BGR_WEIGHTS).astype(np.uint8)
+            elif block.dtype != np.uint8:
+                block = block.astype(np.uint8)
+            out[block_start:block_start + len(block)] = block
+            frame_sum += block.sum(axis=0, dtype=np.float64)
+
+        mean_frame = (frame_sum / max(n_frames, 1)).astype(np.float32)
+        dst.create_dataset("mean_frame", data=mean_frame)
+
+        for name in src:
+            if name not in ("frames", "mean_frame"):
+                src.copy(src[name], dst, name=name)
+        for key, value in src.attrs.items():
+            dst.attrs[key] = value
+        dst.attrs["optimized_layout_version"] = LAYOUT_VERSION
+
+    elapsed = time.perf_counter() - start
+    input_bytes = camera_path.stat().st_size
+    output_bytes = tmp_path.stat().st_size
+
+    if keep_original:
+        os.replace(camera_path, camera_path.with_name(camera_path.stem + ".legacy.h5"))
+    os.replace(tmp_path, camera_path)
+
+    return {
+        "frames": n_frames,
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "seconds": elapsed,
+    }
+
+
+def optimize_anatomical(session_dir: Path) -> bool:
+    """Crop a non-square anatomical.npy to the centered square (True if rewritten)."""
+    anatomical_path = session_dir / "anatomical.npy"
+    if not anatomical_path.exists():
+        return False
+    anatomical = np.load(anatomical_path)
+    if anatomical.ndim < 2 or anatomical.shape[0] == anatomical.shape[1]:
+        return False
+    y0, x0, size = square_crop(anatomical.shape[0], anatomical.shape[1])
+    np.save(anatomical_path, np.ascontiguousarray(anatomical[y0:y0 + size, x0:x0 + size]))
+    return True
+
+
+def optimize_session(session_dir: Path, codec: str, force: bool, keep_original: bool) -> dict:
+    """Optimize every camera file of one session and print per-file throughput."""
+    totals = {"files": 0, "skipped": 0, "frames": 0, "input_bytes": 0, "output_bytes": 0, "seconds": 0.0}
+    print(f"\n{session_dir}")
+
+    for camera_path in sorted(session_dir.glob("*_camera.h5")):
+        if camera_path.name.endswith(".legacy.h5"):
+            continue
+        if not force and is_optimized(camera_path, codec):
+            print(f"  {camera_path.name:<24} already optimized, skipped")
+            totals["skipped"] += 1
+            continue
+
+        stats = optimize_camera_file(camera_path, codec, keep_original)
+        seconds = max(stats["seconds"], 1e-9)
+        print(
+            f"  {camera_path.name:<24} {stats['frames']:>7} frames  "
+            f"{stats['input_bytes'] / 1e6:>9.1f} MB -> {stats['output_bytes'] / 1e6:>9.1f} MB  "
+            f"{stats['input_bytes'] / 1e6 / seconds:>8.1f} MB/s  {stats['frames'] / seconds:>8.1f} fps"
+        )
+        totals["files"] += 1
+        for key in ("frames", "input_bytes", "output_bytes", "seconds"):
+            totals[key] += stats[key]
+
+    if optimize_anatomical(session_dir):
+        print("  anatomical.npy           cropped to square")
+
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sessions", nargs="*", type=Path, help="Session directories to optimize")
+    parser.add_argument("--all", action="store_true", help="Optimize every session in --sessions-dir")
+    parser.add_argument("--sessions-dir", type=Path, default=DEFAULT_SESSIONS_DIR, help="Base directory for --all")
+    parser.add_argument("--codec", choices=CODECS, default=None, help="HDF5 codec (default: system.hdf5_codec)")
+    parser.add_argument("--force", action="store_true", help="Rewrite files already in the modern layout")
+    parser.add_argument("--keep-original", action="store_true", help="Keep old files as *_camera.legacy.h5")
+    args = parser.parse_args()
+
+    sessions = list(args.sessions)
+    if args.all:
+        sessions += sorted(p for p in args.sessions_dir.iterdir() if (p / "metadata.json").exists())
+    if not sessions:
+        parser.error("no sessions given (pass session directories or --all)")
+
+    codec = args.codec or configured_codec()
+    print(f"Target layout: grayscale, square, time-chunked, codec={resolve_codec(codec)}")
+
+    totals = {"files": 0, "skipped": 0, "frames": 0, "input_bytes": 0, "output_bytes": 0, "seconds": 0.0}
+    failures = 0
+    for session_dir in sessions:
+        try:
+            session_totals = optimize_session(session_dir, codec, args.force, args.keep_original)
+        except Exception as e:
+            print(f"  ❌ Failed: {e}")
+            failures += 1
+            continue
+        for key in totals:
+            totals[key] += session_totals[key]
+
+    seconds = max(totals["seconds"], 1e-9)
+    print()
+    print("=" * 70)
+    print(
+        f"{totals['files']} files rewritten ({totals['skipped']} skipped), {totals['frames']} frames, "
+        f"{totals['input_bytes'] / 1e6:.1f} MB -> {totals['output_bytes'] / 1e6:.1f} MB"
+    )
+    if totals["files"]:
+        print(
+            f"Throughput: {totals['input_bytes'] / 1e6 / seconds:.1f} MB/s, "
+            f"{totals['frames'] / seconds:.1f} frames/s over {totals['seconds']:.1f} s"
+        )
+    print("=" * 70)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Sweep analysis parameters over an analyzed session.
+
+Re-runs the post-Fourier pipeline (retinotopy, VFS, boundaries, areas) for
+every parameter combination, reusing the session's phase/magnitude/coherence
+maps, and writes a comparison store under analysis_results/sweeps/. Each set
+is reported with its area count and the share of pixels kept by the
+statistical VFS threshold and the magnitude/percentile response thresholds.
+Parameters not given are taken from config/isi_parameters.json.
+
+Usage:
+    python scripts/sweep_analysis_parameters.py data/sessions/my_session \\
+        --param vfs_threshold_sd=1,1.5,2 --param area_min_size_mm2=0.05,0.1,0.2
+    python scripts/sweep_analysis_parameters.py data/sessions/my_session \\
+        --sets my_sets.json --workers 4
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from config import AppConfig
+from analysis.sweep import (
+    DEFAULT_SWEEP_WORKERS,
+    SWEEPABLE_PARAMETERS,
+    build_configs,
+    expand_parameter_grid,
+    run_parameter_sweep,
+)
+
+PARAMETERS_FILE = Path(__file__).resolve().parents[1] / "config" / "isi_parameters.json"
+
+
+def parse_value(text):
+    """Number, or the string itself for non-numeric values such as true/false."""
+    try:
+        return float(text)
+    except ValueError:
+        return text.strip()
+
+
+def parse_grid(specs):
+    """--param name=v1,v2,... arguments to a parameter grid."""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"Expected name=v1,v2,... got '{spec}'")
+        grid[name.strip()] = [parse_value(v) for v in values.split(",")]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("session", type=Path, help="Analyzed session directory")
+    parser.add_argument(
+        "--param", action="append", default=[], metavar="NAME=V1,V2",
+        help=f"Values of one parameter (repeat for a grid). One of: {', '.join(SWEEPABLE_PARAMETERS)}",
+    )
+    parser.add_argument("--sets", type=Path, help="JSON file with a list of parameter sets")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SWEEP_WORKERS, help="Worker processes")
+    parser.add_argument("--output", type=Path, default=None, help="Sweep store path")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.param)
+    except ValueError as e:
+        parser.error(str(e))
+    parameter_sets = expand_parameter_grid(grid) if grid else []
+    if args.sets:
+        with open(args.sets) as f:
+            parameter_sets += json.load(f)
+    if not parameter_sets:
+        parser.error("no parameter sets (use --param or --sets)")
+
+    base_config = AppConfig.from_file(str(PARAMETERS_FILE)).analysis
+    try:
+        build_configs(base_config, parameter_sets)
+    except ValueError as e:
+        parser.error(str(e))
+
+    def report(completed, total, entry):
+        print(
+            f"  [{completed:>3}/{total}] {json.dumps(entry['parameters'])}: "
+            f"{entry['area_count']} areas, {entry['statistical_coverage'] * 100:.1f}% significant VFS "
+            f"({entry['elapsed_s']:.2f} s)"
+        )
+
+    print(f"Sweeping {len(parameter_sets)} parameter sets with {args.workers} worker(s)")
+    summary = run_parameter_sweep(
+        str(args.session),
+        base_config,
+        parameter_sets,
+        max_workers=args.workers,
+        output_path=args.output,
+        progress_callback=report,
+    )
+
+    swept = summary["swept_parameters"]
+    print()
+    print("=" * 70)
+    print(
+        "  ".join(f"{name:>20}" for name in swept)
+        + f"  {'areas':>6}  {'stat VFS':>8}  {'mag':>6}  {'pctl':>6}  {'time (s)':>8}"
+    )
+    for entry in summary["entries"]:
+        values = "  ".join(f"{entry['parameters'][name]!s:>20}" for name in swept)
+        print(
+            f"{values}  {entry['area_count']:>6}  {entry['statistical_coverage'] * 100:>7.1f}%"
+            f"  {entry['magnitude_coverage'] * 100:>5.1f}%  {entry['percentile_coverage'] * 100:>5.1f}%"
+            f"  {entry['elapsed_s']:>8.2f}"
+        )
+    print("Coverage: % of pixels kept by the statistical VFS, magnitude and percentile thresholds")
+    print("=" * 70)
+    print(f"Total: {summary['total_elapsed_s']:.1f} s")
+    print(f"Store: {summary['store_path']}")
+
+
+if __name__ == "__main__":
+    main()
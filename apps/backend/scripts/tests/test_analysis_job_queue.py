@@ -0,0 +1,182 @@
+"""Test the analysis job queue service with several processes on one host.
+
+The service runs in its own process on a localhost endpoint with stub
+workers; clients in this process submit, cancel and fall back to local runs.
+"""
+
+import itertools
+import multiprocessing
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import pytest
+
+from analysis.job_queue import AnalysisJobClient, AnalysisJobService
+
+_runs = itertools.count(1)
+
+
+class StubWorker:
+    """Stands in for AnalysisWorkerProcess: waits pipeline_options["duration_s"].
+
+    Local fallback stubs (instant=True) finish at once.
+    """
+
+    def __init__(self, host="service", instant=False):
+        self.host = host
+        self.instant = instant
+        self._cancel = threading.Event()
+
+    def run_analysis(self, session_path, parameter_groups, pipeline_options, on_event):
+        self._cancel.clear()
+        run_index = next(_runs)
+        on_event({
+            "message": {"type": "analysis_progress", "progress": 0.5, "stage": "stub", "timestamp": time.time()},
+            "progress": 0.5,
+            "stage": "stub",
+        })
+        duration_s = 0.0 if self.instant else pipeline_options.get("duration_s", 0.0)
+        if self._cancel.wait(duration_s):
+            return {"success": False, "error": None, "stage": "stopping", "reported": False}
+        return {"success": True, "host": self.host, "run_index": run_index, "session_path": session_path}
+
+    def cancel(self):
+        self._cancel.set()
+
+    def shutdown(self, timeout=5.0):
+        self._cancel.set()
+
+
+def run_service(endpoint):
+    service = AnalysisJobService(endpoint, max_workers=1, worker_factory=StubWorker)
+    signal.signal(signal.SIGTERM, lambda signum, frame: service.stop())
+    service.serve_forever()
+
+
+def free_endpoint():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"tcp://127.0.0.1:{s.getsockname()[1]}"
+
+
+@pytest.fixture
+def service():
+    endpoint = free_endpoint()
+    process = multiprocessing.get_context("spawn").Process(target=run_service, args=(endpoint,), daemon=True)
+    process.start()
+
+    deadline = time.monotonic() + 30.0
+    while AnalysisJobClient(endpoint).service_status() is None:
+        assert time.monotonic() < deadline, "analysis job service did not start"
+    yield endpoint, process
+
+    if process.is_alive():
+        process.terminate()
+    process.join(timeout=10.0)
+
+
+def submit_in_thread(client, session, duration_s, results, name, priority=0):
+    """Run client.run_analysis in a thread; results[name] receives (done, events)."""
+    def run():
+        events = []
+        done = client.run_analysis(str(session), {}, {"duration_s": duration_s}, events.append, priority=priority)
+        results[name] = (done, events)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def wait_for_status(endpoint, running, queued, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = AnalysisJobClient(endpoint).service_status()
+        if status and status["running"] == running and status["queued"] == queued:
+            return
+        time.sleep(0.05)
+    raise AssertionError(f"service did not reach running={running}, queued={queued}")
+
+
+def test_higher_priority_runs_first(service, tmp_path):
+    endpoint, _ = service
+    results = {}
+    blocker, low, high = AnalysisJobClient(endpoint), AnalysisJobClient(endpoint), AnalysisJobClient(endpoint)
+
+    threads = [submit_in_thread(blocker, tmp_path, 1.0, results, "blocker")]
+    wait_for_status(endpoint, running=1, queued=0)
+    threads.append(submit_in_thread(low, tmp_path, 0.0, results, "low", priority=0))
+    wait_for_status(endpoint, running=1, queued=1)
+    threads.append(submit_in_thread(high, tmp_path, 0.0, results, "high", priority=5))
+    for thread in threads:
+        thread.join(timeout=30.0)
+
+    done = {name: result[0] for name, result in results.items()}
+    assert all(d["success"] and d["host"] == "service" for d in done.values())
+    assert done["blocker"]["run_index"] < done["high"]["run_index"] < done["low"]["run_index"]
+    # Queued jobs report their queue position, running jobs stream worker events
+    assert any(event["stage"] == "queued" for event in results["low"][1])
+    assert any(event["stage"] == "stub" for event in results["low"][1])
+
+
+def test_cancel_queued_job(service, tmp_path):
+    endpoint, _ = service
+    results = {}
+    first, second = AnalysisJobClient(endpoint), AnalysisJobClient(endpoint)
+
+    running = submit_in_thread(first, tmp_path, 1.0, results, "running")
+    wait_for_status(endpoint, running=1, queued=0)
+    queued = submit_in_thread(second, tmp_path, 0.0, results, "queued")
+    wait_for_status(endpoint, running=1, queued=1)
+
+    second.cancel()
+    queued.join(timeout=10.0)
+    wait_for_status(endpoint, running=1, queued=0)
+    running.join(timeout=10.0)
+
+    done, events = results["queued"]
+    assert done["stage"] == "cancelled" and not done["success"]
+    assert not any(event["stage"] == "stub" for event in events)  # Never reached a worker
+    assert results["running"][0]["success"]
+
+
+def test_unknown_session_is_analyzed_locally(service, tmp_path):
+    endpoint, _ = service
+    client = AnalysisJobClient(endpoint, fallback=StubWorker(host="local", instant=True))
+
+    done = client.run_analysis(str(tmp_path / "missing"), {}, {}, lambda event: None)
+
+    assert done["success"] and done["host"] == "local"
+
+
+def test_absent_service_falls_back_to_local_worker(tmp_path):
+    client = AnalysisJobClient(free_endpoint(), fallback=StubWorker(host="local", instant=True))
+
+    done = client.run_analysis(str(tmp_path), {}, {}, lambda event: None)
+
+    assert done["success"] and done["host"] == "local"
+
+
+def test_absent_service_without_fallback_fails(tmp_path):
+    done = AnalysisJobClient(free_endpoint()).run_analysis(str(tmp_path), {}, {}, lambda event: None)
+
+    assert not done["success"] and "not available" in done["error"]
+
+
+def test_unresponsive_service_falls_back_to_local_worker(service, tmp_path):
+    endpoint, process = service
+    client = AnalysisJobClient(endpoint, fallback=StubWorker(host="local", instant=True), lost_timeout_s=1.0)
+    results = {}
+
+    thread = submit_in_thread(client, tmp_path, 30.0, results, "job")
+    wait_for_status(endpoint, running=1, queued=0)
+    process.kill()  # Service stops answering mid-job
+    thread.join(timeout=20.0)
+
+    done, events = results["job"]
+    assert any(event["stage"] == "stub" for event in events)  # Started on the service
+    assert done["success"] and done["host"] == "local"
@@ -0,0 +1,155 @@
+"""Test the analysis worker process (event relay, stale events, restart, cancel).
+
+Jobs run in a real spawned worker on small sessions with pre-computed
+phase/magnitude maps.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import numpy as np
+import pytest
+
+from analysis.worker import AnalysisWorkerProcess
+
+SHAPE = (32, 40)
+DIRECTIONS = ["LR", "RL", "TB", "BT"]
+
+PARAMETER_GROUPS = {
+    "analysis": {
+        "coherence_threshold": 0.2,
+        "ring_size_mm": 2.0,
+        "phase_filter_sigma": 0.0,
+        "smoothing_sigma": 2.0,
+        "gradient_window_size": 3,
+        "magnitude_threshold": 0.1,
+        "response_threshold_percent": 20,
+        "vfs_threshold_sd": 1.0,
+        "area_min_size_mm2": 0.01,
+    },
+    "acquisition": {"directions": DIRECTIONS, "cycles": 3},
+}
+PIPELINE_OPTIONS = {
+    "fft_mode": "streaming",
+    "chunk_frames": 64,
+    "max_direction_workers": 1,
+    "direction_memory_budget_bytes": 1024 ** 3,
+}
+
+# Longer than the worker's cancel watcher poll (0.2 s)
+CANCEL_SETTLE_S = 1.0
+
+
+class ExitOnUnpickle:
+    """Request payload that makes the worker process exit while reading it."""
+
+    def __reduce__(self):
+        return os._exit, (3,)
+
+
+@pytest.fixture
+def session(tmp_path):
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[:SHAPE[0], :SHAPE[1]]
+    azimuth = 2.0 * np.pi * (x / SHAPE[1] + 0.1 * np.sin(y / 6.0)) - np.pi
+    elevation = 2.0 * np.pi * (y / SHAPE[0] + 0.1 * np.sin(x / 5.0)) - np.pi
+    (tmp_path / "metadata.json").write_text("{}")
+    for direction, base, sign in (("LR", azimuth, 1), ("RL", azimuth, -1), ("TB", elevation, 1), ("BT", elevation, -1)):
+        phase = np.angle(np.exp(1j * (sign * base + rng.normal(0, 0.05, SHAPE)))).astype(np.float32)
+        np.save(tmp_path / f"phase_{direction}.npy", phase)
+        np.save(tmp_path / f"magnitude_{direction}.npy", rng.uniform(0.5, 1.0, SHAPE).astype(np.float32))
+    return tmp_path
+
+
+@pytest.fixture
+def worker():
+    worker = AnalysisWorkerProcess(nice_increment=0)
+    yield worker
+    worker.shutdown()
+
+
+def run(worker, session_path, on_event=None):
+    events = []
+
+    def record(event):
+        events.append(event)
+        if on_event is not None:
+            on_event(event)
+
+    return worker.run_analysis(str(session_path), PARAMETER_GROUPS, PIPELINE_OPTIONS, record), events
+
+
+def message_types(events):
+    return [event["message"]["type"] for event in events]
+
+
+def test_events_of_the_job_are_relayed(worker, session):
+    done, events = run(worker, session)
+
+    assert done["kind"] == "done" and done["success"] and done["reported"]
+    assert done["stage"] == "complete" and done["num_areas"] > 0
+    types = message_types(events)
+    assert types[0] == "analysis_progress" and types[-1] == "analysis_complete"
+    assert {event["job_id"] for event in events} == {done["job_id"]}
+    assert events[-1]["progress"] == 1.0
+    assert (session / "analysis_results" / "analysis_results.h5").exists()
+
+    # Next job gets a new id on the same process
+    pid = worker._process.pid
+    second, _ = run(worker, session)
+    assert second["success"] and second["job_id"] == done["job_id"] + 1
+    assert worker._process.pid == pid
+
+
+def test_stale_events_from_an_abandoned_job_are_ignored(worker, session):
+    worker.start()
+    # Left in the queue by a job whose caller gave up (e.g. after a timeout)
+    worker._events.put({"kind": "message", "job_id": 0, "message": {"type": "stale"}, "progress": 0.5, "stage": "x"})
+    worker._events.put({"kind": "done", "job_id": 0, "success": False, "error": "stale", "stage": "error"})
+
+    done, events = run(worker, session)
+
+    assert done["success"] and done["job_id"] == 1
+    assert "stale" not in message_types(events)
+
+
+def test_worker_is_restarted_after_exiting_unexpectedly(worker, session):
+    worker.start()
+    crashed_pid = worker._process.pid
+
+    done = worker.run_analysis(ExitOnUnpickle(), PARAMETER_GROUPS, PIPELINE_OPTIONS, lambda event: None)
+
+    assert not done["success"] and not done["reported"]
+    assert done["error"] == "Analysis worker exited unexpectedly (exit code 3)"
+    assert not worker.is_alive
+
+    restarted, _ = run(worker, session)
+    assert restarted["success"]
+    assert worker.is_alive and worker._process.pid != crashed_pid
+
+
+def test_cancel_stops_the_job_at_the_next_stage(worker, session):
+    # Loading waits while an acquisition file is still being written
+    pending_file = session / "LR_camera.h5.tmp"
+    pending_file.write_bytes(b"")
+
+    def cancel_while_loading(event):
+        if event["message"].get("stage") == "Loading session data":
+            worker.cancel()
+            time.sleep(CANCEL_SETTLE_S)  # Cancel watcher sets manager.is_running = False
+            pending_file.unlink()
+
+    done, events = run(worker, session, on_event=cancel_while_loading)
+
+    assert not done["success"]
+    assert done["stage"] == "stopping"
+    assert done["error"] == "Analysis stopped at stage: stopping"
+    assert "analysis_complete" not in message_types(events)
+    assert not (session / "analysis_results" / "analysis_results.h5").exists()
+
+    # Cancellation does not carry over to the next job
+    done, _ = run(worker, session)
+    assert done["success"]
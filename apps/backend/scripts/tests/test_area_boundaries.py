@@ -0,0 +1,171 @@
+"""Test vectorized boundary detection, area segmentation and skeletonization.
+
+The reference functions are the original row/column and per-label loops, so
+the vectorized pipeline must reproduce their boundaries and area partitions.
+"""
+
+import sys
+from dataclasses import replace
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import numpy as np
+import pytest
+from scipy import ndimage
+
+from config import AnalysisConfig
+from analysis.pipeline import AnalysisPipeline
+
+
+def make_config(**overrides):
+    config = AnalysisConfig(
+        coherence_threshold=0.3,
+        ring_size_mm=2.0,
+        phase_filter_sigma=0.0,
+        smoothing_sigma=2.0,
+        gradient_window_size=3,
+        magnitude_threshold=0.3,
+        response_threshold_percent=20,
+        vfs_threshold_sd=1.5,
+        area_min_size_mm2=0.01,
+    )
+    return replace(config, **overrides)
+
+
+def make_vfs(seed, shape=(96, 128)):
+    """Patchy sign regions in [-1, 1] whose values jump across sign reversals."""
+    rng = np.random.default_rng(seed)
+    field = ndimage.gaussian_filter(rng.normal(size=shape), sigma=4.0)
+    field /= np.max(np.abs(field))
+    return (np.sign(field) * np.clip(0.2 + 2.0 * np.abs(field), 0.0, 1.0)).astype(np.float32)
+
+
+def reference_boundaries(sign_map):
+    """Original loop implementation of detect_area_boundaries."""
+    sign_filtered = ndimage.median_filter(sign_map, size=3)
+    boundary_map = np.zeros_like(sign_filtered, dtype=np.float32)
+    threshold = 0.1
+
+    for i in range(sign_filtered.shape[1] - 1):
+        left_col = sign_filtered[:, i]
+        right_col = sign_filtered[:, i + 1]
+        both_defined = (np.abs(left_col) > threshold) & (np.abs(right_col) > threshold)
+        sign_change = (left_col * right_col) < 0
+        boundary_map[:, i] += (both_defined & sign_change).astype(np.float32)
+
+    for i in range(sign_filtered.shape[0] - 1):
+        top_row = sign_filtered[i, :]
+        bottom_row = sign_filtered[i + 1, :]
+        both_defined = (np.abs(top_row) > threshold) & (np.abs(bottom_row) > threshold)
+        sign_change = (top_row * bottom_row) < 0
+        boundary_map[i, :] += (both_defined & sign_change).astype(np.float32)
+
+    return (boundary_map > 0).astype(np.uint8)
+
+
+def reference_areas(sign_map, boundary_map, min_area_size_pixels):
+    """Original per-label loop of segment_visual_areas (labels keep their gaps)."""
+    valid_mask = (boundary_map == 0) & (~np.isnan(sign_map))
+    pos_mask = valid_mask & (sign_map > 0)
+    neg_mask = valid_mask & (sign_map < 0)
+    pos_labels, pos_num = ndimage.label(pos_mask)
+    neg_labels, neg_num = ndimage.label(neg_mask)
+
+    area_map = np.zeros_like(sign_map, dtype=np.int32)
+    area_map[pos_mask] = pos_labels[pos_mask]
+    area_map[neg_mask] = neg_labels[neg_mask] + pos_num
+
+    for label in range(1, pos_num + neg_num + 1):
+        if np.sum(area_map == label) < min_area_size_pixels:
+            area_map[area_map == label] = 0
+    return area_map
+
+
+def reference_zhang_suen(binary_image):
+    """Textbook per-pixel Zhang-Suen thinning (zero border)."""
+    image = np.pad(binary_image.astype(np.uint8), 1)
+    while True:
+        removed = 0
+        for step in (0, 1):
+            delete = []
+            for y in range(1, image.shape[0] - 1):
+                for x in range(1, image.shape[1] - 1):
+                    if not image[y, x]:
+                        continue
+                    p = [image[y - 1, x], image[y - 1, x + 1], image[y, x + 1], image[y + 1, x + 1],
+                         image[y + 1, x], image[y + 1, x - 1], image[y, x - 1], image[y - 1, x - 1]]
+                    neighbours = sum(p)
+                    transitions = sum(p[k] == 0 and p[(k + 1) % 8] == 1 for k in range(8))
+                    if not (2 <= neighbours <= 6 and transitions == 1):
+                        continue
+                    p2, p4, p6, p8 = p[0], p[2], p[4], p[6]
+                    if step == 0 and p2 * p4 * p6 == 0 and p4 * p6 * p8 == 0:
+                        delete.append((y, x))
+                    if step == 1 and p2 * p4 * p8 == 0 and p2 * p6 * p8 == 0:
+                        delete.append((y, x))
+            for y, x in delete:
+                image[y, x] = 0
+            removed += len(delete)
+        if removed == 0:
+            return image[1:-1, 1:-1]
+
+
+def assert_same_partition(area_map, reference):
+    """Same pixels labelled, and labels map one-to-one between the two maps."""
+    np.testing.assert_array_equal(area_map > 0, reference > 0)
+    pairs = np.unique(np.stack([area_map[reference > 0], reference[reference > 0]]), axis=1)
+    assert len(np.unique(pairs[0])) == len(np.unique(pairs[1])) == pairs.shape[1]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_boundaries_match_loop_implementation(seed):
+    vfs = make_vfs(seed)
+    pipeline = AnalysisPipeline(make_config())
+
+    boundary_map = pipeline.detect_area_boundaries(vfs)
+
+    assert boundary_map.dtype == np.uint8
+    assert np.count_nonzero(boundary_map) > 0
+    np.testing.assert_array_equal(boundary_map, reference_boundaries(vfs))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_areas_match_loop_implementation(seed):
+    vfs = make_vfs(seed)
+    vfs[:5, :5] = np.nan  # Undefined pixels are never labelled
+    boundary_map = reference_boundaries(np.nan_to_num(vfs))
+    # 128 px / 2 mm = 64 px/mm, so 0.01 mm^2 = 40 px
+    pipeline = AnalysisPipeline(make_config(area_min_size_mm2=0.01))
+
+    area_map = pipeline.segment_visual_areas(vfs, boundary_map, image_width_pixels=128)
+    reference = reference_areas(vfs, boundary_map, min_area_size_pixels=40)
+
+    assert area_map.max() > 0
+    assert_same_partition(area_map, reference)
+    # Kept areas are relabelled 1..n without gaps
+    np.testing.assert_array_equal(np.unique(area_map[area_map > 0]), np.arange(1, area_map.max() + 1))
+
+
+def test_skeletonize_thick_bar_fixture():
+    """A 3-pixel-thick bar thins to a 1-pixel line on its centre row."""
+    bar = np.zeros((7, 12), dtype=np.uint8)
+    bar[2:5, 1:11] = 1
+    expected = np.zeros_like(bar)
+    expected[3, 2:9] = 1
+
+    pipeline = AnalysisPipeline(make_config())
+    np.testing.assert_array_equal(pipeline._skeletonize_boundaries(bar), expected)
+    np.testing.assert_array_equal(reference_zhang_suen(bar), expected)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_skeletonize_matches_per_pixel_zhang_suen(seed):
+    boundary_map = reference_boundaries(make_vfs(seed, shape=(40, 48)))
+    # Thicken the boundaries so there is something to thin
+    thick = ndimage.binary_dilation(boundary_map, iterations=1).astype(np.uint8)
+
+    pipeline = AnalysisPipeline(make_config(boundary_skeletonize=True))
+    skeleton = pipeline.detect_area_boundaries(make_vfs(seed, shape=(40, 48)))
+
+    np.testing.assert_array_equal(skeleton, reference_zhang_suen(boundary_map))
+    np.testing.assert_array_equal(pipeline._skeletonize_boundaries(thick), reference_zhang_suen(thick))
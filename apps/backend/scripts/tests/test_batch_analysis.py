@@ -0,0 +1,176 @@
+"""Test batch analysis (skip/resume via results keys, manifests, memory admission)."""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import numpy as np
+import pytest
+
+import analysis.batch as batch
+from analysis.batch import BATCH_MANIFEST_NAME, is_up_to_date, results_key, run_batch_analysis
+
+SHAPE = (32, 40)
+DIRECTIONS = ["LR", "RL", "TB", "BT"]
+
+PARAMETER_GROUPS = {
+    "analysis": {
+        "coherence_threshold": 0.2,
+        "ring_size_mm": 2.0,
+        "phase_filter_sigma": 0.0,
+        "smoothing_sigma": 2.0,
+        "gradient_window_size": 3,
+        "magnitude_threshold": 0.1,
+        "response_threshold_percent": 20,
+        "vfs_threshold_sd": 1.0,
+        "area_min_size_mm2": 0.01,
+    },
+    "acquisition": {"directions": DIRECTIONS, "cycles": 3},
+}
+
+
+def write_maps(session, seed=0):
+    """Pre-computed phase/magnitude maps of a smooth retinotopy (partial pipeline input)."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[:SHAPE[0], :SHAPE[1]]
+    azimuth = 2.0 * np.pi * (x / SHAPE[1] + 0.1 * np.sin(y / 6.0)) - np.pi
+    elevation = 2.0 * np.pi * (y / SHAPE[0] + 0.1 * np.sin(x / 5.0)) - np.pi
+    for direction, base, sign in (("LR", azimuth, 1), ("RL", azimuth, -1), ("TB", elevation, 1), ("BT", elevation, -1)):
+        phase = np.angle(np.exp(1j * (sign * base + rng.normal(0, 0.05, SHAPE)))).astype(np.float32)
+        np.save(session / f"phase_{direction}.npy", phase)
+        np.save(session / f"magnitude_{direction}.npy", rng.uniform(0.5, 1.0, SHAPE).astype(np.float32))
+
+
+def make_session(base_dir, name, valid=True):
+    session = base_dir / name
+    session.mkdir()
+    (session / "metadata.json").write_text(json.dumps({"session_name": name}))
+    if valid:
+        write_maps(session)
+    else:
+        for direction in DIRECTIONS:
+            (session / f"phase_{direction}.npy").write_bytes(b"not a numpy file")
+            (session / f"magnitude_{direction}.npy").write_bytes(b"not a numpy file")
+    return session
+
+
+def manifest_path(session):
+    return session / "analysis_results" / BATCH_MANIFEST_NAME
+
+
+def statuses(result):
+    return {Path(s["session_path"]).name: s["status"] for s in result["sessions"]}
+
+
+def test_results_key_tracks_sources_and_parameters(tmp_path):
+    session = make_session(tmp_path, "s1")
+    key = results_key(session, PARAMETER_GROUPS, "streaming")
+
+    assert results_key(session, PARAMETER_GROUPS, "streaming") == key
+    assert results_key(session, PARAMETER_GROUPS, "fft") != key
+    changed = {**PARAMETER_GROUPS, "analysis": {**PARAMETER_GROUPS["analysis"], "smoothing_sigma": 3.0}}
+    assert results_key(session, changed, "streaming") != key
+    write_maps(session, seed=1)  # Re-recorded / replaced input files
+    assert results_key(session, PARAMETER_GROUPS, "streaming") != key
+
+
+def test_failed_sessions_get_no_manifest_and_are_retried(tmp_path):
+    good = [make_session(tmp_path, name) for name in ("a", "b")]
+    broken = make_session(tmp_path, "c", valid=False)
+    sessions = good + [broken]
+
+    first = run_batch_analysis(sessions, PARAMETER_GROUPS, max_workers=1)
+    assert statuses(first) == {"a": "analyzed", "b": "analyzed", "c": "failed"}
+    assert first["counts"] == {"analyzed": 2, "failed": 1}
+    assert all(manifest_path(session).exists() for session in good)
+    assert not manifest_path(broken).exists()
+    for session in good:
+        key = results_key(session, PARAMETER_GROUPS, "streaming")
+        assert json.loads(manifest_path(session).read_text())["results_key"] == key
+        assert is_up_to_date(session, key)
+
+    # Rerun: finished sessions are skipped, the failed one is analyzed again
+    write_maps(broken)
+    second = run_batch_analysis(sessions, PARAMETER_GROUPS, max_workers=1)
+    assert statuses(second) == {"a": "up_to_date", "b": "up_to_date", "c": "analyzed"}
+    assert manifest_path(broken).exists()
+
+    forced = run_batch_analysis(good[:1], PARAMETER_GROUPS, max_workers=1, force=True)
+    assert statuses(forced) == {"a": "analyzed"}
+
+
+def test_stopped_batch_resumes_with_unfinished_sessions(tmp_path):
+    sessions = [make_session(tmp_path, name) for name in ("a", "b", "c")]
+    finished = []
+
+    stopped = run_batch_analysis(
+        sessions, PARAMETER_GROUPS, max_workers=1,
+        progress_callback=lambda done, total, summary: finished.append(summary),
+        should_stop=lambda: len(finished) >= 1,
+    )
+    assert statuses(stopped) == {"a": "analyzed", "b": "cancelled", "c": "cancelled"}
+    assert [manifest_path(s).exists() for s in sessions] == [True, False, False]
+
+    resumed = run_batch_analysis(sessions, PARAMETER_GROUPS, max_workers=1)
+    assert statuses(resumed) == {"a": "up_to_date", "b": "analyzed", "c": "analyzed"}
+
+    # Changed analysis parameters make every session stale again
+    changed = {**PARAMETER_GROUPS, "analysis": {**PARAMETER_GROUPS["analysis"], "vfs_threshold_sd": 1.5}}
+    key = results_key(sessions[0], changed, "streaming")
+    assert not is_up_to_date(sessions[0], key)
+
+
+class FakeSessionExecutor:
+    """Stands in for the per-session process pool; tracks concurrently running sessions."""
+
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def __init__(self, max_workers, mp_context=None):
+        assert max_workers == 1
+
+    def submit(self, fn, session_path, *args):
+        future = Future()
+        cls = FakeSessionExecutor
+        with cls.lock:
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+
+        def finish():
+            time.sleep(0.2)
+            with cls.lock:
+                cls.running -= 1
+            future.set_result({"success": True, "num_areas": 1, "elapsed_s": 0.2, "peak_rss_bytes": 1})
+
+        threading.Thread(target=finish, daemon=True).start()
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+@pytest.mark.parametrize("budget, max_workers, expected_concurrency", [
+    (1, 3, 1),  # Nothing fits: still one session at a time
+    (250, 3, 2),
+    (10_000, 3, 3),
+    (10_000, 2, 2),
+])
+def test_admission_stays_within_memory_budget(tmp_path, monkeypatch, budget, max_workers, expected_concurrency):
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", FakeSessionExecutor)
+    monkeypatch.setattr(batch, "estimate_session_memory", lambda session, pipeline: 100)
+    monkeypatch.setattr(FakeSessionExecutor, "running", 0)
+    monkeypatch.setattr(FakeSessionExecutor, "max_running", 0)
+    sessions = [make_session(tmp_path, f"s{i}") for i in range(4)]
+    for session in sessions:
+        (session / "analysis_results").mkdir()
+
+    result = run_batch_analysis(sessions, PARAMETER_GROUPS, max_workers=max_workers, memory_budget_bytes=budget)
+
+    assert result["counts"] == {"analyzed": 4}
+    assert FakeSessionExecutor.max_running == expected_concurrency
+    assert all(summary["estimated_mb"] == 100 / 1024 ** 2 for summary in result["sessions"])
@@ -0,0 +1,137 @@
+"""Test the camera capture ring and the recording frame buffer pool."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import h5py
+import numpy as np
+
+from acquisition.recorder import AcquisitionRecorder, CameraStreamWriter
+from camera.pipeline import FrameBufferPool, FrameCaptureRing
+
+FRAME_SHAPE = (4, 6)
+TIMEOUT_S = 10.0
+
+
+def publish(ring, frame_index):
+    """Capture one frame the way the capture thread does."""
+    slot = ring.begin_write()
+    frame = np.full(FRAME_SHAPE, frame_index % 256, dtype=np.uint8)
+    return ring.publish(slot, frame, timestamp_us=frame_index * 1000, frame_index=frame_index)
+
+
+def test_wait_next_counts_frames_overwritten_after_wraparound():
+    ring = FrameCaptureRing(capacity=4)
+    for frame_index in range(1, 11):
+        publish(ring, frame_index)
+
+    # Cursor 0 fell 10 frames behind a 4-slot ring; the slot after head may be
+    # mid-overwrite, so the oldest safe frame is head - capacity + 2
+    slot, sequence, skipped = ring.wait_next(0, timeout=0)
+    assert (sequence, skipped) == (8, 7)
+    assert slot.frame_index == 8 and slot.timestamp_us == 8000
+    assert ring.is_current(slot, sequence)
+
+    # A cursor still inside the ring skips nothing
+    assert ring.wait_next(7, timeout=0)[1:] == (8, 0)
+    assert ring.wait_next(8, timeout=0)[1:] == (9, 0)
+    assert ring.wait_next(9, timeout=0)[1:] == (10, 0)
+    assert ring.wait_next(10, timeout=0.01) is None
+
+    # wait_latest jumps to head and counts everything in between
+    slot, sequence, skipped = ring.wait_latest(3, timeout=0)
+    assert (sequence, skipped) == (10, 6) and slot.frame_index == 10
+
+
+def test_begin_write_invalidates_slot_held_by_a_stage():
+    ring = FrameCaptureRing(capacity=4)
+    publish(ring, 1)
+    slot, sequence, _ = ring.wait_next(0, timeout=0)
+    for frame_index in range(2, 5):
+        publish(ring, frame_index)
+    assert ring.is_current(slot, sequence)
+
+    # The producer wraps around onto the slot the stage is still reading
+    claimed = ring.begin_write()
+    assert claimed is slot
+    assert not ring.is_current(slot, sequence)
+
+    publish_sequence = ring.publish(claimed, np.zeros(FRAME_SHAPE, dtype=np.uint8), 5000, 5)
+    assert publish_sequence == 5
+    assert not ring.is_current(slot, sequence) and ring.is_current(slot, 5)
+
+
+def test_close_wakes_waiting_stages():
+    ring = FrameCaptureRing(capacity=4)
+    results = {}
+
+    def wait(name, method):
+        start = time.monotonic()
+        results[name] = (method(0, TIMEOUT_S), time.monotonic() - start)
+
+    waiters = [
+        threading.Thread(target=wait, args=("next", ring.wait_next)),
+        threading.Thread(target=wait, args=("latest", ring.wait_latest)),
+    ]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.05)
+    ring.close()
+    for waiter in waiters:
+        waiter.join(TIMEOUT_S)
+        assert not waiter.is_alive()
+
+    assert ring.closed
+    for result, elapsed in results.values():
+        assert result is None and elapsed < TIMEOUT_S / 2
+
+    # Frames published before close are no longer handed out
+    publish(ring, 1)
+    assert ring.wait_next(0, timeout=TIMEOUT_S) is None
+
+
+def test_pool_reuses_buffers_released_by_the_recorder(tmp_path):
+    pool = FrameBufferPool(FRAME_SHAPE, max_buffers=4)
+    recorder = AcquisitionRecorder(str(tmp_path), {"camera": {}})
+    recorder.start_recording("LR")
+
+    used = set()
+    for frame_index in range(200):
+        buffer = pool.acquire(timeout=TIMEOUT_S)
+        assert buffer is not None
+        used.add(id(buffer))
+        buffer[:] = frame_index % 256
+        recorder.record_camera_frame(frame_index * 1000, frame_index, buffer, release=pool.release)
+    recorder.stop_recording()
+
+    # Steady state recycles the same few buffers instead of allocating per frame
+    assert pool.allocated <= 4 and len(used) == pool.allocated
+    with h5py.File(tmp_path / "LR_camera.h5", "r") as f:
+        np.testing.assert_array_equal(f["frames"][:, 0, 0], np.arange(200) % 256)
+
+
+def test_pool_acquire_times_out_while_writer_holds_every_buffer(tmp_path):
+    pool = FrameBufferPool(FRAME_SHAPE, max_buffers=2)
+    stalled = threading.Event()
+
+    def release_when_unstalled(buffer):
+        assert stalled.wait(TIMEOUT_S)  # Writer thread stuck (e.g. slow disk)
+        pool.release(buffer)
+
+    writer = CameraStreamWriter(tmp_path / "LR_camera.h5")
+    buffers = [pool.acquire(timeout=0) for _ in range(2)]
+    for buffer in buffers:
+        writer.write(0, buffer, release_when_unstalled)
+
+    start = time.monotonic()
+    assert pool.acquire(timeout=0.05) is None
+    assert time.monotonic() - start >= 0.05
+    assert pool.allocated == 2
+
+    stalled.set()
+    recycled = pool.acquire(timeout=TIMEOUT_S)
+    assert any(recycled is buffer for buffer in buffers)
+    assert writer.close({})
@@ -0,0 +1,156 @@
+"""Test streaming camera frames to HDF5 (chunking, atomic rename, errors, buffer release)."""
+
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import h5py
+import numpy as np
+import pytest
+
+from acquisition.recorder import AcquisitionRecorder, CameraStreamWriter
+
+FRAME_SHAPE = (8, 10)  # Small frames: CAMERA_MAX_CHUNK_FRAMES frames per chunk
+TIMEOUT_S = 10.0
+
+
+class Releases:
+    """release callback that counts calls per buffer."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, buffer):
+        with self._lock:
+            self.counts[id(buffer)] += 1
+
+    def assert_each_once(self, buffers):
+        assert [self.counts[id(buffer)] for buffer in buffers] == [1] * len(buffers)
+        assert sum(self.counts.values()) == len(buffers)
+
+
+def make_frames(count, shape=FRAME_SHAPE):
+    return [np.full(shape, index % 256, dtype=np.uint8) for index in range(count)]
+
+
+@pytest.fixture
+def final_path(tmp_path):
+    return tmp_path / "LR_camera.h5"
+
+
+def wait_for_error(writer):
+    deadline = time.monotonic() + TIMEOUT_S
+    while writer._error is None:
+        assert time.monotonic() < deadline, "writer thread did not fail"
+        time.sleep(0.01)
+
+
+def test_close_flushes_partial_chunk_and_renames(final_path):
+    releases = Releases()
+    frames = make_frames(70)  # One full chunk plus a partial one
+    writer = CameraStreamWriter(final_path)
+    for index, frame in enumerate(frames):
+        writer.write(1000 + index, frame, releases)
+
+    assert writer.temp_path.exists() and not final_path.exists()
+    assert writer.close({"direction": "LR"})
+
+    assert final_path.exists() and not writer.temp_path.exists()
+    assert writer.frames_written == 70
+    with h5py.File(final_path, "r") as f:
+        assert f["frames"].chunks[0] == 64
+        np.testing.assert_array_equal(f["frames"][:], np.stack(frames))
+        np.testing.assert_array_equal(f["timestamps"][:], 1000 + np.arange(70))
+        assert f.attrs["direction"] == "LR"
+    releases.assert_each_once(frames)
+
+
+def test_close_without_frames_removes_temp_file(final_path):
+    writer = CameraStreamWriter(final_path)
+    assert writer.temp_path.exists()
+
+    assert not writer.close({})
+
+    assert not writer.temp_path.exists() and not final_path.exists()
+    assert not writer.close({})  # Second close is a no-op
+
+
+def test_writer_thread_error_surfaces_and_releases_every_frame(final_path):
+    releases = Releases()
+    frames = make_frames(3)
+    bad_frame = np.zeros((4, 4), dtype=np.uint8)  # Does not fit the chunk buffer
+    writer = CameraStreamWriter(final_path)
+    for frame in frames:
+        writer.write(0, frame, releases)
+    writer.write(0, bad_frame, releases)
+    wait_for_error(writer)
+
+    late_frame = make_frames(1)[0]
+    with pytest.raises(RuntimeError, match="Camera writer failed"):
+        writer.write(0, late_frame, releases)
+    with pytest.raises(RuntimeError, match="Camera writer failed"):
+        writer.close({})
+
+    assert not writer.temp_path.exists() and not final_path.exists()
+    releases.assert_each_once(frames + [bad_frame, late_frame])
+
+
+def test_write_after_close_releases_frame(final_path):
+    releases = Releases()
+    frames = make_frames(2)
+    writer = CameraStreamWriter(final_path)
+    writer.write(0, frames[0], releases)
+    writer.close({})
+
+    with pytest.raises(RuntimeError, match="already closed"):
+        writer.write(1, frames[1], releases)
+    releases.assert_each_once(frames)
+
+
+def test_frame_queued_behind_close_is_released(final_path):
+    """A write() that passed the closed check before close() queues behind the sentinel."""
+    releases = Releases()
+    frames = make_frames(2)
+    writer = CameraStreamWriter(final_path)
+    writer.write(0, frames[0], releases)
+
+    join = writer._thread.join
+
+    def racing_write_then_join(*args, **kwargs):
+        writer._closed = False  # As seen by the racing write()
+        writer.write(1, frames[1], releases)
+        writer._closed = True
+        join(*args, **kwargs)
+
+    writer._thread.join = racing_write_then_join
+    assert writer.close({})
+
+    assert writer.frames_written == 1
+    releases.assert_each_once(frames)
+
+
+def test_recorder_ignores_frame_for_direction_finalized_mid_write(tmp_path):
+    releases = Releases()
+    frames = make_frames(2)
+    recorder = AcquisitionRecorder(str(tmp_path), {"camera": {"camera_fps": 30}})
+    recorder.start_recording("LR")
+    recorder.record_camera_frame(0, 0, frames[0], release=releases)
+
+    writer = recorder._camera_writers["LR"]
+    write = writer.write
+
+    def finalize_then_write(*args):
+        recorder._finalize_camera_file("LR")  # Direction switch wins the race
+        write(*args)
+
+    writer.write = finalize_then_write
+    recorder.record_camera_frame(1, 1, frames[1], release=releases)
+
+    assert recorder.camera_frame_counts["LR"] == 1
+    with h5py.File(tmp_path / "LR_camera.h5", "r") as f:
+        assert len(f["frames"]) == 1
+    releases.assert_each_once(frames)
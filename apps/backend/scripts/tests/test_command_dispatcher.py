@@ -0,0 +1,245 @@
+"""Test per-subsystem command dispatch with stub handlers, and main.py's routes."""
+
+import ast
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import pytest
+
+from ipc.dispatcher import CommandDispatcher
+
+MAIN_PATH = Path(__file__).resolve().parents[2] / 'src' / 'main.py'
+
+ROUTES = {
+    "camera_cmd": "camera",
+    "slow_camera_cmd": "camera",
+    "analysis_cmd": "analysis",
+    "blocking_system_cmd": "system",
+}
+FAST_PATH = ("ping",)
+TIMEOUT_S = 10.0
+
+
+class Responses:
+    """Thread-safe response sink for send_response."""
+
+    def __init__(self):
+        self.items = []
+        self._condition = threading.Condition()
+
+    def send(self, response):
+        with self._condition:
+            self.items.append(dict(response))
+            self._condition.notify_all()
+        return True
+
+    def wait_for(self, count):
+        with self._condition:
+            assert self._condition.wait_for(lambda: len(self.items) >= count, TIMEOUT_S), \
+                f"expected {count} responses, got {len(self.items)}"
+            return list(self.items)
+
+    def by_id(self, message_id):
+        return next(r for r in self.items if r.get("messageId") == message_id)
+
+
+@pytest.fixture
+def setup():
+    """Dispatcher with stub handlers; gate blocks the blocking/slow handlers."""
+    gate = threading.Event()
+    started = threading.Event()
+    calls = []
+    calls_lock = threading.Lock()
+
+    def record(command):
+        with calls_lock:
+            calls.append((command["type"], command.get("index"), threading.current_thread().name))
+
+    def camera_cmd(command):
+        record(command)
+        time.sleep(0.001 * (command["index"] % 3))  # Uneven durations must not reorder
+        return {"success": True, "index": command["index"]}
+
+    def blocking(command):
+        record(command)
+        started.set()
+        assert gate.wait(TIMEOUT_S)
+        return {"success": True}
+
+    def ping(command):
+        record(command)
+        return {"success": True, "pong": True}
+
+    def failing(command):
+        raise RuntimeError("handler exploded")
+
+    handlers = {
+        "camera_cmd": camera_cmd,
+        "slow_camera_cmd": blocking,
+        "analysis_cmd": blocking,
+        "blocking_system_cmd": blocking,
+        "ping": ping,
+        "failing_cmd": failing,
+    }
+    responses = Responses()
+    dispatcher = CommandDispatcher(handlers, responses.send, routes=ROUTES, fast_path=FAST_PATH)
+    yield dispatcher, responses, calls, gate, started
+
+    gate.set()
+    dispatcher.shutdown(wait=True)
+
+
+def test_same_subsystem_commands_keep_arrival_order(setup):
+    dispatcher, responses, calls, _, _ = setup
+
+    for index in range(30):
+        dispatcher.dispatch({"type": "camera_cmd", "messageId": f"m{index}", "index": index})
+    received = responses.wait_for(30)
+
+    assert [r["index"] for r in received] == list(range(30))
+    assert [r["messageId"] for r in received] == [f"m{i}" for i in range(30)]
+    assert all(r["type"] == "camera_cmd_response" for r in received)
+    assert {thread for _, _, thread in calls} == {"Cmd-camera_0"}
+    assert dispatcher.pending() == {"camera": 0}
+
+
+def test_other_subsystems_run_while_one_is_blocked(setup):
+    dispatcher, responses, _, gate, started = setup
+
+    dispatcher.dispatch({"type": "analysis_cmd", "messageId": "slow"})
+    assert started.wait(TIMEOUT_S)
+    dispatcher.dispatch({"type": "camera_cmd", "messageId": "fast", "index": 0})
+
+    assert responses.wait_for(1)[0]["messageId"] == "fast"
+    assert dispatcher.pending()["analysis"] == 1
+    gate.set()
+    assert responses.wait_for(2)[1]["messageId"] == "slow"
+
+
+def test_fast_path_runs_inline_while_executors_are_busy(setup):
+    dispatcher, responses, calls, gate, started = setup
+
+    dispatcher.dispatch({"type": "blocking_system_cmd", "messageId": "busy"})
+    assert started.wait(TIMEOUT_S)
+    dispatcher.dispatch({"type": "ping", "messageId": "p"})
+
+    # Answered before dispatch() returned, on the calling thread, not queued
+    assert [r["messageId"] for r in responses.items] == ["p"]
+    assert responses.by_id("p")["type"] == "ping_response"
+    assert ("ping", None, threading.current_thread().name) in calls
+    assert "ping" not in dispatcher.pending() and dispatcher.pending()["system"] == 1
+    gate.set()
+    responses.wait_for(2)
+
+
+def test_shutdown_answers_cancelled_commands(setup):
+    dispatcher, responses, _, gate, started = setup
+
+    dispatcher.dispatch({"type": "slow_camera_cmd", "messageId": "running"})
+    assert started.wait(TIMEOUT_S)
+    for index in range(3):
+        dispatcher.dispatch({"type": "camera_cmd", "messageId": f"queued{index}", "index": index})
+    assert dispatcher.pending()["camera"] == 4
+
+    # shutdown(wait=True) cancels the queued commands, then waits for the running one
+    stopper = threading.Thread(target=dispatcher.shutdown, kwargs={"wait": True})
+    stopper.start()
+    cancelled = responses.wait_for(3)
+    assert stopper.is_alive()
+    gate.set()
+    stopper.join(TIMEOUT_S)
+    assert not stopper.is_alive()
+
+    assert [r["messageId"] for r in cancelled] == ["queued0", "queued1", "queued2"]
+    for response in cancelled:
+        assert response == {
+            "success": False,
+            "error": "Backend is shutting down",
+            "type": "camera_cmd_response",
+            "messageId": response["messageId"],
+        }
+    assert responses.wait_for(4)[3] == {"success": True, "type": "slow_camera_cmd_response", "messageId": "running"}
+    assert dispatcher.pending() == {"camera": 0}
+
+
+def test_commands_after_shutdown_are_rejected(setup):
+    dispatcher, responses, calls, _, _ = setup
+    dispatcher.shutdown(wait=True)
+
+    dispatcher.dispatch({"type": "camera_cmd", "messageId": "late", "index": 0})
+    dispatcher.dispatch({"type": "ping", "messageId": "late-ping"})
+
+    assert calls == []
+    for message_id in ("late", "late-ping"):
+        response = responses.by_id(message_id)
+        assert not response["success"] and response["error"] == "Backend is shutting down"
+
+
+def test_handler_errors_and_unknown_commands_get_error_responses(setup):
+    dispatcher, responses, _, _, _ = setup
+
+    dispatcher.dispatch({"type": "failing_cmd", "messageId": "fail"})
+    dispatcher.dispatch({"type": "no_such_cmd", "messageId": "unknown"})
+    dispatcher.dispatch({"messageId": "untyped"})
+    responses.wait_for(3)
+
+    assert responses.by_id("fail") == {
+        "success": False, "error": "handler exploded", "type": "failing_cmd_response", "messageId": "fail",
+    }
+    assert responses.by_id("unknown")["error"] == "Unknown command: no_such_cmd"
+    assert responses.by_id("untyped")["error"] == "Command type is required"
+
+
+def test_unserializable_response_is_replaced_by_error():
+    sent = []
+
+    def send_response(response):
+        sent.append(dict(response))
+        return len(sent) > 1  # First (real) response fails to serialize
+
+    dispatcher = CommandDispatcher({"ping": lambda command: {"success": True}}, send_response, fast_path=FAST_PATH)
+    dispatcher.dispatch({"type": "ping", "messageId": "p"})
+
+    assert sent[1] == {
+        "success": False,
+        "error": "Failed to serialize response (check backend logs)",
+        "type": "ping_response",
+        "messageId": "p",
+    }
+
+
+def main_routing_tables():
+    """Handler keys of create_handlers(), COMMAND_SUBSYSTEMS and FAST_PATH_COMMANDS from main.py.
+
+    Read from the source: importing main.py needs every backend dependency.
+    """
+    tree = ast.parse(MAIN_PATH.read_text())
+    tables = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id in ("COMMAND_SUBSYSTEMS", "FAST_PATH_COMMANDS"):
+                tables[node.targets[0].id] = ast.literal_eval(node.value)
+        elif isinstance(node, ast.FunctionDef) and node.name == "create_handlers":
+            for statement in ast.walk(node):
+                if (
+                    isinstance(statement, ast.Assign)
+                    and isinstance(statement.targets[0], ast.Name)
+                    and statement.targets[0].id == "handlers"
+                ):
+                    tables["handlers"] = [key.value for key in statement.value.keys]
+    return tables["handlers"], tables["COMMAND_SUBSYSTEMS"], tables["FAST_PATH_COMMANDS"]
+
+
+def test_every_main_handler_is_routed_explicitly():
+    handlers, subsystems, fast_path = main_routing_tables()
+    routed = [command for commands in subsystems.values() for command in commands]
+
+    assert len(handlers) == len(set(handlers))
+    assert len(routed) == len(set(routed)), "command listed under two subsystems"
+    assert set(handlers) - set(routed) - set(fast_path) == set()
+    assert set(routed) | set(fast_path) <= set(handlers)
+    assert not set(routed) & set(fast_path)
+    assert subsystems["parameters"].count("frontend_ready") == 1
@@ -0,0 +1,105 @@
+"""Test cached real-FFT Gaussian smoothing against the original fft2/ifft2 path."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import numpy as np
+import pytest
+
+from config import AnalysisConfig
+from analysis.pipeline import AnalysisPipeline, _gaussian_kernel_spectrum
+
+# Real-FFT and complex-FFT rounding differ by a few ulps, relative to the data scale
+TOLERANCE = 1e-15
+
+
+def make_config():
+    return AnalysisConfig(
+        coherence_threshold=0.3,
+        ring_size_mm=2.0,
+        phase_filter_sigma=0.0,
+        smoothing_sigma=3.0,
+        gradient_window_size=3,
+        magnitude_threshold=0.3,
+        response_threshold_percent=20,
+        vfs_threshold_sd=1.5,
+        area_min_size_mm2=0.1,
+    )
+
+
+def reference_smoothing(data, sigma):
+    """Original path: real(ifft2(fft2(data) * abs(fft2(h)))) with a centred, normalized h."""
+    y, x = np.ogrid[: data.shape[0], : data.shape[1]]
+    center_y, center_x = data.shape[0] // 2, data.shape[1] // 2
+    h = np.exp(-((x - center_x) ** 2 + (y - center_y) ** 2) / (2 * sigma**2))
+    h = h / np.sum(h)
+    return np.real(np.fft.ifft2(np.fft.fft2(data) * np.abs(np.fft.fft2(h))))
+
+
+def reference_gradients(azimuth_map, elevation_map, sigma):
+    """Original compute_spatial_gradients: each map smoothed on its own."""
+    d_azimuth_dy, d_azimuth_dx = np.gradient(reference_smoothing(azimuth_map, sigma))
+    d_elevation_dy, d_elevation_dx = np.gradient(reference_smoothing(elevation_map, sigma))
+    return {
+        'd_azimuth_dx': d_azimuth_dx,
+        'd_azimuth_dy': d_azimuth_dy,
+        'd_elevation_dx': d_elevation_dx,
+        'd_elevation_dy': d_elevation_dy,
+    }
+
+
+def assert_close(actual, expected, scale):
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=TOLERANCE * scale)
+
+
+@pytest.mark.parametrize("shape", [(64, 80), (63, 81), (50, 37)])
+@pytest.mark.parametrize("sigma", [1.5, 3.0])
+def test_smoothing_matches_complex_fft(shape, sigma):
+    """Even and odd widths (odd widths need irfft2(..., s=shape) to restore the last axis)."""
+    data = np.random.default_rng(0).normal(scale=40.0, size=shape)
+    pipeline = AnalysisPipeline(make_config())
+
+    smoothed = pipeline._apply_fft_gaussian_smoothing(data, sigma)
+
+    assert smoothed.shape == shape
+    assert_close(smoothed, reference_smoothing(data, sigma), np.max(np.abs(data)))
+
+
+@pytest.mark.parametrize("shape", [(48, 64), (47, 61)])
+def test_stacked_smoothing_matches_per_map(shape):
+    rng = np.random.default_rng(1)
+    stack = rng.normal(scale=40.0, size=(3,) + shape)
+    pipeline = AnalysisPipeline(make_config())
+
+    smoothed = pipeline._apply_fft_gaussian_smoothing(stack, 3.0)
+
+    assert smoothed.shape == stack.shape
+    for index in range(stack.shape[0]):
+        assert_close(smoothed[index], reference_smoothing(stack[index], 3.0), np.max(np.abs(stack)))
+
+
+@pytest.mark.parametrize("shape", [(48, 64), (47, 61)])
+def test_spatial_gradients_match_original(shape):
+    rng = np.random.default_rng(2)
+    azimuth_map = rng.uniform(-60.0, 60.0, size=shape)
+    elevation_map = rng.uniform(-30.0, 30.0, size=shape)
+    pipeline = AnalysisPipeline(make_config())
+
+    gradients = pipeline.compute_spatial_gradients(azimuth_map, elevation_map)
+    expected = reference_gradients(azimuth_map, elevation_map, 3.0)
+
+    assert set(gradients) == set(expected)
+    for name, gradient in expected.items():
+        assert_close(gradients[name], gradient, 60.0)
+
+
+def test_kernel_spectrum_is_cached_read_only():
+    _gaussian_kernel_spectrum.cache_clear()
+    first = _gaussian_kernel_spectrum((40, 45), 2.0)
+    second = _gaussian_kernel_spectrum((40, 45), 2.0)
+
+    assert first is second
+    assert first.shape == (40, 45 // 2 + 1)
+    assert not first.flags.writeable
+    assert _gaussian_kernel_spectrum.cache_info().hits == 1
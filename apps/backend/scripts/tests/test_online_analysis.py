@@ -0,0 +1,244 @@
+"""Test online (incremental) analysis and its reuse by offline analysis."""
+
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import h5py
+import numpy as np
+import pytest
+
+from config import AnalysisConfig
+from analysis.manager import AnalysisManager, DirectionData
+from analysis.online import OnlineAnalysisEngine, online_stage_key
+from analysis.pipeline import AnalysisPipeline
+from analysis.stage_cache import STAGE_CACHE_DIRNAME, StageCache
+from analysis.worker import StaticParameters
+
+FRAME_SHAPE = (8, 10)
+PERIOD_SEC = 2.0
+FRAME_INTERVAL_US = 33_333
+N_FRAMES = 180  # ~3 periods at 30 fps
+TIMEOUT_S = 10.0
+
+ANALYSIS_PARAMS = {
+    "coherence_threshold": 0.3,
+    "ring_size_mm": 2.0,
+    "phase_filter_sigma": 0.0,
+    "smoothing_sigma": 2.0,
+    "gradient_window_size": 3,
+    "magnitude_threshold": 0.3,
+    "response_threshold_percent": 20,
+    "vfs_threshold_sd": 1.5,
+    "area_min_size_mm2": 0.1,
+}
+
+
+class StubRenderer:
+    def render_phase_map(self, phase_map, magnitude_map):
+        return np.zeros(phase_map.shape + (3,), dtype=np.uint8)
+
+    def render_retinotopic_map(self, retinotopy, kind):
+        return np.zeros(retinotopy.shape + (3,), dtype=np.uint8)
+
+    def encode_as_png(self, image):
+        return b"png"
+
+
+class StubIPC:
+    def __init__(self):
+        self.messages = []
+
+    def send_sync_message(self, message):
+        self.messages.append(message)
+
+
+def expected_phase():
+    """Per-pixel response phase of the synthetic recording."""
+    y, x = np.mgrid[:FRAME_SHAPE[0], :FRAME_SHAPE[1]]
+    return np.angle(np.exp(1j * (0.3 * x - 0.2 * y + 0.5)))
+
+
+def make_recording(n_frames=N_FRAMES, start_us=5_000_000):
+    """Frames responding at the stimulus period with a per-pixel phase, plus timestamps."""
+    timestamps = start_us + np.arange(n_frames, dtype=np.int64) * FRAME_INTERVAL_US
+    t = (timestamps - start_us)[:, None, None] / 1e6
+    frames = 100.0 + 20.0 * np.cos(2.0 * np.pi * t / PERIOD_SEC + expected_phase())
+    return np.round(frames).astype(np.uint8), timestamps
+
+
+def phase_error(phase, reference):
+    return np.max(np.abs(np.angle(np.exp(1j * (phase - reference)))))
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT_S
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the online analysis worker"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def engine():
+    ipc = StubIPC()
+    engine = OnlineAnalysisEngine(
+        AnalysisPipeline(AnalysisConfig(**ANALYSIS_PARAMS)),
+        StubRenderer(),
+        ipc,
+        preview_interval_sec=3600.0,
+        block_frames=16,
+    )
+    yield engine, ipc
+    engine.cleanup()
+
+
+def record_direction(engine, session_path, frames, timestamps, direction="LR"):
+    engine.begin_session(str(session_path))
+    engine.start_direction(direction, PERIOD_SEC)
+    for frame, timestamp_us in zip(frames, timestamps):
+        engine.add_frame(frame, int(timestamp_us))
+    engine.finish_direction()
+    wait_until(lambda: direction in engine.get_direction_maps())
+    return engine.get_direction_maps()[direction]
+
+
+def test_worker_flushes_partial_block_when_idle(engine, tmp_path):
+    engine, _ = engine
+    frames, timestamps = make_recording(5)
+    engine.begin_session(str(tmp_path))
+    engine.start_direction("LR", PERIOD_SEC)
+    state = engine._current
+
+    for frame, timestamp_us in zip(frames, timestamps):
+        engine.add_frame(frame, int(timestamp_us))
+
+    # Fewer frames than block_frames: accumulated once the queue goes idle
+    wait_until(lambda: state.accumulator is not None and state.accumulator.frames_seen == 5)
+    assert engine.get_status()["current_direction"] == "LR"
+
+
+def test_finish_direction_completes_and_stores_maps(engine, tmp_path):
+    engine, ipc = engine
+    frames, timestamps = make_recording()
+
+    phase_map, magnitude_map, coherence_map = record_direction(engine, tmp_path, frames, timestamps)
+
+    assert phase_map.shape == magnitude_map.shape == coherence_map.shape == FRAME_SHAPE
+    assert phase_error(phase_map, expected_phase()) < 0.05
+    assert not engine.is_collecting
+
+    complete = [m for m in ipc.messages if m["type"] == "online_analysis_direction_complete"]
+    assert len(complete) == 1
+    assert complete[0]["frames"] == N_FRAMES and complete[0]["frames_dropped"] == 0
+    assert complete[0]["completed_directions"] == ["LR"]
+    assert any(m["type"] == "online_analysis_preview" and m["layer_name"] == "phase_LR" for m in ipc.messages)
+
+    # Unfiltered maps stored for offline analysis, keyed by the frames they cover
+    cache = StageCache(tmp_path / "analysis_results" / STAGE_CACHE_DIRNAME)
+    stored = cache.load("online_LR", online_stage_key("LR", N_FRAMES, timestamps[0], timestamps[-1]))
+    assert stored is not None
+    assert int(stored["frames_seen"]) == N_FRAMES and int(stored["frames_dropped"]) == 0
+    np.testing.assert_array_equal(stored["phase_map"], phase_map)
+
+
+def test_dropped_camera_frames_keep_phase(engine, tmp_path):
+    """Positions come from capture timestamps, so gaps do not shift later frames."""
+    engine, _ = engine
+    frames, timestamps = make_recording()
+    kept = np.ones(N_FRAMES, dtype=bool)
+    kept[10::7] = False  # Frames never delivered by the camera
+
+    phase_map, _, _ = record_direction(engine, tmp_path, frames[kept], timestamps[kept])
+
+    assert phase_error(phase_map, expected_phase()) < 0.05
+    # Contiguous frame indices would misplace every frame after the first gap
+    frame_period = PERIOD_SEC * 1e6 / FRAME_INTERVAL_US
+    contiguous = np.exp(-2j * np.pi * np.arange(kept.sum()) / frame_period)
+    signal = frames[kept].reshape(kept.sum(), -1).astype(np.float64)
+    contiguous_phase = np.angle(contiguous @ (signal - signal.mean(axis=0))).reshape(FRAME_SHAPE)
+    assert phase_error(contiguous_phase, expected_phase()) > 0.5
+
+
+def make_manager():
+    groups = {"analysis": ANALYSIS_PARAMS, "acquisition": {"directions": ["LR"], "cycles": 3}}
+    return AnalysisManager(
+        StaticParameters(groups), StubIPC(), None, AnalysisPipeline(AnalysisConfig(**ANALYSIS_PARAMS))
+    )
+
+
+def camera_direction(session_path, frames, timestamps):
+    camera_path = session_path / "LR_camera.h5"
+    with h5py.File(camera_path, "w") as f:
+        f.create_dataset("frames", data=frames)
+        f.create_dataset("timestamps", data=timestamps)
+    direction_data = DirectionData()
+    direction_data.camera_path = camera_path
+    direction_data.n_frames = len(frames)
+    direction_data.frame_shape = FRAME_SHAPE
+    direction_data.timestamps = timestamps
+    direction_data.stimulus_angles = np.zeros(len(frames))
+    return direction_data
+
+
+def compute_offline(manager, session_path, direction_data):
+    session_data = type("Session", (), {"directions": {"LR": direction_data}})()
+    manager.is_running = True
+    cache = StageCache(session_path / "analysis_results" / STAGE_CACHE_DIRNAME)
+    results, _ = manager._compute_direction_maps(session_data, ["LR"], cycles=3, stage_cache=cache)
+    return results["LR"]
+
+
+def test_offline_analysis_uses_complete_online_maps(engine, tmp_path):
+    engine, _ = engine
+    frames, timestamps = make_recording()
+    online = record_direction(engine, tmp_path, frames, timestamps)
+
+    manager = make_manager()
+    manager._compute_single_direction = lambda *args: pytest.fail("camera file was re-read")
+    maps = compute_offline(manager, tmp_path, camera_direction(tmp_path, frames, timestamps))
+
+    for actual, expected in zip(maps, online):
+        np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("mismatch", ["extra_recorded_frame", "online_queue_dropped"])
+def test_offline_analysis_recomputes_incomplete_online_maps(engine, tmp_path, mismatch):
+    engine, _ = engine
+    frames, timestamps = make_recording()
+    if mismatch == "extra_recorded_frame":
+        record_direction(engine, tmp_path, frames[:-1], timestamps[:-1])
+    else:
+        record_direction(engine, tmp_path, frames, timestamps)
+        # Same frames, but online analysis reports frames lost from its queue
+        cache = StageCache(tmp_path / "analysis_results" / STAGE_CACHE_DIRNAME)
+        key = online_stage_key("LR", N_FRAMES, timestamps[0], timestamps[-1])
+        stored = cache.load("online_LR", key)
+        stored["frames_dropped"] = np.int64(3)
+        cache.store("online_LR", key, stored)
+
+    manager = make_manager()
+    computed = []
+    recompute = manager._compute_single_direction
+
+    def compute_single_direction(*args):
+        computed.append(args[0])
+        return recompute(*args)
+
+    manager._compute_single_direction = compute_single_direction
+    phase_map, _, _ = compute_offline(manager, tmp_path, camera_direction(tmp_path, frames, timestamps))
+
+    assert computed == ["LR"]
+    assert phase_error(phase_map, expected_phase()) < 0.1
+
+
+def test_offline_analysis_places_gapped_frames_by_capture_time(tmp_path):
+    frames, timestamps = make_recording()
+    kept = np.ones(N_FRAMES, dtype=bool)
+    kept[10::7] = False  # Frames the recorder fell behind on
+
+    direction_data = camera_direction(tmp_path, frames[kept], timestamps[kept])
+    direction_data.frames_skipped = int((~kept).sum())
+    phase_map, _, _ = compute_offline(make_manager(), tmp_path, direction_data)
+
+    assert phase_error(phase_map, expected_phase()) < 0.05
@@ -0,0 +1,160 @@
+"""Test analysis parameter sweeps (grid expansion, validation, comparison store)."""
+
+import json
+import logging
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import h5py
+import numpy as np
+import pytest
+
+from config import AnalysisConfig
+from analysis.sweep import (
+    COVERAGE_FIELDS,
+    PIPELINE_LOGGER,
+    build_configs,
+    expand_parameter_grid,
+    run_parameter_sweep,
+)
+
+SHAPE = (32, 40)
+
+BASE_CONFIG = AnalysisConfig(
+    coherence_threshold=0.2,
+    ring_size_mm=2.0,
+    phase_filter_sigma=0.0,
+    smoothing_sigma=2.0,
+    gradient_window_size=3,
+    magnitude_threshold=0.1,
+    response_threshold_percent=20,
+    vfs_threshold_sd=1.0,
+    area_min_size_mm2=0.01,
+)
+
+SWEEP_GRID = {"vfs_threshold_sd": [0.5, 1.5], "smoothing_sigma": [1.0, 3.0]}
+
+
+@pytest.fixture
+def session(tmp_path):
+    """Session with pre-computed phase/magnitude maps of a smooth retinotopy."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[:SHAPE[0], :SHAPE[1]]
+    azimuth = 2.0 * np.pi * (x / SHAPE[1] + 0.1 * np.sin(y / 6.0)) - np.pi
+    elevation = 2.0 * np.pi * (y / SHAPE[0] + 0.1 * np.sin(x / 5.0)) - np.pi
+    for direction, base, sign in (("LR", azimuth, 1), ("RL", azimuth, -1), ("TB", elevation, 1), ("BT", elevation, -1)):
+        phase = np.angle(np.exp(1j * (sign * base + rng.normal(0, 0.05, SHAPE)))).astype(np.float32)
+        np.save(tmp_path / f"phase_{direction}.npy", phase)
+        np.save(tmp_path / f"magnitude_{direction}.npy", rng.uniform(0.5, 1.0, SHAPE).astype(np.float32))
+    return tmp_path
+
+
+def read_store(path):
+    with h5py.File(path, "r") as store:
+        return {name: store[name][:] for name in ("vfs_maps", "statistical_vfs_maps", "area_counts") + COVERAGE_FIELDS}
+
+
+def test_expand_parameter_grid_is_cartesian_product():
+    assert expand_parameter_grid({"a": [1, 2], "b": ["x", "y"]}) == [
+        {"a": 1, "b": "x"}, {"a": 1, "b": "y"}, {"a": 2, "b": "x"}, {"a": 2, "b": "y"},
+    ]
+    assert expand_parameter_grid({"a": (v for v in [3])}) == [{"a": 3}]
+    assert expand_parameter_grid({"a": []}) == []
+
+
+def test_build_configs_applies_typed_overrides():
+    configs = build_configs(BASE_CONFIG, [
+        {"vfs_threshold_sd": "2", "response_threshold_percent": 30.0},
+        {},
+    ])
+
+    assert configs[0].vfs_threshold_sd == 2.0 and isinstance(configs[0].vfs_threshold_sd, float)
+    assert configs[0].response_threshold_percent == 30 and isinstance(configs[0].response_threshold_percent, int)
+    assert configs[0].smoothing_sigma == BASE_CONFIG.smoothing_sigma
+    assert configs[1] == BASE_CONFIG
+
+
+@pytest.mark.parametrize("name, message", [
+    ("phase_filter_sigma", "Fourier stage"),
+    ("gradient_window_size", "does not change any sweep output"),
+    ("no_such_parameter", "Unknown analysis parameter"),
+])
+def test_build_configs_rejects_unsweepable_parameters(name, message):
+    with pytest.raises(ValueError, match=message):
+        build_configs(BASE_CONFIG, [{"smoothing_sigma": 1.0}, {name: 1}])
+
+
+@pytest.mark.parametrize("value, expected", [
+    (True, True), (False, False), (1, True), (0, False), (np.bool_(True), True),
+    ("true", True), (" Yes ", True), ("on", True), ("1", True),
+    ("FALSE", False), ("no", False), ("off", False), ("0", False),
+])
+def test_bool_parameters_accept_bool_like_values(value, expected):
+    (config,) = build_configs(BASE_CONFIG, [{"boundary_skeletonize": value}])
+    assert config.boundary_skeletonize is expected
+
+
+@pytest.mark.parametrize("value", [2, -1, 0.5, "maybe", "", None])
+def test_bool_parameters_reject_other_values(value):
+    with pytest.raises(ValueError, match="boundary_skeletonize must be true or false"):
+        build_configs(BASE_CONFIG, [{"boundary_skeletonize": value}])
+
+
+def test_sequential_sweep_writes_store(session, tmp_path):
+    parameter_sets = expand_parameter_grid(SWEEP_GRID)
+    progress = []
+    root_filters = [list(handler.filters) for handler in logging.getLogger().handlers]
+    pipeline_level = logging.getLogger(PIPELINE_LOGGER).level
+
+    summary = run_parameter_sweep(
+        str(session), BASE_CONFIG, parameter_sets,
+        max_workers=1,
+        output_path=tmp_path / "sweep.h5",
+        progress_callback=lambda completed, total, entry: progress.append((completed, total, entry["index"])),
+    )
+
+    assert not summary["cancelled"]
+    assert summary["swept_parameters"] == sorted(SWEEP_GRID)
+    assert summary["map_shape"] == list(SHAPE)
+    assert progress == [(i + 1, 4, i) for i in range(4)]
+    for entry, overrides in zip(summary["entries"], parameter_sets):
+        assert entry["area_count"] >= 0 and entry["elapsed_s"] > 0
+        assert all(0.0 <= entry[name] <= 1.0 for name in COVERAGE_FIELDS)
+        assert entry["parameters"] == {**BASE_CONFIG.to_dict(), **overrides}
+
+    with h5py.File(tmp_path / "sweep.h5", "r") as store:
+        assert store["vfs_maps"].shape == (4,) + SHAPE
+        assert store["magnitude_masks"].shape == (4, 4) + SHAPE
+        assert json.loads(store.attrs["directions"]) == ["LR", "RL", "TB", "BT"]
+    # A stricter statistical threshold keeps fewer pixels
+    coverage = [entry["statistical_coverage"] for entry in summary["entries"]]
+    assert coverage[0] > coverage[2] and coverage[1] > coverage[3]
+
+    # Logging configuration is left as it was
+    assert [list(handler.filters) for handler in logging.getLogger().handlers] == root_filters
+    assert logging.getLogger(PIPELINE_LOGGER).level == pipeline_level
+
+
+def test_cancelled_sweep_leaves_remaining_sets_unevaluated(session, tmp_path):
+    progress = []
+    summary = run_parameter_sweep(
+        str(session), BASE_CONFIG, expand_parameter_grid(SWEEP_GRID),
+        max_workers=1,
+        output_path=tmp_path / "sweep.h5",
+        progress_callback=lambda completed, total, entry: progress.append(completed),
+        should_stop=lambda: len(progress) >= 2,
+    )
+
+    assert summary["cancelled"]
+    assert [entry["area_count"] >= 0 for entry in summary["entries"]] == [True, True, False, False]
+
+
+def test_worker_processes_match_in_process_sweep(session, tmp_path):
+    parameter_sets = expand_parameter_grid(SWEEP_GRID)
+    run_parameter_sweep(str(session), BASE_CONFIG, parameter_sets, max_workers=1, output_path=tmp_path / "one.h5")
+    run_parameter_sweep(str(session), BASE_CONFIG, parameter_sets, max_workers=2, output_path=tmp_path / "two.h5")
+
+    sequential, parallel = read_store(tmp_path / "one.h5"), read_store(tmp_path / "two.h5")
+    for name, values in sequential.items():
+        np.testing.assert_array_equal(parallel[name], values, err_msg=name)
@@ -0,0 +1,138 @@
+"""Test the decoded-frame playback cache (LRU blocks, read-ahead, close) and scrubbing."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import h5py
+import numpy as np
+import pytest
+
+import acquisition.modes as modes
+from acquisition.modes import PlaybackModeController
+from acquisition.playback_cache import PlaybackFrameCache
+
+N_FRAMES = 40
+FRAME_SHAPE = (4, 6)
+BLOCK_FRAMES = 4  # HDF5 chunk length = cache block length
+BLOCK_BYTES = BLOCK_FRAMES * FRAME_SHAPE[0] * FRAME_SHAPE[1]
+TIMEOUT_S = 10.0
+
+
+@pytest.fixture
+def camera_file(tmp_path):
+    frames = (np.arange(N_FRAMES, dtype=np.uint8)[:, None, None] * np.ones(FRAME_SHAPE, dtype=np.uint8))
+    path = tmp_path / "LR_camera.h5"
+    with h5py.File(path, "w") as f:
+        f.create_dataset("frames", data=frames, chunks=(BLOCK_FRAMES,) + FRAME_SHAPE)
+        f.create_dataset("timestamps", data=np.arange(N_FRAMES, dtype=np.int64) * 1000)
+    with h5py.File(path, "r") as f:
+        yield f
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT_S
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for read-ahead"
+        time.sleep(0.01)
+
+
+def cached_blocks(cache):
+    with cache._lock:
+        return list(cache._blocks)
+
+
+def test_blocks_are_evicted_least_recently_used(camera_file):
+    cache = PlaybackFrameCache(camera_file["frames"], max_bytes=3 * BLOCK_BYTES, read_ahead_frames=0)
+    assert cache.block_frames == BLOCK_FRAMES and cache.block_count == 10
+
+    for index in (0, 4, 8):
+        assert cache.get(index)[0, 0] == index
+    cache.get(1)  # Touch block 0, so block 1 is now least recently used
+    cache.get(12)
+
+    assert cached_blocks(cache) == [2, 0, 3]
+    assert cache.cached_bytes == 3 * BLOCK_BYTES <= cache.max_bytes
+    assert not cache.get(13).flags.writeable
+    cache.close()
+
+
+def test_budget_smaller_than_a_block_keeps_the_block_just_loaded(camera_file):
+    cache = PlaybackFrameCache(camera_file["frames"], max_bytes=1, read_ahead_frames=0)
+    cache.get(0)
+    cache.get(5)
+    assert cached_blocks(cache) == [1]
+    cache.close()
+
+
+def test_hit_and_miss_counts(camera_file):
+    cache = PlaybackFrameCache(camera_file["frames"], max_bytes=2 * BLOCK_BYTES, read_ahead_frames=0)
+    for index in (0, 1, 2, 3, 4, 5, 8, 0):  # Block 0 evicted by block 2 before its last read
+        cache.get(index)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (4, 4)
+    assert stats["hit_rate"] == 0.5
+    assert stats["cached_blocks"] == 2
+    cache.close()
+
+
+def test_read_ahead_follows_a_backward_scrub(camera_file):
+    cache = PlaybackFrameCache(
+        camera_file["frames"], max_bytes=100 * BLOCK_BYTES, read_ahead_frames=2 * BLOCK_FRAMES
+    )
+    cache.get(20)  # Block 5, moving forward from the initial cursor
+    wait_until(lambda: set(cached_blocks(cache)) == {5, 6, 7})
+
+    cache.get(19)  # Block 4, moving backward
+    wait_until(lambda: set(cached_blocks(cache)) == {2, 3, 4, 5, 6, 7})
+
+    time.sleep(0.2)  # Read-ahead idles; nothing is fetched past the window
+    assert set(cached_blocks(cache)) == {2, 3, 4, 5, 6, 7}
+    assert cache.get(8)[0, 0] == 8 and cache.hits == 1
+    cache.close()
+
+
+def test_get_after_close_raises(camera_file):
+    cache = PlaybackFrameCache(camera_file["frames"], read_ahead_frames=BLOCK_FRAMES)
+    cache.get(0)
+    cache.close()
+
+    assert cache.closed and cache.cached_bytes == 0 and cache._thread is None
+    with pytest.raises(RuntimeError, match="closed"):
+        cache.get(0)
+
+
+def test_scrub_is_not_broken_by_playback_releasing_the_cache(camera_file, monkeypatch):
+    """Regression: the playback sequence released the cache between scrub lookup and read."""
+    controller = PlaybackModeController(cache_bytes=100 * BLOCK_BYTES, read_ahead_frames=0)
+    controller.current_session_path = "session"
+    controller.session_metadata = {"directions": ["LR"]}
+    controller._hdf5_file = camera_file
+    controller._current_direction = "LR"
+    controller._timestamps = camera_file["timestamps"][:]
+
+    releaser = threading.Thread(target=controller._release_frame_cache)
+
+    class ReleasedDuringRead(PlaybackFrameCache):
+        def get(self, index):
+            # The playback sequence finishes the direction while a scrub is reading
+            if releaser.ident is None:
+                releaser.start()
+                releaser.join(0.1)
+            return super().get(index)
+
+    monkeypatch.setattr(modes, "PlaybackFrameCache", ReleasedDuringRead)
+
+    response = controller.get_playback_frame("LR", 9)
+    releaser.join(TIMEOUT_S)
+
+    assert response["success"], response
+    assert response["frame_data"][0][0] == 9 and response["timestamp"] == 9000
+    assert controller._frame_cache is None  # Released once the scrub was done
+
+    # The next scrub reopens the cache
+    assert controller.get_playback_frame("LR", 10)["success"]
+    controller._release_frame_cache()
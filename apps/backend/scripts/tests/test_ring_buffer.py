@@ -0,0 +1,138 @@
+"""Test the shared memory frame ring buffer (seqlock slots, wraparound, re-layout)."""
+
+import sys
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import numpy as np
+import pytest
+
+from ipc.ring_buffer import FILE_HEADER_SIZE, SLOT_HEADER_SIZE, FrameRingBuffer
+
+FRAME_SHAPE = (32, 48)
+
+
+@pytest.fixture
+def ring(tmp_path):
+    ring = FrameRingBuffer(str(tmp_path / "ring_shm"), size_bytes=64 * 1024, slot_count=4)
+    yield ring
+    ring.close(unlink=True)
+
+
+def frame_for(frame_id, shape=FRAME_SHAPE):
+    return np.full(shape, frame_id % 256, dtype=np.uint8)
+
+
+def test_write_and_read_frame(ring):
+    frame = np.arange(np.prod(FRAME_SHAPE), dtype=np.uint8).reshape(FRAME_SHAPE)
+    frame_id, offset = ring.write(frame, timestamp_us=1000, exposure_us=500, gain=2.0, label="LR")
+
+    header, data = ring.read_frame(frame_id)
+    assert frame_id == 1
+    assert offset == FILE_HEADER_SIZE + SLOT_HEADER_SIZE
+    assert (header.width_px, header.height_px, header.channels) == (48, 32, 1)
+    assert (header.timestamp_us, header.capture_timestamp_us, header.exposure_us) == (1000, 1000, 500)
+    assert header.gain == 2.0 and header.label == "LR"
+    np.testing.assert_array_equal(data, frame)
+
+
+def test_wraparound_recycles_oldest_slots(ring):
+    for frame_id in range(1, 11):
+        assert ring.write(frame_for(frame_id), timestamp_us=frame_id)[0] == frame_id
+
+    # 4 slots: only the last 4 frames are still readable
+    for frame_id in range(1, 7):
+        assert ring.read_frame(frame_id) is None
+    for frame_id in range(7, 11):
+        header, data = ring.read_frame(frame_id)
+        assert header.frame_id == frame_id
+        np.testing.assert_array_equal(data, frame_for(frame_id))
+    # Frame 10 reuses frame 2's and 6's slot
+    assert ring.slot_offset(10) == ring.slot_offset(2) == ring.slot_offset(6)
+    assert ring.read_frame(11) is None
+
+
+def test_slot_being_written_is_not_read(ring):
+    frame_id, offset = ring.write(frame_for(1), timestamp_us=1)
+    seq_word = ring.slot_offset(frame_id) // 8
+
+    # Writer marks the slot odd before rewriting it (here: the next lap's frame 5)
+    ring._words[seq_word] = 2 * 5 - 1
+    assert ring.read_header(frame_id) is None
+    assert ring.read_frame(frame_id) is None
+    assert ring.read_payload(frame_id, offset, frame_for(1).size, ring.layout_gen) is None
+
+
+def test_concurrent_reader_never_sees_torn_frames(ring):
+    """Frames returned while a writer laps the ring are never a mix of two frames."""
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        frame_id = 0
+        while not stop.is_set() and frame_id < 20000:
+            frame_id += 1
+            ring.write(frame_for(frame_id), timestamp_us=frame_id)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = 0
+    try:
+        while thread.is_alive():
+            latest = ring.last_frame_id
+            for frame_id in range(max(1, latest - 5), latest + 1):
+                result = ring.read_frame(frame_id)
+                if result is None:
+                    continue
+                header, data = result
+                reads += 1
+                if header.frame_id != frame_id or not np.all(data == frame_id % 256):
+                    errors.append(frame_id)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert reads > 0
+    assert errors == []
+
+
+def test_fit_relayout_invalidates_old_descriptors(ring):
+    small = frame_for(1)
+    frame_id, offset = ring.write(small, timestamp_us=1)
+    layout_gen = ring.layout_gen
+    assert ring.read_payload(frame_id, offset, small.size, layout_gen) == small.tobytes()
+
+    # A frame larger than a slot re-lays out the ring with fewer, larger slots
+    large = frame_for(2, shape=(128, 160))
+    assert large.size > ring.capacity_bytes
+    large_id, large_offset = ring.write(large, timestamp_us=2)
+
+    assert ring.layout_gen == layout_gen + 1
+    assert ring.slot_count < 4 and ring.capacity_bytes >= large.size
+    # Descriptors from the old layout are rejected, even where the offset still holds a slot
+    assert ring.read_frame(frame_id) is None
+    assert ring.read_payload(frame_id, offset, small.size, layout_gen) is None
+    assert ring.read_payload(large_id, large_offset, large.size, layout_gen) is None
+    assert ring.read_payload(large_id, large_offset, large.size, ring.layout_gen) == large.tobytes()
+
+    header, data = ring.read_frame(large_id)
+    np.testing.assert_array_equal(data, large)
+
+
+def test_frame_too_large_for_buffer(ring):
+    with pytest.raises(ValueError):
+        ring.write(np.zeros((256, 512), dtype=np.uint8), timestamp_us=1)
+
+
+def test_clear_restarts_frame_ids(ring):
+    for frame_id in range(1, 4):
+        ring.write(frame_for(frame_id), timestamp_us=frame_id)
+    layout_gen = ring.layout_gen
+
+    ring.clear()
+
+    assert ring.last_frame_id == 0
+    assert ring.layout_gen == layout_gen + 1
+    assert ring.read_frame(1) is None
+    assert ring.write(frame_for(1), timestamp_us=1)[0] == 1
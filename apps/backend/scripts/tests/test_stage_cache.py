@@ -0,0 +1,191 @@
+"""Test dependency-aware re-analysis with the stage result cache.
+
+Changing one analysis parameter must recompute exactly the stage that reads
+it and the stages downstream of it, load every other stage from the cache,
+and give the same results as an uncached run.
+"""
+
+import sys
+from dataclasses import replace
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import numpy as np
+import pytest
+
+from config import AnalysisConfig
+from analysis.pipeline import ANALYSIS_STAGES, AnalysisPipeline
+from analysis.stage_cache import STAGE_CACHE_ENTRIES_PER_STAGE, StageCache
+
+SHAPE = (48, 64)
+SOURCE_KEY = "test-session-source"
+
+
+class RecordingStageCache(StageCache):
+    """StageCache that records which stages were loaded and which were computed."""
+
+    def __init__(self, cache_dir):
+        super().__init__(cache_dir)
+        self.loaded = []
+        self.stored = []
+
+    def load(self, stage, key):
+        outputs = super().load(stage, key)
+        if outputs is not None:
+            self.loaded.append(stage)
+        return outputs
+
+    def store(self, stage, key, outputs):
+        self.stored.append(stage)
+        super().store(stage, key, outputs)
+
+    def reset(self):
+        self.loaded, self.stored = [], []
+
+
+def make_config(**overrides):
+    config = AnalysisConfig(
+        coherence_threshold=0.2,
+        ring_size_mm=2.0,
+        phase_filter_sigma=0.0,
+        smoothing_sigma=2.0,
+        gradient_window_size=3,
+        magnitude_threshold=0.1,
+        response_threshold_percent=20,
+        vfs_threshold_sd=1.0,
+        area_min_size_mm2=0.01,
+    )
+    return replace(config, **overrides)
+
+
+def make_fourier_maps():
+    """Phase maps of a smooth, curved retinotopy plus noise, with random magnitude and coherence."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[:SHAPE[0], :SHAPE[1]]
+    azimuth = 2.0 * np.pi * (x / SHAPE[1] + 0.1 * np.sin(y / 6.0)) - np.pi
+    elevation = 2.0 * np.pi * (y / SHAPE[0] + 0.1 * np.sin(x / 5.0)) - np.pi
+    phase = {}
+    for direction, base, sign in (("LR", azimuth, 1), ("RL", azimuth, -1), ("TB", elevation, 1), ("BT", elevation, -1)):
+        phase[direction] = np.angle(np.exp(1j * (sign * base + rng.normal(0, 0.05, SHAPE)))).astype(np.float32)
+    magnitude = {d: rng.uniform(0.5, 1.0, SHAPE).astype(np.float32) for d in phase}
+    coherence = {d: rng.uniform(0.3, 1.0, SHAPE).astype(np.float32) for d in phase}
+    return phase, magnitude, coherence
+
+
+def downstream_closure(stages):
+    """Stages that (transitively) consume any of stages, plus stages themselves."""
+    closure = set(stages)
+    changed = True
+    while changed:
+        changed = False
+        for stage, (upstream, _) in ANALYSIS_STAGES.items():
+            if stage not in closure and closure.intersection(upstream):
+                closure.add(stage)
+                changed = True
+    return closure
+
+
+def run(config, cache=None):
+    phase, magnitude, coherence = make_fourier_maps()
+    return AnalysisPipeline(config).run_from_phase_maps(
+        phase, magnitude, coherence, stage_cache=cache, source_key=SOURCE_KEY if cache else None
+    )
+
+
+def assert_same_results(actual, expected):
+    assert set(actual) == set(expected)
+    for name, value in expected.items():
+        if isinstance(value, dict):
+            assert set(actual[name]) == set(value)
+            for member, member_value in value.items():
+                np.testing.assert_array_equal(actual[name][member], member_value)
+        else:
+            np.testing.assert_array_equal(actual[name], value)
+
+
+def test_first_run_computes_and_second_run_loads_every_stage(tmp_path):
+    cache = RecordingStageCache(tmp_path)
+    first = run(make_config(), cache)
+    assert cache.loaded == [] and set(cache.stored) == set(ANALYSIS_STAGES)
+
+    cache.reset()
+    second = run(make_config(), cache)
+    assert cache.stored == [] and set(cache.loaded) == set(ANALYSIS_STAGES)
+    assert_same_results(second, first)
+
+
+@pytest.mark.parametrize("parameter, value, expected_recomputed", [
+    ("magnitude_threshold", 0.3, {"response_thresholds"}),
+    ("response_threshold_percent", 50, {"response_thresholds"}),
+    ("smoothing_sigma", 3.0, {"gradients", "vfs", "boundaries", "areas"}),
+    ("coherence_threshold", 0.5, {"vfs", "boundaries", "areas"}),
+    ("vfs_threshold_sd", 1.5, {"vfs", "boundaries", "areas"}),
+    ("boundary_skeletonize", True, {"boundaries", "areas"}),
+    ("area_min_size_mm2", 0.05, {"areas"}),
+    ("ring_size_mm", 3.0, {"areas"}),
+])
+def test_parameter_change_recomputes_stage_and_downstream_only(tmp_path, parameter, value, expected_recomputed):
+    cache = RecordingStageCache(tmp_path)
+    run(make_config(), cache)
+    cache.reset()
+
+    changed = make_config(**{parameter: value})
+    results = run(changed, cache)
+
+    owners = {stage for stage, (_, parameters) in ANALYSIS_STAGES.items() if parameter in parameters}
+    assert downstream_closure(owners) == expected_recomputed
+    assert set(cache.stored) == expected_recomputed
+    assert set(cache.loaded) == set(ANALYSIS_STAGES) - expected_recomputed
+    # Cached upstream stages + recomputed downstream stages == a fresh run
+    assert_same_results(results, run(changed))
+
+
+def test_parameter_that_does_not_feed_a_stage_keeps_the_cache(tmp_path):
+    cache = RecordingStageCache(tmp_path)
+    run(make_config(), cache)
+    cache.reset()
+
+    run(make_config(gradient_window_size=5), cache)  # Unused by the stages
+
+    assert cache.stored == [] and set(cache.loaded) == set(ANALYSIS_STAGES)
+
+
+def test_new_source_recomputes_everything(tmp_path):
+    cache = RecordingStageCache(tmp_path)
+    run(make_config(), cache)
+    cache.reset()
+
+    phase, magnitude, coherence = make_fourier_maps()
+    AnalysisPipeline(make_config()).run_from_phase_maps(
+        phase, magnitude, coherence, stage_cache=cache, source_key="re-recorded-session"
+    )
+
+    assert cache.loaded == [] and set(cache.stored) == set(ANALYSIS_STAGES)
+
+
+def test_switching_back_to_an_earlier_value_loads_every_stage(tmp_path):
+    cache = RecordingStageCache(tmp_path)
+    run(make_config(), cache)
+    run(make_config(smoothing_sigma=3.0), cache)
+    cache.reset()
+
+    run(make_config(), cache)
+
+    assert cache.stored == [] and set(cache.loaded) == set(ANALYSIS_STAGES)
+
+
+def test_least_recently_used_entries_are_evicted_per_stage(tmp_path):
+    cache = StageCache(tmp_path)
+    keys = [f"k{i}" for i in range(STAGE_CACHE_ENTRIES_PER_STAGE + 2)]
+    for key in keys[:STAGE_CACHE_ENTRIES_PER_STAGE]:
+        cache.store("vfs", key, {"vfs": np.zeros(3)})
+    cache.store("areas", "other", {"areas": np.zeros(3)})
+
+    assert cache.load("vfs", keys[0]) is not None  # Oldest entry is now the most recently used
+    cache.store("vfs", keys[-2], {"vfs": np.ones(3)})
+    cache.store("vfs", keys[-1], {"vfs": np.ones(3)})
+
+    kept = sorted(path.stem for path in tmp_path.glob("vfs-*.npz"))
+    assert kept == sorted(f"vfs-{key}" for key in [keys[0], keys[3], keys[4], keys[5]])
+    assert cache.load("vfs", keys[1]) is None and cache.load("vfs", keys[2]) is None
+    assert cache.load("areas", "other") is not None  # Other stages are untouched
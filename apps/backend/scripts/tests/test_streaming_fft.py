@@ -0,0 +1,115 @@
+"""Test that the streaming single-bin DFT matches the full-FFT phase maps."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import numpy as np
+import pytest
+from scipy.fft import fft, fftfreq
+
+from config import AnalysisConfig
+from analysis.fourier import StimulusFrequencyAccumulator
+from analysis.pipeline import AnalysisPipeline
+
+N_FRAMES = 200
+FRAME_SHAPE = (12, 10)
+STIMULUS_FREQUENCY = 10 / N_FRAMES  # 10 cycles over the recording
+
+
+def make_config():
+    return AnalysisConfig(
+        coherence_threshold=0.3,
+        ring_size_mm=2.0,
+        phase_filter_sigma=0.0,  # Compare unfiltered phase
+        smoothing_sigma=2.0,
+        gradient_window_size=3,
+        magnitude_threshold=0.3,
+        response_threshold_percent=20,
+        vfs_threshold_sd=1.5,
+        area_min_size_mm2=0.1,
+    )
+
+
+def make_frames(seed=0):
+    """uint16 frames: bright baseline + per-pixel phase-shifted response + noise."""
+    rng = np.random.default_rng(seed)
+    height, width = FRAME_SHAPE
+    n = np.arange(N_FRAMES)[:, None, None]
+    phase = np.linspace(-np.pi, np.pi, height * width).reshape(height, width)
+    amplitude = rng.uniform(20.0, 80.0, size=FRAME_SHAPE)
+    signal = 30000.0 + amplitude * np.cos(2 * np.pi * STIMULUS_FREQUENCY * n + phase)
+    signal += rng.normal(0.0, 10.0, size=signal.shape)
+    return signal.astype(np.uint16)
+
+
+def reference_phase_maps(frames):
+    """The original full-FFT path (CPU): fft of the mean-removed series, nearest bin."""
+    n_frames, height, width = frames.shape
+    series = frames.astype(np.float32).reshape(n_frames, -1)
+    centered = series - np.mean(series, axis=0, keepdims=True)
+    spectrum = fft(centered, axis=0)
+    freq_idx = np.argmin(np.abs(fftfreq(n_frames) - STIMULUS_FREQUENCY))
+    amplitude = spectrum[freq_idx, :]
+    coherence = np.clip(np.abs(amplitude) / (np.std(centered, axis=0) + 1e-10), 0.0, 1.0)
+    return (
+        np.angle(amplitude).reshape(height, width),
+        np.abs(amplitude).reshape(height, width),
+        coherence.reshape(height, width),
+    )
+
+
+def phase_difference(a, b):
+    return np.abs(np.angle(np.exp(1j * (a - b))))
+
+
+@pytest.mark.parametrize("chunk_frames", [1, 7, 50, 64, N_FRAMES])
+def test_chunks_match_full_fft(chunk_frames):
+    frames = make_frames()
+    pipeline = AnalysisPipeline(make_config())
+
+    chunks = (frames[start:start + chunk_frames] for start in range(0, N_FRAMES, chunk_frames))
+    phase, magnitude, coherence = pipeline.compute_phase_maps_from_chunks(
+        chunks, N_FRAMES, FRAME_SHAPE, STIMULUS_FREQUENCY
+    )
+    ref_phase, ref_magnitude, ref_coherence = reference_phase_maps(frames)
+
+    assert phase.shape == magnitude.shape == coherence.shape == FRAME_SHAPE
+    assert np.max(phase_difference(phase, ref_phase)) < 1e-4
+    np.testing.assert_allclose(magnitude, ref_magnitude, rtol=1e-4)
+    np.testing.assert_allclose(coherence, ref_coherence, rtol=1e-4, atol=1e-6)
+
+
+def test_streaming_mode_matches_fft_mode():
+    frames = make_frames(seed=1)
+    streaming = AnalysisPipeline(make_config(), fft_mode="streaming", chunk_frames=33)
+    full = AnalysisPipeline(make_config(), fft_mode="fft")
+
+    phase, magnitude, coherence = streaming.compute_fft_phase_maps(frames, STIMULUS_FREQUENCY)
+    ref_phase, ref_magnitude, ref_coherence = full.compute_fft_phase_maps(frames, STIMULUS_FREQUENCY)
+
+    assert np.max(phase_difference(phase, ref_phase)) < 1e-4
+    np.testing.assert_allclose(magnitude, ref_magnitude, rtol=1e-4)
+    np.testing.assert_allclose(coherence, ref_coherence, rtol=1e-4, atol=1e-6)
+
+
+def test_chunks_must_add_up_to_n_frames():
+    frames = make_frames()
+    pipeline = AnalysisPipeline(make_config())
+
+    with pytest.raises(ValueError):
+        pipeline.compute_phase_maps_from_chunks(
+            iter([frames[:150]]), N_FRAMES, FRAME_SHAPE, STIMULUS_FREQUENCY
+        )
+
+
+def test_open_ended_accumulator_requires_positions():
+    frames = make_frames()
+    accumulator = StimulusFrequencyAccumulator.for_period(1.0 / STIMULUS_FREQUENCY, FRAME_SHAPE)
+
+    with pytest.raises(ValueError, match="positions"):
+        accumulator.add_frames(frames[:10])
+    assert accumulator.frames_seen == 0
+
+    accumulator.add_frames(frames[:10], np.arange(10))
+    assert accumulator.frames_seen == 10
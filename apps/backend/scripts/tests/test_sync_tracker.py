@@ -0,0 +1,139 @@
+"""Test windowed synchronization statistics against a brute-force window.
+
+The tracker keeps a fixed-capacity ring with running prefix sums; the
+reference keeps every sample in a list and recomputes each window from
+scratch. Sample timing alternates between dense, normal and sparse segments
+so windows both span the whole ring (the entry before the window was
+overwritten) and fit inside it (prefix-sum subtraction), and the camera clock
+jumps backwards to start new runs.
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'src'))
+
+import numpy as np
+import pytest
+
+from acquisition.sync_tracker import (
+    SYNC_HISTOGRAM_BINS,
+    SYNC_WINDOW_SECONDS,
+    TimestampSynchronizationTracker,
+)
+
+# (samples, min interval us, max interval us) per timing regime
+SEGMENTS = {
+    "dense": (1500, 500, 1500),
+    "normal": (400, 10_000, 30_000),
+    "sparse": (12, 2_000_000, 6_000_000),
+}
+CHECK_EVERY = 7
+
+
+class BruteForceWindow:
+    """Every sample in a list; windows recomputed by scanning."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.samples = []  # (camera_us, stimulus_us, frame_id or None, diff_ms float32)
+        self.run_start = 0
+
+    def record(self, camera_us, stimulus_us, frame_id):
+        if len(self.samples) > self.run_start and camera_us < self.samples[-1][0]:
+            self.run_start = len(self.samples)
+        diff_ms = np.float32((camera_us - stimulus_us) / 1000.0)
+        self.samples.append((camera_us, stimulus_us, frame_id, diff_ms))
+
+    def window(self, window_seconds):
+        """(first sequence number, samples) of the most recent window."""
+        end = len(self.samples)
+        oldest = max(self.run_start, end - self.capacity)
+        if end == oldest:
+            return end, []
+        threshold = self.samples[-1][0] - int(window_seconds * 1_000_000)
+        first = next(n for n in range(oldest, end) if self.samples[n][0] >= threshold)
+        return first, self.samples[first:end]
+
+
+def sample_stream(seed, n_segments=14, resets=(4, 9)):
+    """Yield (camera_us, stimulus_us, frame_id), with the camera clock reset before the given segments."""
+    rng = np.random.default_rng(seed)
+    camera_us = 10_000_000
+    frame_id = 0
+    for segment in range(n_segments):
+        if segment in resets:
+            camera_us = int(rng.integers(0, 1_000_000))  # Camera reopened: clock restarts
+        regime = ("dense", "normal", "sparse")[segment % 3]
+        count, low, high = SEGMENTS[regime]
+        for _ in range(count):
+            camera_us += int(rng.integers(low, high))
+            stimulus_us = camera_us - int(rng.integers(-99_000, 99_000))
+            frame_id += 1
+            yield camera_us, stimulus_us, None if frame_id % 11 == 0 else frame_id
+
+
+def assert_matches(tracker, reference):
+    first, window = reference.window(SYNC_WINDOW_SECONDS)
+    data = tracker.get_synchronization_data()
+    stats = data["statistics"]
+    entries = data["synchronization"]
+
+    assert stats["count"] == len(window)
+    assert [
+        (e["camera_timestamp"], e["stimulus_timestamp"], e["frame_id"], e["time_difference_us"])
+        for e in entries
+    ] == [(cam, stim, fid, cam - stim) for cam, stim, fid, _ in window]
+    if not window:
+        return first
+
+    diffs = np.array([diff for *_, diff in window], dtype=np.float32)
+    assert stats["mean_diff_ms"] == pytest.approx(float(diffs.astype(np.float64).mean()), abs=1e-6)
+    # Variance from differences of running sums cancels to ~1e-9 ms^2, not to 0
+    assert stats["std_diff_ms"] ** 2 == pytest.approx(float(diffs.astype(np.float64).var()), abs=1e-6)
+    assert (stats["min_diff_ms"], stats["max_diff_ms"]) == (float(diffs.min()), float(diffs.max()))
+    assert stats["histogram"] == np.histogram(diffs, bins=SYNC_HISTOGRAM_BINS)[0].tolist()
+    assert data["window_info"]["total_history_count"] == min(len(reference.samples), reference.capacity)
+
+    # Other window lengths use the same search
+    _, short = reference.window(0.05)
+    assert [e["camera_timestamp"] for e in tracker.get_recent_synchronization(0.05)] == [s[0] for s in short]
+    return first
+
+
+@pytest.mark.parametrize("capacity", [7, 50, 1000])
+def test_window_statistics_match_brute_force(capacity):
+    tracker = TimestampSynchronizationTracker(max_history=capacity)
+    tracker.enable()
+    reference = BruteForceWindow(capacity)
+    moments_paths = set()
+
+    for step, (camera_us, stimulus_us, frame_id) in enumerate(sample_stream(seed=capacity), start=1):
+        tracker.record_synchronization(camera_us, stimulus_us, frame_id)
+        reference.record(camera_us, stimulus_us, frame_id)
+        if step % CHECK_EVERY and reference.run_start != len(reference.samples) - 1:
+            continue
+
+        first = assert_matches(tracker, reference)
+        total = len(reference.samples)
+        if first > 0:
+            # Which _window_moments path this window takes
+            moments_paths.add("overwritten" if first - 1 < total - capacity else "prefix_sums")
+
+    assert reference.run_start > 0  # The clock resets were detected
+    assert moments_paths == {"overwritten", "prefix_sums"}
+
+
+def test_stale_samples_are_not_recorded_and_clear_empties_window():
+    tracker = TimestampSynchronizationTracker(max_history=7)
+    tracker.record_synchronization(1_000, 900, 1)  # Disabled: ignored
+    tracker.enable()
+    tracker.record_synchronization(2_000, None, None)
+    tracker.record_synchronization(3_000_000, 2_800_000, 2)  # 200 ms apart: stale
+    assert tracker.count == 0
+
+    tracker.record_synchronization(4_000_000, 3_990_000, 3)
+    assert tracker.get_synchronization_data()["statistics"]["mean_diff_ms"] == pytest.approx(10.0)
+
+    tracker.clear()
+    assert tracker.count == 0
+    assert tracker.get_synchronization_data()["synchronization"] == []
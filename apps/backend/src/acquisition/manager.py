@@ -15,6 +15,8 @@ import logging
 
 import numpy as np
 
+from hdf5_codecs import DEFAULT_CODEC
+
 from .sync_tracker import TimestampSynchronizationTracker
 from .state import AcquisitionStateCoordinator
 from .modes import (
@@ -53,6 +55,7 @@ class AcquisitionManager:
         unified_stimulus=None,
         data_recorder=None,
         param_manager=None,
+        online_analysis=None,
     ):
         """Initialize acquisition manager with injected dependencies.
 
@@ -66,6 +69,7 @@ class AcquisitionManager:
             unified_stimulus: Optional unified stimulus controller for both preview and record modes
             data_recorder: Optional data recorder
             param_manager: Optional parameter manager
+            online_analysis: Optional OnlineAnalysisEngine fed during record mode
         """
         # Injected dependencies
         self.ipc = ipc
@@ -111,6 +115,9 @@ class AcquisitionManager:
         # Data recorder (dependency injection)
         self.data_recorder = data_recorder
 
+        # Online analysis engine (dependency injection)
+        self.online_analysis = online_analysis
+
         # Mode controllers - inject dependencies
         self.preview_controller = PreviewModeController(
             state_coordinator=state_coordinator,
@@ -467,6 +474,7 @@ class AcquisitionManager:
             self.data_recorder = create_session_recorder(
                 session_name=session_metadata["session_name"],
                 metadata=session_metadata,
+                codec=pm.get_parameter_group("system").get("hdf5_codec", DEFAULT_CODEC),
             )
             logger.info(f"Data recorder created: {self.data_recorder.session_path}")
 
@@ -474,6 +482,12 @@ class AcquisitionManager:
             self.camera.set_data_recorder(self.data_recorder)
             logger.info("Data recorder wired to camera manager")
 
+            # Analyze recorded frames online so maps are ready as each direction ends
+            if self.online_analysis and self.online_analysis.enabled:
+                self.online_analysis.begin_session(str(self.data_recorder.session_path))
+                self.camera.set_online_analysis(self.online_analysis)
+                logger.info("Online analysis wired to camera manager")
+
         # Clear synchronization history and enable continuous tracking
         # Timestamp validation will filter non-stimulus synchronization data
         if self.synchronization_tracker:
@@ -627,6 +641,10 @@ class AcquisitionManager:
                 # Start data recording for this direction
                 if self.data_recorder:
                     self.data_recorder.start_recording(direction)
+                    if self.online_analysis:
+                        self.online_analysis.start_direction(
+                            direction, self._stimulus_period_sec(direction)
+                        )
 
                 # For each cycle
                 for cycle in range(self.cycles):
@@ -705,6 +723,8 @@ class AcquisitionManager:
                 # Stop data recording for this direction (after all cycles complete)
                 if self.data_recorder:
                     self.data_recorder.stop_recording()
+                    if self.online_analysis:
+                        self.online_analysis.finish_direction()
 
                 if self.stop_event.is_set():
                     break
@@ -735,6 +755,10 @@ class AcquisitionManager:
             if self.synchronization_tracker:
                 self.synchronization_tracker.disable()
 
+            if self.online_analysis:
+                self.online_analysis.end_session()
+                self.camera.set_online_analysis(None)
+
             # Save all recorded data to disk
             if self.data_recorder:
                 try:
@@ -767,6 +791,24 @@ class AcquisitionManager:
                     f"Failed to display black screen at end of acquisition: {e}"
                 )
 
+    def _stimulus_period_sec(self, direction: str) -> float:
+        """Stimulus period for a direction as recorded by the camera.
+
+        The recording for a direction spans all cycles plus the between-trial
+        gaps (none after the last cycle), so the offline analysis frequency
+        cycles / n_frames corresponds to this period.
+
+        Args:
+            direction: Sweep direction
+
+        Returns:
+            Period in seconds (0.0 if sweep duration unavailable)
+        """
+        dataset_info = self.stimulus_generator.get_dataset_info(direction)
+        sweep_duration_sec = dataset_info.get("duration_sec", 0.0)
+        total_sec = self.cycles * sweep_duration_sec + (self.cycles - 1) * self.between_sec
+        return total_sec / self.cycles
+
     def _enter_phase(self, phase: AcquisitionPhase):
         """Enter a new acquisition phase."""
         with self._state_lock:
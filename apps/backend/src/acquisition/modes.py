@@ -8,10 +8,18 @@ Refactored from isi_control/acquisition_mode_controllers.py with KISS approach:
 
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
+import contextlib
 import logging
 import threading
 import time
 
+from ipc.bulk import encode_array
+
+from .playback_cache import (
+    DEFAULT_PLAYBACK_CACHE_MB,
+    DEFAULT_READ_AHEAD_FRAMES,
+    PlaybackFrameCache,
+)
 from .state import AcquisitionStateCoordinator
 
 logger = logging.getLogger(__name__)
@@ -227,7 +235,21 @@ class PlaybackModeController(AcquisitionModeController):
         state_coordinator: Optional[AcquisitionStateCoordinator] = None,
         shared_memory=None,
         ipc=None,
+        param_manager=None,
+        cache_bytes: Optional[int] = None,
+        read_ahead_frames: Optional[int] = None,
     ):
+        """Initialize playback controller.
+
+        Args:
+            state_coordinator: Acquisition state coordinator
+            shared_memory: SharedMemoryService for publishing playback frames
+            ipc: MultiChannelIPC for progress events
+            param_manager: ParameterManager (system.playback_cache_mb and
+                system.playback_read_ahead_frames are read when a direction is opened)
+            cache_bytes: Decoded-frame cache budget (overrides the system parameter)
+            read_ahead_frames: Frames decoded ahead of the cursor (overrides the system parameter)
+        """
         super().__init__(state_coordinator)
         self.current_session_path: Optional[str] = None
         self.session_metadata: Optional[Dict[str, Any]] = None
@@ -235,6 +257,14 @@ class PlaybackModeController(AcquisitionModeController):
         self._current_direction: Optional[str] = (
             None  # Track which direction file is open
         )
+        self.param_manager = param_manager
+        self.cache_bytes = cache_bytes
+        self.read_ahead_frames = read_ahead_frames
+        self._frame_cache: Optional[PlaybackFrameCache] = None  # Decoded frames of the open direction
+        # Guards _frame_cache: scrubbing (command executor) and the playback
+        # sequence thread both open, read and release it
+        self._frame_cache_lock = threading.RLock()
+        self._timestamps = None  # Timestamps of the open direction (loaded once)
 
         # Playback sequence control
         self.shared_memory = shared_memory
@@ -311,22 +341,68 @@ class PlaybackModeController(AcquisitionModeController):
         Returns:
             Dictionary with success status
         """
-        # Close HDF5 file if open
-        if self._hdf5_file:
-            try:
-                self._hdf5_file.close()
-                logger.info("Closed HDF5 file for playback")
-            except Exception as e:
-                logger.warning(f"Error closing HDF5 file: {e}")
-            finally:
-                self._hdf5_file = None
+        self._close_camera_file()
 
-        self._current_direction = None
         self.current_session_path = None
         self.session_metadata = None
         logger.info("Playback mode deactivated")
         return {"success": True}
 
+    def _cache_settings(self) -> tuple:
+        """(cache budget bytes, read-ahead frames) from overrides or system parameters."""
+        system_params = (
+            self.param_manager.get_parameter_group("system") if self.param_manager else {}
+        )
+        cache_bytes = self.cache_bytes
+        if cache_bytes is None:
+            cache_mb = system_params.get("playback_cache_mb", DEFAULT_PLAYBACK_CACHE_MB)
+            cache_bytes = int(float(cache_mb) * 1024 * 1024)
+        read_ahead_frames = self.read_ahead_frames
+        if read_ahead_frames is None:
+            read_ahead_frames = system_params.get(
+                "playback_read_ahead_frames", DEFAULT_READ_AHEAD_FRAMES
+            )
+        return int(cache_bytes), int(read_ahead_frames)
+
+    def _open_frame_cache(self) -> Optional[PlaybackFrameCache]:
+        """Frame cache of the open direction (recreated if the playback sequence released it).
+
+        Callers must use the returned reference, not self._frame_cache, which
+        another thread may release at any time.
+        """
+        with self._frame_cache_lock:
+            if self._frame_cache is None and self._hdf5_file is not None:
+                cache_bytes, read_ahead_frames = self._cache_settings()
+                self._frame_cache = PlaybackFrameCache(
+                    self._hdf5_file["frames"], max_bytes=cache_bytes, read_ahead_frames=read_ahead_frames
+                )
+            return self._frame_cache
+
+    def _release_frame_cache(self) -> None:
+        """Stop read-ahead and drop decoded frames of the open direction (the file stays open)."""
+        with self._frame_cache_lock:
+            if self._frame_cache:
+                self._frame_cache.close()
+                self._frame_cache = None
+
+    def _close_camera_file(self) -> None:
+        """Stop read-ahead, drop cached frames and close the open camera file."""
+        with self._frame_cache_lock:
+            self._release_frame_cache()
+            self._timestamps = None
+
+            # Close HDF5 file if open
+            if self._hdf5_file:
+                try:
+                    self._hdf5_file.close()
+                    logger.info("Closed HDF5 file for playback")
+                except Exception as e:
+                    logger.warning(f"Error closing HDF5 file: {e}")
+                finally:
+                    self._hdf5_file = None
+
+            self._current_direction = None
+
     def list_sessions(self, base_dir: Optional[str] = None) -> Dict[str, Any]:
         """List all available recorded sessions.
 
@@ -406,12 +482,15 @@ class PlaybackModeController(AcquisitionModeController):
             "count": len(sessions),
         }
 
-    def get_session_data(self, direction: Optional[str] = None) -> Dict[str, Any]:
+    def get_session_data(
+        self, direction: Optional[str] = None, transport: str = "json"
+    ) -> Dict[str, Any]:
         """
         Get data from the loaded session for a specific direction.
 
         Args:
             direction: Direction to load (LR, RL, TB, BT). If None, returns all available.
+            transport: How stimulus_angles is sent ("json" list or "shm" descriptor)
 
         Returns:
             Dictionary with session data
@@ -461,10 +540,8 @@ class PlaybackModeController(AcquisitionModeController):
             camera_data = None
             if os.path.exists(camera_path):
                 try:
-                    # Close previous file if switching directions
-                    if self._hdf5_file and self._current_direction != direction:
-                        self._hdf5_file.close()
-                        self._hdf5_file = None
+                    # Close previous file (and its frame cache)
+                    self._close_camera_file()
 
                     # Open HDF5 file in SWMR mode for concurrent read access
                     # This allows multiple readers without exclusive locks
@@ -487,8 +564,16 @@ class PlaybackModeController(AcquisitionModeController):
                     else:
                         self._current_direction = direction
 
-                        # Read ONLY metadata - do not load actual frame data into memory
-                        frame_count = len(self._hdf5_file["frames"])
+                        # Read ONLY metadata - frames are decoded on demand
+                        # (chunk blocks, LRU cache with read-ahead)
+                        frames = self._hdf5_file["frames"]
+                        cache_bytes, read_ahead_frames = self._cache_settings()
+                        with self._frame_cache_lock:
+                            self._frame_cache = PlaybackFrameCache(
+                                frames, max_bytes=cache_bytes, read_ahead_frames=read_ahead_frames
+                            )
+                        self._timestamps = self._hdf5_file["timestamps"][:]
+                        frame_count = len(frames)
                         frame_shape = (
                             self._hdf5_file["frames"].shape[1:]
                             if frame_count > 0
@@ -510,9 +595,7 @@ class PlaybackModeController(AcquisitionModeController):
                     logger.error(
                         f"Failed to open camera file {camera_path}: {e}", exc_info=True
                     )
-                    if self._hdf5_file:
-                        self._hdf5_file.close()
-                        self._hdf5_file = None
+                    self._close_camera_file()
                     camera_data = {
                         "has_frames": False,
                         "error": f"Cannot read camera data: {str(e)}",
@@ -528,7 +611,9 @@ class PlaybackModeController(AcquisitionModeController):
                 "success": True,
                 "direction": direction,
                 "events": events,
-                "stimulus_angles": angles.tolist() if angles is not None else None,
+                "stimulus_angles": encode_array(
+                    angles, transport, self.shared_memory, "stimulus_angles"
+                ),
                 "camera_data": camera_data,
                 "metadata": self.session_metadata,
             }
@@ -537,84 +622,94 @@ class PlaybackModeController(AcquisitionModeController):
             logger.error(f"Failed to load session data: {e}", exc_info=True)
             return {"success": False, "error": f"Failed to load data: {str(e)}"}
 
-    def get_playback_frame(self, direction: str, frame_index: int) -> Dict[str, Any]:
+    def get_playback_frame(
+        self,
+        direction: str,
+        frame_index: int,
+        transport: str = "json",
+        publish: bool = False,
+    ) -> Dict[str, Any]:
         """
         Load a specific frame from the session for playback.
 
+        Frames come from the decoded-frame cache, which also moves the
+        read-ahead cursor so scrubbing and sequential stepping stay ahead of
+        decompression.
+
         Args:
             direction: Direction (LR, RL, TB, BT)
             frame_index: Frame index to load
+            transport: How frame_data is sent ("json" nested list or "shm" descriptor)
+            publish: Publish the frame on the camera shared-memory channel
+                instead of returning it (response carries camera_frame_id)
 
         Returns:
             Dictionary with frame data
         """
-        import numpy as np
-
         if not self.current_session_path or not self.session_metadata:
             return {"success": False, "error": "No session loaded"}
 
-        # Use already-open HDF5 file for fast frame access
-        if not self._hdf5_file or self._current_direction != direction:
-            return {"success": False, "error": "No session loaded for this direction"}
-
         try:
-            # Validate frame index
-            if frame_index < 0 or frame_index >= len(self._hdf5_file["frames"]):
-                return {
-                    "success": False,
-                    "error": f"Frame index {frame_index} out of range",
-                }
-
-            # Access frame directly from already-open file - FAST (no file open overhead)
-            frame_data = self._hdf5_file["frames"][frame_index]
-            timestamp = self._hdf5_file["timestamps"][frame_index]
-
-            # Validate and convert frame shape
-            if len(frame_data.shape) not in [2, 3]:
-                return {
-                    "success": False,
-                    "error": f"Invalid frame shape: {frame_data.shape}",
-                }
+            # The lock keeps the playback sequence from releasing the cache
+            # between the lookup and the read
+            with self._frame_cache_lock:
+                # Use already-open HDF5 file for fast frame access
+                frame_cache = (
+                    self._open_frame_cache() if self._current_direction == direction else None
+                )
+                if frame_cache is None:
+                    return {"success": False, "error": "No session loaded for this direction"}
 
-            # Handle different color formats
-            if len(frame_data.shape) == 3:
-                channels = frame_data.shape[2]
-                if channels == 3:
-                    # RGB -> Grayscale using ITU-R BT.601 luminance formula
-                    frame_gray = (
-                        frame_data[:, :, 0] * 0.299
-                        + frame_data[:, :, 1] * 0.587
-                        + frame_data[:, :, 2] * 0.114
-                    ).astype(np.uint8)
-                    frame_data = frame_gray
-                elif channels == 4:
-                    # RGBA -> RGB -> Grayscale (drop alpha channel first)
-                    rgb = frame_data[:, :, :3]
-                    frame_gray = (
-                        rgb[:, :, 0] * 0.299
-                        + rgb[:, :, 1] * 0.587
-                        + rgb[:, :, 2] * 0.114
-                    ).astype(np.uint8)
-                    frame_data = frame_gray
-                else:
+                # Validate frame index
+                if frame_index < 0 or frame_index >= frame_cache.frame_count:
                     return {
                         "success": False,
-                        "error": f"Unsupported channel count: {channels}",
+                        "error": f"Frame index {frame_index} out of range",
                     }
-            # else: Already grayscale (2D shape), use as-is
 
-            return {
+                # Grayscale [H, W] frame (decoded once per chunk block, then cached)
+                frame_data = frame_cache.get(frame_index)
+                timestamp = int(self._timestamps[frame_index])
+
+            response = {
                 "success": True,
-                "frame_data": frame_data.tolist(),
-                "timestamp": int(timestamp),
+                "width_px": int(frame_data.shape[1]),
+                "height_px": int(frame_data.shape[0]),
+                "timestamp": timestamp,
                 "frame_index": frame_index,
                 "direction": direction,
             }
 
+            if publish:
+                if not self.shared_memory:
+                    return {"success": False, "error": "Shared memory not available"}
+                response["camera_frame_id"] = self.shared_memory.write_camera_frame(
+                    frame_data=frame_data,
+                    camera_name="playback",
+                    capture_timestamp_us=timestamp,
+                )
+            else:
+                response["frame_data"] = encode_array(
+                    frame_data, transport, self.shared_memory, "playback_frame"
+                )
+            return response
+
         except Exception as e:
             logger.error(f"Failed to load playback frame: {e}", exc_info=True)
             return {"success": False, "error": f"Failed to load frame: {str(e)}"}
 
+    def get_playback_cache_status(self) -> Dict[str, Any]:
+        """Decoded-frame cache statistics for the open direction."""
+        with self._frame_cache_lock:
+            frame_cache = self._frame_cache
+            if not frame_cache:
+                return {"success": True, "direction": None, "cache": None}
+            return {
+                "success": True,
+                "direction": self._current_direction,
+                "cache": frame_cache.stats(),
+            }
+
     def start_playback_sequence(self) -> Dict[str, Any]:
         """
         Start automatic playback sequence that replays all directions and cycles.
@@ -691,7 +786,6 @@ class PlaybackModeController(AcquisitionModeController):
         """
         import os
         import h5py
-        import numpy as np
 
         try:
             # Load acquisition parameters from metadata
@@ -743,17 +837,39 @@ class PlaybackModeController(AcquisitionModeController):
                     )
                     continue
 
-                # Open HDF5 file for this direction
-                with h5py.File(camera_path, "r") as h5file:
-                    if "frames" not in h5file or "timestamps" not in h5file:
-                        logger.warning(f"Invalid camera file for {direction}, skipping")
-                        continue
+                with contextlib.ExitStack() as direction_stack:
+                    frame_cache = (
+                        self._open_frame_cache() if direction == self._current_direction else None
+                    )
+                    if frame_cache is not None:
+                        # Direction open for scrubbing: play from its cache
+                        timestamps = self._timestamps
+                    else:
+                        # One decoded-frame cache at a time: release the scrub cache
+                        # (recreated when scrubbing resumes) before opening this one
+                        self._release_frame_cache()
+                        h5file = direction_stack.enter_context(h5py.File(camera_path, "r"))
+                        if "frames" not in h5file or "timestamps" not in h5file:
+                            logger.warning(f"Invalid camera file for {direction}, skipping")
+                            continue
+
+                        # Decode chunk blocks ahead of the playback position
+                        cache_bytes, read_ahead_frames = self._cache_settings()
+                        frame_cache = PlaybackFrameCache(
+                            h5file["frames"],
+                            max_bytes=cache_bytes,
+                            read_ahead_frames=read_ahead_frames,
+                        )
+                        direction_stack.callback(frame_cache.close)
+                        timestamps = h5file["timestamps"][:]
 
-                    total_frames = len(h5file["frames"])
+                    total_frames = frame_cache.frame_count
                     frames_per_cycle = (
                         total_frames // cycles if cycles > 0 else total_frames
                     )
 
+                    next_frame_time = time.perf_counter()
+
                     for cycle_idx in range(cycles):
                         # Check for stop signal
                         if self._playback_stop_event.is_set():
@@ -789,31 +905,14 @@ class PlaybackModeController(AcquisitionModeController):
                             # Check for stop signal
                             if self._playback_stop_event.is_set():
                                 return
+                            # Scrub cache released by loading another direction
+                            if frame_cache.closed:
+                                break
 
                             # Load and publish frame
                             try:
-                                frame_data = h5file["frames"][frame_idx]
-                                timestamp = h5file["timestamps"][frame_idx]
-
-                                # Convert to grayscale if needed
-                                if len(frame_data.shape) == 3:
-                                    if frame_data.shape[2] == 3:
-                                        # RGB to grayscale
-                                        frame_gray = (
-                                            frame_data[:, :, 0] * 0.299
-                                            + frame_data[:, :, 1] * 0.587
-                                            + frame_data[:, :, 2] * 0.114
-                                        ).astype(np.uint8)
-                                        frame_data = frame_gray
-                                    elif frame_data.shape[2] == 4:
-                                        # RGBA to grayscale
-                                        rgb = frame_data[:, :, :3]
-                                        frame_gray = (
-                                            rgb[:, :, 0] * 0.299
-                                            + rgb[:, :, 1] * 0.587
-                                            + rgb[:, :, 2] * 0.114
-                                        ).astype(np.uint8)
-                                        frame_data = frame_gray
+                                frame_data = frame_cache.get(frame_idx)
+                                timestamp = timestamps[frame_idx]
 
                                 # Publish to shared memory (best-effort, non-blocking)
                                 if self.shared_memory:
@@ -839,8 +938,20 @@ class PlaybackModeController(AcquisitionModeController):
                             except Exception as e:
                                 logger.warning(f"Failed to load frame {frame_idx}: {e}")
 
-                            # Sleep to maintain playback FPS
-                            time.sleep(frame_interval)
+                            # Sleep until the next frame deadline (decode time
+                            # does not accumulate into drift)
+                            next_frame_time += frame_interval
+                            delay = next_frame_time - time.perf_counter()
+                            if delay > 0:
+                                time.sleep(delay)
+                            else:
+                                next_frame_time = time.perf_counter()
+
+                        if frame_cache.closed:
+                            logger.warning(
+                                f"Frame cache for {direction} was closed, skipping rest of direction"
+                            )
+                            break
 
                         # Between trials pause (except after last cycle)
                         if cycle_idx < cycles - 1:
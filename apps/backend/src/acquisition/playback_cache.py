@@ -0,0 +1,241 @@
+"""Decoded-frame cache with read-ahead for session playback.
+
+Recorded camera frames are stored in compressed chunks of several consecutive
+frames (see hdf5_codecs.time_series_chunks), so reading one frame decompresses
+its whole chunk. PlaybackFrameCache therefore reads and caches whole chunk
+blocks: the first access to a block decodes it once (converted to grayscale),
+and every other frame in it is served from memory. Blocks are evicted least
+recently used once the cache exceeds its memory budget.
+
+A read-ahead thread follows the playback cursor and decodes the blocks ahead
+of it in the direction the cursor last moved (forward or backward scrubbing),
+so sequential playback and scrubbing hit the cache instead of waiting on
+decompression.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLAYBACK_CACHE_MB = 1024
+DEFAULT_READ_AHEAD_FRAMES = 64
+
+# Read-ahead thread wake-up interval when the cursor is idle
+READ_AHEAD_IDLE_SEC = 0.1
+
+# ITU-R BT.601 luminance weights
+_LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def to_grayscale(frames: np.ndarray, color: bool) -> np.ndarray:
+    """Convert recorded frames to uint8 grayscale.
+
+    Args:
+        frames: [..., H, W] grayscale, or [..., H, W, 3] RGB / [..., H, W, 4] RGBA
+            (alpha dropped)
+        color: True if the last axis holds color channels
+
+    Returns:
+        [..., H, W] uint8 array (frames itself if already grayscale uint8)
+    """
+    if color:
+        return (frames[..., :3] @ _LUMA_WEIGHTS).astype(np.uint8)
+    if frames.dtype != np.uint8:
+        return frames.astype(np.uint8)
+    return frames
+
+
+class PlaybackFrameCache:
+    """LRU cache of decoded chunk blocks of a recorded frames dataset."""
+
+    def __init__(
+        self,
+        frames: Any,
+        max_bytes: int = DEFAULT_PLAYBACK_CACHE_MB * 1024 * 1024,
+        read_ahead_frames: int = DEFAULT_READ_AHEAD_FRAMES,
+        color_frames: Optional[bool] = None,
+    ):
+        """Wrap a frames dataset and start the read-ahead thread.
+
+        Args:
+            frames: h5py dataset (or array) of shape [N, H, W] or [N, H, W, C]
+            max_bytes: Memory budget for decoded frames
+            read_ahead_frames: Frames to decode ahead of the cursor (0 = no read-ahead)
+            color_frames: True if the last axis is color channels (default: 4-D dataset)
+
+        Raises:
+            ValueError: If frames is not 3-D or 4-D
+        """
+        if len(frames.shape) not in (3, 4):
+            raise ValueError(f"Invalid frames shape: {frames.shape}")
+        if color_frames is None:
+            color_frames = len(frames.shape) == 4
+        if color_frames and frames.shape[-1] not in (3, 4):
+            raise ValueError(f"Unsupported channel count: {frames.shape[-1]}")
+
+        self.frames = frames
+        self.color_frames = bool(color_frames)
+        self.frame_count = int(frames.shape[0])
+        self.frame_shape = tuple(int(d) for d in frames.shape[1:3])
+        self.max_bytes = int(max_bytes)
+        self.read_ahead_frames = int(read_ahead_frames)
+
+        chunks = getattr(frames, "chunks", None)
+        self.block_frames = max(1, int(chunks[0])) if chunks else 1
+        self.block_count = -(-self.frame_count // self.block_frames)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._blocks: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()  # Guards _blocks, counters and cursor
+        self._read_lock = threading.Lock()  # One dataset read at a time
+
+        self._cursor = 0
+        self._step = 1  # +1 forward, -1 backward
+        self._cursor_moved = threading.Event()
+        self._closed = False
+
+        self._thread: Optional[threading.Thread] = None
+        if self.read_ahead_frames > 0:
+            self._thread = threading.Thread(
+                target=self._read_ahead_loop, name="PlaybackReadAhead", daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def cached_bytes(self) -> int:
+        """Bytes of decoded frames currently held."""
+        return self._cached_bytes
+
+    @property
+    def closed(self) -> bool:
+        """True once close() has been called."""
+        return self._closed
+
+    def get(self, index: int) -> np.ndarray:
+        """Decoded grayscale frame at index (read-only view into the cache).
+
+        Args:
+            index: Frame index (0 <= index < frame_count)
+
+        Returns:
+            [H, W] uint8 frame
+
+        Raises:
+            IndexError: If index is out of range
+            RuntimeError: If the cache has been closed
+        """
+        if self._closed:
+            raise RuntimeError("Playback frame cache is closed")
+        if index < 0 or index >= self.frame_count:
+            raise IndexError(f"Frame index {index} out of range")
+
+        block_index = index // self.block_frames
+        with self._lock:
+            block = self._blocks.get(block_index)
+            if block is not None:
+                self._blocks.move_to_end(block_index)
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._move_cursor(index)
+
+        if block is None:
+            block = self._load(block_index)
+        return block[index - block_index * self.block_frames]
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics for status reporting."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "frame_count": self.frame_count,
+                "block_frames": self.block_frames,
+                "cached_blocks": len(self._blocks),
+                "cached_mb": self._cached_bytes / (1024 * 1024),
+                "max_mb": self.max_bytes / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+    def close(self) -> None:
+        """Stop read-ahead and drop all cached frames (the dataset is not closed)."""
+        self._closed = True
+        self._cursor_moved.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        with self._lock:
+            self._blocks.clear()
+            self._cached_bytes = 0
+
+    def _move_cursor(self, index: int) -> None:
+        """Record the playback position (caller holds _lock)."""
+        if index != self._cursor:
+            self._step = 1 if index > self._cursor else -1
+            self._cursor = index
+        self._cursor_moved.set()
+
+    def _load(self, block_index: int) -> np.ndarray:
+        """Decode a block from the dataset and insert it into the cache."""
+        with self._read_lock:
+            # Another thread (read-ahead) may have decoded it meanwhile
+            with self._lock:
+                block = self._blocks.get(block_index)
+                if block is not None:
+                    self._blocks.move_to_end(block_index)
+                    return block
+
+            start = block_index * self.block_frames
+            stop = min(start + self.block_frames, self.frame_count)
+            block = to_grayscale(np.asarray(self.frames[start:stop]), self.color_frames)
+            block.flags.writeable = False
+
+            with self._lock:
+                self._blocks[block_index] = block
+                self._cached_bytes += block.nbytes
+                # Evict least recently used blocks, never the one just loaded
+                while self._cached_bytes > self.max_bytes and len(self._blocks) > 1:
+                    _, evicted = self._blocks.popitem(last=False)
+                    self._cached_bytes -= evicted.nbytes
+            return block
+
+    def _read_ahead_loop(self) -> None:
+        """Decode blocks ahead of the cursor until closed."""
+        block_bytes = self.block_frames * self.frame_shape[0] * self.frame_shape[1]
+        # Read-ahead may use at most half the budget so it never evicts what it just fetched
+        max_blocks = max(1, (self.max_bytes // 2) // max(block_bytes, 1))
+        ahead_blocks = min(max_blocks, -(-self.read_ahead_frames // self.block_frames))
+
+        while not self._closed:
+            self._cursor_moved.wait(READ_AHEAD_IDLE_SEC)
+            self._cursor_moved.clear()
+            if self._closed:
+                break
+
+            with self._lock:
+                cursor_block = self._cursor // self.block_frames
+                step = self._step
+
+            for offset in range(1, ahead_blocks + 1):
+                if self._closed or self._cursor_moved.is_set():
+                    break  # Cursor jumped: restart from the new position
+                block_index = cursor_block + step * offset
+                if block_index < 0 or block_index >= self.block_count:
+                    break
+                with self._lock:
+                    cached = block_index in self._blocks
+                if not cached:
+                    try:
+                        self._load(block_index)
+                    except Exception as e:
+                        logger.warning(f"Playback read-ahead failed for block {block_index}: {e}")
+                        break
@@ -8,8 +8,10 @@ This file was already clean - no service_locator dependencies!
 
 import os
 import json
+import queue
+import threading
 import time
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import logging
@@ -17,8 +19,17 @@ import logging
 import numpy as np
 import h5py
 
+from hdf5_codecs import DEFAULT_CODEC, compression_kwargs, resolve_codec, time_series_chunks
+
 logger = logging.getLogger(__name__)
 
+# Camera HDF5 streaming: target bytes per stored chunk (frames per chunk derived
+# from frame size) and how many frames may wait for the writer thread
+CAMERA_CHUNK_TARGET_BYTES = 8 * 1024 * 1024
+CAMERA_MAX_CHUNK_FRAMES = 64
+CAMERA_MAX_QUEUED_FRAMES = 128
+CAMERA_QUEUE_TIMEOUT_SEC = 5.0
+
 
 @dataclass
 class StimulusEvent:
@@ -40,21 +51,270 @@ class CameraFrame:
     frame_data: np.ndarray  # Will be saved to HDF5, not JSON
 
 
+class CameraStreamWriter:
+    """Streams camera frames for one direction into a chunked HDF5 file.
+
+    Frames are queued by the camera thread and appended by a dedicated writer
+    thread to a resizable, chunked `frames` dataset (plus `timestamps`) in
+    `{direction}_camera.h5.tmp`. The writer copies each frame into a
+    preallocated chunk staging buffer (then hands the frame's buffer back via
+    its release callback) and writes whole chunks from it. RAM use is bounded
+    by the queue and one chunk regardless of session length. close() drains
+    the queue, writes attributes and atomically renames the file to its final
+    name.
+    """
+
+    def __init__(
+        self,
+        final_path: Path,
+        max_queued_frames: int = CAMERA_MAX_QUEUED_FRAMES,
+        codec: str = DEFAULT_CODEC,
+    ):
+        """Create the temporary HDF5 file and start the writer thread.
+
+        Args:
+            final_path: Final `{direction}_camera.h5` path
+            max_queued_frames: Frames buffered between camera and writer thread
+            codec: HDF5 compression codec for frames (see hdf5_codecs.CODECS)
+        """
+        self.final_path = Path(final_path)
+        self.codec = codec
+        self.temp_path = self.final_path.with_name(self.final_path.name + ".tmp")
+
+        self.frames_written = 0
+        self._queue: "queue.Queue[Optional[Tuple[int, np.ndarray, Optional[Callable]]]]" = queue.Queue(
+            maxsize=max_queued_frames
+        )
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+        self._file = h5py.File(self.temp_path, "w")
+        self._frames_dataset = None
+        self._timestamps_dataset = None
+        self._chunk_frames = 1
+
+        # Chunk staging buffers (allocated once the frame shape is known)
+        self._chunk_buffer: Optional[np.ndarray] = None
+        self._chunk_timestamps: Optional[np.ndarray] = None
+        self._chunk_fill = 0
+
+        self._thread = threading.Thread(
+            target=self._writer_loop,
+            name=f"CameraWriter-{self.final_path.stem}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def write(
+        self,
+        timestamp_us: int,
+        frame_data: np.ndarray,
+        release: Optional[Callable[[np.ndarray], None]] = None,
+    ) -> None:
+        """Queue a frame for writing (called from the camera thread).
+
+        The writer takes ownership of frame_data: the caller must not modify
+        it afterwards. release(frame_data), if given, is called once the frame
+        has been staged (or dropped on error), so pooled buffers can be reused.
+
+        Blocks briefly if the writer is behind; raises rather than silently
+        dropping frames so record mode fails hard.
+
+        Args:
+            timestamp_us: Capture timestamp in microseconds
+            frame_data: Frame array (same shape and dtype for every frame)
+            release: Optional callback returning frame_data to its pool
+
+        Raises:
+            RuntimeError: If the writer failed or cannot keep up
+        """
+        try:
+            if self._error is not None:
+                raise RuntimeError(f"Camera writer failed: {self._error}") from self._error
+            if self._closed:
+                raise RuntimeError(f"Camera writer already closed: {self.final_path.name}")
+
+            try:
+                self._queue.put((timestamp_us, frame_data, release), timeout=CAMERA_QUEUE_TIMEOUT_SEC)
+            except queue.Full:
+                raise RuntimeError(
+                    f"Camera writer for {self.final_path.name} fell behind by "
+                    f"{self._queue.maxsize} frames (disk too slow)"
+                )
+        except RuntimeError:
+            if release is not None:
+                release(frame_data)
+            raise
+
+    def close(self, attrs: Dict[str, Any]) -> bool:
+        """Drain queued frames, write attributes and rename .tmp to final path.
+
+        Args:
+            attrs: File attributes to store
+
+        Returns:
+            True if a camera file was written, False if no frames were recorded
+
+        Raises:
+            RuntimeError: If the writer thread failed
+        """
+        if self._closed:
+            return self.final_path.exists()
+        self._closed = True
+
+        self._queue.put(None)
+        self._thread.join()
+        self._release_unwritten()
+
+        try:
+            if self._error is not None:
+                raise RuntimeError(f"Camera writer failed: {self._error}") from self._error
+
+            if self.frames_written == 0:
+                self._file.close()
+                self.temp_path.unlink()
+                return False
+
+            for key, value in attrs.items():
+                self._file.attrs[key] = value
+
+            # Ensure all data is written to disk (critical for compressed data)
+            self._file.flush()
+            self._file.close()
+
+            # Atomic rename - file appears complete or not at all
+            self.temp_path.rename(self.final_path)
+            return True
+
+        except Exception:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """Stop writing and remove the temporary file."""
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._release_unwritten()
+        try:
+            self._file.close()
+        except Exception:
+            pass
+        if self.temp_path.exists():
+            self.temp_path.unlink()
+
+    def _release_unwritten(self) -> None:
+        """Release frames queued behind the close sentinel by a racing write()."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                _, frame_data, release = item
+                if release is not None:
+                    release(frame_data)
+
+    def _writer_loop(self) -> None:
+        """Stage queued frames into whole chunks until the close sentinel arrives."""
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    self._flush_chunk()
+                    return
+
+                timestamp_us, frame_data, release = item
+                try:
+                    if self._frames_dataset is None:
+                        self._create_datasets(frame_data)
+                    self._chunk_buffer[self._chunk_fill] = frame_data
+                    self._chunk_timestamps[self._chunk_fill] = timestamp_us
+                finally:
+                    if release is not None:
+                        release(frame_data)
+                self._chunk_fill += 1
+
+                # Write whole chunks so compressed chunks are never rewritten
+                if self._chunk_fill == self._chunk_frames:
+                    self._flush_chunk()
+
+        except BaseException as e:
+            logger.error(f"Camera writer error ({self.final_path.name}): {e}", exc_info=True)
+            self._error = e
+            # Keep draining so the camera thread never blocks on a dead writer
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                _, frame_data, release = item
+                if release is not None:
+                    release(frame_data)
+
+    def _create_datasets(self, first_frame: np.ndarray) -> None:
+        """Create resizable datasets and chunk staging buffers shaped from the first frame."""
+        frame_shape = first_frame.shape
+        chunks = time_series_chunks(
+            frame_shape,
+            first_frame.dtype,
+            target_bytes=CAMERA_CHUNK_TARGET_BYTES,
+            max_frames=CAMERA_MAX_CHUNK_FRAMES,
+        )
+        self._chunk_frames = chunks[0]
+        self._chunk_buffer = np.empty(chunks, dtype=first_frame.dtype)
+        self._chunk_timestamps = np.empty(self._chunk_frames, dtype=np.int64)
+        self._frames_dataset = self._file.create_dataset(
+            "frames",
+            shape=(0,) + frame_shape,
+            maxshape=(None,) + frame_shape,
+            dtype=first_frame.dtype,
+            chunks=chunks,
+            **compression_kwargs(self.codec),
+        )
+        self._frames_dataset.attrs["codec"] = resolve_codec(self.codec)
+        self._timestamps_dataset = self._file.create_dataset(
+            "timestamps",
+            shape=(0,),
+            maxshape=(None,),
+            dtype=np.int64,
+            chunks=(max(self._chunk_frames, 1024),),
+        )
+
+    def _flush_chunk(self) -> None:
+        """Append the staged frames and timestamps to the datasets."""
+        count = self._chunk_fill
+        if count == 0:
+            return
+        start = self.frames_written
+        end = start + count
+
+        self._frames_dataset.resize(end, axis=0)
+        self._frames_dataset[start:end] = self._chunk_buffer[:count]
+        self._timestamps_dataset.resize(end, axis=0)
+        self._timestamps_dataset[start:end] = self._chunk_timestamps[:count]
+
+        self.frames_written = end
+        self._chunk_fill = 0
+
+
 class AcquisitionRecorder:
     """Records acquisition data to disk for later analysis and playback."""
 
-    def __init__(self, session_path: str, metadata: Dict[str, Any]):
+    def __init__(self, session_path: str, metadata: Dict[str, Any], codec: str = DEFAULT_CODEC):
         """
         Initialize recorder for a new acquisition session.
 
         Args:
             session_path: Directory where session data will be saved
             metadata: Session metadata (parameters, directions, etc.)
+            codec: HDF5 compression codec for camera frames (see hdf5_codecs.CODECS)
         """
         self.session_path = Path(session_path)
         self.session_path.mkdir(parents=True, exist_ok=True)
 
         self.metadata = metadata
+        self.codec = codec
 
         # Add timestamp source information for data provenance
         if "timestamp_info" not in self.metadata:
@@ -66,9 +326,12 @@ class AcquisitionRecorder:
 
         self.is_recording = False
 
-        # Data buffers per direction
+        # Data buffers per direction (camera frames stream straight to disk)
         self.stimulus_events: Dict[str, List[StimulusEvent]] = {}
-        self.camera_frames: Dict[str, List[CameraFrame]] = {}
+        self.camera_frame_counts: Dict[str, int] = {}
+        self.camera_frames_skipped: Dict[str, List[int]] = {}
+        self._camera_writers: Dict[str, CameraStreamWriter] = {}
+        self._camera_lock = threading.Lock()
         self.current_direction: Optional[str] = None
 
         # Anatomical reference image (captured before acquisition)
@@ -84,22 +347,32 @@ class AcquisitionRecorder:
         # Initialize buffers for this direction if needed
         if direction not in self.stimulus_events:
             self.stimulus_events[direction] = []
-        if direction not in self.camera_frames:
-            self.camera_frames[direction] = []
+        if direction not in self.camera_frame_counts:
+            self.camera_frame_counts[direction] = 0
+
+        # Open streaming camera writer ({direction}_camera.h5.tmp until finalized)
+        with self._camera_lock:
+            if direction not in self._camera_writers:
+                self._camera_writers[direction] = CameraStreamWriter(
+                    self.session_path / f"{direction}_camera.h5", codec=self.codec
+                )
 
         logger.info(f"Started recording for direction: {direction}")
 
     def stop_recording(self) -> None:
-        """Stop recording current direction."""
-        if self.current_direction:
-            logger.info(
-                f"Stopped recording for direction: {self.current_direction} "
-                f"({len(self.stimulus_events.get(self.current_direction, []))} stimulus events, "
-                f"{len(self.camera_frames.get(self.current_direction, []))} camera frames)"
-            )
+        """Stop recording current direction and finalize its camera file."""
+        direction = self.current_direction
         self.is_recording = False
         self.current_direction = None
 
+        if direction:
+            logger.info(
+                f"Stopped recording for direction: {direction} "
+                f"({len(self.stimulus_events.get(direction, []))} stimulus events, "
+                f"{self.camera_frame_counts.get(direction, 0)} camera frames)"
+            )
+            self._finalize_camera_file(direction)
+
     def record_stimulus_event(
         self,
         timestamp_us: int,
@@ -128,22 +401,68 @@ class AcquisitionRecorder:
         frame_index: int,
         frame_data: np.ndarray,
         direction: Optional[str] = None,
+        release: Optional[Callable[[np.ndarray], None]] = None,
     ) -> None:
-        """Record a camera frame."""
-        if not self.is_recording:
-            return
+        """Record a camera frame.
 
+        Args:
+            timestamp_us: Capture timestamp in microseconds
+            frame_index: Camera frame index
+            frame_data: Grayscale frame
+            direction: Direction to record into (default: current direction)
+            release: Optional callback returning frame_data to its buffer pool.
+                If given, the recorder takes ownership of frame_data without
+                copying and calls release(frame_data) exactly once when done
+                with it; otherwise frame_data is copied.
+        """
         target_direction = direction or self.current_direction
-        if not target_direction:
+        if not self.is_recording or not target_direction:
+            if release is not None:
+                release(frame_data)
             return
 
-        frame = CameraFrame(
-            timestamp_us=timestamp_us,
-            frame_index=frame_index,
-            frame_data=frame_data.copy(),  # Copy to avoid reference issues
-        )
+        if release is None:
+            frame_data = frame_data.copy()  # Copy to avoid reference issues
+
+        with self._camera_lock:
+            writer = self._camera_writers.get(target_direction)
+        if writer is None:
+            if release is not None:
+                release(frame_data)
+            return
+
+        # write() blocks for up to CAMERA_QUEUE_TIMEOUT_SEC when the disk falls
+        # behind, so it must not hold _camera_lock (direction switch and stop
+        # take it to finalize the writer)
+        try:
+            writer.write(timestamp_us, frame_data, release)
+        except RuntimeError:
+            with self._camera_lock:
+                finalized = self._camera_writers.get(target_direction) is not writer
+            if finalized:
+                return  # Direction was finalized while this frame was in flight
+            raise
+
+        with self._camera_lock:
+            self.camera_frame_counts[target_direction] += 1
 
-        self.camera_frames[target_direction].append(frame)
+    def record_camera_gap(self, frame_indices: List[int], direction: Optional[str] = None) -> None:
+        """Record camera frames that were captured but never reached the recorder.
+
+        Saved as camera_frames_skipped in metadata.json and as the
+        frames_skipped attribute of the direction's camera file, so analysis
+        can detect gaps in the recorded frame sequence.
+
+        Args:
+            frame_indices: Camera frame indices of the lost frames
+            direction: Direction being recorded (default: current direction)
+        """
+        target_direction = direction or self.current_direction
+        if not self.is_recording or not target_direction:
+            return
+
+        with self._camera_lock:
+            self.camera_frames_skipped.setdefault(target_direction, []).extend(frame_indices)
 
     def set_anatomical_image(self, frame: np.ndarray) -> None:
         """
@@ -163,6 +482,13 @@ class AcquisitionRecorder:
         logger.info(f"Saving session data to {self.session_path}")
 
         try:
+            # Record gaps in the camera frame sequence (frames the recorder never received)
+            with self._camera_lock:
+                self.metadata["camera_frames_skipped"] = {
+                    direction: {"count": len(indices), "frame_indices": list(indices)}
+                    for direction, indices in self.camera_frames_skipped.items()
+                }
+
             # Save metadata
             metadata_path = self.session_path / "metadata.json"
             with open(metadata_path, "w") as f:
@@ -173,6 +499,10 @@ class AcquisitionRecorder:
             for direction in self.stimulus_events.keys():
                 self._save_direction_data(direction)
 
+            # Finalize any camera file still open (e.g. acquisition stopped mid-direction)
+            for direction in list(self._camera_writers.keys()):
+                self._finalize_camera_file(direction)
+
             # Save anatomical image if available
             if self.anatomical_image is not None:
                 anatomical_path = self.session_path / "anatomical.npy"
@@ -190,7 +520,11 @@ class AcquisitionRecorder:
             raise
 
     def _save_direction_data(self, direction: str) -> None:
-        """Save data for a specific direction."""
+        """Save stimulus data for a specific direction.
+
+        Camera frames are streamed to disk while recording (CameraStreamWriter)
+        and finalized in stop_recording, so they are not written here.
+        """
         logger.info(f"  Saving {direction} data...")
 
         # Save stimulus events as JSON
@@ -234,22 +568,8 @@ class AcquisitionRecorder:
             f.create_dataset("angles", data=angles)
 
             # Add essential monitor metadata
-            monitor_params = self.metadata.get("monitor", {})
-            f.attrs["monitor_fps"] = monitor_params.get("monitor_fps", -1)
-            f.attrs["monitor_width_px"] = monitor_params.get("monitor_width_px", -1)
-            f.attrs["monitor_height_px"] = monitor_params.get("monitor_height_px", -1)
-            f.attrs["monitor_distance_cm"] = monitor_params.get(
-                "monitor_distance_cm", -1.0
-            )
-            f.attrs["monitor_width_cm"] = monitor_params.get("monitor_width_cm", -1.0)
-            f.attrs["monitor_height_cm"] = monitor_params.get("monitor_height_cm", -1.0)
-            # Angle parameters: use -1.0 as sentinel for missing data (consistent with other params)
-            f.attrs["monitor_lateral_angle_deg"] = monitor_params.get(
-                "monitor_lateral_angle_deg", -1.0
-            )
-            f.attrs["monitor_tilt_angle_deg"] = monitor_params.get(
-                "monitor_tilt_angle_deg", -1.0
-            )
+            for key, value in self._monitor_attrs().items():
+                f.attrs[key] = value
 
             # Add stimulus metadata
             f.attrs["direction"] = direction
@@ -265,70 +585,46 @@ class AcquisitionRecorder:
             f"    Saved stimulus data (atomic): {len(angles)} events (timestamps, frame_indices, angles)"
         )
 
-        # Save camera frames as HDF5 with atomic write (if any were recorded)
-        if direction in self.camera_frames and self.camera_frames[direction]:
-            camera_path = self.session_path / f"{direction}_camera.h5"
-            camera_temp_path = self.session_path / f"{direction}_camera.h5.tmp"
+    def _monitor_attrs(self) -> Dict[str, Any]:
+        """Essential monitor metadata stored as HDF5 attributes."""
+        monitor_params = self.metadata.get("monitor", {})
+        return {
+            "monitor_fps": monitor_params.get("monitor_fps", -1),
+            "monitor_width_px": monitor_params.get("monitor_width_px", -1),
+            "monitor_height_px": monitor_params.get("monitor_height_px", -1),
+            "monitor_distance_cm": monitor_params.get("monitor_distance_cm", -1.0),
+            "monitor_width_cm": monitor_params.get("monitor_width_cm", -1.0),
+            "monitor_height_cm": monitor_params.get("monitor_height_cm", -1.0),
+            # Angle parameters: use -1.0 as sentinel for missing data (consistent with other params)
+            "monitor_lateral_angle_deg": monitor_params.get("monitor_lateral_angle_deg", -1.0),
+            "monitor_tilt_angle_deg": monitor_params.get("monitor_tilt_angle_deg", -1.0),
+        }
 
-            frames_list = self.camera_frames[direction]
-            frames_array = np.stack([f.frame_data for f in frames_list])
-            timestamps_array = np.array([f.timestamp_us for f in frames_list])
+    def _finalize_camera_file(self, direction: str) -> None:
+        """Finalize the streamed camera file for a direction (.tmp -> rename)."""
+        with self._camera_lock:
+            writer = self._camera_writers.pop(direction, None)
+        if writer is None:
+            return
 
-            # Write to temporary file first (atomic write pattern)
-            # This prevents readers from seeing partial writes
-            try:
-                with h5py.File(camera_temp_path, "w") as f:
-                    f.create_dataset(
-                        "frames", data=frames_array, compression="gzip", compression_opts=4
-                    )
-                    f.create_dataset("timestamps", data=timestamps_array)
-
-                    # Add essential monitor metadata
-                    monitor_params = self.metadata.get("monitor", {})
-                    f.attrs["monitor_fps"] = monitor_params.get("monitor_fps", -1)
-                    f.attrs["monitor_width_px"] = monitor_params.get("monitor_width_px", -1)
-                    f.attrs["monitor_height_px"] = monitor_params.get(
-                        "monitor_height_px", -1
-                    )
-                    f.attrs["monitor_distance_cm"] = monitor_params.get(
-                        "monitor_distance_cm", -1.0
-                    )
-                    f.attrs["monitor_width_cm"] = monitor_params.get(
-                        "monitor_width_cm", -1.0
-                    )
-                    f.attrs["monitor_height_cm"] = monitor_params.get(
-                        "monitor_height_cm", -1.0
-                    )
-                    # Angle parameters: use -1.0 as sentinel for missing data (consistent with other params)
-                    f.attrs["monitor_lateral_angle_deg"] = monitor_params.get(
-                        "monitor_lateral_angle_deg", -1.0
-                    )
-                    f.attrs["monitor_tilt_angle_deg"] = monitor_params.get(
-                        "monitor_tilt_angle_deg", -1.0
-                    )
-
-                    # Add camera metadata
-                    camera_params = self.metadata.get("camera", {})
-                    f.attrs["camera_fps"] = camera_params.get("camera_fps", -1)
-                    f.attrs["direction"] = direction
-
-                    # Ensure all data is written to disk (critical for compressed data)
-                    f.flush()
-
-                # Atomic rename - file appears complete or not at all
-                camera_temp_path.rename(camera_path)
+        camera_params = self.metadata.get("camera", {})
+        attrs = self._monitor_attrs()
+        attrs["camera_fps"] = camera_params.get("camera_fps", -1)
+        attrs["direction"] = direction
+        with self._camera_lock:
+            attrs["frames_skipped"] = len(self.camera_frames_skipped.get(direction, []))
 
+        try:
+            if writer.close(attrs):
                 logger.info(
-                    f"    Saved camera data (atomic): {frames_array.shape} "
-                    f"({frames_array.nbytes / 1024 / 1024:.1f} MB)"
+                    f"    Finalized camera data (atomic): {writer.frames_written} frames "
+                    f"-> {writer.final_path.name}"
                 )
-
-            except Exception as e:
-                # Clean up temp file if it exists
-                if camera_temp_path.exists():
-                    camera_temp_path.unlink()
-                logger.error(f"    Failed to save camera data: {e}")
-                raise
+            else:
+                logger.info(f"    No camera frames recorded for {direction}")
+        except Exception as e:
+            logger.error(f"    Failed to save camera data: {e}")
+            raise
 
     def get_session_info(self) -> Dict[str, Any]:
         """Get information about the current recording session."""
@@ -341,9 +637,9 @@ class AcquisitionRecorder:
                 direction: len(events)
                 for direction, events in self.stimulus_events.items()
             },
-            "camera_frames_count": {
-                direction: len(frames)
-                for direction, frames in self.camera_frames.items()
+            "camera_frames_count": dict(self.camera_frame_counts),
+            "camera_frames_skipped": {
+                direction: len(indices) for direction, indices in self.camera_frames_skipped.items()
             },
         }
 
@@ -352,6 +648,7 @@ def create_session_recorder(
     session_name: Optional[str] = None,
     base_path: str = "data/sessions",
     metadata: Optional[Dict[str, Any]] = None,
+    codec: str = DEFAULT_CODEC,
 ) -> AcquisitionRecorder:
     """
     Create a new acquisition recorder for a session.
@@ -360,6 +657,7 @@ def create_session_recorder(
         session_name: Name of the session (auto-generated if None)
         base_path: Base directory for session data (relative to backend root)
         metadata: Session metadata
+        codec: HDF5 compression codec for camera frames (see hdf5_codecs.CODECS)
 
     Returns:
         Initialized AcquisitionRecorder
@@ -381,4 +679,4 @@ def create_session_recorder(
             "timestamp": time.time(),
         }
 
-    return AcquisitionRecorder(session_path, metadata)
+    return AcquisitionRecorder(session_path, metadata, codec=codec)
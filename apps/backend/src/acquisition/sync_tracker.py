@@ -2,9 +2,15 @@
 
 Refactored from isi_control/timestamp_synchronization_tracker.py with KISS approach.
 This file was already perfect - no service_locator dependencies!
+
+History is a fixed-capacity, array-backed ring buffer (int64 timestamps,
+float32 differences) with O(1) append. Entries are addressed by a running
+sequence number (entry n lives at n % capacity). Window queries binary-search
+the monotonic camera timestamps, and windowed mean/std come from running
+prefix sums, so UI polls cost O(log n + window) regardless of history size.
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import threading
 import logging
 
@@ -12,6 +18,13 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Samples further apart than this are stale (previous stimulus phase)
+MAX_SYNC_AGE_US = 100_000  # 100ms
+
+# Window returned by get_synchronization_data()
+SYNC_WINDOW_SECONDS = 5.0
+SYNC_HISTOGRAM_BINS = 50
+
 
 class TimestampSynchronizationTracker:
     """Tracks and analyzes camera-stimulus timestamp synchronization quality."""
@@ -24,10 +37,24 @@ class TimestampSynchronizationTracker:
             max_history: Maximum number of synchronization entries to retain
                        Default 100,000 entries supports ~30 minutes at 60fps
         """
-        self.synchronization_history: List[Dict[str, Any]] = []
         self.max_history = max_history
         self._enabled = False
-        self._lock = threading.RLock()  # Thread-safe access to synchronization_history
+        self._lock = threading.RLock()  # Thread-safe access to the history arrays
+
+        # Ring buffer columns (entry n at index n % max_history)
+        self._camera_ts = np.zeros(max_history, dtype=np.int64)
+        self._stimulus_ts = np.zeros(max_history, dtype=np.int64)
+        self._frame_ids = np.zeros(max_history, dtype=np.int64)  # -1 = no frame ID
+        self._diff_ms = np.zeros(max_history, dtype=np.float32)
+
+        # Running sums of diff and diff^2 up to and including each entry
+        self._cum_diff = np.zeros(max_history, dtype=np.float64)
+        self._cum_diff_sq = np.zeros(max_history, dtype=np.float64)
+        self._sum_diff = 0.0
+        self._sum_diff_sq = 0.0
+
+        self._total = 0  # Entries ever appended since clear()
+        self._run_start = 0  # First entry of the current monotonic camera-timestamp run
 
     def enable(self) -> None:
         """Enable timestamp synchronization tracking."""
@@ -44,10 +71,19 @@ class TimestampSynchronizationTracker:
     def clear(self) -> None:
         """Clear all synchronization history."""
         with self._lock:
-            previous_count = len(self.synchronization_history)
-            self.synchronization_history.clear()
+            previous_count = self.count
+            self._total = 0
+            self._run_start = 0
+            self._sum_diff = 0.0
+            self._sum_diff_sq = 0.0
             logger.info(f"Synchronization history cleared (removed {previous_count} entries)")
 
+    @property
+    def count(self) -> int:
+        """Number of entries currently retained."""
+        with self._lock:
+            return min(self._total, self.max_history)
+
     def record_synchronization(
         self,
         camera_timestamp_us: int,
@@ -85,7 +121,6 @@ class TimestampSynchronizationTracker:
         # Validate timestamps are recent to avoid synchronization spikes from stale data
         # Only record if timestamps are within reasonable window
         time_diff_us = abs(camera_timestamp_us - stimulus_timestamp_us)
-        MAX_SYNC_AGE_US = 100_000  # 100ms
 
         if time_diff_us >= MAX_SYNC_AGE_US:
             # Timestamp too old - likely from previous stimulus phase
@@ -98,31 +133,43 @@ class TimestampSynchronizationTracker:
             return
 
         # Calculate signed time difference for synchronization analysis
-        signed_time_diff_us = camera_timestamp_us - stimulus_timestamp_us
-        time_diff_ms = signed_time_diff_us / 1000.0
+        time_diff_ms = (camera_timestamp_us - stimulus_timestamp_us) / 1000.0
 
-        # Append to history (with lock for thread safety)
+        # Append to ring buffer (with lock for thread safety)
         with self._lock:
-            self.synchronization_history.append(
-                {
-                    "camera_timestamp": camera_timestamp_us,
-                    "stimulus_timestamp": stimulus_timestamp_us,
-                    "frame_id": frame_id,
-                    "time_difference_us": signed_time_diff_us,
-                    "time_difference_ms": time_diff_ms,
-                }
-            )
+            n = self._total
+            i = n % self.max_history
+
+            # Camera clock went backwards (e.g. camera reopened): window queries
+            # binary-search timestamps, so start a new monotonic run
+            if n > self._run_start and camera_timestamp_us < self._camera_ts[(n - 1) % self.max_history]:
+                logger.warning(
+                    f"Camera timestamp went backwards ({camera_timestamp_us}us), "
+                    f"starting new synchronization window"
+                )
+                self._run_start = n
+
+            self._camera_ts[i] = camera_timestamp_us
+            self._stimulus_ts[i] = stimulus_timestamp_us
+            self._frame_ids[i] = -1 if frame_id is None else frame_id
+            self._diff_ms[i] = time_diff_ms
+
+            diff = float(self._diff_ms[i])
+            self._sum_diff += diff
+            self._sum_diff_sq += diff * diff
+            self._cum_diff[i] = self._sum_diff
+            self._cum_diff_sq[i] = self._sum_diff_sq
+
+            self._total = n + 1
 
             # Log periodically for monitoring
-            if len(self.synchronization_history) % 100 == 0:
-                logger.info(f"Synchronization history: {len(self.synchronization_history)} entries recorded")
+            if self._total % 100 == 0:
+                logger.debug(f"Synchronization history: {self._total} entries recorded")
 
-            # Maintain maximum history size
-            if len(self.synchronization_history) > self.max_history:
-                dropped = self.synchronization_history.pop(0)
+            if self._total == self.max_history + 1:
                 logger.warning(
                     f"Synchronization history limit reached ({self.max_history}), "
-                    f"dropping oldest entry from {dropped['camera_timestamp']}"
+                    f"oldest entries are now overwritten"
                 )
 
     def get_synchronization_data(self) -> Dict[str, Any]:
@@ -140,9 +187,10 @@ class TimestampSynchronizationTracker:
             # Return recent synchronization based on synchronization timestamps
             # During between-trials, this returns the same data, freezing the plot
             # rather than flushing it with empty data
-            recent_entries = self._get_recent_synchronization_internal(window_seconds=5.0)
+            first, end = self._window_range(SYNC_WINDOW_SECONDS)
+            count = end - first
 
-            if not recent_entries:
+            if count == 0:
                 return {
                     "synchronization": [],
                     "statistics": {
@@ -157,94 +205,127 @@ class TimestampSynchronizationTracker:
                     },
                 }
 
-            diffs_ms = np.array(
-                [
-                    c["time_difference_ms"]
-                    for c in recent_entries
-                    if c["time_difference_ms"] is not None
-                ],
-                dtype=float,
-            )
-
-            if diffs_ms.size == 0:
-                stats = {
-                    "count": len(recent_entries),
-                    "matched_count": 0,
-                    "mean_diff_ms": 0.0,
-                    "std_diff_ms": 0.0,
-                    "min_diff_ms": 0.0,
-                    "max_diff_ms": 0.0,
-                    "histogram": [],
-                    "bin_edges": [],
-                }
-            else:
-                hist, bin_edges = np.histogram(diffs_ms, bins=50)
-
-                stats = {
-                    "count": len(recent_entries),
-                    "matched_count": int(diffs_ms.size),
-                    "mean_diff_ms": float(np.mean(diffs_ms)),
-                    "std_diff_ms": float(np.std(diffs_ms)),
-                    "min_diff_ms": float(np.min(diffs_ms)),
-                    "max_diff_ms": float(np.max(diffs_ms)),
-                    "histogram": hist.tolist(),
-                    "bin_edges": bin_edges.tolist(),
-                }
+            mean_ms, std_ms = self._window_moments(first, end)
+            diffs_ms = self._column(self._diff_ms, first, end)
+            hist, bin_edges = np.histogram(diffs_ms, bins=SYNC_HISTOGRAM_BINS)
+
+            stats = {
+                "count": count,
+                "matched_count": count,
+                "mean_diff_ms": mean_ms,
+                "std_diff_ms": std_ms,
+                "min_diff_ms": float(diffs_ms.min()),
+                "max_diff_ms": float(diffs_ms.max()),
+                "histogram": hist.tolist(),
+                "bin_edges": bin_edges.tolist(),
+            }
 
             # Include window metadata for debugging
-            window_info = {}
-            if self.synchronization_history:
-                window_info = {
-                    "window_anchor_timestamp": self.synchronization_history[-1]["camera_timestamp"],
-                    "window_start_timestamp": self.synchronization_history[-1]["camera_timestamp"] - (5.0 * 1_000_000),
-                    "total_history_count": len(self.synchronization_history),
-                    "window_entry_count": len(recent_entries),
-                }
+            anchor = int(self._camera_ts[(self._total - 1) % self.max_history])
+            window_info = {
+                "window_anchor_timestamp": anchor,
+                "window_start_timestamp": anchor - (SYNC_WINDOW_SECONDS * 1_000_000),
+                "total_history_count": self.count,
+                "window_entry_count": count,
+            }
 
             result = {
-                "synchronization": recent_entries,
+                "synchronization": self._entries(first, end),
                 "statistics": stats,
                 "window_info": window_info,
             }
 
-            logger.info(
-                f"get_synchronization_data: {len(recent_entries)} entries in window "
-                f"(total history: {len(self.synchronization_history)}), "
-                f"window_anchor={window_info.get('window_anchor_timestamp', 'N/A')}, "
+            logger.debug(
+                f"get_synchronization_data: {count} entries in window "
+                f"(total history: {self.count}), "
+                f"window_anchor={anchor}, "
                 f"enabled={self._enabled}"
             )
 
             return result
 
-    def _get_recent_synchronization_internal(
-        self, window_seconds: float = 5.0
-    ) -> List[Dict[str, Any]]:
+    def _window_range(self, window_seconds: float) -> Tuple[int, int]:
         """
-        Internal method to get recent synchronization WITHOUT acquiring lock.
+        Sequence range [first, end) of entries in the most recent window.
         Must be called while holding self._lock.
 
+        Uses the most recent SYNCHRONIZATION timestamp, not wall-clock time,
+        so the window freezes during between-trials periods.
+
         Args:
-            window_seconds: Time window to retrieve (default: 5.0 seconds)
+            window_seconds: Time window to retrieve
 
         Returns:
-            List of synchronization entries within the time window
+            (first, end) sequence numbers; first == end if empty
         """
-        if not self.synchronization_history:
-            return []
-
-        # Use most recent SYNCHRONIZATION timestamp, not wall-clock time
-        # This freezes the window during between-trials periods
-        latest_timestamp = self.synchronization_history[-1]["camera_timestamp"]
-        threshold = latest_timestamp - (window_seconds * 1_000_000)
-
-        recent = [
-            entry
-            for entry in self.synchronization_history
-            if entry["camera_timestamp"] >= threshold
+        end = self._total
+        oldest = max(self._run_start, end - self.max_history)
+        if end == oldest:
+            return end, end
+
+        latest_timestamp = self._camera_ts[(end - 1) % self.max_history]
+        threshold = latest_timestamp - int(window_seconds * 1_000_000)
+
+        # Binary search over the (possibly wrapped) monotonic run
+        lo, hi = oldest, end
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._camera_ts[mid % self.max_history] < threshold:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo, end
+
+    def _column(self, column: np.ndarray, first: int, end: int) -> np.ndarray:
+        """Entries [first, end) of a ring column in order (view unless wrapped)."""
+        start = first % self.max_history
+        stop = start + (end - first)
+        if stop <= self.max_history:
+            return column[start:stop]
+        return np.concatenate((column[start:], column[: stop - self.max_history]))
+
+    def _window_moments(self, first: int, end: int) -> Tuple[float, float]:
+        """Mean and standard deviation of diffs [first, end) from the running sums."""
+        last = (end - 1) % self.max_history
+        sum_diff = self._cum_diff[last]
+        sum_diff_sq = self._cum_diff_sq[last]
+
+        if first > 0:
+            if first - 1 >= self._total - self.max_history:
+                before = (first - 1) % self.max_history
+                sum_diff -= self._cum_diff[before]
+                sum_diff_sq -= self._cum_diff_sq[before]
+            else:
+                # Window spans the whole ring; the entry before it was overwritten
+                diffs = self._column(self._diff_ms, first, end).astype(np.float64)
+                sum_diff = diffs.sum()
+                sum_diff_sq = np.dot(diffs, diffs)
+
+        count = end - first
+        mean = sum_diff / count
+        variance = max(sum_diff_sq / count - mean * mean, 0.0)
+        return float(mean), float(np.sqrt(variance))
+
+    def _entries(self, first: int, end: int) -> List[Dict[str, Any]]:
+        """Entries [first, end) as dictionaries (frontend / API format)."""
+        camera = self._column(self._camera_ts, first, end)
+        stimulus = self._column(self._stimulus_ts, first, end)
+        frame_ids = self._column(self._frame_ids, first, end)
+        diff_us = camera - stimulus
+
+        return [
+            {
+                "camera_timestamp": cam,
+                "stimulus_timestamp": stim,
+                "frame_id": None if fid < 0 else fid,
+                "time_difference_us": diff,
+                "time_difference_ms": diff / 1000.0,
+            }
+            for cam, stim, fid, diff in zip(
+                camera.tolist(), stimulus.tolist(), frame_ids.tolist(), diff_us.tolist()
+            )
         ]
 
-        return recent
-
     def get_recent_synchronization(
         self, window_seconds: float = 5.0
     ) -> List[Dict[str, Any]]:
@@ -262,7 +343,8 @@ class TimestampSynchronizationTracker:
             List of synchronization entries within the time window
         """
         with self._lock:
-            return self._get_recent_synchronization_internal(window_seconds)
+            first, end = self._window_range(window_seconds)
+            return self._entries(first, end)
 
     @property
     def is_enabled(self) -> bool:
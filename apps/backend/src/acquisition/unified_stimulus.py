@@ -5,9 +5,14 @@ used for both preview and record modes.
 
 Architecture:
 - Pre-generates LR + TB directions as grayscale (4x memory savings vs RGBA)
-- Derives RL = reversed(LR), BT = reversed(TB) (50% compute savings)
-- Stores frames as raw numpy arrays for zero-overhead playback
-- Total memory: ~12 GB for all 4 directions (acceptable on modern systems)
+- Stores each primary direction as one contiguous (n_frames, H, W) uint8 array
+- Derives RL = LR[::-1], BT = TB[::-1] as zero-copy views (50% compute and memory savings)
+- Optionally backs the primary arrays with uncompressed .npy files on local disk,
+  memory-mapped read-only, so a cached library maps instantly at startup instead
+  of being regenerated or decompressed (pages are loaded on first playback)
+- The cache is content-addressed by a hash of the monitor + stimulus parameters,
+  holds several libraries (LRU-evicted under a disk budget) and is re-mapped
+  automatically when parameters change back to a previously used configuration
 - Playback at monitor FPS (VSync-locked, independent from camera)
 - Frame correspondence via frame index (camera_frame_N → stimulus_frame_2N)
 
@@ -22,6 +27,10 @@ VSync Architecture:
   platform-specific VSync APIs (CVDisplayLink/D3D11/X11), frontend handles it
 """
 
+import hashlib
+import os
+import shutil
+import tempfile
 import threading
 import time
 import logging
@@ -33,8 +42,43 @@ import json
 import numpy as np
 import h5py
 
+from hdf5_codecs import DEFAULT_CODEC, compression_kwargs, resolve_codec, time_series_chunks
+
 logger = logging.getLogger(__name__)
 
+PRIMARY_DIRECTIONS = ("LR", "TB")
+REVERSED_DIRECTIONS = {"RL": "LR", "BT": "TB"}
+LIBRARY_CACHE_METADATA = "library_cache.json"
+# Prefixes of entries being written and of replaced entries awaiting deletion
+CACHE_TEMP_PREFIX = ".tmp-"
+CACHE_STALE_PREFIX = ".stale-"
+DEFAULT_CACHE_BUDGET_GB = 20.0
+
+
+def library_cache_key(generation_params: Dict[str, Any]) -> str:
+    """Content hash identifying a library by the parameters that generated it.
+
+    Numbers are hashed as floats so 10 and 10.0 (as sent by different callers)
+    map to the same library, matching the equality used by _compare_parameters.
+
+    Args:
+        generation_params: {"monitor": {...}, "stimulus": {...}}
+
+    Returns:
+        16-character hex key
+    """
+    def canonical(value):
+        if isinstance(value, dict):
+            return {str(k): canonical(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [canonical(v) for v in value]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        return value
+
+    encoded = json.dumps(canonical(generation_params), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
 
 @dataclass
 class StimulusDisplayEvent:
@@ -57,7 +101,10 @@ class UnifiedStimulusController:
         stimulus_generator,
         param_manager,
         shared_memory,
-        ipc
+        ipc,
+        cache_dir: Optional[str] = None,
+        use_memmap_cache: bool = True,
+        cache_budget_bytes: Optional[int] = None
     ):
         """Initialize unified stimulus controller.
 
@@ -66,15 +113,30 @@ class UnifiedStimulusController:
             param_manager: ParameterManager instance
             shared_memory: SharedMemoryService for frame publishing
             ipc: MultiChannelIPC for event broadcasting
+            cache_dir: Directory for the memory-mapped library cache, one
+                subdirectory per parameter hash (defaults to data/stimulus_library/cache)
+            use_memmap_cache: If True, generated frames are written to and played
+                back from memory-mapped .npy files in cache_dir; if False they are
+                held in RAM only
+            cache_budget_bytes: Disk budget for cached libraries (None = read
+                system.stimulus_cache_budget_gb at eviction time)
         """
         self.stimulus_generator = stimulus_generator
         self.param_manager = param_manager
         self.shared_memory = shared_memory
         self.ipc = ipc
 
+        if cache_dir is None:
+            backend_root = Path(__file__).resolve().parents[2]
+            cache_dir = backend_root / "data" / "stimulus_library" / "cache"
+        self.cache_dir = Path(cache_dir)
+        self.use_memmap_cache = use_memmap_cache
+        self.cache_budget_bytes = cache_budget_bytes
+
         # Pre-generated frame library
-        # Structure: {direction: {"frames": [numpy.ndarray (grayscale uint8, H×W)], "angles": [float]}}
-        self._frame_library: Dict[str, Dict[str, List]] = {}
+        # Structure: {direction: {"frames": ndarray (n_frames, H, W) uint8, "angles": ndarray (n_frames,)}}
+        # RL/BT entries are reversed views of LR/TB (no copy)
+        self._frame_library: Dict[str, Dict[str, np.ndarray]] = {}
         self._library_lock = threading.RLock()
         self._generation_params: Optional[Dict[str, Any]] = None  # Parameters used for current library
 
@@ -97,6 +159,9 @@ class UnifiedStimulusController:
         # Subscribe to parameter changes for cache invalidation
         self.param_manager.subscribe("stimulus", self._handle_stimulus_params_changed)
         self.param_manager.subscribe("monitor", self._handle_monitor_params_changed)
+        # Registered after the invalidation handlers so it sees the cleared library
+        self.param_manager.subscribe("stimulus", self._restore_cached_library)
+        self.param_manager.subscribe("monitor", self._restore_cached_library)
 
         logger.info("UnifiedStimulusController initialized")
 
@@ -227,32 +292,25 @@ class UnifiedStimulusController:
         """Pre-generate all stimulus directions.
 
         Generates LR + TB as grayscale, derives RL and BT via reversal.
-        Stores frames as raw numpy arrays for maximum performance.
+        Stores each direction as one contiguous array (memory-mapped from the
+        library cache when use_memmap_cache is set). If the cache already holds
+        a library generated with the current parameters it is mapped instead.
 
         Returns:
             Dict with success status and generation statistics
         """
+        entry_dir = None
         try:
+            # Capture current parameters for invalidation checking
+            generation_params = self._current_generation_params()
+
+            cache_result = self.load_library_cache(generation_params)
+            if cache_result.get("success"):
+                return cache_result
+
             logger.info("Pre-generating stimulus library for all directions...")
             start_time = time.time()
 
-            # Capture current parameters for invalidation checking
-            monitor_params = self.param_manager.get_parameter_group("monitor")
-            stimulus_params = self.param_manager.get_parameter_group("stimulus")
-            generation_params = {
-                "monitor": {
-                    "monitor_width_px": monitor_params.get("monitor_width_px"),
-                    "monitor_height_px": monitor_params.get("monitor_height_px"),
-                    "monitor_fps": monitor_params.get("monitor_fps"),
-                    "monitor_width_cm": monitor_params.get("monitor_width_cm"),
-                    "monitor_height_cm": monitor_params.get("monitor_height_cm"),
-                    "monitor_distance_cm": monitor_params.get("monitor_distance_cm"),
-                    "monitor_lateral_angle_deg": monitor_params.get("monitor_lateral_angle_deg"),
-                    "monitor_tilt_angle_deg": monitor_params.get("monitor_tilt_angle_deg"),
-                },
-                "stimulus": dict(stimulus_params)
-            }
-
             # Statistics tracking
             stats = {
                 "total_frames": 0,
@@ -261,8 +319,12 @@ class UnifiedStimulusController:
             }
 
             with self._library_lock:
+                self._frame_library.clear()
+                self._generation_params = None
+                entry_dir = self._prepare_cache_entry(generation_params)
+
                 # Generate primary directions (LR, TB) as grayscale
-                for direction_index, direction in enumerate(["LR", "TB"]):
+                for direction_index, direction in enumerate(PRIMARY_DIRECTIONS):
                     logger.info(f"Generating {direction} direction...")
                     dir_start = time.time()
 
@@ -278,19 +340,24 @@ class UnifiedStimulusController:
                             "timestamp": time.time()
                         })
 
-                    # Generate grayscale frames
+                    # Generate grayscale frames straight into the library array
+                    # (memory-mapped cache file if enabled)
+                    frames = self._allocate_direction_frames(
+                        entry_dir,
+                        direction,
+                        self.stimulus_generator.get_sweep_shape(direction, "grayscale")
+                    )
                     frames, angles = self.stimulus_generator.generate_sweep(
                         direction=direction,
-                        output_format="grayscale"
+                        output_format="grayscale",
+                        out=frames
                     )
+                    frames = self._finalize_direction_frames(entry_dir, direction, frames)
+                    total_size = frames.nbytes
 
-                    # Calculate memory size from numpy arrays
-                    total_size = sum(frame.nbytes for frame in frames)
-
-                    # Store frames directly (no compression)
                     self._frame_library[direction] = {
-                        "frames": frames,  # List of numpy arrays
-                        "angles": angles
+                        "frames": frames,
+                        "angles": np.asarray(angles, dtype=np.float64)
                     }
 
                     dir_duration = time.time() - dir_start
@@ -326,15 +393,8 @@ class UnifiedStimulusController:
                         "duration_sec": dir_duration
                     }
 
-                # Derive reversed directions (RL from LR, BT from TB)
-                self._frame_library["RL"] = {
-                    "frames": list(reversed(self._frame_library["LR"]["frames"])),
-                    "angles": list(reversed(self._frame_library["LR"]["angles"]))
-                }
-                self._frame_library["BT"] = {
-                    "frames": list(reversed(self._frame_library["TB"]["frames"])),
-                    "angles": list(reversed(self._frame_library["TB"]["angles"]))
-                }
+                # Derive reversed directions (RL from LR, BT from TB) as zero-copy views
+                self._derive_reversed_directions()
 
                 logger.info(f"Derived RL from reversed LR ({len(self._frame_library['RL']['frames'])} frames)")
                 logger.info(f"Derived BT from reversed TB ({len(self._frame_library['BT']['frames'])} frames)")
@@ -356,6 +416,12 @@ class UnifiedStimulusController:
                 self._generation_params = generation_params
                 logger.debug(f"Captured generation parameters for invalidation checking")
 
+                if entry_dir is not None:
+                    frames = None  # Drop the last map into the temp entry before it moves
+                    entry_dir = self._commit_cache_entry(entry_dir, generation_params)
+                    self._evict_library_cache(keep=entry_dir)
+                    entry_dir = None
+
                 # Broadcast final completion
                 if self.ipc:
                     self.ipc.send_sync_message({
@@ -374,6 +440,11 @@ class UnifiedStimulusController:
         except Exception as e:
             logger.error(f"Pre-generation failed: {e}", exc_info=True)
 
+            # Never leave a partially written cache entry behind
+            if entry_dir is not None:
+                frames = None
+                self._discard_cache_entry(entry_dir)
+
             # Broadcast failure
             if self.ipc:
                 self.ipc.send_sync_message({
@@ -530,7 +601,7 @@ class UnifiedStimulusController:
                 metadata = {
                     "frame_index": frame_index,
                     "total_frames": total_frames,
-                    "angle_degrees": angles[frame_index],
+                    "angle_degrees": float(angles[frame_index]),
                     "direction": direction,
                     "timestamp_us": timestamp_us,
                     "channels": 1  # Tell frontend this is grayscale (1 channel)
@@ -553,7 +624,7 @@ class UnifiedStimulusController:
                     event = StimulusDisplayEvent(
                         timestamp_us=timestamp_us,
                         frame_index=frame_index,
-                        angle_degrees=angles[frame_index],
+                        angle_degrees=float(angles[frame_index]),
                         direction=direction
                     )
                     self._display_log[direction].append(event)
@@ -708,7 +779,7 @@ class UnifiedStimulusController:
                 logger.warning(f"Direction {direction} not in library")
                 return None
 
-            angles = self._frame_library[direction].get("angles", [])
+            angles = self._frame_library[direction]["angles"]
             if stimulus_frame_index < 0 or stimulus_frame_index >= len(angles):
                 logger.warning(
                     f"Stimulus frame index {stimulus_frame_index} out of range "
@@ -716,7 +787,7 @@ class UnifiedStimulusController:
                 )
                 return None
 
-            return angles[stimulus_frame_index]
+            return float(angles[stimulus_frame_index])
 
     def display_baseline(self) -> Dict[str, Any]:
         """Display background luminance screen (for baseline/between phases).
@@ -810,7 +881,9 @@ class UnifiedStimulusController:
             library_status = {
                 direction: {
                     "frames": len(data["frames"]),
-                    "memory_mb": sum(f.nbytes for f in data["frames"]) / 1024 / 1024
+                    "memory_mb": data["frames"].nbytes / 1024 / 1024,
+                    "memory_mapped": isinstance(data["frames"], np.memmap),
+                    "derived_from": REVERSED_DIRECTIONS.get(direction)
                 }
                 for direction, data in self._frame_library.items()
             }
@@ -823,13 +896,16 @@ class UnifiedStimulusController:
             "library_status": library_status
         }
 
-    def save_library_to_disk(self, save_path: Optional[str] = None) -> Dict[str, Any]:
+    def save_library_to_disk(
+        self, save_path: Optional[str] = None, codec: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Save pre-generated stimulus library to disk with generation parameters.
 
         Saves frames as HDF5 files with embedded parameters for validation on load.
 
         Args:
             save_path: Directory to save library (defaults to data/stimulus_library)
+            codec: HDF5 compression codec (defaults to system.hdf5_codec parameter)
 
         Returns:
             Dict with success status and file paths
@@ -857,12 +933,18 @@ class UnifiedStimulusController:
                     save_path = Path(save_path)
 
                 save_path.mkdir(parents=True, exist_ok=True)
-                logger.info(f"Saving stimulus library to {save_path}")
+
+                if codec is None:
+                    codec = self.param_manager.get_parameter_group("system").get(
+                        "hdf5_codec", DEFAULT_CODEC
+                    )
+                compression = compression_kwargs(codec)
+                logger.info(f"Saving stimulus library to {save_path} (codec={resolve_codec(codec)})")
 
                 saved_files = []
 
-                # Save each direction
-                for direction in ["LR", "TB", "RL", "BT"]:
+                # Save primary directions (RL/BT are derived by reversal on load)
+                for direction in PRIMARY_DIRECTIONS:
                     if direction not in self._frame_library:
                         continue
 
@@ -874,23 +956,30 @@ class UnifiedStimulusController:
                     h5_path = save_path / f"{direction}_frames.h5"
 
                     with h5py.File(h5_path, 'w') as f:
-                        # Store frames as grayscale uint8
-                        frames_array = np.array(frames, dtype=np.uint8)
+                        # Store frames as grayscale uint8 (already contiguous, no copy)
+                        frames_array = frames
+                        chunks = None
+                        if len(frames_array) > 0:
+                            chunks = time_series_chunks(
+                                frames_array.shape[1:],
+                                frames_array.dtype,
+                                n_frames=len(frames_array),
+                            )
                         f.create_dataset(
                             'frames',
                             data=frames_array,
-                            compression='gzip',
-                            compression_opts=4
+                            chunks=chunks,
+                            **compression
                         )
 
                         # Store angles
-                        f.create_dataset('angles', data=np.array(angles, dtype=np.float32))
+                        f.create_dataset('angles', data=np.asarray(angles, dtype=np.float32))
 
                         # Store generation parameters as attributes
                         f.attrs['generation_params'] = json.dumps(self._generation_params)
                         f.attrs['direction'] = direction
                         f.attrs['num_frames'] = len(frames)
-                        f.attrs['frame_shape'] = frames[0].shape if len(frames) > 0 else (0, 0)
+                        f.attrs['frame_shape'] = frames.shape[1:]
 
                     saved_files.append(str(h5_path))
                     logger.info(f"  Saved {direction}: {len(frames)} frames to {h5_path.name}")
@@ -899,9 +988,10 @@ class UnifiedStimulusController:
                 metadata_path = save_path / "library_metadata.json"
                 metadata = {
                     "generation_params": self._generation_params,
-                    "directions": list(self._frame_library.keys()),
+                    "directions": [d for d in PRIMARY_DIRECTIONS if d in self._frame_library],
                     "timestamp": time.time(),
-                    "total_frames": sum(len(self._frame_library[d]["frames"]) for d in self._frame_library),
+                    "codec": resolve_codec(codec),
+                    "total_frames": sum(len(self._frame_library[d]["frames"]) for d in PRIMARY_DIRECTIONS if d in self._frame_library),
                 }
 
                 with open(metadata_path, 'w') as f:
@@ -970,21 +1060,7 @@ class UnifiedStimulusController:
                 }
 
             # Get current parameters
-            current_monitor = self.param_manager.get_parameter_group("monitor")
-            current_stimulus = self.param_manager.get_parameter_group("stimulus")
-            current_params = {
-                "monitor": {
-                    "monitor_width_px": current_monitor.get("monitor_width_px"),
-                    "monitor_height_px": current_monitor.get("monitor_height_px"),
-                    "monitor_fps": current_monitor.get("monitor_fps"),
-                    "monitor_width_cm": current_monitor.get("monitor_width_cm"),
-                    "monitor_height_cm": current_monitor.get("monitor_height_cm"),
-                    "monitor_distance_cm": current_monitor.get("monitor_distance_cm"),
-                    "monitor_lateral_angle_deg": current_monitor.get("monitor_lateral_angle_deg"),
-                    "monitor_tilt_angle_deg": current_monitor.get("monitor_tilt_angle_deg"),
-                },
-                "stimulus": dict(current_stimulus)
-            }
+            current_params = self._current_generation_params()
 
             # Validate parameters match (unless force=True)
             if not force:
@@ -1003,14 +1079,17 @@ class UnifiedStimulusController:
             # Parameters match (or force=True), proceed with loading
             logger.info(f"Loading stimulus library from {load_path}")
 
+            entry_dir = None
             with self._library_lock:
                 # Clear existing library
                 self._frame_library.clear()
 
                 loaded_stats = {}
 
-                # Load each direction
-                for direction in ["LR", "TB", "RL", "BT"]:
+                entry_dir = self._prepare_cache_entry(saved_params)
+
+                # Load primary directions (older libraries also stored RL/BT; those are re-derived)
+                for direction in PRIMARY_DIRECTIONS:
                     h5_path = load_path / f"{direction}_frames.h5"
 
                     if not h5_path.exists():
@@ -1018,13 +1097,9 @@ class UnifiedStimulusController:
                         continue
 
                     with h5py.File(h5_path, 'r') as f:
-                        # Load frames
-                        frames_array = f['frames'][:]
-                        angles_array = f['angles'][:]
-
-                        # Convert to list of numpy arrays (matching in-memory format)
-                        frames = [frames_array[i] for i in range(len(frames_array))]
-                        angles = angles_array.tolist()
+                        # Decompress straight into the contiguous library array
+                        frames = self._store_direction_frames(entry_dir, direction, f['frames'])
+                        angles = f['angles'][:].astype(np.float64)
 
                         self._frame_library[direction] = {
                             "frames": frames,
@@ -1033,13 +1108,26 @@ class UnifiedStimulusController:
 
                         loaded_stats[direction] = {
                             "frames": len(frames),
-                            "memory_mb": sum(f.nbytes for f in frames) / 1024 / 1024
+                            "memory_mb": frames.nbytes / 1024 / 1024
                         }
 
                         logger.info(f"  Loaded {direction}: {len(frames)} frames")
 
+                self._derive_reversed_directions()
+                for derived in REVERSED_DIRECTIONS:
+                    if derived in self._frame_library:
+                        loaded_stats[derived] = {
+                            "frames": len(self._frame_library[derived]["frames"]),
+                            "memory_mb": 0.0
+                        }
+
                 # Store generation parameters
                 self._generation_params = saved_params
+                if entry_dir is not None:
+                    frames = None  # Drop the last map into the temp entry before it moves
+                    entry_dir = self._commit_cache_entry(entry_dir, saved_params)
+                    self._evict_library_cache(keep=entry_dir)
+                    entry_dir = None
 
                 logger.info(f"Stimulus library loaded successfully: {len(self._frame_library)} directions")
 
@@ -1054,11 +1142,400 @@ class UnifiedStimulusController:
 
         except Exception as e:
             logger.error(f"Failed to load stimulus library: {e}", exc_info=True)
+
+            # Never leave a partially written cache entry behind
+            if entry_dir is not None:
+                frames = None
+                self._discard_cache_entry(entry_dir)
+
             return {
                 "success": False,
                 "error": str(e)
             }
 
+    def load_library_cache(self, generation_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Map the cached library for a parameter set, if one exists.
+
+        Mapping is near-instant regardless of library size; frame pages are read
+        from disk (or the OS page cache) on first access.
+
+        Args:
+            generation_params: Parameters to look up (defaults to current parameters)
+
+        Returns:
+            Dict with success status (success=False if no valid cache entry exists)
+        """
+        if not self.use_memmap_cache:
+            return {"success": False, "error": "Memory-mapped library cache disabled"}
+
+        if generation_params is None:
+            generation_params = self._current_generation_params()
+        key = library_cache_key(generation_params)
+        entry_dir = self.cache_dir / key
+        metadata_path = entry_dir / LIBRARY_CACHE_METADATA
+        if not metadata_path.exists():
+            return {"success": False, "error": f"No cached library for current parameters ({key})"}
+
+        try:
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+
+            cached_params = metadata.get("generation_params")
+            if not cached_params:
+                return {"success": False, "error": "Library cache has no generation parameters"}
+
+            # Guard against hash collisions and hand-edited entries
+            mismatches = self._compare_parameters(cached_params, generation_params)
+            if mismatches:
+                logger.warning(f"Library cache entry {key} does not match its parameters: {list(mismatches.keys())}")
+                return {"success": False, "error": "Library cache parameter mismatch", "mismatches": mismatches}
+
+            library = {}
+            for direction in metadata.get("directions", PRIMARY_DIRECTIONS):
+                library[direction] = {
+                    "frames": np.load(entry_dir / f"{direction}_frames.npy", mmap_mode='r'),
+                    "angles": np.load(entry_dir / f"{direction}_angles.npy"),
+                }
+
+            with self._library_lock:
+                self._frame_library.clear()
+                self._frame_library.update(library)
+                self._derive_reversed_directions()
+                self._generation_params = cached_params
+
+            # Record use for LRU eviction
+            os.utime(metadata_path)
+
+            total_frames = sum(len(data["frames"]) for data in self._frame_library.values())
+            logger.info(f"Mapped cached stimulus library {key} ({total_frames} frames)")
+
+            if self.ipc:
+                self.ipc.send_sync_message({
+                    "type": "unified_stimulus_pregeneration_complete",
+                    "statistics": {"total_frames": total_frames, "from_cache": True},
+                    "total_duration_sec": 0.0,
+                    "timestamp": time.time()
+                })
+
+            return {
+                "success": True,
+                "from_cache": True,
+                "cache_key": key,
+                "cache_dir": str(entry_dir),
+                "statistics": {
+                    "total_frames": total_frames,
+                    "directions": {
+                        direction: {"frames": len(data["frames"])}
+                        for direction, data in self._frame_library.items()
+                    }
+                },
+                "total_duration_sec": 0.0
+            }
+
+        except Exception as e:
+            logger.warning(f"Failed to map cached stimulus library {key}: {e}")
+            return {"success": False, "error": str(e)}
+
+    def get_library_cache_status(self) -> Dict[str, Any]:
+        """List cached libraries with their size and last use.
+
+        Returns:
+            Dict with cache entries (most recently used first), total size and budget
+        """
+        entries = self._list_cache_entries()
+        current_key = (
+            library_cache_key(self._generation_params) if self._generation_params else None
+        )
+        return {
+            "success": True,
+            "enabled": self.use_memmap_cache,
+            "cache_dir": str(self.cache_dir),
+            "budget_bytes": self._cache_budget_bytes(),
+            "total_bytes": sum(entry["size_bytes"] for entry in entries),
+            "entries": [
+                {
+                    "key": entry["key"],
+                    "size_bytes": entry["size_bytes"],
+                    "last_used": entry["last_used"],
+                    "loaded": entry["key"] == current_key,
+                    "generation_params": entry["generation_params"],
+                }
+                for entry in sorted(entries, key=lambda e: e["last_used"], reverse=True)
+            ],
+        }
+
+    def _restore_cached_library(self, group_name: str, updates: Dict[str, Any]):
+        """Map a cached library after a parameter change left the library empty.
+
+        Makes switching back to a previously used monitor geometry or stimulus
+        configuration instant instead of requiring pre-generation.
+
+        Args:
+            group_name: Parameter group that changed
+            updates: Dict of changed parameters
+        """
+        with self._library_lock:
+            if self._frame_library or not self.use_memmap_cache or self._is_playing:
+                return
+
+        result = self.load_library_cache()
+        if result.get("success"):
+            logger.info(f"Restored cached stimulus library after {group_name} change")
+
+    def _current_generation_params(self) -> Dict[str, Any]:
+        """Collect the monitor and stimulus parameters that determine frame content."""
+        monitor_params = self.param_manager.get_parameter_group("monitor")
+        stimulus_params = self.param_manager.get_parameter_group("stimulus")
+        return {
+            "monitor": {
+                "monitor_width_px": monitor_params.get("monitor_width_px"),
+                "monitor_height_px": monitor_params.get("monitor_height_px"),
+                "monitor_fps": monitor_params.get("monitor_fps"),
+                "monitor_width_cm": monitor_params.get("monitor_width_cm"),
+                "monitor_height_cm": monitor_params.get("monitor_height_cm"),
+                "monitor_distance_cm": monitor_params.get("monitor_distance_cm"),
+                "monitor_lateral_angle_deg": monitor_params.get("monitor_lateral_angle_deg"),
+                "monitor_tilt_angle_deg": monitor_params.get("monitor_tilt_angle_deg"),
+            },
+            "stimulus": dict(stimulus_params)
+        }
+
+    def _prepare_cache_entry(self, generation_params: Dict[str, Any]) -> Optional[Path]:
+        """Create a fresh temporary directory to write a cache entry into.
+
+        The existing entry with the same key (possibly memory-mapped by the
+        current library) is left untouched until _commit_cache_entry swaps
+        the finished entry in.
+
+        Args:
+            generation_params: Parameters the library is generated with
+
+        Returns:
+            Temporary entry directory, or None when the memmap cache is disabled
+        """
+        if not self.use_memmap_cache:
+            return None
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_cache_dirs()
+        return Path(tempfile.mkdtemp(
+            prefix=f"{CACHE_TEMP_PREFIX}{library_cache_key(generation_params)}-",
+            dir=self.cache_dir,
+        ))
+
+    def _commit_cache_entry(self, temp_dir: Path, generation_params: Dict[str, Any]) -> Path:
+        """Swap a fully written entry into place and re-map the library from it.
+
+        The library's maps into temp_dir are dropped before the rename (Windows
+        cannot move a directory holding mapped files) and re-created from the
+        final location. The replaced entry is renamed aside and deleted once
+        nothing maps it; if deletion fails it is retried on the next prepare.
+        Caller holds _library_lock and must not keep its own frame references.
+
+        Args:
+            temp_dir: Directory returned by _prepare_cache_entry, fully written
+            generation_params: Parameters the library was generated with
+
+        Returns:
+            Final entry directory
+        """
+        self._write_library_cache_metadata(temp_dir, generation_params)
+
+        angles = {
+            direction: self._frame_library[direction]["angles"]
+            for direction in PRIMARY_DIRECTIONS
+            if direction in self._frame_library
+        }
+        self._frame_library.clear()
+
+        entry_dir = self.cache_dir / library_cache_key(generation_params)
+        stale_dir = None
+        if entry_dir.exists():
+            stale_dir = Path(tempfile.mkdtemp(
+                prefix=f"{CACHE_STALE_PREFIX}{entry_dir.name}-", dir=self.cache_dir
+            ))
+            os.replace(entry_dir, stale_dir)
+        os.replace(temp_dir, entry_dir)
+        if stale_dir is not None:
+            shutil.rmtree(stale_dir, ignore_errors=True)
+
+        for direction, direction_angles in angles.items():
+            self._frame_library[direction] = {
+                "frames": np.load(entry_dir / f"{direction}_frames.npy", mmap_mode='r'),
+                "angles": direction_angles,
+            }
+        self._derive_reversed_directions()
+        return entry_dir
+
+    def _discard_cache_entry(self, temp_dir: Path) -> None:
+        """Drop a partially written entry and the library arrays mapped from it."""
+        with self._library_lock:
+            self._frame_library.clear()
+            self._generation_params = None
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _remove_stale_cache_dirs(self) -> None:
+        """Delete temp and replaced entries left behind by interrupted writes or open maps."""
+        for path in self.cache_dir.iterdir():
+            if path.is_dir() and path.name.startswith((CACHE_TEMP_PREFIX, CACHE_STALE_PREFIX)):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _allocate_direction_frames(
+        self, entry_dir: Optional[Path], direction: str, shape: Tuple[int, ...]
+    ) -> np.ndarray:
+        """Allocate the contiguous (n_frames, H, W) uint8 array for a primary direction.
+
+        With a cache entry the array is an uncompressed .npy file in entry_dir,
+        written as .tmp until _finalize_direction_frames.
+
+        Args:
+            entry_dir: Cache entry directory (None = RAM only)
+            direction: Primary direction ("LR" or "TB")
+            shape: (n_frames, H, W)
+
+        Returns:
+            Writable frame array (np.memmap when cached)
+        """
+        shape = tuple(int(n) for n in shape)
+        if shape[0] == 0:
+            raise ValueError(f"No frames to store for {direction}")
+        if entry_dir is None:
+            return np.empty(shape, dtype=np.uint8)
+
+        return np.lib.format.open_memmap(
+            entry_dir / f"{direction}_frames.npy.tmp", mode='w+', dtype=np.uint8, shape=shape
+        )
+
+    def _finalize_direction_frames(
+        self, entry_dir: Optional[Path], direction: str, frames: np.ndarray
+    ) -> np.ndarray:
+        """Flush, rename and re-map a cached direction read-only (no-op without cache).
+
+        Args:
+            entry_dir: Cache entry directory (None = RAM only)
+            direction: Primary direction ("LR" or "TB")
+            frames: Array returned by _allocate_direction_frames, now filled
+
+        Returns:
+            Library frame array
+        """
+        if entry_dir is None:
+            return frames
+
+        final_path = entry_dir / f"{direction}_frames.npy"
+        frames.flush()
+        del frames
+        os.replace(entry_dir / f"{direction}_frames.npy.tmp", final_path)
+        return np.load(final_path, mmap_mode='r')
+
+    def _store_direction_frames(self, entry_dir: Optional[Path], direction: str, source) -> np.ndarray:
+        """Copy frames from an array or HDF5 dataset into the library array.
+
+        Args:
+            entry_dir: Cache entry directory (None = RAM only)
+            direction: Primary direction ("LR" or "TB")
+            source: (n, H, W) uint8 array or HDF5 dataset
+
+        Returns:
+            Library frame array
+        """
+        frames = self._allocate_direction_frames(entry_dir, direction, tuple(source.shape))
+        if hasattr(source, "read_direct"):
+            # HDF5 dataset: decompress directly into the destination buffer
+            source.read_direct(frames)
+        else:
+            frames[:] = source
+        return self._finalize_direction_frames(entry_dir, direction, frames)
+
+    def _derive_reversed_directions(self) -> None:
+        """Add RL/BT entries as reversed views of LR/TB (no frame copies)."""
+        for derived, source in REVERSED_DIRECTIONS.items():
+            if source in self._frame_library:
+                self._frame_library[derived] = {
+                    "frames": self._frame_library[source]["frames"][::-1],
+                    "angles": self._frame_library[source]["angles"][::-1],
+                }
+
+    def _write_library_cache_metadata(self, entry_dir: Path, generation_params: Dict[str, Any]) -> None:
+        """Save angles and parameters that make a cache entry valid (written last, atomically)."""
+        try:
+            directions = [d for d in PRIMARY_DIRECTIONS if d in self._frame_library]
+            for direction in directions:
+                np.save(entry_dir / f"{direction}_angles.npy", self._frame_library[direction]["angles"])
+
+            metadata_path = entry_dir / LIBRARY_CACHE_METADATA
+            temp_path = entry_dir / f"{LIBRARY_CACHE_METADATA}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({
+                    "generation_params": generation_params,
+                    "directions": directions,
+                    "timestamp": time.time(),
+                }, f, indent=2)
+            os.replace(temp_path, metadata_path)
+        except Exception as e:
+            logger.warning(f"Failed to write stimulus library cache metadata: {e}")
+
+    def _cache_budget_bytes(self) -> int:
+        """Disk budget for cached libraries (constructor override or system parameter)."""
+        if self.cache_budget_bytes is not None:
+            return int(self.cache_budget_bytes)
+        system_params = self.param_manager.get_parameter_group("system")
+        budget_gb = system_params.get("stimulus_cache_budget_gb", DEFAULT_CACHE_BUDGET_GB)
+        return int(float(budget_gb) * 1024 ** 3)
+
+    def _list_cache_entries(self) -> List[Dict[str, Any]]:
+        """Scan cache_dir for entries (size, last use, parameters); incomplete entries included."""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+
+        for entry_dir in self.cache_dir.iterdir():
+            if not entry_dir.is_dir() or entry_dir.name.startswith((CACHE_TEMP_PREFIX, CACHE_STALE_PREFIX)):
+                continue
+            metadata_path = entry_dir / LIBRARY_CACHE_METADATA
+            generation_params = None
+            last_used = 0.0
+            if metadata_path.exists():
+                last_used = metadata_path.stat().st_mtime
+                try:
+                    with open(metadata_path, 'r') as f:
+                        generation_params = json.load(f).get("generation_params")
+                except (OSError, ValueError):
+                    pass
+            entries.append({
+                "key": entry_dir.name,
+                "path": entry_dir,
+                "size_bytes": sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file()),
+                "last_used": last_used,
+                "generation_params": generation_params,
+            })
+        return entries
+
+    def _evict_library_cache(self, keep: Path) -> None:
+        """Delete least recently used cache entries until the cache fits its budget.
+
+        Args:
+            keep: Entry that must not be evicted (the one just written)
+        """
+        try:
+            budget = self._cache_budget_bytes()
+            entries = self._list_cache_entries()
+            total = sum(entry["size_bytes"] for entry in entries)
+
+            for entry in sorted(entries, key=lambda e: e["last_used"]):
+                if total <= budget:
+                    break
+                if entry["path"] == keep:
+                    continue
+                shutil.rmtree(entry["path"], ignore_errors=True)
+                total -= entry["size_bytes"]
+                logger.info(
+                    f"Evicted cached stimulus library {entry['key']} "
+                    f"({entry['size_bytes'] / 1024 ** 2:.0f} MB, budget {budget / 1024 ** 3:.1f} GB)"
+                )
+        except Exception as e:
+            logger.warning(f"Stimulus library cache eviction failed: {e}")
+
     def _compare_parameters(self, saved_params: Dict, current_params: Dict) -> Dict[str, Any]:
         """Compare saved and current parameters to detect mismatches.
 
@@ -1104,6 +1581,8 @@ class UnifiedStimulusController:
         try:
             self.param_manager.unsubscribe("stimulus", self._handle_stimulus_params_changed)
             self.param_manager.unsubscribe("monitor", self._handle_monitor_params_changed)
+            self.param_manager.unsubscribe("stimulus", self._restore_cached_library)
+            self.param_manager.unsubscribe("monitor", self._restore_cached_library)
         except Exception as e:
             logger.warning(f"Error unsubscribing from parameters: {e}")
 
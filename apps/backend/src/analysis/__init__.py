@@ -6,14 +6,20 @@ dependencies passed explicitly.
 """
 
 from .pipeline import AnalysisPipeline
+from .fourier import StimulusFrequencyAccumulator
 from .manager import AnalysisManager, AnalysisResults, SessionData, DirectionData
 from .renderer import AnalysisRenderer
+from .online import OnlineAnalysisEngine
+from .stage_cache import StageCache
 
 __all__ = [
     "AnalysisPipeline",
+    "StimulusFrequencyAccumulator",
     "AnalysisManager",
     "AnalysisResults",
     "SessionData",
     "DirectionData",
     "AnalysisRenderer",
+    "OnlineAnalysisEngine",
+    "StageCache",
 ]
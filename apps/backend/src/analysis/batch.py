@@ -0,0 +1,547 @@
+"""Batch analysis of many recorded sessions.
+
+Sessions are discovered under a sessions directory (the same layout playback
+lists: one directory per session with a metadata.json) and analyzed in worker
+processes, one fresh process per session so each session's peak memory can be
+measured. Sessions are admitted while the sum of their estimated working
+memory stays within a global budget (one session always runs).
+
+A session is up to date when analysis_results/batch_manifest.json records the
+same results key: the identity of its recorded files, the analysis and
+acquisition parameters, the FFT mode and the stage cache version. Manifests
+are written only after a session completes, so rerunning an interrupted batch
+resumes with the sessions that did not finish - and within a session the stage
+cache keeps the directions already reduced. BatchAnalysisController runs
+batches in the background for the backend's batch commands.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import h5py
+import psutil
+
+from .stage_cache import file_signature, stage_key
+from .worker import StaticParameters, config_from_groups
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_BATCH_MEMORY_BUDGET_BYTES = 8 * 1024 ** 3  # 8 GiB across concurrent sessions
+
+# How often a worker samples its resident memory for the peak
+_RSS_SAMPLE_INTERVAL_S = 0.1
+
+# Resident memory of a worker before it loads any session data (NumPy/SciPy/h5py)
+WORKER_BASE_MEMORY_BYTES = 300 * 1024 ** 2
+
+BATCH_MANIFEST_NAME = "batch_manifest.json"
+
+# Same default location playback lists sessions from
+DEFAULT_SESSIONS_DIR = Path(__file__).resolve().parents[2] / "data" / "sessions"
+
+# Recorded files whose identity defines a session's analysis input
+_SOURCE_PATTERNS = (
+    "metadata.json",
+    "anatomical.npy",
+    "*_camera.h5",
+    "*_stimulus.h5",
+    "phase_*.npy",
+    "magnitude_*.npy",
+)
+
+
+def discover_sessions(base_dir: Optional[Path] = None) -> List[Path]:
+    """Session directories (containing metadata.json) under base_dir, sorted by name."""
+    base_dir = Path(base_dir) if base_dir else DEFAULT_SESSIONS_DIR
+    if not base_dir.exists():
+        return []
+    return sorted(p for p in base_dir.iterdir() if p.is_dir() and (p / "metadata.json").exists())
+
+
+def results_key(session_path: Path, parameter_groups: Dict[str, Dict[str, Any]], fft_mode: str) -> str:
+    """Key identifying the analysis results a session would get now.
+
+    Args:
+        session_path: Session directory
+        parameter_groups: Parameter groups ("analysis", "acquisition")
+        fft_mode: AnalysisPipeline FFT mode
+
+    Returns:
+        Hex key (changes with the recorded files, parameters or pipeline version)
+    """
+    session_path = Path(session_path)
+    sources = sorted(
+        (path.name, file_signature(path))
+        for pattern in _SOURCE_PATTERNS
+        for path in session_path.glob(pattern)
+        if not path.name.endswith(".legacy.h5")
+    )
+    acquisition = parameter_groups.get("acquisition", {})
+    return stage_key(
+        "session",
+        {
+            "sources": sources,
+            "analysis": parameter_groups.get("analysis", {}),
+            "directions": acquisition.get("directions", ["LR", "RL", "TB", "BT"]),
+            "cycles": acquisition.get("cycles", 10),
+            "fft_mode": fft_mode,
+        },
+        [],
+    )
+
+
+def is_up_to_date(session_path: Path, key: str) -> bool:
+    """True if the session's saved results were produced with key."""
+    results_dir = Path(session_path) / "analysis_results"
+    try:
+        with open(results_dir / BATCH_MANIFEST_NAME) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return manifest.get("results_key") == key and (results_dir / "analysis_results.h5").exists()
+
+
+def estimate_session_memory(session_path: Path, pipeline) -> int:
+    """Approximate peak working memory of analyzing one session.
+
+    A batch worker reduces directions one at a time, so the peak is the
+    largest direction's phase-map computation plus the result maps and the
+    worker interpreter.
+
+    Args:
+        session_path: Session directory
+        pipeline: AnalysisPipeline configured like the workers' (FFT mode, chunking)
+
+    Returns:
+        Approximate peak bytes
+    """
+    largest = 0
+    n_pixels = 0
+    for camera_path in Path(session_path).glob("*_camera.h5"):
+        try:
+            with h5py.File(camera_path, "r") as f:
+                shape = f["frames"].shape
+        except (OSError, KeyError):
+            continue
+        if len(shape) == 4:
+            # Legacy color recordings are cropped to a square grayscale frame
+            frame_shape = (min(shape[1], shape[2]),) * 2
+            legacy_block = min(pipeline.chunk_frames, shape[0]) * shape[1] * shape[2] * shape[3]
+        else:
+            frame_shape = (shape[1], shape[2])
+            legacy_block = 0
+        n_pixels = max(n_pixels, frame_shape[0] * frame_shape[1])
+        largest = max(largest, pipeline.estimate_phase_map_memory(shape[0], frame_shape) + legacy_block)
+
+    # Per-direction and derived float maps held until results are saved
+    return largest + n_pixels * 8 * 40 + WORKER_BASE_MEMORY_BYTES
+
+
+class _NoIPC:
+    """Drops analysis progress messages (batch workers report to the parent)."""
+
+    def send_sync_message(self, message: Dict[str, Any]) -> None:
+        pass
+
+
+class _PeakRSSSampler:
+    """Tracks this process's peak resident memory while it runs.
+
+    psutil reports the peak itself only on Windows (peak_wset); elsewhere the
+    resident size is sampled from a background thread.
+    """
+
+    def __init__(self, interval_s: float = _RSS_SAMPLE_INTERVAL_S):
+        self._process = psutil.Process()
+        self._interval_s = interval_s
+        self._peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True, name="PeakRSSSampler")
+
+    def __enter__(self) -> "_PeakRSSSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._read()
+
+    @property
+    def peak_bytes(self) -> int:
+        return self._peak
+
+    def _read(self) -> None:
+        memory = self._process.memory_info()
+        self._peak = max(self._peak, memory.rss, getattr(memory, "peak_wset", 0))
+
+    def _sample(self) -> None:
+        while True:
+            self._read()
+            if self._stop.wait(self._interval_s):
+                return
+
+
+def _analyze_in_worker(
+    session_path: str,
+    parameter_groups: Dict[str, Dict[str, Any]],
+    fft_mode: str,
+    chunk_frames: int,
+) -> Dict[str, Any]:
+    """Worker process entry point: analyze one session headlessly."""
+    from .manager import AnalysisManager
+    from .pipeline import AnalysisPipeline
+
+    logging.getLogger("analysis").setLevel(logging.WARNING)
+    start = time.perf_counter()
+
+    with _PeakRSSSampler() as memory:
+        params = StaticParameters(parameter_groups)
+        manager = AnalysisManager(
+            params,
+            _NoIPC(),
+            None,
+            AnalysisPipeline(config_from_groups(parameter_groups), fft_mode=fft_mode, chunk_frames=chunk_frames),
+            max_direction_workers=1,
+        )
+        response = manager.analyze_session(session_path)
+
+    return {
+        "success": response["success"],
+        "error": response.get("error"),
+        "num_areas": response.get("num_areas", 0),
+        "elapsed_s": time.perf_counter() - start,
+        "peak_rss_bytes": memory.peak_bytes,
+    }
+
+
+def run_batch_analysis(
+    sessions: List[Path],
+    parameter_groups: Dict[str, Dict[str, Any]],
+    max_workers: int = DEFAULT_BATCH_WORKERS,
+    memory_budget_bytes: int = DEFAULT_BATCH_MEMORY_BUDGET_BYTES,
+    fft_mode: str = "streaming",
+    chunk_frames: Optional[int] = None,
+    force: bool = False,
+    progress_callback: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Dict[str, Any]:
+    """Analyze sessions across worker processes within a memory budget.
+
+    Args:
+        sessions: Session directories
+        parameter_groups: "analysis" and "acquisition" parameter groups
+        max_workers: Maximum sessions analyzed concurrently
+        memory_budget_bytes: Budget for the summed estimates of running sessions
+        fft_mode: AnalysisPipeline FFT mode
+        chunk_frames: Frames per streaming chunk (default: pipeline default)
+        force: Re-analyze sessions whose results are up to date
+        progress_callback: Called as (finished, total, session summary) per session
+        should_stop: Polled between sessions; True stops admitting new sessions
+
+    Returns:
+        Dict with "sessions" (per-session status, elapsed_s, peak_rss_mb,
+        num_areas, error), counts and total_elapsed_s
+    """
+    from .fourier import DEFAULT_CHUNK_FRAMES
+    from .pipeline import AnalysisPipeline
+
+    chunk_frames = chunk_frames or DEFAULT_CHUNK_FRAMES
+    estimator = AnalysisPipeline(config_from_groups(parameter_groups), fft_mode=fft_mode, chunk_frames=chunk_frames)
+    batch_start = time.perf_counter()
+    summaries: List[Dict[str, Any]] = []
+    total = len(sessions)
+
+    def finish(summary: Dict[str, Any]) -> None:
+        summaries.append(summary)
+        if progress_callback is not None:
+            progress_callback(len(summaries), total, summary)
+
+    # Skip up-to-date sessions, estimate the rest
+    pending = []
+    for session in sessions:
+        key = results_key(session, parameter_groups, fft_mode)
+        if not force and is_up_to_date(session, key):
+            finish({"session_path": str(session), "status": "up_to_date"})
+            continue
+        pending.append((session, key, estimate_session_memory(session, estimator)))
+
+    logger.info(
+        f"Batch analysis: {len(pending)} of {total} sessions to analyze "
+        f"({max_workers} workers, budget {memory_budget_bytes / 1024 ** 3:.1f} GiB)"
+    )
+
+    running: Dict[Future, tuple] = {}
+    reserved = 0
+    stopped = False
+
+    # One fresh process per session (a single-worker pool each): isolates
+    # failures and gives per-session peak memory. spawn, not fork, so workers
+    # get no copies of the backend's threads and sockets (entry points need a
+    # __main__ guard).
+    context = multiprocessing.get_context("spawn")
+    try:
+        while pending or running:
+            if should_stop is not None and should_stop() and not stopped:
+                stopped = True
+                for session, _, _ in pending:
+                    finish({"session_path": str(session), "status": "cancelled"})
+                pending = []
+
+            # Admit sessions in order while they fit (always at least one)
+            while pending and len(running) < max_workers:
+                session, key, estimate = pending[0]
+                if running and reserved + estimate > memory_budget_bytes:
+                    break
+                pending.pop(0)
+                executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+                future = executor.submit(
+                    _analyze_in_worker, str(session), parameter_groups, fft_mode, chunk_frames
+                )
+                running[future] = (session, key, estimate, executor)
+                reserved += estimate
+
+            if not running:
+                continue
+
+            done, _ = wait(running, timeout=1.0, return_when=FIRST_COMPLETED)
+            for future in done:
+                session, key, estimate, executor = running.pop(future)
+                executor.shutdown()
+                reserved -= estimate
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"success": False, "error": f"Worker failed: {e}"}
+
+                summary = {
+                    "session_path": str(session),
+                    "status": "analyzed" if result["success"] else "failed",
+                    "elapsed_s": result.get("elapsed_s"),
+                    "peak_rss_mb": (
+                        result["peak_rss_bytes"] / 1024 ** 2 if result.get("peak_rss_bytes") else None
+                    ),
+                    "estimated_mb": estimate / 1024 ** 2,
+                    "num_areas": result.get("num_areas"),
+                    "error": result.get("error"),
+                }
+                if result["success"]:
+                    _write_manifest(session, key, summary)
+                finish(summary)
+    finally:
+        for _, _, _, executor in running.values():
+            executor.shutdown()
+
+    counts: Dict[str, int] = {}
+    for summary in summaries:
+        counts[summary["status"]] = counts.get(summary["status"], 0) + 1
+
+    return {
+        "sessions": summaries,
+        "counts": counts,
+        "total_elapsed_s": time.perf_counter() - batch_start,
+    }
+
+
+def _write_manifest(session_path: Path, key: str, summary: Dict[str, Any]) -> None:
+    """Record that a session's results are up to date for key."""
+    manifest_path = Path(session_path) / "analysis_results" / BATCH_MANIFEST_NAME
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "results_key": key,
+                "completed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "elapsed_s": summary["elapsed_s"],
+                "peak_rss_mb": summary["peak_rss_mb"],
+                "num_areas": summary["num_areas"],
+            }, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+    except OSError as e:
+        logger.warning(f"Failed to write batch manifest for {session_path}: {e}")
+
+
+class BatchAnalysisController:
+    """Runs batch analyses for the backend's batch analysis commands.
+
+    One batch runs at a time in a background thread. Progress is reported
+    with analysis_batch_progress messages (one per finished session) and the
+    per-session summary with analysis_batch_complete (or analysis_batch_error).
+    """
+
+    def __init__(self, param_manager, ipc, pipeline, config_provider: Callable[[], Any]):
+        """Create the controller.
+
+        Args:
+            param_manager: ParameterManager (analysis/acquisition groups snapshotted per batch)
+            ipc: IPC channels (send_sync_message)
+            pipeline: The backend's AnalysisPipeline (FFT mode and chunking for workers)
+            config_provider: Returns the current AnalysisConfig; raises if the
+                analysis parameters are invalid
+        """
+        self.param_manager = param_manager
+        self.ipc = ipc
+        self.pipeline = pipeline
+        self.config_provider = config_provider
+
+        self.thread: Optional[threading.Thread] = None
+        self.is_running = False
+        self.progress: Tuple[int, int] = (0, 0)
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+
+    def start(
+        self,
+        base_dir: Optional[str] = None,
+        session_paths: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        memory_budget_mb: Optional[float] = None,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """Start analyzing many sessions in worker processes.
+
+        Sessions with up-to-date results are skipped unless force is set.
+
+        Args:
+            base_dir: Directory to discover sessions in (default: data/sessions)
+            session_paths: Explicit session directories (instead of discovery)
+            workers: Maximum concurrent sessions (default: DEFAULT_BATCH_WORKERS)
+            memory_budget_mb: Memory budget across concurrent sessions
+            force: Re-analyze sessions whose results are up to date
+
+        Returns:
+            Success response with session count, or error response
+        """
+        if self.is_running:
+            return {"success": False, "error": "Batch analysis already running"}
+
+        if session_paths:
+            sessions = [Path(p) for p in session_paths]
+            missing = [str(p) for p in sessions if not (p / "metadata.json").exists()]
+            if missing:
+                return {"success": False, "error": f"Not session directories: {', '.join(missing)}"}
+        else:
+            sessions = discover_sessions(base_dir)
+            if not sessions:
+                return {"success": False, "error": f"No sessions found in {base_dir or 'data/sessions'}"}
+
+        try:
+            self.config_provider()  # Validate before starting
+        except (RuntimeError, TypeError) as e:
+            return {"success": False, "error": str(e)}
+        parameter_groups = {
+            "analysis": self.param_manager.get_parameter_group("analysis"),
+            "acquisition": self.param_manager.get_parameter_group("acquisition"),
+        }
+
+        workers = int(workers) if workers else DEFAULT_BATCH_WORKERS
+        memory_budget = (
+            int(memory_budget_mb * 1024 ** 2) if memory_budget_mb else DEFAULT_BATCH_MEMORY_BUDGET_BYTES
+        )
+
+        self.is_running = True
+        self.progress = (0, len(sessions))
+        self.summary = None
+        self.error = None
+        self._stop.clear()
+
+        self.thread = threading.Thread(
+            target=self._run,
+            args=(sessions, parameter_groups, workers, memory_budget, bool(force)),
+            daemon=True,
+            name="AnalysisBatchThread"
+        )
+        self.thread.start()
+
+        return {
+            "success": True,
+            "message": "Batch analysis started",
+            "sessions": [str(p) for p in sessions],
+            "total": len(sessions),
+            "workers": workers,
+        }
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop starting new sessions; sessions in progress finish."""
+        if not self.is_running:
+            return {"success": False, "error": "No batch analysis running"}
+        self._stop.set()
+        return {"success": True, "message": "Batch analysis will stop after current sessions"}
+
+    def get_status(self) -> Dict[str, Any]:
+        """Progress of the current or last batch analysis."""
+        completed, total = self.progress
+        return {
+            "success": True,
+            "is_running": self.is_running,
+            "completed": completed,
+            "total": total,
+            "error": self.error,
+            "summary": self.summary,
+        }
+
+    def _run(
+        self,
+        sessions: List[Path],
+        parameter_groups: Dict[str, Dict[str, Any]],
+        workers: int,
+        memory_budget: int,
+        force: bool
+    ) -> None:
+        """Background thread for a batch analysis."""
+        def report(completed: int, total: int, session_summary: Dict[str, Any]):
+            self.progress = (completed, total)
+            self._send_sync_message({
+                "type": "analysis_batch_progress",
+                "completed": completed,
+                "total": total,
+                "session": session_summary,
+                "timestamp": time.time(),
+            })
+
+        try:
+            summary = run_batch_analysis(
+                sessions,
+                parameter_groups,
+                max_workers=workers,
+                memory_budget_bytes=memory_budget,
+                fft_mode=self.pipeline.fft_mode,
+                chunk_frames=self.pipeline.chunk_frames,
+                force=force,
+                progress_callback=report,
+                should_stop=self._stop.is_set,
+            )
+            self.summary = summary
+            self._send_sync_message({
+                "type": "analysis_batch_complete",
+                "success": True,
+                "timestamp": time.time(),
+                **summary,
+            })
+        except Exception as e:
+            logger.error(f"Batch analysis failed: {e}", exc_info=True)
+            self.error = str(e)
+            self._send_sync_message({
+                "type": "analysis_batch_error",
+                "error": str(e),
+                "timestamp": time.time(),
+            })
+        finally:
+            self.is_running = False
+
+    def _send_sync_message(self, message: Dict[str, Any]) -> None:
+        try:
+            self.ipc.send_sync_message(message)
+        except Exception as e:
+            logger.error(f"Failed to send IPC message: {e}")
@@ -0,0 +1,454 @@
+"""Analysis job queue service shared by several rigs.
+
+Rigs that write sessions to a shared disk can send their offline analyses to
+one service on the strongest machine instead of analyzing locally. The
+service keeps a priority queue of jobs and runs them on a pool of analysis
+worker processes (AnalysisWorkerProcess, one job each at a time). Each job's
+progress, layer and completion messages are streamed back to the backend that
+submitted it, which relays them to its frontend as if the analysis ran locally.
+
+Transport is ZeroMQ, like the backend's IPC channels: the service binds a
+ROUTER socket, each backend connects a DEALER. Messages are JSON objects:
+
+    backend -> service
+        {"type": "ping"}
+        {"type": "submit", "job_id", "session_path", "parameter_groups",
+         "pipeline_options", "priority"}        higher priority runs first
+        {"type": "cancel", "job_id"}
+    service -> backend
+        {"type": "pong", "queued", "running", "workers"}
+        {"type": "job_rejected", "job_id", "error"}
+        {"type": "job_status", "job_id", "state", "position"}  also a heartbeat
+        {"type": "job_event", "job_id", "event"}    worker message event
+        {"type": "job_done", "job_id", "done"}      worker done event
+
+Session paths are resolved on the service host, so the shared disk must be
+mounted at the same path on every rig. AnalysisJobClient is a drop-in for
+AnalysisWorkerProcess in AnalysisManager and analyzes locally (with its
+fallback worker) when the service is absent, stops answering or cannot see
+the session.
+
+Everything runs on one host too: start scripts/analysis_job_service.py and
+point backends (system.analysis_service_endpoint) at tcp://127.0.0.1:5570.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import zmq
+
+from .worker import AnalysisWorkerProcess
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ANALYSIS_SERVICE_ENDPOINT = "tcp://127.0.0.1:5570"
+DEFAULT_SERVICE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Service -> backend job_status interval while a job is queued or running
+HEARTBEAT_INTERVAL_S = 2.0
+# A backend gives up on the service after this long without a message for its job
+SERVICE_LOST_TIMEOUT_S = 5 * HEARTBEAT_INTERVAL_S
+# How long a backend waits for the service to answer a ping
+SERVICE_PING_TIMEOUT_S = 1.0
+
+_POLL_INTERVAL_MS = 100
+
+# ROUTER identity of the submitting backend + its job id
+JobKey = Tuple[bytes, str]
+
+
+@dataclass(order=True)
+class _QueuedJob:
+    """Queued job ordered by priority (highest first), then submission order."""
+
+    sort_key: Tuple[int, int]
+    identity: bytes = field(compare=False)
+    request: Dict[str, Any] = field(compare=False)
+
+    @property
+    def key(self) -> JobKey:
+        return self.identity, self.request["job_id"]
+
+
+class AnalysisJobService:
+    """Priority job queue running analyses on a pool of worker processes."""
+
+    def __init__(
+        self,
+        endpoint: str = "tcp://*:5570",
+        max_workers: int = DEFAULT_SERVICE_WORKERS,
+        worker_factory: Callable[[], AnalysisWorkerProcess] = AnalysisWorkerProcess,
+    ):
+        """Create the service (call serve_forever to run it).
+
+        Args:
+            endpoint: ZeroMQ endpoint to bind
+            max_workers: Analyses run concurrently (one worker process each)
+            worker_factory: Creates the pool's worker processes
+
+        Raises:
+            ValueError: If max_workers is not positive
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+
+        self.endpoint = endpoint
+        self.max_workers = max_workers
+        self._worker_factory = worker_factory
+
+        self._queue: List[_QueuedJob] = []
+        self._sequence = itertools.count()
+        self._running: Dict[JobKey, AnalysisWorkerProcess] = {}
+        self._cancelled: set = set()
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+
+        # Messages from dispatcher threads; only the serve_forever thread uses the socket
+        self._outbox: "queue.Queue[Tuple[bytes, Dict[str, Any]]]" = queue.Queue()
+
+    def stop(self) -> None:
+        """Make serve_forever return (running analyses are cancelled)."""
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def serve_forever(self) -> None:
+        """Accept and run jobs until stop() is called."""
+        context = zmq.Context()
+        socket = context.socket(zmq.ROUTER)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.bind(self.endpoint)
+        logger.info(f"Analysis job service listening on {self.endpoint} ({self.max_workers} workers)")
+
+        workers = [self._worker_factory() for _ in range(self.max_workers)]
+        dispatchers = [
+            threading.Thread(target=self._dispatch, args=(worker,), daemon=True, name=f"AnalysisJobDispatcher-{i}")
+            for i, worker in enumerate(workers)
+        ]
+        for dispatcher in dispatchers:
+            dispatcher.start()
+
+        next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL_S
+        try:
+            while not self._stopping.is_set():
+                if socket.poll(_POLL_INTERVAL_MS):
+                    identity, payload = socket.recv_multipart()
+                    try:
+                        self._handle_request(identity, json.loads(payload))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning(f"Ignoring malformed analysis job request: {e}")
+
+                while True:
+                    try:
+                        identity, message = self._outbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    socket.send_multipart([identity, json.dumps(message).encode("utf-8")])
+
+                if time.monotonic() >= next_heartbeat:
+                    self._send_heartbeats()
+                    next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL_S
+        finally:
+            with self._condition:
+                for worker in self._running.values():
+                    worker.cancel()
+                self._condition.notify_all()
+            for dispatcher in dispatchers:
+                dispatcher.join(timeout=10.0)
+            for worker in workers:
+                worker.shutdown()
+            socket.close()
+            context.term()
+            logger.info("Analysis job service stopped")
+
+    def _handle_request(self, identity: bytes, request: Dict[str, Any]) -> None:
+        request_type = request["type"]
+
+        if request_type == "ping":
+            with self._condition:
+                status = {"queued": len(self._queue), "running": len(self._running)}
+            self._outbox.put((identity, {"type": "pong", "workers": self.max_workers, **status}))
+
+        elif request_type == "submit":
+            job_id = request["job_id"]
+            if not Path(request["session_path"]).exists():
+                self._outbox.put((identity, {
+                    "type": "job_rejected",
+                    "job_id": job_id,
+                    "error": f"Session not found on analysis service host: {request['session_path']}",
+                }))
+                return
+            job = _QueuedJob((-int(request.get("priority", 0)), next(self._sequence)), identity, request)
+            with self._condition:
+                heapq.heappush(self._queue, job)
+                position = self._queue_position(job.key)
+                self._condition.notify()
+            logger.info(f"Queued analysis job {job_id} ({request['session_path']}, position {position})")
+            self._outbox.put((identity, {"type": "job_status", "job_id": job_id, "state": "queued", "position": position}))
+
+        elif request_type == "cancel":
+            key = (identity, request["job_id"])
+            with self._condition:
+                queued = [job for job in self._queue if job.key == key]
+                if queued:
+                    self._queue.remove(queued[0])
+                    heapq.heapify(self._queue)
+                elif key in self._running:
+                    self._cancelled.add(key)
+                    self._running[key].cancel()
+            if queued:
+                logger.info(f"Cancelled queued analysis job {request['job_id']}")
+                self._outbox.put((identity, {
+                    "type": "job_done",
+                    "job_id": request["job_id"],
+                    "done": {"success": False, "error": None, "stage": "cancelled", "reported": False},
+                }))
+
+        else:
+            raise ValueError(f"unknown request type {request_type!r}")
+
+    def _queue_position(self, key: JobKey) -> int:
+        """1-based position of a queued job (call with the condition held)."""
+        return 1 + sorted(self._queue).index(next(job for job in self._queue if job.key == key))
+
+    def _send_heartbeats(self) -> None:
+        with self._condition:
+            statuses = [(job.key, "queued", position) for position, job in enumerate(sorted(self._queue), start=1)]
+            statuses += [(key, "running", 0) for key in self._running]
+        for (identity, job_id), state, position in statuses:
+            self._outbox.put((identity, {"type": "job_status", "job_id": job_id, "state": state, "position": position}))
+
+    def _dispatch(self, worker: AnalysisWorkerProcess) -> None:
+        """Dispatcher thread: run queued jobs on one worker process."""
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping.is_set():
+                    self._condition.wait()
+                if self._stopping.is_set():
+                    return
+                job = heapq.heappop(self._queue)
+                self._running[job.key] = worker
+
+            identity, request = job.identity, job.request
+            job_id = request["job_id"]
+            logger.info(f"Running analysis job {job_id} ({request['session_path']})")
+            self._outbox.put((identity, {"type": "job_status", "job_id": job_id, "state": "running", "position": 0}))
+
+            def forward(event: Dict[str, Any]) -> None:
+                # Re-send cancellation that raced with the job starting
+                if job.key in self._cancelled:
+                    worker.cancel()
+                self._outbox.put((identity, {"type": "job_event", "job_id": job_id, "event": event}))
+
+            try:
+                done = worker.run_analysis(
+                    request["session_path"],
+                    request["parameter_groups"],
+                    request["pipeline_options"],
+                    forward,
+                )
+            except Exception as e:
+                logger.error(f"Analysis job {job_id} failed: {e}", exc_info=True)
+                done = {"success": False, "error": str(e), "stage": "error", "reported": False}
+            finally:
+                with self._condition:
+                    self._running.pop(job.key, None)
+                    self._cancelled.discard(job.key)
+
+            self._outbox.put((identity, {"type": "job_done", "job_id": job_id, "done": done}))
+
+
+class AnalysisJobClient:
+    """Runs a backend's analyses on an AnalysisJobService, locally as fallback.
+
+    Has the AnalysisWorkerProcess interface AnalysisManager uses (run_analysis,
+    cancel, shutdown), so it is injected the same way.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = DEFAULT_ANALYSIS_SERVICE_ENDPOINT,
+        fallback: Optional[AnalysisWorkerProcess] = None,
+        lost_timeout_s: float = SERVICE_LOST_TIMEOUT_S,
+    ):
+        """Create a client (connections are made per analysis).
+
+        Args:
+            endpoint: ZeroMQ endpoint of the service
+            fallback: Local worker used when the service is unavailable
+                (None = such analyses fail)
+            lost_timeout_s: Silence after which a submitted job is considered lost
+        """
+        self.endpoint = endpoint
+        self.fallback = fallback
+        self.lost_timeout_s = lost_timeout_s
+        self._context = zmq.Context.instance()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def run_analysis(
+        self,
+        session_path: str,
+        parameter_groups: Dict[str, Dict[str, Any]],
+        pipeline_options: Dict[str, Any],
+        on_event: Callable[[Dict[str, Any]], None],
+        priority: int = 0,
+    ) -> Dict[str, Any]:
+        """Analyze a session on the service (or locally) and wait for the result.
+
+        Args and return value as AnalysisWorkerProcess.run_analysis, plus:
+            priority: Queue priority on the service (higher runs first)
+        """
+        with self._lock:
+            self._cancel.clear()
+            socket = self._context.socket(zmq.DEALER)
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.connect(self.endpoint)
+            try:
+                if not self._ping(socket):
+                    return self._run_locally(
+                        f"Analysis service {self.endpoint} not available",
+                        session_path, parameter_groups, pipeline_options, on_event,
+                    )
+                return self._run_on_service(
+                    socket, session_path, parameter_groups, pipeline_options, on_event, priority
+                )
+            finally:
+                socket.close()
+
+    def cancel(self) -> None:
+        """Cancel the current analysis (queued or running, remote or local)."""
+        self._cancel.set()
+        if self.fallback is not None:
+            self.fallback.cancel()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the local fallback worker."""
+        if self.fallback is not None:
+            self.fallback.shutdown(timeout)
+
+    def service_status(self) -> Optional[Dict[str, Any]]:
+        """The service's pong (queued, running, workers), None if unavailable."""
+        socket = self._context.socket(zmq.DEALER)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(self.endpoint)
+        try:
+            socket.send_json({"type": "ping"})
+            if socket.poll(int(SERVICE_PING_TIMEOUT_S * 1000)):
+                return socket.recv_json()
+            return None
+        finally:
+            socket.close()
+
+    def _ping(self, socket) -> bool:
+        socket.send_json({"type": "ping"})
+        deadline = time.monotonic() + SERVICE_PING_TIMEOUT_S
+        while (remaining := deadline - time.monotonic()) > 0:
+            if socket.poll(int(remaining * 1000) + 1) and socket.recv_json().get("type") == "pong":
+                return True
+        return False
+
+    def _run_on_service(
+        self,
+        socket,
+        session_path: str,
+        parameter_groups: Dict[str, Dict[str, Any]],
+        pipeline_options: Dict[str, Any],
+        on_event: Callable[[Dict[str, Any]], None],
+        priority: int,
+    ) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        socket.send_json({
+            "type": "submit",
+            "job_id": job_id,
+            "session_path": session_path,
+            "parameter_groups": parameter_groups,
+            "pipeline_options": pipeline_options,
+            "priority": priority,
+        })
+        logger.info(f"Submitted analysis job {job_id} to {self.endpoint} (priority {priority})")
+
+        last_heard = time.monotonic()
+        cancel_sent = False
+        while True:
+            if self._cancel.is_set() and not cancel_sent:
+                socket.send_json({"type": "cancel", "job_id": job_id})
+                cancel_sent = True
+
+            if not socket.poll(_POLL_INTERVAL_MS):
+                if time.monotonic() - last_heard > self.lost_timeout_s:
+                    if cancel_sent:
+                        return {"success": False, "error": None, "stage": "stopping", "reported": False}
+                    # The service may still be running the job after a network stall:
+                    # stop it before writing the same session's results locally
+                    self._send_cancel(socket, job_id)
+                    return self._run_locally(
+                        f"Lost analysis service {self.endpoint}",
+                        session_path, parameter_groups, pipeline_options, on_event,
+                    )
+                continue
+
+            message = socket.recv_json()
+            if message.get("job_id") != job_id:
+                continue
+            last_heard = time.monotonic()
+
+            message_type = message["type"]
+            if message_type == "job_event":
+                on_event(message["event"])
+            elif message_type == "job_status" and message["state"] == "queued":
+                on_event({
+                    "message": {
+                        "type": "analysis_progress",
+                        "progress": 0.0,
+                        "stage": f"Queued on analysis service (position {message['position']})",
+                        "timestamp": time.time(),
+                    },
+                    "progress": 0.0,
+                    "stage": "queued",
+                })
+            elif message_type == "job_done":
+                return message["done"]
+            elif message_type == "job_rejected":
+                self._send_cancel(socket, job_id)
+                return self._run_locally(
+                    message["error"], session_path, parameter_groups, pipeline_options, on_event
+                )
+
+    def _send_cancel(self, socket, job_id: str) -> None:
+        """Best-effort cancel of a remote job before analyzing it locally.
+
+        Does not block: if the service is unreachable the message waits in the
+        socket (open until the local run ends) and is delivered on reconnect.
+        """
+        try:
+            socket.send_json({"type": "cancel", "job_id": job_id}, flags=zmq.NOBLOCK)
+        except zmq.ZMQError as e:
+            logger.warning(f"Could not cancel analysis job {job_id} on {self.endpoint}: {e}")
+
+    def _run_locally(
+        self,
+        reason: str,
+        session_path: str,
+        parameter_groups: Dict[str, Dict[str, Any]],
+        pipeline_options: Dict[str, Any],
+        on_event: Callable[[Dict[str, Any]], None],
+    ) -> Dict[str, Any]:
+        if self.fallback is None:
+            return {"success": False, "error": reason, "stage": "error", "reported": False}
+        if self._cancel.is_set():
+            return {"success": False, "error": None, "stage": "stopping", "reported": False}
+        logger.warning(f"{reason} - analyzing locally")
+        return self.fallback.run_analysis(session_path, parameter_groups, pipeline_options, on_event)
@@ -7,21 +7,71 @@ All dependencies injected via constructor - NO service locator pattern.
 from __future__ import annotations
 
 import logging
+import os
 import threading
 import time
-from typing import Dict, Any, Optional, List, Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List, Callable, Iterator, Tuple
 from pathlib import Path
 import json
 import numpy as np
 import h5py
 
+import hdf5_codecs  # noqa: F401 - registers optional hdf5plugin filters for reading
 from config import AnalysisConfig, AcquisitionConfig
 from ipc.channels import MultiChannelIPC
 from ipc.shared_memory import SharedMemoryService
 from .pipeline import AnalysisPipeline
+from .online import online_stage_key
+from .worker import AnalysisWorkerProcess
+from .stage_cache import STAGE_CACHE_DIRNAME, StageCache, file_signature, stage_key
 
 logger = logging.getLogger(__name__)
 
+# Per-direction FFT stage concurrency. NumPy/SciPy release the GIL inside the
+# heavy kernels, so a thread pool scales without copying frame data to workers.
+DEFAULT_MAX_DIRECTION_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_DIRECTION_MEMORY_BUDGET_BYTES = 8 * 1024 ** 3  # 8 GiB across concurrent directions
+
+
+def direction_limits(system_params: Dict[str, Any]) -> Tuple[int, int]:
+    """Direction concurrency and memory budget from the "system" parameter group.
+
+    Args:
+        system_params: System parameters (analysis_direction_workers, 0 = default;
+            analysis_memory_budget_gb)
+
+    Returns:
+        (max_direction_workers, direction_memory_budget_bytes)
+    """
+    workers = int(system_params.get("analysis_direction_workers", 0)) or DEFAULT_MAX_DIRECTION_WORKERS
+    budget_gb = system_params.get("analysis_memory_budget_gb")
+    budget_bytes = int(float(budget_gb) * 1024 ** 3) if budget_gb else DEFAULT_DIRECTION_MEMORY_BUDGET_BYTES
+    return workers, budget_bytes
+
+
+def camera_mean_frame(session_path: Path) -> Optional[np.ndarray]:
+    """Average of the per-direction mean frames of a session's camera files.
+
+    Camera files rewritten by scripts/optimize_sessions.py store a mean_frame
+    dataset; it stands in for the anatomical reference of sessions recorded
+    without one, without reading any frames.
+
+    Args:
+        session_path: Session directory
+
+    Returns:
+        [height, width] float32 mean frame, or None if no camera file has one
+    """
+    mean_frames = []
+    for camera_path in sorted(Path(session_path).glob("*_camera.h5")):
+        with h5py.File(camera_path, 'r') as f:
+            if "mean_frame" in f:
+                mean_frames.append(f["mean_frame"][:])
+    if not mean_frames or any(m.shape != mean_frames[0].shape for m in mean_frames):
+        return None
+    return np.mean(mean_frames, axis=0).astype(np.float32)
+
 
 class SessionData:
     """Container for loaded acquisition session data."""
@@ -38,8 +88,15 @@ class DirectionData:
 
     def __init__(self):
         # Raw acquisition data
+        # Camera frames are read out-of-core from camera_path in chunks; frames is
+        # only populated when a caller supplies an in-memory stack directly.
         self.frames: Optional[np.ndarray] = None
+        self.camera_path: Optional[Path] = None
+        self.n_frames: int = 0
+        self.frame_shape: Optional[Tuple[int, int]] = None  # (height, width) after legacy conversion
+        self.legacy_rgb: bool = False  # True for legacy (N, H, W, 3) BGR recordings
         self.timestamps: Optional[np.ndarray] = None
+        self.frames_skipped: int = 0  # Captured frames the recorder never received
         self.stimulus_angles: Optional[np.ndarray] = None
         self.events: Optional[List[Dict[str, Any]]] = None
 
@@ -79,7 +136,10 @@ class AnalysisManager:
         param_manager,
         ipc: MultiChannelIPC,
         shared_memory: SharedMemoryService,
-        pipeline: AnalysisPipeline
+        pipeline: AnalysisPipeline,
+        max_direction_workers: int = DEFAULT_MAX_DIRECTION_WORKERS,
+        direction_memory_budget_bytes: int = DEFAULT_DIRECTION_MEMORY_BUDGET_BYTES,
+        worker: Optional[AnalysisWorkerProcess] = None
     ):
         """Initialize analysis manager.
 
@@ -88,14 +148,36 @@ class AnalysisManager:
             ipc: IPC communication channels
             shared_memory: Shared memory service for frame streaming
             pipeline: Analysis pipeline for Fourier computations
+            max_direction_workers: Maximum directions reduced concurrently
+                (1 = sequential)
+            direction_memory_budget_bytes: Working-memory budget shared by
+                concurrently running directions
+            worker: Run analyses in this worker process (or analysis job
+                service client) instead of a thread of the calling process
+                (isolates acquisition timing)
+
+        Raises:
+            ValueError: If max_direction_workers or the memory budget is invalid
         """
+        if max_direction_workers < 1:
+            raise ValueError(f"max_direction_workers must be >= 1, got {max_direction_workers}")
+        if direction_memory_budget_bytes <= 0:
+            raise ValueError(
+                f"direction_memory_budget_bytes must be positive, got {direction_memory_budget_bytes}"
+            )
+
         self.param_manager = param_manager
         self.ipc = ipc
         self.shared_memory = shared_memory
         self.pipeline = pipeline
+        self.max_direction_workers = max_direction_workers
+        self.direction_memory_budget_bytes = direction_memory_budget_bytes
+        self.worker = worker
+        self._active_worker: Optional[AnalysisWorkerProcess] = None  # Worker of the running analysis
 
         # Subscribe to analysis parameter changes
         self.param_manager.subscribe("analysis", self._handle_analysis_params_changed)
+        self.param_manager.subscribe("system", self._handle_system_params_changed)
 
         # State tracking
         self.is_running = False
@@ -108,7 +190,19 @@ class AnalysisManager:
 
         # Import renderer for layer visualization
         from .renderer import AnalysisRenderer
-        # Get current analysis config from param_manager
+        self.renderer = AnalysisRenderer(self.build_analysis_config(), shared_memory)
+
+        logger.info("AnalysisManager initialized with ParameterManager")
+
+    def build_analysis_config(self) -> AnalysisConfig:
+        """Current analysis parameters from param_manager as an AnalysisConfig.
+
+        Returns:
+            AnalysisConfig with validated parameters
+
+        Raises:
+            RuntimeError: If a required analysis parameter is not configured
+        """
         analysis_params = self.param_manager.get_parameter_group("analysis")
 
         # Validate ALL parameters explicitly - NO hardcoded defaults
@@ -177,8 +271,7 @@ class AnalysisManager:
             )
 
         # Create a compatibility config object with validated parameters (NO defaults)
-        from config import AnalysisConfig
-        config = AnalysisConfig(
+        return AnalysisConfig(
             coherence_threshold=float(coherence_threshold),
             magnitude_threshold=float(magnitude_threshold),
             smoothing_sigma=float(smoothing_sigma),
@@ -187,11 +280,9 @@ class AnalysisManager:
             phase_filter_sigma=float(phase_filter_sigma),
             gradient_window_size=int(gradient_window_size),
             response_threshold_percent=float(response_threshold_percent),
-            area_min_size_mm2=float(area_min_size_mm2)
+            area_min_size_mm2=float(area_min_size_mm2),
+            boundary_skeletonize=bool(analysis_params.get("boundary_skeletonize", False))
         )
-        self.renderer = AnalysisRenderer(config, shared_memory)
-
-        logger.info("AnalysisManager initialized with ParameterManager")
 
     def _handle_analysis_params_changed(self, group_name: str, updates: Dict[str, Any]):
         """React to analysis parameter changes.
@@ -203,6 +294,23 @@ class AnalysisManager:
         logger.info(f"Analysis parameters changed: {list(updates.keys())}")
         # Analysis parameters are typically used at analysis time, not continuously
 
+    def _handle_system_params_changed(self, group_name: str, updates: Dict[str, Any]):
+        """Apply direction concurrency/memory budget changes to the next analysis.
+
+        Args:
+            group_name: Parameter group that changed ("system")
+            updates: Dictionary of updated parameters
+        """
+        if "analysis_direction_workers" not in updates and "analysis_memory_budget_gb" not in updates:
+            return
+        self.max_direction_workers, self.direction_memory_budget_bytes = direction_limits(
+            self.param_manager.get_parameter_group("system")
+        )
+        logger.info(
+            f"Direction workers: {self.max_direction_workers}, "
+            f"memory budget: {self.direction_memory_budget_bytes / 1024 ** 3:.1f} GiB"
+        )
+
     def _send_layer_ready(self, layer_name: str, layer_data: np.ndarray, session_path: str):
         """Send intermediate layer visualization to frontend.
 
@@ -263,11 +371,13 @@ class AnalysisManager:
         except Exception as e:
             logger.error(f"Failed to send layer_ready for {layer_name}: {e}", exc_info=True)
 
-    def start_analysis(self, session_path: str) -> Dict[str, Any]:
+    def start_analysis(self, session_path: str, priority: int = 0) -> Dict[str, Any]:
         """Start analysis on a recorded session.
 
         Args:
             session_path: Path to session directory
+            priority: Queue priority when the worker is a shared analysis
+                service (higher runs first)
 
         Returns:
             Success response with analysis info or error response
@@ -325,10 +435,10 @@ class AnalysisManager:
 
         logger.info(f"Starting analysis for session: {session_path}")
 
-        # Start analysis in background thread
+        # Start analysis in background thread (relaying a worker process if configured)
         self.analysis_thread = threading.Thread(
-            target=self._run_analysis,
-            args=(session_path,),
+            target=self._run_analysis if self.worker is None else self._run_analysis_in_worker,
+            args=(session_path,) if self.worker is None else (session_path, int(priority or 0)),
             daemon=True,
             name="AnalysisThread"
         )
@@ -351,9 +461,20 @@ class AnalysisManager:
         logger.warning("Analysis stop requested")
         self.is_running = False
         self.current_stage = "stopping"
+        worker = self._active_worker or self.worker
+        if worker is not None:
+            worker.cancel()
 
         return self._format_success("Analysis will complete current stage and stop")
 
+    def set_worker(self, worker: Optional[AnalysisWorkerProcess]) -> None:
+        """Run subsequent analyses on another worker (a running analysis keeps its own).
+
+        Args:
+            worker: Worker process or analysis job service client (None = in-process)
+        """
+        self.worker = worker
+
     def get_status(self) -> Dict[str, Any]:
         """Get current analysis status.
 
@@ -370,11 +491,45 @@ class AnalysisManager:
             "has_results": self.results is not None,
         }
 
-    def _run_analysis(self, session_path: str):
+    def analyze_session(self, session_path: str, publish_layers: bool = False) -> Dict[str, Any]:
+        """Analyze a session synchronously in the calling thread (headless use).
+
+        Runs the same stages as start_analysis (including the stage cache and
+        saving results); batch runs skip rendering intermediate layers.
+
+        Args:
+            session_path: Path to session directory
+            publish_layers: Render and send intermediate layers
+
+        Returns:
+            Success response with num_areas, or error response
+        """
+        if self.is_running:
+            return self._format_error("Analysis already running")
+
+        self.current_session_path = session_path
+        self.is_running = True
+        self.progress = 0.0
+        self.current_stage = "starting"
+        self.error = None
+        self.results = None
+
+        self._run_analysis(session_path, publish_layers=publish_layers)
+
+        if self.error is not None:
+            return self._format_error(self.error)
+        if self.current_stage != "complete":
+            return self._format_error(f"Analysis stopped at stage: {self.current_stage}")
+        area_map = self.results.area_map if self.results is not None else None
+        num_areas = int(np.max(area_map)) if area_map is not None else 0
+        return self._format_success("Analysis complete", session_path=session_path, num_areas=num_areas)
+
+    def _run_analysis(self, session_path: str, publish_layers: bool = True):
         """Background thread for running analysis.
 
         Args:
             session_path: Path to session directory
+            publish_layers: Render and send intermediate layers to the frontend
         """
         try:
             # Send started message
@@ -392,6 +547,11 @@ class AnalysisManager:
             session_data = self._load_acquisition_data(session_path)
             logger.info("Session data loaded successfully")
 
+            # Analyze with the current parameters; the stage cache decides which
+            # stages they invalidate
+            self.pipeline.config = self.build_analysis_config()
+            stage_cache = StageCache(Path(session_path) / "analysis_results" / STAGE_CACHE_DIRNAME)
+
             # Stage 2: Process each direction (10% -> 70%)
             if not self.is_running:
                 return
@@ -405,47 +565,32 @@ class AnalysisManager:
             magnitude_maps = {}
             coherence_maps = {}
 
-            for i, direction in enumerate(directions):
-                if not self.is_running:
-                    return
-
-                # Update progress proportionally
-                progress = 0.1 + (i / len(directions)) * 0.6
-                self.progress = progress
-                self.current_stage = f"processing_{direction}"
-                self._send_progress(progress, f"Processing {direction} direction")
-
-                # Check if we have pre-computed phase/magnitude maps or need to compute from frames
-                if session_data.has_camera_data:
-                    # Full pipeline: compute FFT from raw camera frames
-                    frames = session_data.directions[direction].frames
-                    angles = session_data.directions[direction].stimulus_angles
-
-                    if frames is None or angles is None:
-                        logger.warning(f"Skipping {direction}: missing data")
-                        continue
-
-                    # Compute FFT phase/magnitude/coherence maps
-                    # Get cycles from parameter manager
-                    cycles = acquisition_params.get("cycles", 10)
-                    stimulus_freq = cycles / len(frames)
-                    logger.info(f"  Computing FFT for {direction} ({len(frames)} frames, freq={stimulus_freq:.4f})...")
-                    start_time = time.time()
-
-                    phase_map, magnitude_map, coherence_map = self.pipeline.compute_fft_phase_maps(
-                        frames, stimulus_freq
-                    )
-
-                    elapsed = time.time() - start_time
-                    logger.info(f"  FFT computation completed in {elapsed:.2f}s")
-                    logger.info(f"  Phase: [{np.min(phase_map):.3f}, {np.max(phase_map):.3f}], "
-                               f"Mag: [{np.min(magnitude_map):.1f}, {np.max(magnitude_map):.1f}], "
-                               f"Coh: [{np.min(coherence_map):.3f}, {np.max(coherence_map):.3f}]")
+            # Check if we have pre-computed phase/magnitude maps or need to compute from frames
+            if session_data.has_camera_data:
+                # Full pipeline: compute FFT from raw camera frames (directions in parallel)
+                cycles = acquisition_params.get("cycles", 10)
+                direction_maps, source_key = self._compute_direction_maps(
+                    session_data, directions, cycles, stage_cache
+                )
 
+                for direction, (phase_map, magnitude_map, coherence_map) in direction_maps.items():
                     phase_maps[direction] = phase_map
                     magnitude_maps[direction] = magnitude_map
                     coherence_maps[direction] = coherence_map
-                else:
+            else:
+                # Pre-computed maps are identified by their files
+                source_key = stage_key(
+                    "fourier",
+                    {
+                        "files": [
+                            file_signature(Path(session_path) / f"{prefix}_{direction}.npy")
+                            for direction in directions
+                            for prefix in ("phase", "magnitude")
+                        ]
+                    },
+                    [],
+                )
+                for direction in directions:
                     # Partial pipeline: use pre-loaded phase/magnitude maps
                     phase_map = session_data.directions[direction].phase_map
                     magnitude_map = session_data.directions[direction].magnitude_map
@@ -477,7 +622,9 @@ class AnalysisManager:
                 phase_data=phase_maps,
                 magnitude_data=magnitude_maps,
                 coherence_data=coherence_maps if coherence_maps else None,
-                anatomical=session_data.anatomical
+                anatomical=session_data.anatomical,
+                stage_cache=stage_cache,
+                source_key=source_key
             )
 
             # Extract results from pipeline
@@ -488,32 +635,23 @@ class AnalysisManager:
             magnitude_vfs_map = pipeline_results.get('magnitude_vfs_map')  # Alternative method
             statistical_vfs_map = pipeline_results.get('statistical_vfs_map')  # Alternative method
             boundary_map = pipeline_results.get('boundary_map')
+            area_map = pipeline_results.get('area_map')
+            gradients = pipeline_results.get('gradients')
 
             # Send intermediate results to frontend
-            if azimuth_map is not None:
-                self._send_layer_ready('azimuth_map', azimuth_map, session_path)
-            if elevation_map is not None:
-                self._send_layer_ready('elevation_map', elevation_map, session_path)
-
-            # Use coherence-thresholded VFS for display if available (literature standard)
-            # Fall back to magnitude-thresholded if coherence unavailable
-            display_vfs = coherence_vfs_map if coherence_vfs_map is not None else magnitude_vfs_map
-            if display_vfs is not None:
-                self._send_layer_ready('sign_map', display_vfs, session_path)
-            if boundary_map is not None:
-                self._send_layer_ready('boundary_map', boundary_map, session_path)
-
-            # Segment visual areas with spatial calibration
-            area_map = None
-            if display_vfs is not None and boundary_map is not None:
-                # Get image dimensions for spatial calibration (ring_size_mm parameter)
-                image_width_pixels = azimuth_map.shape[1] if azimuth_map is not None else None
-                area_map = self.pipeline.segment_visual_areas(display_vfs, boundary_map, image_width_pixels)
-
-            # Compute gradients for results storage
-            gradients = None
-            if azimuth_map is not None and elevation_map is not None:
-                gradients = self.pipeline.compute_spatial_gradients(azimuth_map, elevation_map)
+            if publish_layers:
+                if azimuth_map is not None:
+                    self._send_layer_ready('azimuth_map', azimuth_map, session_path)
+                if elevation_map is not None:
+                    self._send_layer_ready('elevation_map', elevation_map, session_path)
+
+                # Use coherence-thresholded VFS for display if available (literature standard)
+                # Fall back to magnitude-thresholded if coherence unavailable
+                display_vfs = coherence_vfs_map if coherence_vfs_map is not None else magnitude_vfs_map
+                if display_vfs is not None:
+                    self._send_layer_ready('sign_map', display_vfs, session_path)
+                if boundary_map is not None:
+                    self._send_layer_ready('boundary_map', boundary_map, session_path)
 
             self.progress = 0.9
             self.current_stage = "analysis_complete"
@@ -583,6 +721,422 @@ class AnalysisManager:
             self.is_running = False
             logger.info("Analysis thread finished")
 
+    def _run_analysis_in_worker(self, session_path: str, priority: int = 0):
+        """Background thread relaying an analysis run in the worker process.
+
+        The worker's progress, layer and completion messages are forwarded to
+        the sync channel as they arrive; results are read back from the
+        analysis_results.h5 the worker saved.
+
+        Args:
+            session_path: Path to session directory
+            priority: Queue priority (shared analysis service only)
+        """
+        worker = self._active_worker = self.worker
+
+        def relay(event: Dict[str, Any]):
+            self.progress = event["progress"]
+            if self.is_running:
+                self.current_stage = event["stage"]
+            else:
+                worker.cancel()  # Stop requested before the job started
+            self._send_sync_message(event["message"])
+
+        try:
+            # Validate here so configuration errors surface like in-process runs
+            self.build_analysis_config()
+            parameter_groups = {
+                "analysis": self.param_manager.get_parameter_group("analysis"),
+                "acquisition": self.param_manager.get_parameter_group("acquisition"),
+            }
+            done = worker.run_analysis(
+                session_path,
+                parameter_groups,
+                {
+                    "fft_mode": self.pipeline.fft_mode,
+                    "chunk_frames": self.pipeline.chunk_frames,
+                    "max_direction_workers": self.max_direction_workers,
+                    "direction_memory_budget_bytes": self.direction_memory_budget_bytes,
+                },
+                relay,
+                priority=priority,
+            )
+
+            self.current_stage = done["stage"]
+            if done["success"]:
+                self.results = self._load_results(Path(session_path) / "analysis_results")
+                self.progress = 1.0
+                logger.info(f"Analysis complete in worker: {done['num_areas']} visual areas")
+            elif done["stage"] == "error":
+                self.error = done["error"]
+                if not done["reported"]:
+                    # The worker's manager could not report the failure itself
+                    self._send_sync_message({
+                        "type": "analysis_error",
+                        "error": self.error,
+                        "session_path": session_path,
+                        "timestamp": time.time(),
+                    })
+
+        except Exception as e:
+            logger.error(f"Analysis failed: {e}", exc_info=True)
+            self.error = str(e)
+            self.current_stage = "error"
+
+            self._send_sync_message({
+                "type": "analysis_error",
+                "error": str(e),
+                "session_path": session_path,
+                "timestamp": time.time(),
+            })
+
+        finally:
+            self.is_running = False
+            self._active_worker = None
+            logger.info("Analysis relay thread finished")
+
+    def _compute_direction_maps(
+        self,
+        session_data: SessionData,
+        directions: List[str],
+        cycles: int,
+        stage_cache: Optional[StageCache] = None
+    ) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]], Optional[str]]:
+        """Compute phase/magnitude/coherence maps for all directions (10% -> 70%).
+
+        Directions are independent, so they are reduced concurrently on a thread
+        pool. Concurrency is limited by max_direction_workers and by how many
+        directions fit in direction_memory_budget_bytes. Progress is reported as
+        each direction completes. Directions whose Fourier stage is in
+        stage_cache (same recording, cycles, FFT mode and phase filter) are
+        loaded instead of recomputed, as are directions whose complete maps
+        online analysis stored there during recording.
+
+        Args:
+            session_data: Loaded session data with camera frames
+            directions: Directions to process
+            cycles: Number of stimulus cycles per direction
+            stage_cache: Optional session-local stage cache
+
+        Returns:
+            Tuple of (dict mapping direction to (phase_map, magnitude_map,
+            coherence_map), combined Fourier stage key or None if not cacheable).
+            The dict is incomplete if analysis was stopped.
+        """
+        results: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        fourier_keys: Dict[str, Optional[str]] = {}
+
+        jobs = []
+        for direction in directions:
+            direction_data = session_data.directions.get(direction)
+            if (
+                direction_data is None
+                or (direction_data.frames is None and direction_data.camera_path is None)
+                or direction_data.stimulus_angles is None
+            ):
+                logger.warning(f"Skipping {direction}: missing data")
+                continue
+
+            key = self._fourier_stage_key(direction, direction_data, cycles)
+            fourier_keys[direction] = key
+            if stage_cache is not None and key is not None:
+                cached = stage_cache.load(f"fourier_{direction}", key)
+                if cached is not None:
+                    logger.info(f"  {direction} phase maps loaded from stage cache")
+                    results[direction] = (cached["phase_map"], cached["magnitude_map"], cached["coherence_map"])
+                    continue
+                online = self._load_online_maps(direction, direction_data, stage_cache)
+                if online is not None:
+                    logger.info(f"  {direction} phase maps taken from online analysis")
+                    phase_map, magnitude_map, coherence_map = online
+                    stage_cache.store(f"fourier_{direction}", key, {
+                        "phase_map": phase_map,
+                        "magnitude_map": magnitude_map,
+                        "coherence_map": coherence_map,
+                    })
+                    results[direction] = online
+                    continue
+            jobs.append((direction, direction_data))
+
+        source_key = None
+        if fourier_keys and all(key is not None for key in fourier_keys.values()):
+            source_key = stage_key("fourier", {}, [fourier_keys[d] for d in sorted(fourier_keys)])
+
+        if not jobs:
+            return results, source_key
+
+        def compute(direction: str, direction_data: DirectionData) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            maps = self._compute_single_direction(direction, direction_data, cycles)
+            key = fourier_keys[direction]
+            if stage_cache is not None and key is not None:
+                phase_map, magnitude_map, coherence_map = maps
+                stage_cache.store(f"fourier_{direction}", key, {
+                    "phase_map": phase_map,
+                    "magnitude_map": magnitude_map,
+                    "coherence_map": coherence_map,
+                })
+            return maps
+
+        workers = self._plan_direction_workers(jobs)
+        total = len(jobs)
+        logger.info(f"Computing phase maps for {total} directions with {workers} worker(s)")
+
+        self.current_stage = "processing_directions"
+        self._send_progress(0.1, f"Processing {total} directions ({workers} in parallel)")
+
+        cached_count = len(results)
+
+        def report_completion(direction: str):
+            progress = 0.1 + ((len(results) - cached_count) / total) * 0.6
+            self.progress = progress
+            self._send_progress(progress, f"{direction} direction complete ({len(results) - cached_count}/{total})")
+
+        if workers == 1:
+            for direction, direction_data in jobs:
+                if not self.is_running:
+                    return results, source_key
+                self.current_stage = f"processing_{direction}"
+                results[direction] = compute(direction, direction_data)
+                report_completion(direction)
+            return results, source_key
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AnalysisDirection")
+        try:
+            futures = {
+                executor.submit(compute, direction, direction_data): direction
+                for direction, direction_data in jobs
+            }
+            for future in as_completed(futures):
+                direction = futures[future]
+                results[direction] = future.result()
+                report_completion(direction)
+
+                if not self.is_running:
+                    logger.info("Analysis stopped - cancelling pending directions")
+                    break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return results, source_key
+
+    def _load_online_maps(
+        self,
+        direction: str,
+        direction_data: DirectionData,
+        stage_cache: StageCache
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Phase-filtered maps online analysis computed during recording, if complete.
+
+        Online maps are used only if they cover exactly the recorded frames:
+        same frame count and first/last timestamps (the stage key) and no
+        frames dropped by the online queue.
+
+        Args:
+            direction: Direction name
+            direction_data: Direction data with timestamps of the recorded frames
+            stage_cache: Session-local stage cache
+
+        Returns:
+            (phase_map, magnitude_map, coherence_map), or None
+        """
+        timestamps = direction_data.timestamps
+        if timestamps is None or len(timestamps) == 0 or direction_data.legacy_rgb:
+            return None
+        key = online_stage_key(direction, direction_data.n_frames, timestamps[0], timestamps[-1])
+        online = stage_cache.load(f"online_{direction}", key)
+        if online is None:
+            return None
+        if int(online["frames_dropped"]) != 0 or int(online["frames_seen"]) != direction_data.n_frames:
+            logger.info(
+                f"  {direction} online maps incomplete ({int(online['frames_seen'])} frames, "
+                f"{int(online['frames_dropped'])} dropped) - recomputing"
+            )
+            return None
+        return (
+            self.pipeline.apply_phase_filter(online["phase_map"]),
+            online["magnitude_map"],
+            online["coherence_map"],
+        )
+
+    def _fourier_stage_key(
+        self,
+        direction: str,
+        direction_data: DirectionData,
+        cycles: int
+    ) -> Optional[str]:
+        """Stage cache key of one direction's phase/magnitude/coherence maps.
+
+        Args:
+            direction: Direction name
+            direction_data: Direction data with camera_path
+            cycles: Number of stimulus cycles
+
+        Returns:
+            Key, or None if the frames are not backed by a file (not cacheable)
+        """
+        if direction_data.frames is not None or direction_data.camera_path is None:
+            return None
+        signature = file_signature(direction_data.camera_path)
+        if signature is None:
+            return None
+        return stage_key(
+            f"fourier_{direction}",
+            {
+                "camera_file": signature,
+                "n_frames": direction_data.n_frames,
+                "frames_skipped": direction_data.frames_skipped,
+                "cycles": cycles,
+                "fft_mode": self.pipeline.fft_mode,
+                "phase_filter_sigma": self.pipeline.config.phase_filter_sigma,
+            },
+            [],
+        )
+
+    def _plan_direction_workers(self, jobs: List[Tuple[str, DirectionData]]) -> int:
+        """Choose how many directions to reduce concurrently.
+
+        Args:
+            jobs: (direction, DirectionData) pairs to process
+
+        Returns:
+            Worker count (>= 1)
+        """
+        per_direction_bytes = max(
+            self._estimate_direction_memory(direction_data) for _, direction_data in jobs
+        )
+        by_memory = max(1, self.direction_memory_budget_bytes // max(per_direction_bytes, 1))
+        workers = int(min(self.max_direction_workers, by_memory, len(jobs)))
+
+        logger.info(
+            f"  Direction workers: {workers} (max={self.max_direction_workers}, "
+            f"~{per_direction_bytes / 1024 ** 2:.0f} MB each, "
+            f"budget={self.direction_memory_budget_bytes / 1024 ** 2:.0f} MB)"
+        )
+        return workers
+
+    def _estimate_direction_memory(self, direction_data: DirectionData) -> int:
+        """Estimate peak working memory for one direction.
+
+        Args:
+            direction_data: Direction to estimate
+
+        Returns:
+            Approximate peak bytes
+        """
+        if direction_data.frames is not None:
+            n_frames, height, width = direction_data.frames.shape
+            # In-memory stacks go through compute_fft_phase_maps on top of the resident frames
+            return self.pipeline.estimate_phase_map_memory(n_frames, (height, width)) + direction_data.frames.nbytes
+        return self.pipeline.estimate_phase_map_memory(direction_data.n_frames, direction_data.frame_shape)
+
+    def _compute_single_direction(
+        self,
+        direction: str,
+        direction_data: DirectionData,
+        cycles: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Load and reduce one direction to phase/magnitude/coherence maps.
+
+        Runs on a worker thread when directions are processed in parallel.
+
+        Args:
+            direction: Direction name
+            direction_data: Direction data (in-memory frames or camera_path)
+            cycles: Number of stimulus cycles
+
+        Returns:
+            Tuple of (phase_map, magnitude_map, coherence_map)
+        """
+        if direction_data.frames is not None:
+            n_frames = len(direction_data.frames)
+        else:
+            n_frames = direction_data.n_frames
+        stimulus_freq = cycles / n_frames
+        capture_positions = self._capture_positions(direction_data, cycles)
+        logger.info(f"  Computing FFT for {direction} ({n_frames} frames, freq={stimulus_freq:.4f})...")
+        start_time = time.time()
+
+        if direction_data.frames is not None:
+            phase_map, magnitude_map, coherence_map = self.pipeline.compute_fft_phase_maps(
+                direction_data.frames, stimulus_freq
+            )
+        elif capture_positions is not None:
+            # Gaps in the recording: place frames at their capture times (any fft_mode)
+            positions, capture_freq = capture_positions
+            logger.info(
+                f"  {direction}: {direction_data.frames_skipped} frame(s) missing - "
+                f"using capture timestamps ({capture_freq:.4f} cycles/s)"
+            )
+            phase_map, magnitude_map, coherence_map = self.pipeline.compute_phase_maps_from_chunks(
+                self._iter_camera_chunks(direction_data),
+                n_frames,
+                direction_data.frame_shape,
+                capture_freq,
+                positions=positions
+            )
+        elif self.pipeline.fft_mode == "streaming":
+            # Out-of-core: peak memory scales with chunk size, not session length
+            phase_map, magnitude_map, coherence_map = self.pipeline.compute_phase_maps_from_chunks(
+                self._iter_camera_chunks(direction_data),
+                n_frames,
+                direction_data.frame_shape,
+                stimulus_freq
+            )
+        else:
+            # Full-FFT mode needs the whole stack in memory
+            frames = np.concatenate(list(self._iter_camera_chunks(direction_data)))
+            phase_map, magnitude_map, coherence_map = self.pipeline.compute_fft_phase_maps(
+                frames, stimulus_freq
+            )
+            del frames
+
+        elapsed = time.time() - start_time
+        logger.info(f"  {direction} FFT computation completed in {elapsed:.2f}s")
+        logger.info(f"  {direction} Phase: [{np.min(phase_map):.3f}, {np.max(phase_map):.3f}], "
+                   f"Mag: [{np.min(magnitude_map):.1f}, {np.max(magnitude_map):.1f}], "
+                   f"Coh: [{np.min(coherence_map):.3f}, {np.max(coherence_map):.3f}]")
+
+        return phase_map, magnitude_map, coherence_map
+
+    @staticmethod
+    def _capture_positions(
+        direction_data: DirectionData,
+        cycles: int
+    ) -> Optional[Tuple[np.ndarray, float]]:
+        """Frame capture times and stimulus frequency for a recording with gaps.
+
+        Frames the recorder never received would shift every later frame if
+        frames were placed at consecutive indices. Instead frames are placed at
+        their capture times, and the recording is taken to span the first to
+        last capture plus one frame interval, i.e. the cycles / n_frames model
+        of a gap-free recording.
+
+        Args:
+            direction_data: File-backed direction data with timestamps
+            cycles: Number of stimulus cycles
+
+        Returns:
+            (positions in seconds, frequency in cycles per second), or None if
+            nothing was skipped or the timestamps cannot place the frames
+        """
+        timestamps = direction_data.timestamps
+        if (
+            not direction_data.frames_skipped
+            or direction_data.frames is not None
+            or timestamps is None
+            or len(timestamps) != direction_data.n_frames
+            or len(timestamps) < 2
+        ):
+            return None
+
+        positions = (np.asarray(timestamps, dtype=np.int64) - int(timestamps[0])) / 1e6
+        intervals = np.diff(positions)
+        if np.any(intervals <= 0):
+            logger.warning("  Camera timestamps are not increasing - frames placed at consecutive indices")
+            return None
+        duration = positions[-1] + float(np.median(intervals))
+        return positions, cycles / duration
+
     def _load_acquisition_data(self, session_path: str) -> SessionData:
         """Load all data from acquisition session.
 
@@ -632,7 +1186,8 @@ class AnalysisManager:
             for direction in directions:
                 camera_path = session_path_obj / f"{direction}_camera.h5"
                 stimulus_path = session_path_obj / f"{direction}_stimulus.h5"
-                if camera_path.exists() or stimulus_path.exists():
+                phase_path = session_path_obj / f"phase_{direction}.npy"
+                if camera_path.exists() or stimulus_path.exists() or phase_path.exists():
                     has_some_data = True
                     break
 
@@ -652,6 +1207,17 @@ class AnalysisManager:
         with open(metadata_path, 'r') as f:
             session_data.metadata = json.load(f)
 
+        frames_skipped = {
+            direction: int(gap.get("count", 0))
+            for direction, gap in session_data.metadata.get("camera_frames_skipped", {}).items()
+        }
+        for direction, count in frames_skipped.items():
+            if count:
+                logger.warning(
+                    f"  {direction}: {count} camera frame(s) were not recorded "
+                    f"(recorder fell behind capture) - frames are placed by capture time"
+                )
+
         # Detect which type of data we have
         has_camera_files = any(
             (session_path_obj / f"{dir}_camera.h5").exists()
@@ -693,6 +1259,10 @@ class AnalysisManager:
 
             session_data.anatomical = anatomical
             logger.info(f"  Loaded anatomical image: {session_data.anatomical.shape}")
+        else:
+            session_data.anatomical = camera_mean_frame(session_path_obj)
+            if session_data.anatomical is not None:
+                logger.info(f"  No anatomical image - using mean camera frame {session_data.anatomical.shape}")
 
         # Load data for each direction
         for direction in directions:
@@ -704,47 +1274,36 @@ class AnalysisManager:
             camera_path = session_path_obj / f"{direction}_camera.h5"
             if camera_path.exists():
                 with h5py.File(camera_path, 'r') as f:
-                    frames = f['frames'][:]
+                    # Only read shape and timestamps here - frames are streamed in
+                    # chunks during analysis by _iter_camera_chunks
+                    frames_dataset = f['frames']
+                    frames_shape = frames_dataset.shape
                     timestamps = f['timestamps'][:]
 
+                    direction_data.camera_path = camera_path
+                    direction_data.n_frames = int(frames_shape[0])
+
                     # Check if frames are already grayscale or need conversion (legacy data)
-                    if len(frames.shape) == 4 and frames.shape[3] == 3:
-                        # Legacy data: RGB/BGR frames need conversion and cropping
-                        logger.warning(f"    ⚠️  LEGACY RGB/BGR DATA - converting to grayscale ({frames.shape})...")
-                        start_time = time.time()
-
-                        # BGR to grayscale: 0.114*B + 0.587*G + 0.299*R
-                        # Use element-wise operations (avoids np.dot hang on large arrays)
-                        frames = (frames[:, :, :, 0] * 0.114 +
-                                 frames[:, :, :, 1] * 0.587 +
-                                 frames[:, :, :, 2] * 0.299).astype(np.uint8)
-
-                        # Legacy data also needs cropping
-                        num_frames, height, width = frames.shape
-                        min_dim = min(height, width)
-                        y_start = (height - min_dim) // 2
-                        x_start = (width - min_dim) // 2
-                        frames = frames[:, y_start:y_start + min_dim, x_start:x_start + min_dim]
-
-                        # Ensure C-contiguous after operations
-                        if not frames.flags['C_CONTIGUOUS']:
-                            frames = np.ascontiguousarray(frames)
-
-                        elapsed = time.time() - start_time
-                        logger.info(f"    Legacy conversion completed in {elapsed:.2f}s")
-                        logger.info(f"    Result: {frames.shape} (cropped from {height}x{width})")
+                    if len(frames_shape) == 4 and frames_shape[3] == 3:
+                        # Legacy data: RGB/BGR frames are converted and cropped per chunk
+                        min_dim = min(frames_shape[1], frames_shape[2])
+                        direction_data.legacy_rgb = True
+                        direction_data.frame_shape = (min_dim, min_dim)
+                        logger.warning(
+                            f"    ⚠️  LEGACY RGB/BGR DATA {frames_shape} - will convert to "
+                            f"grayscale {min_dim}x{min_dim} while streaming"
+                        )
                     else:
                         # Modern data: already grayscale and square-cropped during recording
-                        logger.info(f"    ✓ Optimized grayscale data: {frames.shape}")
+                        direction_data.frame_shape = (int(frames_shape[1]), int(frames_shape[2]))
+                        logger.info(f"    ✓ Optimized grayscale data: {frames_shape}")
 
-                        # CRITICAL: Ensure C-contiguous (HDF5 may load as non-contiguous)
-                        if not frames.flags['C_CONTIGUOUS']:
-                            logger.info(f"    Making C-contiguous for GPU efficiency...")
-                            frames = np.ascontiguousarray(frames)
-
-                    direction_data.frames = frames
                     direction_data.timestamps = timestamps
-                    logger.info(f"    Camera: {frames.shape} dtype={frames.dtype}")
+                    direction_data.frames_skipped = frames_skipped.get(direction, 0)
+                    logger.info(
+                        f"    Camera: {frames_shape} dtype={frames_dataset.dtype} "
+                        f"(hdf5 chunks={frames_dataset.chunks})"
+                    )
             else:
                 # If no camera data, load pre-computed phase/magnitude maps
                 phase_file = session_path_obj / f"phase_{direction}.npy"
@@ -775,6 +1334,49 @@ class AnalysisManager:
         logger.info("Session data loaded successfully")
         return session_data
 
+    def _iter_camera_chunks(self, direction_data: DirectionData) -> Iterator[np.ndarray]:
+        """Stream camera frames for one direction from HDF5 in bounded time blocks.
+
+        Block length is at most the pipeline's chunk_frames. When at least one
+        stored HDF5 chunk fits, it is rounded down to whole chunks along time so
+        each block decompresses each stored chunk exactly once; with larger
+        stored chunks (e.g. legacy h5py auto-chunking) chunk_frames is used as
+        is and a stored chunk is decompressed once per block it spans. Legacy
+        RGB/BGR frames are converted to grayscale and square-cropped per block.
+
+        Args:
+            direction_data: DirectionData with camera_path populated
+
+        Yields:
+            [n_block, height, width] uint8 C-contiguous frame blocks in time order
+        """
+        with h5py.File(direction_data.camera_path, 'r') as f:
+            frames_dataset = f['frames']
+            n_frames = frames_dataset.shape[0]
+
+            block_frames = self.pipeline.chunk_frames
+            if frames_dataset.chunks:
+                h5_chunk_frames = frames_dataset.chunks[0]
+                if h5_chunk_frames <= block_frames:
+                    block_frames = (block_frames // h5_chunk_frames) * h5_chunk_frames
+
+            for start in range(0, n_frames, block_frames):
+                block = frames_dataset[start:start + block_frames]
+
+                if direction_data.legacy_rgb:
+                    # BGR to grayscale: 0.114*B + 0.587*G + 0.299*R
+                    block = (block[:, :, :, 0] * 0.114 +
+                             block[:, :, :, 1] * 0.587 +
+                             block[:, :, :, 2] * 0.299).astype(np.uint8)
+
+                    height, width = block.shape[1:]
+                    min_dim = min(height, width)
+                    y_start = (height - min_dim) // 2
+                    x_start = (width - min_dim) // 2
+                    block = block[:, y_start:y_start + min_dim, x_start:x_start + min_dim]
+
+                yield np.ascontiguousarray(block)
+
     def _save_results(
         self,
         output_path: Path,
@@ -861,6 +1463,28 @@ class AnalysisManager:
 
         logger.info(f"Results saved to {output_path}")
 
+    def _load_results(self, output_path: Path) -> AnalysisResults:
+        """Load results saved by _save_results (e.g. by the worker process).
+
+        Args:
+            output_path: Directory the results were saved to
+
+        Returns:
+            Analysis results (gradients are not saved and stay None)
+        """
+        results = AnalysisResults()
+        with h5py.File(output_path / "analysis_results.h5", 'r') as f:
+            for name in (
+                'azimuth_map', 'elevation_map', 'raw_vfs_map', 'coherence_vfs_map',
+                'magnitude_vfs_map', 'statistical_vfs_map', 'area_map', 'boundary_map',
+            ):
+                if name in f:
+                    setattr(results, name, f[name][:])
+            for group in ('phase_maps', 'magnitude_maps', 'coherence_maps'):
+                if group in f:
+                    setattr(results, group, {d: f[group][d][:] for d in f[group]})
+        return results
+
     def _send_progress(self, progress: float, stage: str):
         """Send progress update via IPC.
 
@@ -0,0 +1,418 @@
+"""Online (incremental) analysis during acquisition.
+
+Feeds camera frames into per-direction StimulusFrequencyAccumulators while a
+session is being recorded, so phase/magnitude/coherence maps for a direction
+are available as soon as its last cycle ends and a progressively refined
+preview can be shown while recording.
+
+The camera thread only enqueues frames (add_frame never blocks); the Fourier
+accumulation runs on a dedicated worker thread. Frames are placed on the
+stimulus period by their capture timestamps, so dropped or irregularly timed
+frames do not shift the phase of later ones.
+
+Each finished direction's unfiltered maps are stored in the session's stage
+cache under online_{direction}, keyed by the frame count and first/last
+capture timestamps. The offline AnalysisManager uses them as that direction's
+Fourier stage when they cover exactly the recorded frames (none dropped by
+online analysis), so re-reading the camera file is only needed for
+incomplete directions.
+
+All dependencies injected via constructor - NO service locator pattern.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+
+from .fourier import StimulusFrequencyAccumulator
+from .stage_cache import STAGE_CACHE_DIRNAME, StageCache, stage_key
+
+logger = logging.getLogger(__name__)
+
+# Opposing direction pairs used for the live retinotopy preview
+_DIRECTION_PAIRS = {"azimuth_map": ("LR", "RL"), "elevation_map": ("TB", "BT")}
+
+
+def online_stage_key(direction: str, n_frames: int, first_timestamp_us: int, last_timestamp_us: int) -> str:
+    """Stage cache key of a direction's online maps (identifies the frames they cover).
+
+    Args:
+        direction: Direction name
+        n_frames: Frames accumulated
+        first_timestamp_us: Capture timestamp of the first frame
+        last_timestamp_us: Capture timestamp of the last frame
+
+    Returns:
+        Key under which the online_{direction} stage is stored
+    """
+    return stage_key(
+        f"online_{direction}",
+        {
+            "n_frames": int(n_frames),
+            "first_timestamp_us": int(first_timestamp_us),
+            "last_timestamp_us": int(last_timestamp_us),
+        },
+        [],
+    )
+
+
+class _DirectionState:
+    """Running accumulator and timing for one direction."""
+
+    def __init__(self, direction: str, period_sec: float, session_path: str):
+        self.direction = direction
+        self.session_path = session_path
+        self.period_sec = period_sec
+        self.accumulator: Optional[StimulusFrequencyAccumulator] = None
+        self.first_timestamp_us: Optional[int] = None
+        self.last_timestamp_us: Optional[int] = None
+        self.frames_dropped = 0
+
+
+class OnlineAnalysisEngine:
+    """Incremental Fourier analysis of camera frames during acquisition.
+
+    Lifecycle (driven by AcquisitionManager):
+        begin_session() -> start_direction() -> add_frame()... -> finish_direction()
+        -> ... -> end_session()
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        renderer,
+        ipc,
+        enabled: bool = True,
+        preview_interval_sec: float = 2.0,
+        max_queued_frames: int = 256,
+        block_frames: int = 16
+    ):
+        """Initialize online analysis engine.
+
+        Args:
+            pipeline: AnalysisPipeline (phase filtering and retinotopy conversion)
+            renderer: AnalysisRenderer for preview images
+            ipc: MultiChannelIPC for preview/completion messages
+            enabled: Whether sessions are analyzed online
+            preview_interval_sec: Minimum interval between live preview updates
+            max_queued_frames: Frames buffered between camera and worker thread
+            block_frames: Frames accumulated per batch on the worker thread
+        """
+        self.pipeline = pipeline
+        self.renderer = renderer
+        self.ipc = ipc
+        self.enabled = enabled
+        self.preview_interval_sec = preview_interval_sec
+        self.block_frames = block_frames
+
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=max_queued_frames)
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+        self._session_path: Optional[str] = None
+        self._current: Optional[_DirectionState] = None
+        self._direction_maps: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._last_preview_time = 0.0
+
+        logger.info(f"OnlineAnalysisEngine initialized (enabled={enabled})")
+
+    # ========== CONTROL (acquisition thread) ==========
+
+    @property
+    def is_collecting(self) -> bool:
+        """True while a direction is being recorded and frames are accepted."""
+        return self._current is not None
+
+    def set_enabled(self, enabled: bool) -> Dict[str, Any]:
+        """Enable or disable online analysis for subsequent sessions.
+
+        Args:
+            enabled: New enabled state
+
+        Returns:
+            Dict with success status
+        """
+        self.enabled = bool(enabled)
+        logger.info(f"Online analysis {'enabled' if self.enabled else 'disabled'}")
+        return {"success": True, "enabled": self.enabled}
+
+    def begin_session(self, session_path: str) -> None:
+        """Reset results and start the worker for a new recording session.
+
+        Args:
+            session_path: Session directory being recorded
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._session_path = session_path
+            self._current = None
+            self._direction_maps = {}
+
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._worker_loop, name="OnlineAnalysis", daemon=True
+            )
+            self._worker.start()
+
+        logger.info(f"Online analysis session started: {session_path}")
+
+    def start_direction(self, direction: str, period_sec: float) -> None:
+        """Start accumulating frames for a direction.
+
+        Args:
+            direction: Sweep direction ("LR", "RL", "TB", "BT")
+            period_sec: Stimulus period in seconds (one cycle including between-trial gap)
+        """
+        if not self.enabled or self._session_path is None:
+            return
+        if period_sec <= 0:
+            logger.warning(f"Online analysis skipped for {direction}: invalid period {period_sec}")
+            return
+
+        with self._lock:
+            self._current = _DirectionState(direction, period_sec, self._session_path)
+        self._queue.put(("start", self._current))
+        logger.info(f"Online analysis started for {direction} (period={period_sec:.2f}s)")
+
+    def add_frame(self, frame_gray: np.ndarray, timestamp_us: int) -> None:
+        """Queue a grayscale camera frame (called from the camera thread, never blocks).
+
+        Args:
+            frame_gray: [height, width] grayscale frame
+            timestamp_us: Capture timestamp in microseconds
+        """
+        state = self._current
+        if state is None:
+            return
+
+        try:
+            self._queue.put_nowait(("frame", (frame_gray.copy(), timestamp_us)))
+        except queue.Full:
+            state.frames_dropped += 1
+            if state.frames_dropped % 100 == 1:
+                logger.warning(
+                    f"Online analysis falling behind: {state.frames_dropped} frames dropped "
+                    f"for {state.direction} (recording unaffected)"
+                )
+
+    def finish_direction(self) -> None:
+        """Finish the current direction; final maps are computed on the worker."""
+        with self._lock:
+            state = self._current
+            self._current = None
+        if state is not None:
+            self._queue.put(("finish", state))
+
+    def end_session(self) -> None:
+        """Finish any open direction and stop accepting frames for this session."""
+        self.finish_direction()
+        with self._lock:
+            self._session_path = None
+
+    def get_direction_maps(self) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Return completed (phase, magnitude, coherence) maps keyed by direction."""
+        with self._lock:
+            return dict(self._direction_maps)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get online analysis status.
+
+        Returns:
+            Dict with status information
+        """
+        with self._lock:
+            current = self._current
+            return {
+                "success": True,
+                "enabled": self.enabled,
+                "session_path": self._session_path,
+                "current_direction": current.direction if current else None,
+                "completed_directions": list(self._direction_maps.keys()),
+                "queued_frames": self._queue.qsize(),
+            }
+
+    def cleanup(self) -> None:
+        """Stop the worker thread."""
+        self.end_session()
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(("stop", None))
+            self._worker.join(timeout=2.0)
+        logger.info("OnlineAnalysisEngine cleaned up")
+
+    # ========== WORKER THREAD ==========
+
+    def _worker_loop(self) -> None:
+        """Consume queued frames and update accumulators."""
+        state: Optional[_DirectionState] = None
+        frames = []
+        positions = []
+
+        def flush():
+            if state is None or not frames:
+                frames.clear()
+                positions.clear()
+                return
+            block = np.stack(frames)
+            if state.accumulator is None:
+                state.accumulator = StimulusFrequencyAccumulator.for_period(
+                    state.period_sec, block.shape[1:]
+                )
+            state.accumulator.add_frames(block, np.asarray(positions))
+            frames.clear()
+            positions.clear()
+
+        while True:
+            try:
+                kind, payload = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                flush()
+                continue
+
+            try:
+                if kind == "stop":
+                    return
+                elif kind == "start":
+                    flush()
+                    state = payload
+                elif kind == "frame" and state is not None:
+                    frame_gray, timestamp_us = payload
+                    if state.first_timestamp_us is None:
+                        state.first_timestamp_us = timestamp_us
+                    state.last_timestamp_us = timestamp_us
+                    frames.append(frame_gray)
+                    positions.append((timestamp_us - state.first_timestamp_us) / 1_000_000)
+
+                    if len(frames) >= self.block_frames:
+                        flush()
+                        now = time.time()
+                        if now - self._last_preview_time >= self.preview_interval_sec:
+                            self._last_preview_time = now
+                            self._publish_preview(state)
+                elif kind == "finish":
+                    flush()
+                    self._complete_direction(payload)
+                    if payload is state:
+                        state = None
+            except Exception as e:
+                # Online analysis is best-effort: never let it affect recording
+                logger.error(f"Online analysis error: {e}", exc_info=True)
+                frames.clear()
+                positions.clear()
+
+    def _compute_direction(self, state: _DirectionState) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Compute (phase, magnitude, coherence) for a direction from its accumulator."""
+        if state.accumulator is None or state.accumulator.frames_seen == 0:
+            return None
+        phase_map, magnitude_map, coherence_map = state.accumulator.compute_maps()
+        return self.pipeline.apply_phase_filter(phase_map), magnitude_map, coherence_map
+
+    def _complete_direction(self, state: _DirectionState) -> None:
+        """Store final maps for a direction and notify the frontend."""
+        if state.accumulator is None or state.accumulator.frames_seen == 0:
+            logger.warning(f"Online analysis: no frames accumulated for {state.direction}")
+            return
+        phase_map, magnitude_map, coherence_map = state.accumulator.compute_maps()
+        self._save_direction_maps(state, phase_map, magnitude_map, coherence_map)
+        maps = (self.pipeline.apply_phase_filter(phase_map), magnitude_map, coherence_map)
+
+        with self._lock:
+            self._direction_maps[state.direction] = maps
+
+        frames_seen = state.accumulator.frames_seen
+        logger.info(
+            f"Online analysis complete for {state.direction}: {frames_seen} frames "
+            f"({state.frames_dropped} dropped)"
+        )
+
+        self._send_layers(state, maps)
+        if self.ipc:
+            self.ipc.send_sync_message({
+                "type": "online_analysis_direction_complete",
+                "direction": state.direction,
+                "frames": frames_seen,
+                "frames_dropped": state.frames_dropped,
+                "completed_directions": list(self._direction_maps.keys()),
+                "session_path": state.session_path,
+                "timestamp": time.time(),
+            })
+
+    def _save_direction_maps(
+        self,
+        state: _DirectionState,
+        phase_map: np.ndarray,
+        magnitude_map: np.ndarray,
+        coherence_map: np.ndarray
+    ) -> None:
+        """Store a direction's unfiltered maps in the session's stage cache for offline analysis."""
+        key = online_stage_key(
+            state.direction, state.accumulator.frames_seen, state.first_timestamp_us, state.last_timestamp_us
+        )
+        StageCache(Path(state.session_path) / "analysis_results" / STAGE_CACHE_DIRNAME).store(
+            f"online_{state.direction}",
+            key,
+            {
+                "phase_map": phase_map,
+                "magnitude_map": magnitude_map,
+                "coherence_map": coherence_map,
+                "frames_seen": np.int64(state.accumulator.frames_seen),
+                "frames_dropped": np.int64(state.frames_dropped),
+                "period_sec": np.float64(state.period_sec),
+            },
+        )
+
+    def _publish_preview(self, state: _DirectionState) -> None:
+        """Send a progressively refined preview for the direction in progress."""
+        maps = self._compute_direction(state)
+        if maps is not None:
+            self._send_layers(state, maps)
+
+    def _send_layers(self, state: _DirectionState, maps: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+        """Render and send the direction's phase map plus any available retinotopy."""
+        direction = state.direction
+        phase_map, magnitude_map, _ = maps
+        self._send_preview_image(
+            f"phase_{direction}", self.renderer.render_phase_map(phase_map, magnitude_map), state.session_path
+        )
+
+        # Live retinotopy once both opposing directions exist (in-progress one included)
+        with self._lock:
+            phases = {d: m[0] for d, m in self._direction_maps.items()}
+        phases[direction] = phase_map
+
+        for layer_name, (forward, reverse) in _DIRECTION_PAIRS.items():
+            if forward in phases and reverse in phases and direction in (forward, reverse):
+                if layer_name == "azimuth_map":
+                    retinotopy = self.pipeline.generate_azimuth_map(phases[forward], phases[reverse])
+                    image = self.renderer.render_retinotopic_map(retinotopy, "azimuth")
+                else:
+                    retinotopy = self.pipeline.generate_elevation_map(phases[forward], phases[reverse])
+                    image = self.renderer.render_retinotopic_map(retinotopy, "elevation")
+                self._send_preview_image(layer_name, image, state.session_path)
+
+    def _send_preview_image(self, layer_name: str, image: np.ndarray, session_path: Optional[str]) -> None:
+        """Encode an RGB/RGBA image as PNG and send it as an online preview layer."""
+        if not self.ipc:
+            return
+        rgb_image = np.ascontiguousarray(image[:, :, :3])
+        png_bytes = self.renderer.encode_as_png(rgb_image)
+        if not png_bytes:
+            return
+        self.ipc.send_sync_message({
+            "type": "online_analysis_preview",
+            "layer_name": layer_name,
+            "image_base64": base64.b64encode(png_bytes).decode("utf-8"),
+            "width": rgb_image.shape[1],
+            "height": rgb_image.shape[0],
+            "format": "png",
+            "session_path": session_path,
+            "timestamp": time.time(),
+        })
@@ -11,12 +11,15 @@ All dependencies injected via constructor - NO service locator pattern.
 from __future__ import annotations
 
 import logging
-from typing import Dict, Tuple, Optional, Any
+from typing import Dict, Tuple, Optional, Any, Iterable, Callable
 import numpy as np
 from scipy import ndimage
-from scipy.fft import fft, fftfreq
+from functools import lru_cache
+from scipy.fft import fft, fftfreq, rfft2, irfft2
 
 from config import AnalysisConfig
+from .fourier import StimulusFrequencyAccumulator, DEFAULT_CHUNK_FRAMES
+from .stage_cache import StageCache, stage_key
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +73,71 @@ except ImportError:
 
 logger.info(f"ISI Analysis GPU Status: {DEVICE_NAME}, GPU Available: {GPU_AVAILABLE}")
 
+# Stage graph of run_from_phase_maps: stage -> (upstream stages, parameters it reads).
+# "fourier" is the per-direction phase/magnitude/coherence input computed by the caller.
+ANALYSIS_STAGES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "retinotopy": (("fourier",), ()),
+    "response_thresholds": (("fourier",), ("magnitude_threshold", "response_threshold_percent")),
+    "gradients": (("retinotopy",), ("smoothing_sigma",)),
+    "vfs": (("gradients", "fourier"), ("coherence_threshold", "vfs_threshold_sd")),
+    "boundaries": (("vfs",), ("boundary_skeletonize",)),
+    "areas": (("vfs", "boundaries"), ("ring_size_mm", "area_min_size_mm2")),
+}
+
+
+def _neighbour_code(image: np.ndarray) -> np.ndarray:
+    """8-neighbour bit code of the interior pixels of a padded boolean image.
+
+    Bits 0..7 are P2..P9 in Zhang-Suen order: N, NE, E, SE, S, SW, W, NW.
+    """
+    h, w = image.shape[0] - 2, image.shape[1] - 2
+    offsets = ((0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0), (1, 0), (0, 0))
+    code = np.zeros((h, w), dtype=np.uint8)
+    for bit, (dy, dx) in enumerate(offsets):
+        code |= image[dy:dy + h, dx:dx + w].astype(np.uint8) << bit
+    return code
+
+
+def _zhang_suen_luts() -> Tuple[np.ndarray, np.ndarray]:
+    """Deletion tables of the two Zhang-Suen sub-iterations, indexed by neighbour code."""
+    luts = (np.zeros(256, dtype=bool), np.zeros(256, dtype=bool))
+    for code in range(256):
+        p = [(code >> bit) & 1 for bit in range(8)]  # P2..P9
+        neighbours = sum(p)
+        transitions = sum(p[k] == 0 and p[(k + 1) % 8] == 1 for k in range(8))
+        if not (2 <= neighbours <= 6 and transitions == 1):
+            continue
+        p2, p4, p6, p8 = p[0], p[2], p[4], p[6]
+        luts[0][code] = p2 * p4 * p6 == 0 and p4 * p6 * p8 == 0
+        luts[1][code] = p2 * p4 * p8 == 0 and p2 * p6 * p8 == 0
+    return luts
+
+
+_ZHANG_SUEN_LUTS = _zhang_suen_luts()
+
+
+def _gaussian_kernel(shape: Tuple[int, int], sigma: float) -> np.ndarray:
+    """Full-image Gaussian centered at the image center (unnormalized)."""
+    y, x = np.ogrid[: shape[0], : shape[1]]
+    center_y, center_x = shape[0] // 2, shape[1] // 2
+    return np.exp(-((x - center_x) ** 2 + (y - center_y) ** 2) / (2 * sigma**2))
+
+
+# Cached Gaussian kernel spectra (1024x1024 float64 half-spectrum: ~4 MB each)
+KERNEL_SPECTRUM_CACHE_SIZE = 16
+
+
+@lru_cache(maxsize=KERNEL_SPECTRUM_CACHE_SIZE)
+def _gaussian_kernel_spectrum(shape: Tuple[int, int], sigma: float) -> np.ndarray:
+    """abs(rfft2(h)) of the normalized full-image Gaussian kernel (read-only, cached)."""
+    kernel = _gaussian_kernel(shape, sigma)
+    # Normalize kernel (MATLAB: h = h/sum(h(:)))
+    kernel /= kernel.sum()
+
+    spectrum = np.abs(rfft2(kernel))
+    spectrum.flags.writeable = False
+    return spectrum
+
 
 class AnalysisPipeline:
     """Fourier analysis pipeline for ISI data.
@@ -78,20 +146,42 @@ class AnalysisPipeline:
     All dependencies injected via constructor - NO service locator.
     """
 
-    def __init__(self, config: AnalysisConfig):
+    FFT_MODES = ("streaming", "fft")
+
+    def __init__(
+        self,
+        config: AnalysisConfig,
+        fft_mode: str = "streaming",
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES
+    ):
         """Initialize analysis pipeline.
 
         Args:
             config: Analysis configuration (FFT params, filtering)
+            fft_mode: "streaming" computes the stimulus-frequency bin with a
+                single-bin DFT over frame chunks (bounded memory, CPU);
+                "fft" runs a full FFT over the whole stack (GPU when available)
+            chunk_frames: Frames per chunk for streaming mode
+
+        Raises:
+            ValueError: If fft_mode or chunk_frames is invalid
         """
+        if fft_mode not in self.FFT_MODES:
+            raise ValueError(f"Invalid fft_mode: {fft_mode}. Must be one of {self.FFT_MODES}")
+        if chunk_frames <= 0:
+            raise ValueError(f"chunk_frames must be positive, got {chunk_frames}")
+
         self.config = config
         self.use_gpu = GPU_AVAILABLE
+        self.fft_mode = fft_mode
+        self.chunk_frames = chunk_frames
 
         # Log GPU status on initialization
         if self.use_gpu:
             logger.info(f"GPU acceleration enabled: {DEVICE_NAME}")
         else:
             logger.warning(f"GPU acceleration not available, using CPU: {DEVICE_NAME}")
+        logger.info(f"FFT mode: {self.fft_mode} (chunk_frames={self.chunk_frames})")
 
         # Log all 9 analysis parameters (Juavinett et al. 2017 + Kalatsky & Stryker 2003)
         logger.info("=" * 70)
@@ -105,6 +195,7 @@ class AnalysisPipeline:
         logger.info("  [7] smoothing_sigma: %.2f (position smoothing AFTER conversion)", self.config.smoothing_sigma)
         logger.info("  [8] vfs_threshold_sd: %.2f (statistical VFS threshold)", self.config.vfs_threshold_sd)
         logger.info("  [9] area_min_size_mm2: %.2f mm² (minimum area size)", self.config.area_min_size_mm2)
+        logger.info("  boundary_skeletonize: %s (single-pixel boundaries)", self.config.boundary_skeletonize)
         logger.info("=" * 70)
 
     # ========== FOURIER ANALYSIS (Kalatsky & Stryker Method) ==========
@@ -119,6 +210,11 @@ class AnalysisPipeline:
         Implements Kalatsky & Stryker 2003 Fourier method with optional phase filtering
         (Juavinett et al. 2017 - Gaussian smoothing before phase-to-position conversion).
 
+        In streaming mode (default) the stimulus-frequency bin is computed with a
+        single-bin DFT over chunks of frames, so only one chunk is converted to
+        float at a time and frames may be any array-like supporting slicing
+        (e.g. an h5py dataset). In fft mode the full spectrum is computed.
+
         Args:
             frames: [n_frames, height, width] grayscale data
             stimulus_frequency: Stimulus frequency in cycles per frame
@@ -128,7 +224,7 @@ class AnalysisPipeline:
             magnitude_map: [height, width] response amplitude
             coherence_map: [height, width] signal coherence (0-1)
         """
-        logger.info("Computing FFT phase maps...")
+        logger.info(f"Computing FFT phase maps ({self.fft_mode} mode)...")
 
         # Validate frame array shape
         if len(frames.shape) != 3:
@@ -137,6 +233,151 @@ class AnalysisPipeline:
                 f"If frames are RGB/BGR, convert to grayscale first."
             )
 
+        if self.fft_mode == "streaming":
+            phase_map, magnitude_map, coherence_map = self._compute_streaming_phase_maps(
+                frames, stimulus_frequency
+            )
+        else:
+            phase_map, magnitude_map, coherence_map = self._compute_full_fft_phase_maps(
+                frames, stimulus_frequency
+            )
+
+        return self.apply_phase_filter(phase_map), magnitude_map, coherence_map
+
+    def compute_phase_maps_from_chunks(
+        self,
+        chunks: Iterable[np.ndarray],
+        n_frames: int,
+        frame_shape: Tuple[int, int],
+        stimulus_frequency: float,
+        positions: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute phase, magnitude, and coherence from consecutive frame chunks.
+
+        Out-of-core counterpart of compute_fft_phase_maps: frames are consumed
+        chunk by chunk (e.g. read from HDF5) so peak memory scales with the chunk
+        size rather than the session length. Always uses the single-bin DFT.
+
+        Args:
+            chunks: Iterable of [n_chunk, height, width] grayscale frame blocks,
+                in time order, totalling n_frames frames
+            n_frames: Total number of frames across all chunks
+            frame_shape: (height, width) of each frame
+            stimulus_frequency: Stimulus frequency in cycles per frame, or in
+                cycles per position unit when positions are given
+            positions: Optional [n_frames] sample positions of the frames (e.g.
+                capture times, for recordings with gaps). The frequency is then
+                used exactly instead of snapping to a DFT bin.
+
+        Returns:
+            phase_map: [height, width] phase in radians (optionally filtered)
+            magnitude_map: [height, width] response amplitude
+            coherence_map: [height, width] signal coherence (0-1)
+
+        Raises:
+            ValueError: If the chunks do not add up to n_frames
+        """
+        logger.info("Computing FFT phase maps from frame chunks (streaming mode)...")
+        phase_map, magnitude_map, coherence_map = self._accumulate_phase_maps(
+            chunks, n_frames, frame_shape, stimulus_frequency, positions
+        )
+        return self.apply_phase_filter(phase_map), magnitude_map, coherence_map
+
+    def _compute_streaming_phase_maps(
+        self,
+        frames: np.ndarray,
+        stimulus_frequency: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute phase, magnitude, and coherence with a single-bin DFT over chunks.
+
+        Args:
+            frames: [n_frames, height, width] array-like supporting slicing
+            stimulus_frequency: Stimulus frequency in cycles per frame
+
+        Returns:
+            Tuple of (phase_map, magnitude_map, coherence_map), unfiltered
+        """
+        n_frames, height, width = frames.shape
+        chunks = (
+            np.asarray(frames[start:start + self.chunk_frames])
+            for start in range(0, n_frames, self.chunk_frames)
+        )
+        return self._accumulate_phase_maps(chunks, n_frames, (height, width), stimulus_frequency)
+
+    def _accumulate_phase_maps(
+        self,
+        chunks: Iterable[np.ndarray],
+        n_frames: int,
+        frame_shape: Tuple[int, int],
+        stimulus_frequency: float,
+        positions: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Feed frame chunks through a StimulusFrequencyAccumulator.
+
+        Args:
+            chunks: Iterable of [n_chunk, height, width] frame blocks in time order
+            n_frames: Total number of frames across all chunks
+            frame_shape: (height, width) of each frame
+            stimulus_frequency: Stimulus frequency in cycles per frame (per
+                position unit when positions are given)
+            positions: Optional [n_frames] sample positions of the frames
+
+        Returns:
+            Tuple of (phase_map, magnitude_map, coherence_map), unfiltered
+
+        Raises:
+            ValueError: If the chunks do not add up to n_frames
+        """
+        height, width = frame_shape
+        if positions is None:
+            accumulator = StimulusFrequencyAccumulator(n_frames, (height, width), stimulus_frequency)
+            logger.info(f"  Stimulus frequency: {stimulus_frequency:.4f} cycles/frame")
+            logger.info(
+                f"  Streaming {n_frames} frames of {height}x{width} pixels "
+                f"(frequency index {accumulator.freq_idx})..."
+            )
+        else:
+            if len(positions) != n_frames:
+                raise ValueError(f"Expected {n_frames} positions, got {len(positions)}")
+            # Open-ended: the exact frequency at irregular positions, as in online analysis
+            accumulator = StimulusFrequencyAccumulator(None, (height, width), stimulus_frequency)
+            logger.info(
+                f"  Streaming {n_frames} frames of {height}x{width} pixels at given positions "
+                f"(frequency {stimulus_frequency:.4f} cycles/unit)..."
+            )
+
+        for chunk in chunks:
+            if positions is None:
+                accumulator.add_frames(chunk)
+            else:
+                start = accumulator.frames_seen
+                if start + len(chunk) > n_frames:
+                    raise ValueError(f"Expected {n_frames} frames, received {start + len(chunk)}")
+                accumulator.add_frames(chunk, positions[start:start + len(chunk)])
+
+        if accumulator.frames_seen != n_frames:
+            raise ValueError(
+                f"Expected {n_frames} frames, received {accumulator.frames_seen}"
+            )
+
+        phase_map, magnitude_map, coherence_map = accumulator.compute_maps()
+        logger.info("  Phase/magnitude/coherence maps computed (streaming single-bin DFT)")
+        return phase_map, magnitude_map, coherence_map
+
+    def _compute_full_fft_phase_maps(
+        self,
+        frames: np.ndarray,
+        stimulus_frequency: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute phase, magnitude, and coherence from a full FFT of every pixel.
+
+        Args:
+            frames: [n_frames, height, width] grayscale data
+            stimulus_frequency: Stimulus frequency in cycles per frame
+
+        Returns:
+            Tuple of (phase_map, magnitude_map, coherence_map), unfiltered
+        """
         # Convert frames to float for processing
         frames_float = frames.astype(np.float32)
         n_frames, height, width = frames_float.shape
@@ -236,6 +477,37 @@ class AnalysisPipeline:
 
             logger.info("  Phase/magnitude/coherence maps computed (CPU vectorized)")
 
+        return phase_map, magnitude_map, coherence_map
+
+    def estimate_phase_map_memory(self, n_frames: int, frame_shape: Tuple[int, int]) -> int:
+        """Estimate peak working memory of one phase-map computation.
+
+        Used to decide how many directions can be reduced concurrently.
+
+        Args:
+            n_frames: Number of frames in the direction
+            frame_shape: (height, width) of each frame
+
+        Returns:
+            Approximate peak bytes
+        """
+        n_pixels = int(frame_shape[0]) * int(frame_shape[1])
+        if self.fft_mode == "streaming":
+            # uint8 block + float32 chunk + float64 accumulators and outputs
+            block_frames = min(self.chunk_frames, n_frames)
+            return block_frames * n_pixels * 5 + n_pixels * 64
+        # uint8 stack + float32 copy + centered float32 + complex64/128 spectrum
+        return n_frames * n_pixels * 25
+
+    def apply_phase_filter(self, phase_map: np.ndarray) -> np.ndarray:
+        """Apply optional Gaussian phase filtering (phase_filter_sigma).
+
+        Args:
+            phase_map: [height, width] phase in radians
+
+        Returns:
+            Filtered phase map (unchanged if phase_filter_sigma is 0)
+        """
         # PARAMETER 2: Apply phase filtering BEFORE conversion to retinotopy (Juavinett et al. 2017)
         # This smooths the phase maps to reduce noise before converting to azimuth/elevation
         if self.config.phase_filter_sigma > 0:
@@ -244,7 +516,7 @@ class AnalysisPipeline:
             phase_map = gaussian_filter(phase_map, sigma=self.config.phase_filter_sigma)
             logger.info(f"  Phase map smoothed (different from smoothing_sigma={self.config.smoothing_sigma} which applies AFTER conversion)")
 
-        return phase_map, magnitude_map, coherence_map
+        return phase_map
 
     def bidirectional_analysis(
         self,
@@ -345,13 +617,7 @@ class AnalysisPipeline:
         Returns:
             Gaussian kernel with same shape as input image
         """
-        y, x = np.ogrid[: shape[0], : shape[1]]
-        center_y, center_x = shape[0] // 2, shape[1] // 2
-
-        # Create Gaussian centered at image center
-        kernel = np.exp(-((x - center_x) ** 2 + (y - center_y) ** 2) / (2 * sigma**2))
-
-        return kernel
+        return _gaussian_kernel(shape, sigma)
 
     def _apply_fft_gaussian_smoothing(self, data: np.ndarray, sigma: float) -> np.ndarray:
         """Apply Gaussian smoothing using FFT (frequency-domain convolution).
@@ -361,30 +627,27 @@ class AnalysisPipeline:
         2. Normalize kernel: h = h / sum(h(:))
         3. FFT convolution: smoothed = real(ifft2(fft2(data) .* abs(fft2(h))))
 
+        abs(fft2(h)) is real and symmetric, so the same result is computed with
+        real-input transforms (rfft2/irfft2) and the kernel spectrum is cached
+        per (shape, sigma). A stack of maps is smoothed in one transform.
+
         FFT-based filtering has different behavior than spatial-domain filtering:
         - Wraps at boundaries (circular convolution)
         - Uses full-image kernel (not truncated)
         - Better for periodic structures
 
         Args:
-            data: Input 2D array to smooth
+            data: Input 2D array to smooth, or [..., H, W] stack of maps
             sigma: Gaussian standard deviation
 
         Returns:
             Smoothed data (same shape as input)
         """
-        # Create Gaussian kernel matching image size
-        h = self._create_gaussian_kernel(data.shape, sigma)
-
-        # Normalize kernel (MATLAB: h = h/sum(h(:)))
-        h = h / np.sum(h)
-
-        # FFT-based convolution (MATLAB: ifft2(fft2(data).*abs(fft2(h))))
-        smoothed = np.real(
-            np.fft.ifft2(np.fft.fft2(data) * np.abs(np.fft.fft2(h)))
-        )
+        shape = data.shape[-2:]
+        kernel_spectrum = _gaussian_kernel_spectrum(shape, float(sigma))
 
-        return smoothed
+        # MATLAB: real(ifft2(fft2(data).*abs(fft2(h)))) over the last two axes
+        return irfft2(rfft2(data) * kernel_spectrum, s=shape)
 
     def compute_spatial_gradients(
         self,
@@ -411,8 +674,9 @@ class AnalysisPipeline:
 
         if sigma > 0:
             logger.info(f"  Applying FFT-based Gaussian smoothing (sigma={sigma}) to retinotopic maps...")
-            azimuth_smooth = self._apply_fft_gaussian_smoothing(azimuth_map, sigma)
-            elevation_smooth = self._apply_fft_gaussian_smoothing(elevation_map, sigma)
+            azimuth_smooth, elevation_smooth = self._apply_fft_gaussian_smoothing(
+                np.stack((azimuth_map, elevation_map)), sigma
+            )
         else:
             logger.info("  Skipping retinotopic map smoothing (sigma=0)")
             azimuth_smooth = azimuth_map
@@ -507,59 +771,41 @@ class AnalysisPipeline:
             logger.info("  VFS post-smoothing disabled (sigma=0)")
             return vfs.astype(np.float32)
 
-    def _thin_boundaries_fast(self, binary_image: np.ndarray) -> np.ndarray:
-        """Fast boundary thinning using morphological operations.
+    def _skeletonize_boundaries(self, binary_image: np.ndarray) -> np.ndarray:
+        """Thin boundaries to single-pixel lines (Zhang-Suen skeletonization).
 
-        Uses scipy's binary_hit_or_miss and erosion for efficient thinning.
-        This is much faster than pixel-by-pixel iteration.
+        Each sub-iteration computes the 8-neighbour code of every pixel from
+        shifted arrays and looks up the deletion rule in a precomputed table,
+        so a pass costs a handful of whole-array operations.
 
         Args:
             binary_image: Binary boundary map (0 or 1)
 
         Returns:
-            Thinned boundary map (single-pixel wide)
+            Skeletonized boundary map (uint8, single-pixel wide)
         """
-        from scipy.ndimage import binary_hit_or_miss, binary_erosion
-
-        original_count = np.sum(binary_image > 0)
-        image = binary_image.astype(bool).copy()
-
-        # Simple morphological thinning: iteratively remove pixels that don't break connectivity
-        # Use hit-or-miss transforms with thinning structure elements
-        changed = True
-        max_iterations = 10
-        iteration = 0
-
-        while changed and iteration < max_iterations:
-            changed = False
-            iteration += 1
-            prev_count = np.sum(image)
-
-            # Apply thinning: remove pixels that have neighbors on opposite sides
-            # This creates single-pixel wide lines
-
-            # Horizontal thinning: remove middle pixels in horizontal triplets
-            h_struct = np.array([[0, 0, 0],
-                                [1, 1, 1],
-                                [0, 0, 0]], dtype=bool)
-            h_thin = binary_hit_or_miss(image, structure1=h_struct)
-            image[h_thin] = False
-
-            # Vertical thinning: remove middle pixels in vertical triplets
-            v_struct = np.array([[0, 1, 0],
-                                [0, 1, 0],
-                                [0, 1, 0]], dtype=bool)
-            v_thin = binary_hit_or_miss(image, structure1=v_struct)
-            image[v_thin] = False
-
-            curr_count = np.sum(image)
-            if curr_count < prev_count:
-                changed = True
-                logger.info(f"    Iteration {iteration}: removed {prev_count - curr_count} pixels")
-
-        thinned_count = np.sum(image)
+        image = np.pad(binary_image.astype(bool), 1)
+        original_count = int(np.count_nonzero(image))
+
+        iterations = 0
+        while True:
+            iterations += 1
+            removed = 0
+            for delete_lut in _ZHANG_SUEN_LUTS:
+                code = _neighbour_code(image)
+                delete = image[1:-1, 1:-1] & delete_lut[code]
+                removed += int(np.count_nonzero(delete))
+                image[1:-1, 1:-1] &= ~delete
+            if removed == 0:
+                break
+
+        image = image[1:-1, 1:-1]
+        thinned_count = int(np.count_nonzero(image))
         reduction_pct = 100 * (original_count - thinned_count) / original_count if original_count > 0 else 0
-        logger.info(f"    Thinning reduced boundaries from {original_count} to {thinned_count} pixels ({reduction_pct:.1f}% reduction)")
+        logger.info(
+            f"    Skeletonization reduced boundaries from {original_count} to {thinned_count} pixels "
+            f"({reduction_pct:.1f}% reduction, {iterations} passes)"
+        )
 
         return image.astype(np.uint8)
 
@@ -573,59 +819,38 @@ class AnalysisPipeline:
             sign_map: Visual field sign map (continuous values in [-1, 1])
 
         Returns:
-            boundary_map: Binary map of area boundaries (single-pixel thin)
+            boundary_map: Binary map of area boundaries (skeletonized to single
+                pixels when config.boundary_skeletonize is enabled)
         """
         logger.info("Detecting area boundaries (continuous VFS)...")
 
         # Apply median filter to reduce noise (size=3 preserves sharp boundaries better)
         sign_filtered = ndimage.median_filter(sign_map, size=3)
 
-        # Find boundaries using sign changes
-        boundary_map = np.zeros_like(sign_filtered, dtype=np.float32)
-
         # For continuous values, detect sign reversals by checking where
         # the product of neighboring pixels is negative (sign change)
         # Ignore pixels near zero (undefined regions)
         threshold = 0.1  # Minimum absolute value to consider as defined
+        defined = np.abs(sign_filtered) > threshold
 
-        # Horizontal boundaries: check where sign changes horizontally
-        for i in range(sign_filtered.shape[1] - 1):
-            left_col = sign_filtered[:, i]
-            right_col = sign_filtered[:, i + 1]
-
-            # Both pixels must be significantly non-zero
-            both_defined = (np.abs(left_col) > threshold) & (np.abs(right_col) > threshold)
-
-            # Product is negative when sign changes
-            sign_change = (left_col * right_col) < 0
-
-            # Mark boundary on the left pixel
-            boundary_map[:, i] += (both_defined & sign_change).astype(np.float32)
-
-        # Vertical boundaries: check where sign changes vertically
-        for i in range(sign_filtered.shape[0] - 1):
-            top_row = sign_filtered[i, :]
-            bottom_row = sign_filtered[i + 1, :]
+        boundary_map = np.zeros(sign_filtered.shape, dtype=bool)
 
-            # Both pixels must be significantly non-zero
-            both_defined = (np.abs(top_row) > threshold) & (np.abs(bottom_row) > threshold)
-
-            # Product is negative when sign changes
-            sign_change = (top_row * bottom_row) < 0
-
-            # Mark boundary on the top pixel
-            boundary_map[i, :] += (both_defined & sign_change).astype(np.float32)
+        # Horizontal boundaries: compare each column with its right neighbour,
+        # mark the left pixel
+        boundary_map[:, :-1] |= (
+            defined[:, :-1] & defined[:, 1:] & ((sign_filtered[:, :-1] * sign_filtered[:, 1:]) < 0)
+        )
 
-        # Convert to binary
-        boundary_map = (boundary_map > 0).astype(np.uint8)
+        # Vertical boundaries: compare each row with the row below, mark the top pixel
+        boundary_map[:-1, :] |= (
+            defined[:-1, :] & defined[1:, :] & ((sign_filtered[:-1, :] * sign_filtered[1:, :]) < 0)
+        )
 
-        # TEMPORARILY DISABLED: Thinning was causing timeouts
-        # The diff-based detection produces reasonably thin boundaries
-        # TODO: Re-enable with a faster algorithm
-        # logger.info("  Applying skeletonization to ensure single-pixel boundaries...")
-        # boundary_map = self._thin_boundaries_fast(boundary_map)
+        if self.config.boundary_skeletonize:
+            logger.info("  Applying skeletonization to ensure single-pixel boundaries...")
+            return self._skeletonize_boundaries(boundary_map)
 
-        return boundary_map
+        return boundary_map.astype(np.uint8)
 
     def segment_visual_areas(
         self,
@@ -641,7 +866,7 @@ class AnalysisPipeline:
             image_width_pixels: Width of image in pixels (for spatial calibration)
 
         Returns:
-            area_map: Labeled map of visual areas
+            area_map: Labeled map of visual areas (labels 1..n_areas, 0 = none)
         """
         logger.info("Segmenting visual areas...")
 
@@ -673,60 +898,31 @@ class AnalysisPipeline:
         area_map[pos_mask] = pos_labels[pos_mask]
         area_map[neg_mask] = neg_labels[neg_mask] + pos_num
 
-        # Filter out small areas
-        for label in range(1, pos_num + neg_num + 1):
-            area_size = np.sum(area_map == label)
-            if area_size < min_area_size_pixels:
-                area_map[area_map == label] = 0
+        # Filter out small areas and relabel the rest consecutively (one pass)
+        area_sizes = np.bincount(area_map.ravel(), minlength=pos_num + neg_num + 1)
+        keep = area_sizes >= min_area_size_pixels
+        keep[0] = False
+        relabel = np.zeros(area_sizes.shape, dtype=np.int32)
+        relabel[keep] = np.arange(1, np.count_nonzero(keep) + 1, dtype=np.int32)
+        area_map = relabel[area_map]
 
-        logger.info(f"  Found {np.max(area_map)} visual areas (after filtering areas < {min_area_size_pixels} pixels)")
+        logger.info(f"  Found {np.count_nonzero(keep)} visual areas (after filtering areas < {min_area_size_pixels} pixels)")
         return area_map
 
-    # ========== HIGH-LEVEL PIPELINE ORCHESTRATION ==========
-
-    def run_from_phase_maps(
-        self,
-        phase_data: Dict[str, np.ndarray],
-        magnitude_data: Dict[str, np.ndarray],
-        coherence_data: Optional[Dict[str, np.ndarray]] = None,
-        anatomical: Optional[np.ndarray] = None
-    ) -> Dict[str, np.ndarray]:
-        """Run analysis pipeline starting from phase/magnitude maps.
+    # ========== ANALYSIS STAGES (see ANALYSIS_STAGES) ==========
 
-        This allows processing data that has already undergone Fourier analysis
-        (e.g., pre-computed sample data or externally processed data).
-
-        Args:
-            phase_data: Dict with keys 'LR', 'RL', 'TB', 'BT' containing phase maps
-            magnitude_data: Dict with keys 'LR', 'RL', 'TB', 'BT' containing magnitude maps
-            coherence_data: Optional dict with keys 'LR', 'RL', 'TB', 'BT' containing coherence maps
-            anatomical: Optional anatomical reference image
-
-        Returns:
-            Dictionary containing:
-                - azimuth_map: Horizontal retinotopy
-                - elevation_map: Vertical retinotopy
-                - sign_map: Visual field sign
-                - boundary_map: Area boundaries
-                - anatomical: Anatomical reference (if provided)
-        """
-        logger.info("=" * 70)
-        logger.info("Running analysis from phase/magnitude maps...")
-        logger.info("=" * 70)
-
-        results = {}
-
-        # Step 1: Generate retinotopic maps
-        logger.info("\n[1/3] Generating retinotopic maps...")
+    def _retinotopy_stage(self, phase_data: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Azimuth and elevation maps from the four phase maps."""
         azimuth_map = self.generate_azimuth_map(phase_data['LR'], phase_data['RL'])
         elevation_map = self.generate_elevation_map(phase_data['TB'], phase_data['BT'])
 
-        results['azimuth_map'] = azimuth_map
-        results['elevation_map'] = elevation_map
-
         logger.info(f"  Azimuth range: [{np.nanmin(azimuth_map):.1f}°, {np.nanmax(azimuth_map):.1f}°]")
         logger.info(f"  Elevation range: [{np.nanmin(elevation_map):.1f}°, {np.nanmax(elevation_map):.1f}°]")
 
+        return {'azimuth_map': azimuth_map, 'elevation_map': elevation_map}
+
+    def _response_threshold_stage(self, magnitude_data: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """Per-direction magnitude and percentile thresholded response maps."""
         # PARAMETER 3: Apply magnitude threshold to per-direction maps (Juavinett et al. 2017)
         # Threshold individual magnitude maps (LR, RL, TB, BT separately)
         # Do NOT average magnitudes across directions (that was previous error)
@@ -744,8 +940,6 @@ class AnalysisPipeline:
                 total = mag_map.size
                 logger.info(f"  {direction}: {num_above}/{total} pixels ({100*num_above/total:.1f}%) above threshold")
 
-        results['magnitude_thresholded'] = magnitude_thresholded
-
         # PARAMETER 5: Apply percentile-based threshold (alternative method, Juavinett et al. 2017)
         logger.info(f"\n[1.6/3] Applying percentile-based thresholding...")
         logger.info(f"  Response threshold percentile: {self.config.response_threshold_percent}")
@@ -765,16 +959,20 @@ class AnalysisPipeline:
                     total = mag_map.size
                     logger.info(f"  {direction}: percentile value={percentile_val:.3f}, {num_above}/{total} pixels ({100*num_above/total:.1f}%) above")
 
-        results['percentile_thresholded'] = percentile_thresholded
+        return {
+            'magnitude_thresholded': magnitude_thresholded,
+            'percentile_thresholded': percentile_thresholded,
+        }
 
-        # Step 2: Compute visual field sign
-        logger.info("\n[2/3] Computing visual field sign...")
-        gradients = self.compute_spatial_gradients(azimuth_map, elevation_map)
+    def _vfs_stage(
+        self,
+        gradients: Dict[str, np.ndarray],
+        magnitude_data: Dict[str, np.ndarray],
+        coherence_data: Optional[Dict[str, np.ndarray]]
+    ) -> Dict[str, Optional[np.ndarray]]:
+        """Raw VFS and its coherence, magnitude and statistical thresholded variants."""
         raw_sign_map = self.calculate_visual_field_sign(gradients)
 
-        # Save raw VFS map (before thresholding) - keep as float32 for continuous visualization
-        results['raw_vfs_map'] = raw_sign_map
-
         # PRIMARY METHOD: Coherence-based thresholding (Kalatsky & Stryker 2003)
         # This is the literature-standard approach: threshold by signal reliability
         coherence_vfs_map = None
@@ -793,7 +991,6 @@ class AnalysisPipeline:
             # Threshold VFS by coherence (literature-standard method)
             coherence_vfs_map = raw_sign_map.copy()
             coherence_vfs_map[min_coherence < self.config.coherence_threshold] = 0
-            results['coherence_vfs_map'] = coherence_vfs_map
 
             num_positive_coh = np.sum(coherence_vfs_map > 0)
             num_negative_coh = np.sum(coherence_vfs_map < 0)
@@ -810,7 +1007,6 @@ class AnalysisPipeline:
 
         magnitude_thresholded_vfs = raw_sign_map.copy()
         magnitude_thresholded_vfs[avg_magnitude < magnitude_threshold] = 0
-        results['magnitude_vfs_map'] = magnitude_thresholded_vfs
 
         num_positive = np.sum(magnitude_thresholded_vfs > 0)
         num_negative = np.sum(magnitude_thresholded_vfs < 0)
@@ -835,7 +1031,6 @@ class AnalysisPipeline:
             statistical_thresholded_vfs = coherence_vfs_map.copy()
             # Threshold by absolute VFS value (must be significantly non-zero)
             statistical_thresholded_vfs[np.abs(coherence_vfs_map) < statistical_threshold] = 0
-            results['statistical_vfs_map'] = statistical_thresholded_vfs
 
             num_positive_stat = np.sum(statistical_thresholded_vfs > 0)
             num_negative_stat = np.sum(statistical_thresholded_vfs < 0)
@@ -854,7 +1049,6 @@ class AnalysisPipeline:
 
             statistical_thresholded_vfs = raw_sign_map.copy()
             statistical_thresholded_vfs[np.abs(raw_sign_map) < statistical_threshold] = 0
-            results['statistical_vfs_map'] = statistical_thresholded_vfs
 
             num_positive_stat = np.sum(statistical_thresholded_vfs > 0)
             num_negative_stat = np.sum(statistical_thresholded_vfs < 0)
@@ -864,24 +1058,137 @@ class AnalysisPipeline:
             logger.info(f"  Statistical-thresholded VFS - Negative: {num_negative_stat} ({100*num_negative_stat/total:.1f}%)")
             logger.info(f"  Statistical-thresholded VFS - Masked: {num_undefined_stat} ({100*num_undefined_stat/total:.1f}%)")
 
+        # Raw VFS map (before thresholding) - keep as float32 for continuous visualization
+        return {
+            'raw_vfs_map': raw_sign_map,
+            'coherence_vfs_map': coherence_vfs_map,
+            'magnitude_vfs_map': magnitude_thresholded_vfs,
+            'statistical_vfs_map': statistical_thresholded_vfs,
+        }
+
+    def _boundary_sign_map(self, results: Dict[str, Any]) -> np.ndarray:
+        """VFS variant used for boundaries and areas (coherence, else magnitude)."""
+        coherence_vfs_map = results.get('coherence_vfs_map')
+        return coherence_vfs_map if coherence_vfs_map is not None else results['magnitude_vfs_map']
+
+    def _boundary_stage(self, results: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Area boundaries of the thresholded VFS."""
         # Use coherence-thresholded version for boundary detection (literature standard)
         # Fall back to magnitude if coherence not available
-        if coherence_vfs_map is not None:
-            thresholded_sign_map = coherence_vfs_map
+        thresholded_sign_map = self._boundary_sign_map(results)
+        if results.get('coherence_vfs_map') is not None:
             logger.info("  Using coherence-thresholded VFS for boundary detection (PRIMARY METHOD)")
         else:
-            thresholded_sign_map = magnitude_thresholded_vfs
             logger.info("  Using magnitude-thresholded VFS for boundary detection (fallback - coherence unavailable)")
 
-        # Step 3: Detect boundaries
-        logger.info("\n[3/3] Detecting area boundaries...")
         boundary_map = self.detect_area_boundaries(thresholded_sign_map)
 
         num_boundary_pixels = np.sum(boundary_map > 0)
         boundary_percentage = 100 * num_boundary_pixels / boundary_map.size
         logger.info(f"  Boundary pixels: {num_boundary_pixels} ({boundary_percentage:.1f}%)")
 
-        results['boundary_map'] = boundary_map
+        return {'boundary_map': boundary_map}
+
+    # ========== HIGH-LEVEL PIPELINE ORCHESTRATION ==========
+
+    def stage_parameters(self, stage: str) -> Dict[str, Any]:
+        """Parameter values a stage of ANALYSIS_STAGES reads (part of its cache key)."""
+        _, parameter_names = ANALYSIS_STAGES[stage]
+        return {
+            name: getattr(self.config, name)
+            for name in parameter_names
+        }
+
+    def run_from_phase_maps(
+        self,
+        phase_data: Dict[str, np.ndarray],
+        magnitude_data: Dict[str, np.ndarray],
+        coherence_data: Optional[Dict[str, np.ndarray]] = None,
+        anatomical: Optional[np.ndarray] = None,
+        stage_cache: Optional[StageCache] = None,
+        source_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run analysis pipeline starting from phase/magnitude maps.
+
+        This allows processing data that has already undergone Fourier analysis
+        (e.g., pre-computed sample data or externally processed data).
+
+        Stages run in ANALYSIS_STAGES order. When stage_cache and source_key
+        (identity of the phase/magnitude/coherence inputs) are given, a stage
+        whose key is cached is loaded instead of recomputed, so only the stages
+        downstream of a changed parameter run again.
+
+        Args:
+            phase_data: Dict with keys 'LR', 'RL', 'TB', 'BT' containing phase maps
+            magnitude_data: Dict with keys 'LR', 'RL', 'TB', 'BT' containing magnitude maps
+            coherence_data: Optional dict with keys 'LR', 'RL', 'TB', 'BT' containing coherence maps
+            anatomical: Optional anatomical reference image
+            stage_cache: Optional session-local stage cache
+            source_key: Cache key of the Fourier inputs (caching is off if None)
+
+        Returns:
+            Dictionary containing:
+                - azimuth_map: Horizontal retinotopy
+                - elevation_map: Vertical retinotopy
+                - magnitude_thresholded / percentile_thresholded: Per-direction response maps
+                - gradients: Spatial gradients of the smoothed retinotopic maps
+                - raw_vfs_map / coherence_vfs_map / magnitude_vfs_map / statistical_vfs_map:
+                  Visual field sign variants
+                - boundary_map: Area boundaries
+                - area_map: Labeled visual areas
+                - anatomical: Anatomical reference (if provided)
+        """
+        logger.info("=" * 70)
+        logger.info("Running analysis from phase/magnitude maps...")
+        logger.info("=" * 70)
+
+        results: Dict[str, Any] = {}
+        keys: Dict[str, Optional[str]] = {"fourier": source_key}
+        use_cache = stage_cache is not None and source_key is not None
+
+        def run_stage(stage: str, compute: Callable[[], Dict[str, Any]]) -> None:
+            key = None
+            if use_cache:
+                upstream, _ = ANALYSIS_STAGES[stage]
+                key = stage_key(stage, self.stage_parameters(stage), [keys[name] for name in upstream])
+                cached = stage_cache.load(stage, key)
+                if cached is not None:
+                    logger.info(f"  Stage '{stage}' loaded from cache")
+                    keys[stage] = key
+                    results.update(cached)
+                    return
+
+            outputs = compute()
+            if use_cache:
+                stage_cache.store(stage, key, outputs)
+            keys[stage] = key
+            results.update(outputs)
+
+        # Step 1: Generate retinotopic maps
+        logger.info("\n[1/3] Generating retinotopic maps...")
+        run_stage("retinotopy", lambda: self._retinotopy_stage(phase_data))
+        run_stage("response_thresholds", lambda: self._response_threshold_stage(magnitude_data))
+
+        # Step 2: Compute visual field sign
+        logger.info("\n[2/3] Computing visual field sign...")
+        run_stage("gradients", lambda: {
+            'gradients': self.compute_spatial_gradients(results['azimuth_map'], results['elevation_map'])
+        })
+        run_stage("vfs", lambda: self._vfs_stage(results['gradients'], magnitude_data, coherence_data))
+
+        # Step 3: Detect boundaries and segment areas
+        logger.info("\n[3/3] Detecting area boundaries...")
+        run_stage("boundaries", lambda: self._boundary_stage(results))
+        run_stage("areas", lambda: {
+            'area_map': self.segment_visual_areas(
+                self._boundary_sign_map(results),
+                results['boundary_map'],
+                results['azimuth_map'].shape[1]
+            )
+        })
+
+        if use_cache:
+            logger.info(f"  Stage cache: {stage_cache.hits} hits, {stage_cache.misses} misses")
 
         # Add anatomical if provided
         if anatomical is not None:
@@ -0,0 +1,195 @@
+"""Session-local cache of analysis stage results.
+
+Analysis runs as a chain of stages (per-direction Fourier -> retinotopy ->
+gradients -> VFS variants -> boundaries -> areas). Each stage's key is a hash
+of the stage name, the parameters the stage actually reads and the keys of the
+stages it consumes, so a key changes exactly when the stage's inputs or its
+own parameters change. The chain starts at the source key (the identity of the
+recorded files), which makes every key content-addressed without hashing map
+data.
+
+Results are stored per session as ``{stage}-{key}.npz`` under
+``analysis_results/stage_cache``. Each stage keeps its
+STAGE_CACHE_ENTRIES_PER_STAGE most recently used entries (file mtime, which a
+hit refreshes), so switching a parameter back and forth between a few values
+stays cached. Re-analysis after changing, say, vfs_threshold_sd finds the
+Fourier, retinotopy and gradient stages in the cache and recomputes only the
+VFS, boundary and area stages.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when a stage's algorithm changes so existing cache entries are ignored
+STAGE_CACHE_VERSION = 1
+
+STAGE_CACHE_DIRNAME = "stage_cache"
+
+# Entries kept per stage (least recently used beyond this are deleted)
+STAGE_CACHE_ENTRIES_PER_STAGE = 4
+
+# Separator for flattening one level of nested dicts (e.g. gradients, per-direction maps)
+_NESTED_SEPARATOR = "/"
+
+
+def stage_key(stage: str, parameters: Dict[str, Any], upstream_keys: Iterable[Optional[str]]) -> str:
+    """Cache key of a stage from its parameters and upstream stage keys.
+
+    Args:
+        stage: Stage name
+        parameters: Parameter values the stage reads (JSON-serializable)
+        upstream_keys: Keys of the stages whose outputs it consumes
+
+    Returns:
+        Hex digest identifying the stage result
+    """
+    payload = json.dumps(
+        {
+            "version": STAGE_CACHE_VERSION,
+            "stage": stage,
+            "parameters": parameters,
+            "upstream": list(upstream_keys),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def file_signature(path: Path) -> Optional[Dict[str, Any]]:
+    """Identity of a file for source keys (name, size, mtime), None if missing."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return {"name": path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class StageCache:
+    """Persisted stage outputs of one session (a few recent entries per stage)."""
+
+    def __init__(self, cache_dir: Path, entries_per_stage: int = STAGE_CACHE_ENTRIES_PER_STAGE):
+        """Create a cache rooted at cache_dir (created on first store).
+
+        Args:
+            cache_dir: Session-local cache directory
+            entries_per_stage: Most recently used entries kept per stage (>= 1)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.entries_per_stage = max(1, int(entries_per_stage))
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        """Outputs stored for stage under key, or None on a miss.
+
+        Args:
+            stage: Stage name
+            key: Stage key from stage_key()
+
+        Returns:
+            Dict of stage outputs (arrays, or dicts of arrays)
+        """
+        path = self._entry_path(stage, key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                outputs: Dict[str, Any] = {}
+                for name in data.files:
+                    if _NESTED_SEPARATOR in name:
+                        group, member = name.split(_NESTED_SEPARATOR, 1)
+                        outputs.setdefault(group, {})[member] = data[name]
+                    else:
+                        outputs[name] = data[name]
+        except Exception as e:
+            logger.warning(f"Discarding unreadable stage cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        _mark_used(path)  # store() evicts other entries first
+
+        self.hits += 1
+        return outputs
+
+    def store(self, stage: str, key: str, outputs: Dict[str, Any]) -> None:
+        """Persist a stage's outputs, evicting its least recently used entries.
+
+        None outputs are skipped (they load back as missing keys). Failures are
+        logged and ignored - the cache is an optimization, not a result store.
+
+        Args:
+            stage: Stage name
+            key: Stage key from stage_key()
+            outputs: Arrays, or one level of dicts of arrays
+        """
+        arrays: Dict[str, np.ndarray] = {}
+        for name, value in outputs.items():
+            if isinstance(value, dict):
+                for member, member_value in value.items():
+                    if member_value is not None:
+                        arrays[f"{name}{_NESTED_SEPARATOR}{member}"] = np.asarray(member_value)
+            elif value is not None:
+                arrays[name] = np.asarray(value)
+
+        path = self._entry_path(stage, key)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+            _mark_used(path)
+        except Exception as e:
+            logger.warning(f"Failed to cache stage {stage}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        # Keep this entry and the most recently used others of the stage
+        others = []
+        for entry in self.cache_dir.glob(f"{stage}-*.npz"):
+            if entry == path:
+                continue
+            try:
+                others.append((entry.stat().st_mtime_ns, entry))
+            except OSError:
+                continue
+        others.sort(reverse=True)
+        for _, stale in others[self.entries_per_stage - 1:]:
+            stale.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Delete all cached stage results of the session."""
+        if self.cache_dir.exists():
+            for entry in self.cache_dir.glob("*.npz"):
+                entry.unlink(missing_ok=True)
+
+    def _entry_path(self, stage: str, key: str) -> Path:
+        return self.cache_dir / f"{stage}-{key}.npz"
+
+
+def _mark_used(path: Path) -> None:
+    """Stamp an entry as most recently used.
+
+    An explicit time_ns() stamp orders entries written or read within the same
+    coarse filesystem clock tick.
+    """
+    now = time.time_ns()
+    try:
+        os.utime(path, ns=(now, now))
+    except OSError:
+        pass
@@ -0,0 +1,639 @@
+"""Analysis parameter sweeps.
+
+Evaluates the post-Fourier pipeline (run_from_phase_maps, including area
+segmentation) for many AnalysisConfig parameter sets of one session. The
+per-direction phase/magnitude/coherence maps are loaded once per worker from
+the session's analysis_results.h5 (or its pre-computed phase_*.npy /
+magnitude_*.npy maps), so the FFT is never rerun. Parameter sets are spread
+over a process pool and results go to a compact comparison store:
+
+    analysis_results/sweeps/sweep_YYYYmmdd_HHMMSS.h5
+        vfs_maps              (n, H, W)    float16  display VFS of each parameter set
+        statistical_vfs_maps  (n, H, W)    float16  VFS after the vfs_threshold_sd threshold
+        magnitude_masks       (n, D, H, W) bool     per-direction magnitude_threshold masks
+        percentile_masks      (n, D, H, W) bool     per-direction response_threshold_percent masks
+        area_counts           (n,)         int32
+        statistical_coverage  (n,)         float32  fraction of pixels kept by statistical_vfs_maps
+        magnitude_coverage    (n,)         float32  fraction of pixels kept by magnitude_masks
+        percentile_coverage   (n,)         float32  fraction of pixels kept by percentile_masks
+        elapsed_s             (n,)         float64  per-set pipeline time
+        parameters            (n,)         str      JSON of the full AnalysisConfig
+        attrs: session_path, swept_parameters (JSON), directions (JSON, the D axis), created
+
+Fourier-stage parameters (phase_filter_sigma) cannot be swept here - they need
+the FFT rerun by a full analysis. ParameterSweepController runs sweeps in the
+background for the backend's sweep commands.
+"""
+
+from __future__ import annotations
+
+import base64
+import dataclasses
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import h5py
+import numpy as np
+
+from config import AnalysisConfig
+from hdf5_codecs import compression_kwargs
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ("LR", "RL", "TB", "BT")
+
+DEFAULT_SWEEP_WORKERS = min(4, os.cpu_count() or 1)
+
+SWEEPS_DIRNAME = "sweeps"
+
+# Parameters that only affect the Fourier stage (not sweepable from cached maps)
+FOURIER_PARAMETERS = ("phase_filter_sigma",)
+
+# Parameters that do not change any stored output
+UNSWEPT_PARAMETERS = ("gradient_window_size",)
+
+SWEEPABLE_PARAMETERS = tuple(
+    field.name for field in dataclasses.fields(AnalysisConfig)
+    if field.name not in FOURIER_PARAMETERS + UNSWEPT_PARAMETERS
+)
+
+# Per-entry fractions of pixels kept by the statistical VFS and response thresholds
+COVERAGE_FIELDS = ("statistical_coverage", "magnitude_coverage", "percentile_coverage")
+
+# Minimum time between "n/total sets" progress log lines
+PROGRESS_LOG_INTERVAL_S = 10.0
+
+# Logger of the per-set pipeline messages quieted during in-process sweeps
+PIPELINE_LOGGER = "analysis.pipeline"
+
+FourierMaps = Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, np.ndarray]]
+
+
+def expand_parameter_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of parameter values.
+
+    Args:
+        grid: Parameter name -> values, e.g. {"vfs_threshold_sd": [1, 1.5, 2]}
+
+    Returns:
+        List of parameter sets (one dict per combination)
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(list(grid[n]) for n in names))]
+
+
+def _parse_bool(name: str, value: Any) -> bool:
+    """Bool parameter value from a bool, 0/1 or a true/false string."""
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ("true", "yes", "on", "1"):
+            return True
+        if text in ("false", "no", "off", "0"):
+            return False
+    elif isinstance(value, (bool, int, float, np.bool_)) and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"{name} must be true or false, got {value!r}")
+
+
+def build_configs(base: AnalysisConfig, parameter_sets: List[Dict[str, Any]]) -> List[AnalysisConfig]:
+    """Apply parameter sets to a base config.
+
+    Args:
+        base: Config providing unswept parameters
+        parameter_sets: Overrides per sweep entry
+
+    Returns:
+        One AnalysisConfig per parameter set
+
+    Raises:
+        ValueError: If a parameter is unknown or not sweepable
+    """
+    field_types = {field.name: field.type for field in dataclasses.fields(AnalysisConfig)}
+    configs = []
+    for overrides in parameter_sets:
+        for name in overrides:
+            if name in FOURIER_PARAMETERS:
+                raise ValueError(f"{name} changes the Fourier stage and cannot be swept (run a full analysis)")
+            if name in UNSWEPT_PARAMETERS:
+                raise ValueError(f"{name} does not change any sweep output and cannot be swept")
+            if name not in field_types:
+                raise ValueError(f"Unknown analysis parameter: {name}")
+        typed = {}
+        for name, value in overrides.items():
+            if field_types[name] in (bool, "bool"):
+                typed[name] = _parse_bool(name, value)
+            elif field_types[name] in (int, "int"):
+                typed[name] = int(value)
+            else:
+                typed[name] = float(value)
+        configs.append(dataclasses.replace(base, **typed))
+    return configs
+
+
+def load_fourier_maps(session_path: str) -> FourierMaps:
+    """Per-direction phase, magnitude and coherence maps of an analyzed session.
+
+    Args:
+        session_path: Session directory
+
+    Returns:
+        (phase_maps, magnitude_maps, coherence_maps) keyed by direction
+
+    Raises:
+        FileNotFoundError: If the session has neither analysis results nor
+            pre-computed phase/magnitude maps
+    """
+    session = Path(session_path)
+    results_path = session / "analysis_results" / "analysis_results.h5"
+
+    if results_path.exists():
+        with h5py.File(results_path, "r") as f:
+            if "phase_maps" in f and "magnitude_maps" in f:
+                phase = {d: f["phase_maps"][d][:] for d in f["phase_maps"]}
+                magnitude = {d: f["magnitude_maps"][d][:] for d in f["magnitude_maps"]}
+                if "coherence_maps" in f:
+                    coherence = {d: f["coherence_maps"][d][:] for d in f["coherence_maps"]}
+                else:
+                    coherence = {d: np.ones_like(m) for d, m in magnitude.items()}
+                return phase, magnitude, coherence
+
+    phase, magnitude = {}, {}
+    for direction in DIRECTIONS:
+        phase_file = session / f"phase_{direction}.npy"
+        magnitude_file = session / f"magnitude_{direction}.npy"
+        if phase_file.exists() and magnitude_file.exists():
+            phase[direction] = np.load(phase_file)
+            magnitude[direction] = np.load(magnitude_file)
+    if not phase:
+        raise FileNotFoundError(
+            f"No phase/magnitude maps for {session_path} - run analysis on the session first"
+        )
+    # Same placeholder as AnalysisManager for pre-computed maps without coherence
+    coherence = {d: np.ones_like(m) for d, m in magnitude.items()}
+    return phase, magnitude, coherence
+
+
+def evaluate_parameter_set(config: AnalysisConfig, maps: FourierMaps) -> Dict[str, Any]:
+    """Run the post-Fourier pipeline for one parameter set.
+
+    Args:
+        config: Analysis parameters
+        maps: (phase, magnitude, coherence) maps from load_fourier_maps
+
+    Returns:
+        Dict with vfs_map (display VFS), statistical_vfs_map, magnitude_masks and
+        percentile_masks ((D, H, W) in DIRECTIONS order), their coverage
+        fractions, area_count and elapsed_s
+    """
+    from .pipeline import AnalysisPipeline
+
+    phase, magnitude, coherence = maps
+    start = time.perf_counter()
+    pipeline = AnalysisPipeline(config)
+    results = pipeline.run_from_phase_maps(phase, magnitude, coherence)
+    elapsed = time.perf_counter() - start
+
+    vfs_map = results.get("coherence_vfs_map")
+    if vfs_map is None:
+        vfs_map = results["magnitude_vfs_map"]
+    statistical_vfs_map = results["statistical_vfs_map"]
+    directions = [d for d in DIRECTIONS if d in magnitude]
+    magnitude_masks = np.stack([results["magnitude_thresholded"][d] != 0 for d in directions])
+    # Directions without any response have no percentile map: nothing kept
+    percentile_masks = np.stack([
+        results["percentile_thresholded"][d] != 0 if d in results["percentile_thresholded"]
+        else np.zeros(magnitude[d].shape, dtype=bool)
+        for d in directions
+    ])
+    area_map = results["area_map"]
+    return {
+        "vfs_map": vfs_map,
+        "statistical_vfs_map": statistical_vfs_map,
+        "magnitude_masks": magnitude_masks,
+        "percentile_masks": percentile_masks,
+        "statistical_coverage": float(np.count_nonzero(statistical_vfs_map)) / statistical_vfs_map.size,
+        "magnitude_coverage": float(magnitude_masks.mean()),
+        "percentile_coverage": float(percentile_masks.mean()),
+        "area_count": int(area_map.max()) if area_map.size else 0,
+        "elapsed_s": elapsed,
+    }
+
+
+# Fourier maps of the session, loaded once per worker process
+_worker_maps: Optional[FourierMaps] = None
+
+
+def _init_worker(session_path: str) -> None:
+    """Process pool initializer: load the session's maps and quiet pipeline logging."""
+    global _worker_maps
+    logging.getLogger("analysis").setLevel(logging.WARNING)
+    _worker_maps = load_fourier_maps(session_path)
+
+
+def _evaluate_in_worker(index: int, config: AnalysisConfig) -> Tuple[int, Dict[str, Any]]:
+    return index, evaluate_parameter_set(config, _worker_maps)
+
+
+def run_parameter_sweep(
+    session_path: str,
+    base_config: AnalysisConfig,
+    parameter_sets: List[Dict[str, Any]],
+    max_workers: int = DEFAULT_SWEEP_WORKERS,
+    output_path: Optional[Path] = None,
+    progress_callback: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Dict[str, Any]:
+    """Evaluate parameter sets of a session and write the comparison store.
+
+    Args:
+        session_path: Analyzed session directory
+        base_config: Config for parameters not in a parameter set
+        parameter_sets: Parameter overrides per sweep entry
+        max_workers: Worker processes (1 = evaluate in this process)
+        output_path: Store path (default: analysis_results/sweeps/sweep_<timestamp>.h5)
+        progress_callback: Called as (completed, total, entry summary) after each set
+        should_stop: Polled between sets; True cancels the remaining sets
+
+    Returns:
+        Sweep summary (see sweep_summary), plus "cancelled"
+
+    Raises:
+        ValueError: If parameter_sets is empty or contains invalid parameters
+        FileNotFoundError: If the session has no Fourier maps
+    """
+    if not parameter_sets:
+        raise ValueError("Parameter sweep needs at least one parameter set")
+    configs = build_configs(base_config, parameter_sets)
+
+    if output_path is None:
+        output_path = (
+            Path(session_path) / "analysis_results" / SWEEPS_DIRNAME
+            / f"sweep_{time.strftime('%Y%m%d_%H%M%S')}.h5"
+        )
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Map shape for the store (workers load their own copy)
+    maps = load_fourier_maps(session_path)
+    map_shape = next(iter(maps[0].values())).shape
+    directions = [d for d in DIRECTIONS if d in maps[1]]
+    total = len(configs)
+    swept = sorted({name for overrides in parameter_sets for name in overrides})
+    logger.info(f"Parameter sweep: {total} sets over {swept} with {max_workers} worker(s)")
+
+    sweep_start = time.perf_counter()
+    cancelled = False
+    with h5py.File(output_path, "w") as store:
+        store.attrs["session_path"] = str(session_path)
+        store.attrs["swept_parameters"] = json.dumps(swept)
+        store.attrs["directions"] = json.dumps(directions)
+        store.attrs["created"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        map_datasets = {}
+        for name in ("vfs_maps", "statistical_vfs_maps"):
+            map_datasets[name] = store.create_dataset(
+                name,
+                shape=(total,) + tuple(map_shape),
+                dtype=np.float16,
+                chunks=(1,) + tuple(map_shape),
+                **compression_kwargs(),
+            )
+        for name in ("magnitude_masks", "percentile_masks"):
+            map_datasets[name] = store.create_dataset(
+                name,
+                shape=(total, len(directions)) + tuple(map_shape),
+                dtype=bool,
+                chunks=(1, len(directions)) + tuple(map_shape),
+                **compression_kwargs(),
+            )
+        area_counts = store.create_dataset("area_counts", shape=(total,), dtype=np.int32, fillvalue=-1)
+        coverages = {
+            name: store.create_dataset(name, shape=(total,), dtype=np.float32, fillvalue=np.nan)
+            for name in COVERAGE_FIELDS
+        }
+        elapsed = store.create_dataset("elapsed_s", shape=(total,), dtype=np.float64, fillvalue=np.nan)
+        store.create_dataset(
+            "parameters",
+            data=[json.dumps(config.to_dict()) for config in configs],
+            dtype=h5py.string_dtype(),
+        )
+
+        next_progress_log = time.monotonic() + PROGRESS_LOG_INTERVAL_S
+
+        def record(index: int, result: Dict[str, Any], completed: int) -> None:
+            nonlocal next_progress_log
+            map_datasets["vfs_maps"][index] = result["vfs_map"].astype(np.float16)
+            map_datasets["statistical_vfs_maps"][index] = result["statistical_vfs_map"].astype(np.float16)
+            map_datasets["magnitude_masks"][index] = result["magnitude_masks"]
+            map_datasets["percentile_masks"][index] = result["percentile_masks"]
+            area_counts[index] = result["area_count"]
+            for name in COVERAGE_FIELDS:
+                coverages[name][index] = result[name]
+            elapsed[index] = result["elapsed_s"]
+            if time.monotonic() >= next_progress_log:
+                logger.info(f"Parameter sweep: {completed}/{total} sets evaluated")
+                next_progress_log = time.monotonic() + PROGRESS_LOG_INTERVAL_S
+            if progress_callback is not None:
+                progress_callback(completed, total, {
+                    "index": index,
+                    "parameters": parameter_sets[index],
+                    "area_count": result["area_count"],
+                    **{name: result[name] for name in COVERAGE_FIELDS},
+                    "elapsed_s": result["elapsed_s"],
+                })
+
+        if max_workers <= 1:
+            # Quiet per-set pipeline logging as pool workers do (for the
+            # duration of the sweep; this module's progress lines still show)
+            pipeline_logger = logging.getLogger(PIPELINE_LOGGER)
+            previous_level = pipeline_logger.level
+            pipeline_logger.setLevel(logging.WARNING)
+            try:
+                for index, config in enumerate(configs):
+                    if should_stop is not None and should_stop():
+                        cancelled = True
+                        break
+                    record(index, evaluate_parameter_set(config, maps), index + 1)
+            finally:
+                pipeline_logger.setLevel(previous_level)
+        else:
+            del maps  # Workers load their own copy
+            # spawn, not fork: no copies of the backend's camera/IPC threads and their locks
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(str(session_path),),
+            ) as executor:
+                futures = [executor.submit(_evaluate_in_worker, i, c) for i, c in enumerate(configs)]
+                try:
+                    for completed, future in enumerate(as_completed(futures), start=1):
+                        index, result = future.result()
+                        record(index, result, completed)
+                        if should_stop is not None and should_stop():
+                            cancelled = True
+                            break
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+        store.attrs["total_elapsed_s"] = time.perf_counter() - sweep_start
+
+    summary = sweep_summary(output_path)
+    summary["cancelled"] = cancelled
+    logger.info(f"Parameter sweep {'cancelled' if cancelled else 'complete'}: {output_path}")
+    return summary
+
+
+def sweep_summary(store_path: Path) -> Dict[str, Any]:
+    """Parameters, area counts, coverages and timings of a sweep store (no maps).
+
+    Args:
+        store_path: Sweep store written by run_parameter_sweep
+
+    Returns:
+        Dict with store_path, swept_parameters, total_elapsed_s and entries
+        (index, parameters, area_count, coverages, elapsed_s; area_count -1 =
+        not evaluated)
+    """
+    with h5py.File(store_path, "r") as store:
+        parameters = [json.loads(p) for p in store["parameters"].asstr()[:]]
+        area_counts = store["area_counts"][:]
+        coverages = {name: store[name][:] for name in COVERAGE_FIELDS}
+        elapsed = store["elapsed_s"][:]
+        return {
+            "store_path": str(store_path),
+            "swept_parameters": json.loads(store.attrs["swept_parameters"]),
+            "total_elapsed_s": float(store.attrs.get("total_elapsed_s", np.nan)),
+            "map_shape": list(store["vfs_maps"].shape[1:]),
+            "entries": [
+                {
+                    "index": i,
+                    "parameters": parameters[i],
+                    "area_count": int(area_counts[i]),
+                    **{name: float(coverages[name][i]) for name in COVERAGE_FIELDS},
+                    "elapsed_s": float(elapsed[i]),
+                }
+                for i in range(len(parameters))
+            ],
+        }
+
+
+def read_sweep_vfs(store_path: Path, index: int, statistical: bool = False) -> np.ndarray:
+    """Display (or statistical-thresholded) VFS map of one sweep entry as float32."""
+    with h5py.File(store_path, "r") as store:
+        name = "statistical_vfs_maps" if statistical else "vfs_maps"
+        return store[name][index].astype(np.float32)
+
+
+class ParameterSweepController:
+    """Runs parameter sweeps for the backend's analysis sweep commands.
+
+    One sweep runs at a time in a background thread. Progress is reported
+    with analysis_sweep_progress messages and the summary with
+    analysis_sweep_complete (or analysis_sweep_error).
+    """
+
+    def __init__(self, ipc, renderer, config_provider: Callable[[], AnalysisConfig]):
+        """Create the controller.
+
+        Args:
+            ipc: IPC channels (send_sync_message)
+            renderer: AnalysisRenderer for gallery images of sweep results
+            config_provider: Returns the current analysis parameters (unswept
+                parameters of a new sweep); may raise RuntimeError
+        """
+        self.ipc = ipc
+        self.renderer = renderer
+        self.config_provider = config_provider
+
+        self.thread: Optional[threading.Thread] = None
+        self.is_running = False
+        self.progress: Tuple[int, int] = (0, 0)
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+
+    def start(
+        self,
+        session_path: str,
+        grid: Optional[Dict[str, List[Any]]] = None,
+        parameter_sets: Optional[List[Dict[str, Any]]] = None,
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Start a parameter sweep over an analyzed session in the background.
+
+        Args:
+            session_path: Path to an analyzed session directory
+            grid: Parameter name -> values (Cartesian product)
+            parameter_sets: Explicit list of parameter sets (appended to the grid)
+            workers: Worker processes (default: DEFAULT_SWEEP_WORKERS)
+
+        Returns:
+            Success response with store path and set count, or error response
+        """
+        if self.is_running:
+            return {"success": False, "error": "Parameter sweep already running"}
+        if not session_path or not Path(session_path).exists():
+            return {"success": False, "error": f"Session directory not found: {session_path}"}
+
+        sets = (expand_parameter_grid(grid) if grid else []) + list(parameter_sets or [])
+        if not sets:
+            return {"success": False, "error": "Parameter sweep needs a grid or parameter_sets"}
+        try:
+            base_config = self.config_provider()
+            build_configs(base_config, sets)  # Validate before starting
+        except (ValueError, RuntimeError, TypeError) as e:
+            return {"success": False, "error": str(e)}
+
+        workers = int(workers) if workers else DEFAULT_SWEEP_WORKERS
+        store_path = (
+            Path(session_path) / "analysis_results" / SWEEPS_DIRNAME
+            / f"sweep_{time.strftime('%Y%m%d_%H%M%S')}.h5"
+        )
+
+        self.is_running = True
+        self.progress = (0, len(sets))
+        self.summary = None
+        self.error = None
+        self._stop.clear()
+
+        self.thread = threading.Thread(
+            target=self._run,
+            args=(session_path, base_config, sets, workers, store_path),
+            daemon=True,
+            name="AnalysisSweepThread"
+        )
+        self.thread.start()
+
+        return {
+            "success": True,
+            "message": "Parameter sweep started",
+            "session_path": session_path,
+            "store_path": str(store_path),
+            "total": len(sets),
+            "workers": workers,
+        }
+
+    def stop(self) -> Dict[str, Any]:
+        """Cancel the running sweep after the sets already in progress."""
+        if not self.is_running:
+            return {"success": False, "error": "No parameter sweep running"}
+        self._stop.set()
+        return {"success": True, "message": "Parameter sweep will stop after current sets"}
+
+    def get_status(self) -> Dict[str, Any]:
+        """Progress of the current or last parameter sweep."""
+        completed, total = self.progress
+        return {
+            "success": True,
+            "is_running": self.is_running,
+            "completed": completed,
+            "total": total,
+            "error": self.error,
+            "summary": self.summary,
+        }
+
+    def get_results(
+        self,
+        store_path: Optional[str] = None,
+        session_path: Optional[str] = None,
+        include_images: bool = False
+    ) -> Dict[str, Any]:
+        """Summary of a sweep store, optionally with a rendered VFS per entry.
+
+        Args:
+            store_path: Sweep store path (default: latest sweep of session_path)
+            session_path: Session whose latest sweep to read
+            include_images: Add base64 PNG renderings of each VFS map (gallery)
+
+        Returns:
+            Success response with the sweep summary, or error response
+        """
+        if store_path is None:
+            if not session_path:
+                return {"success": False, "error": "store_path or session_path is required"}
+            stores = sorted((Path(session_path) / "analysis_results" / SWEEPS_DIRNAME).glob("sweep_*.h5"))
+            if not stores:
+                return {"success": False, "error": f"No parameter sweeps for session: {session_path}"}
+            store_path = stores[-1]
+
+        if not Path(store_path).exists():
+            return {"success": False, "error": f"Sweep store not found: {store_path}"}
+
+        summary = sweep_summary(Path(store_path))
+        if include_images:
+            # vfs_threshold_sd only shows in the statistical-thresholded VFS
+            statistical = "vfs_threshold_sd" in summary["swept_parameters"]
+            for entry in summary["entries"]:
+                if entry["area_count"] < 0:
+                    continue  # Not evaluated (sweep cancelled)
+                vfs_map = read_sweep_vfs(Path(store_path), entry["index"], statistical=statistical)
+                png_bytes = self.renderer.encode_as_png(self.renderer.render_sign_map(vfs_map))
+                if png_bytes:
+                    entry["image_base64"] = base64.b64encode(png_bytes).decode("utf-8")
+
+        return {"success": True, "message": "Sweep results", **summary}
+
+    def _run(
+        self,
+        session_path: str,
+        base_config: AnalysisConfig,
+        parameter_sets: List[Dict[str, Any]],
+        workers: int,
+        store_path: Path
+    ) -> None:
+        """Background thread for a parameter sweep."""
+        def report(completed: int, total: int, entry: Dict[str, Any]):
+            self.progress = (completed, total)
+            self._send_sync_message({
+                "type": "analysis_sweep_progress",
+                "session_path": session_path,
+                "completed": completed,
+                "total": total,
+                "entry": entry,
+                "timestamp": time.time(),
+            })
+
+        try:
+            summary = run_parameter_sweep(
+                session_path,
+                base_config,
+                parameter_sets,
+                max_workers=workers,
+                output_path=store_path,
+                progress_callback=report,
+                should_stop=self._stop.is_set,
+            )
+            self.summary = summary
+            self._send_sync_message({
+                "type": "analysis_sweep_complete",
+                "session_path": session_path,
+                "success": True,
+                "timestamp": time.time(),
+                **summary,
+            })
+        except Exception as e:
+            logger.error(f"Parameter sweep failed: {e}", exc_info=True)
+            self.error = str(e)
+            self._send_sync_message({
+                "type": "analysis_sweep_error",
+                "error": str(e),
+                "session_path": session_path,
+                "timestamp": time.time(),
+            })
+        finally:
+            self.is_running = False
+
+    def _send_sync_message(self, message: Dict[str, Any]) -> None:
+        try:
+            self.ipc.send_sync_message(message)
+        except Exception as e:
+            logger.error(f"Failed to send IPC message: {e}")
@@ -0,0 +1,288 @@
+"""Out-of-process analysis.
+
+Offline analysis is NumPy/SciPy heavy. Run as a thread of the backend process
+it competes for the GIL, memory bandwidth and cores with the camera capture
+loop, stimulus playback and the command dispatcher. AnalysisWorkerProcess runs
+it in a separate, long-lived process instead: a headless AnalysisManager at
+lowered scheduling priority, started on the first analysis and reused after
+(so NumPy/SciPy are imported once).
+
+The backend's AnalysisManager talks to the worker through two queues:
+
+- requests: one analysis job at a time (session path, a snapshot of the
+  analysis/acquisition parameter groups and the pipeline options)
+- events: every sync message the headless manager sends (progress,
+  analysis_layer_ready PNGs, completion) together with its progress/stage,
+  relayed unchanged to the frontend, and a final "done" event per job
+
+Result maps never cross the queue - the worker writes
+analysis_results/analysis_results.h5 as before and the backend reads it from
+there. Cancellation is a shared event the worker maps onto the manager's
+between-stage is_running checks.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Scheduling priority of the worker relative to the backend (Unix niceness)
+ANALYSIS_WORKER_NICE_INCREMENT = 10
+
+# How often the backend checks the worker is still alive while waiting
+_EVENT_POLL_INTERVAL_S = 0.5
+
+
+class StaticParameters:
+    """Read-only parameter groups with the ParameterManager interface AnalysisManager uses.
+
+    Headless managers (worker processes, batch runs) analyze with a snapshot
+    of the backend's parameters instead of a live ParameterManager.
+    """
+
+    def __init__(self, groups: Dict[str, Dict[str, Any]]):
+        self.groups = groups
+
+    def get_parameter_group(self, group_name: str) -> Dict[str, Any]:
+        return dict(self.groups.get(group_name, {}))
+
+    def subscribe(self, group_name: str, callback: Callable) -> None:
+        pass
+
+
+def config_from_groups(parameter_groups: Dict[str, Dict[str, Any]]):
+    """AnalysisConfig from an "analysis" parameter group."""
+    from config import AnalysisConfig
+
+    analysis = parameter_groups.get("analysis", {})
+    return AnalysisConfig(**{
+        field.name: analysis[field.name]
+        for field in dataclasses.fields(AnalysisConfig)
+        if field.name in analysis
+    })
+
+
+class AnalysisWorkerProcess:
+    """Long-lived process that runs offline analyses for the backend.
+
+    One analysis runs at a time; run_analysis blocks the calling (relay)
+    thread until the job finishes and forwards the worker's messages as they
+    arrive. If the process dies it is restarted for the next job.
+    """
+
+    def __init__(self, nice_increment: int = ANALYSIS_WORKER_NICE_INCREMENT):
+        """Create the worker handle (the process starts with the first job).
+
+        Args:
+            nice_increment: Niceness added to the worker process (0 = same priority)
+        """
+        self.nice_increment = nice_increment
+        # spawn: a clean interpreter, no copies of camera/IPC threads or sockets
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._requests = None
+        self._events = None
+        self._cancel = None
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        """Start the worker process if it is not running."""
+        if self.is_alive:
+            return
+        self._requests = self._context.Queue()
+        self._events = self._context.Queue()
+        self._cancel = self._context.Event()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(self._requests, self._events, self._cancel, self.nice_increment),
+            daemon=True,
+            name="AnalysisWorker",
+        )
+        self._process.start()
+        logger.info(f"Analysis worker process started (pid {self._process.pid})")
+
+    def run_analysis(
+        self,
+        session_path: str,
+        parameter_groups: Dict[str, Dict[str, Any]],
+        pipeline_options: Dict[str, Any],
+        on_event: Callable[[Dict[str, Any]], None],
+        priority: int = 0,
+    ) -> Dict[str, Any]:
+        """Analyze a session in the worker and wait for the result.
+
+        Args:
+            session_path: Session directory
+            parameter_groups: "analysis" and "acquisition" parameter groups
+            pipeline_options: fft_mode, chunk_frames, max_direction_workers and
+                direction_memory_budget_bytes for the worker's manager
+            on_event: Called in this thread for each relayed message event
+                ({"message", "progress", "stage"})
+            priority: Unused (one job at a time); see AnalysisJobClient
+
+        Returns:
+            Done event: success, error, stage, num_areas and reported (False
+            if the worker could not send its own analysis_error message)
+        """
+        with self._lock:
+            self.start()
+            self._cancel.clear()
+            job_id = next(self._job_ids)
+            self._requests.put({
+                "job_id": job_id,
+                "session_path": session_path,
+                "parameter_groups": parameter_groups,
+                "pipeline_options": pipeline_options,
+            })
+
+            while True:
+                try:
+                    event = self._events.get(timeout=_EVENT_POLL_INTERVAL_S)
+                except queue.Empty:
+                    if not self.is_alive:
+                        exitcode = self._process.exitcode
+                        self._process = None
+                        return {
+                            "success": False,
+                            "error": f"Analysis worker exited unexpectedly (exit code {exitcode})",
+                            "stage": "error",
+                            "reported": False,
+                        }
+                    continue
+
+                if event.get("job_id") != job_id:
+                    continue  # Left over from a job whose caller gave up
+                if event["kind"] == "done":
+                    return event
+                on_event(event)
+
+    def cancel(self) -> None:
+        """Ask the running job to stop at its next stage boundary."""
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the worker process (terminating it if it does not exit)."""
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self.cancel()
+            self._requests.put(None)
+            self._process.join(timeout)
+            if self._process.is_alive():
+                logger.warning("Analysis worker did not exit - terminating")
+                self._process.terminate()
+                self._process.join(timeout)
+        self._process = None
+        logger.info("Analysis worker process stopped")
+
+
+class _EventRelay:
+    """IPC stand-in for the worker's manager: queues sync messages for the backend."""
+
+    def __init__(self, events):
+        self.events = events
+        self.manager = None
+        self.job_id: Optional[int] = None
+
+    def send_sync_message(self, message: Dict[str, Any]) -> None:
+        self.events.put({
+            "kind": "message",
+            "job_id": self.job_id,
+            "message": message,
+            "progress": self.manager.progress if self.manager is not None else 0.0,
+            "stage": self.manager.current_stage if self.manager is not None else "",
+        })
+
+
+def _worker_main(requests, events, cancel, nice_increment: int) -> None:
+    """Worker process entry point: serve analysis jobs until a None request."""
+    from logging_config import configure_logging
+
+    configure_logging(level=logging.WARNING)
+    if nice_increment and hasattr(os, "nice"):
+        try:
+            os.nice(nice_increment)
+        except OSError as e:
+            logger.warning(f"Could not lower analysis worker priority: {e}")
+
+    from .manager import AnalysisManager
+    from .pipeline import AnalysisPipeline
+
+    relay = _EventRelay(events)
+    while True:
+        job = requests.get()
+        if job is None:
+            break
+
+        relay.job_id = job["job_id"]
+        options = job["pipeline_options"]
+        try:
+            params = StaticParameters(job["parameter_groups"])
+            pipeline = AnalysisPipeline(
+                config_from_groups(job["parameter_groups"]),
+                fft_mode=options["fft_mode"],
+                chunk_frames=options["chunk_frames"],
+            )
+            manager = AnalysisManager(
+                params,
+                relay,
+                None,
+                pipeline,
+                max_direction_workers=options["max_direction_workers"],
+                direction_memory_budget_bytes=options["direction_memory_budget_bytes"],
+            )
+        except Exception as e:
+            logger.error(f"Analysis worker could not start job: {e}", exc_info=True)
+            events.put({
+                "kind": "done",
+                "job_id": relay.job_id,
+                "success": False,
+                "error": str(e),
+                "stage": "error",
+                "reported": False,
+            })
+            continue
+        relay.manager = manager
+
+        # Map cancellation onto the manager's between-stage checks
+        finished = threading.Event()
+
+        def watch_cancel():
+            while not finished.wait(0.2):
+                if cancel.is_set():
+                    manager.is_running = False
+                    manager.current_stage = "stopping"
+                    return
+
+        watcher = threading.Thread(target=watch_cancel, daemon=True, name="AnalysisCancelWatcher")
+        watcher.start()
+        try:
+            response = manager.analyze_session(job["session_path"], publish_layers=True)
+        finally:
+            finished.set()
+            watcher.join()
+
+        events.put({
+            "kind": "done",
+            "job_id": relay.job_id,
+            "success": response["success"],
+            "error": response.get("error"),
+            "stage": manager.current_stage,
+            "num_areas": response.get("num_areas", 0),
+            "reported": True,  # The manager sent analysis_complete / analysis_error
+        })
+        relay.manager = None
@@ -5,6 +5,7 @@ Uses constructor injection pattern - all dependencies passed explicitly.
 """
 
 from .manager import CameraManager, CameraInfo
+from .pipeline import FrameBufferPool, FrameCaptureRing, PreviewProfile, render_preview
 from .utils import (
     get_available_camera_indices,
     get_system_camera_names,
@@ -14,6 +15,10 @@ from .utils import (
 __all__ = [
     "CameraManager",
     "CameraInfo",
+    "FrameBufferPool",
+    "FrameCaptureRing",
+    "PreviewProfile",
+    "render_preview",
     "get_available_camera_indices",
     "get_system_camera_names",
     "run_system_command",
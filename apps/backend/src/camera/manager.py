@@ -11,10 +11,28 @@ import threading
 import logging
 from typing import List, Dict, Optional, Any
 
+from .pipeline import (
+    DEFAULT_CAPTURE_RING_FRAMES,
+    FrameBufferPool,
+    FrameCaptureRing,
+    PreviewProfile,
+    render_preview,
+)
 from .utils import get_available_camera_indices, get_system_camera_names
 
 logger = logging.getLogger(__name__)
 
+# Capture stage back-off after a failed read (normal cadence comes from read() blocking)
+CAPTURE_RETRY_SEC = 0.01
+
+# How long pipeline stages wait for a frame before re-checking the stop event
+STAGE_WAIT_TIMEOUT_SEC = 0.1
+
+# Recording buffer pool: larger than the HDF5 writer queue (128 frames), so the
+# writer's own back-pressure error fires before the pool runs dry
+RECORDING_POOL_MAX_BUFFERS = 160
+RECORDING_POOL_TIMEOUT_SEC = 5.0
+
 
 class CameraInfo:
     """Information about a detected camera."""
@@ -50,6 +68,7 @@ class CameraManager:
         ipc,
         shared_memory,
         synchronization_tracker=None,
+        capture_ring_frames: int = DEFAULT_CAPTURE_RING_FRAMES,
     ):
         """Initialize camera manager with explicit dependencies.
 
@@ -58,6 +77,8 @@ class CameraManager:
             ipc: IPC service (MultiChannelIPC from ipc/channels.py)
             shared_memory: Shared memory service (SharedMemoryService from ipc/shared_memory.py)
             synchronization_tracker: Optional timestamp synchronization tracker
+            capture_ring_frames: Slots in the capture ring between the capture
+                stage and the recording/preview stages
         """
         # Injected dependencies (NO service_locator!)
         self.config = config
@@ -68,17 +89,27 @@ class CameraManager:
         # Data recorder will be set later (Phase 4)
         self._data_recorder = None
 
+        # Optional online analysis engine fed with recorded frames
+        self._online_analysis = None
+
         # Camera state
         self.detected_cameras: List[CameraInfo] = []
         self.active_camera: Optional[cv2.VideoCapture] = None
+        self._active_camera_index: Optional[int] = None
+        self._active_camera_name = "unknown"
         self._has_detected = False
 
-        # Acquisition state
+        # Acquisition state: capture stage -> ring -> recording / preview stages
         self.is_streaming = False
-        self.current_frame = None
         self.current_frame_cropped = None  # Square cropped version
         self.last_capture_timestamp = None
+        self.capture_fps = 0.0  # Measured from capture timestamps
+        self.frames_skipped = {"recording": 0, "preview": 0}
+        self.capture_ring_frames = capture_ring_frames
+        self._capture_ring: Optional[FrameCaptureRing] = None
+        self._recording_pool: Optional[FrameBufferPool] = None
         self.acquisition_thread: Optional[threading.Thread] = None
+        self._stage_threads: List[threading.Thread] = []
         self.acquisition_lock = threading.Lock()
         self.stop_acquisition_event = threading.Event()
 
@@ -86,6 +117,29 @@ class CameraManager:
         self.timestamp_source = "unknown"
         self.uses_hardware_timestamps = False
 
+        # Live preview reduction (system.camera_preview_* parameters)
+        self.preview_profile = PreviewProfile()
+        if hasattr(self.config, "get_parameter_group"):
+            self.preview_profile = PreviewProfile.from_params(
+                self.config.get_parameter_group("system")
+            )
+        if hasattr(self.config, "subscribe"):
+            self.config.subscribe("system", self._handle_system_params_changed)
+
+    def _handle_system_params_changed(self, group_name: str, updates: Dict[str, Any]):
+        """Apply preview profile changes (takes effect on the next preview frame).
+
+        Args:
+            group_name: Parameter group that changed ("system")
+            updates: Dictionary of updated parameters
+        """
+        if not any(key.startswith("camera_preview_") for key in updates):
+            return
+        self.preview_profile = PreviewProfile.from_params(
+            self.config.get_parameter_group("system")
+        )
+        logger.info(f"Camera preview profile updated: {self.preview_profile}")
+
     def set_data_recorder(self, recorder) -> None:
         """Thread-safe setter for data recorder (will be used in Phase 4).
 
@@ -103,6 +157,15 @@ class CameraManager:
         with self.acquisition_lock:
             return self._data_recorder
 
+    def set_online_analysis(self, online_analysis) -> None:
+        """Thread-safe setter for the online analysis engine.
+
+        Args:
+            online_analysis: OnlineAnalysisEngine instance (or None to detach)
+        """
+        with self.acquisition_lock:
+            self._online_analysis = online_analysis
+
     def detect_cameras(
         self, max_cameras: int = 10, force: bool = False
     ) -> List[CameraInfo]:
@@ -278,6 +341,7 @@ class CameraManager:
             self.active_camera = cv2.VideoCapture(camera_index)
 
             if self.active_camera.isOpened():
+                self._active_camera_index = camera_index
                 logger.info(f"Successfully opened camera at index {camera_index}")
                 return True
             else:
@@ -293,11 +357,15 @@ class CameraManager:
         if self.active_camera is not None:
             self.active_camera.release()
             self.active_camera = None
+            self._active_camera_index = None
             logger.info("Closed active camera")
 
-    def capture_frame(self) -> Optional[np.ndarray]:
+    def capture_frame(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
         """Capture a frame from the active camera.
 
+        Args:
+            out: Optional buffer to read into (reused if its shape/dtype match)
+
         Returns:
             Frame data if successful, None otherwise
         """
@@ -306,7 +374,7 @@ class CameraManager:
             return None
 
         try:
-            ret, frame = self.active_camera.read()
+            ret, frame = self.active_camera.read(out)
             if ret:
                 return frame
             else:
@@ -573,14 +641,19 @@ class CameraManager:
         return self.synchronization_tracker.get_synchronization_data()
 
     def _acquisition_loop(self):
-        """Continuous camera frame capture loop (runs in separate thread)."""
+        """Capture stage: grab frames and timestamps into the capture ring (runs in separate thread).
+
+        Runs at the camera's own cadence - read() blocks until the next frame -
+        and does no processing, so slow recording or preview stages cannot
+        lower the capture rate.
+        """
         logger.info("Camera acquisition loop started")
 
         # Check timestamp capability and record for data provenance
         test_hardware_ts = self.get_camera_hardware_timestamp_us()
         uses_hardware_timestamps = test_hardware_ts is not None
 
-        # Check development mode
+        # Check development mode (once - not re-read for every frame)
         system_params = (
             self.config.get_parameter_group("system")
             if hasattr(self.config, "get_parameter_group")
@@ -646,15 +719,22 @@ class CameraManager:
                     "Timestamp source will not be recorded."
                 )
 
+        ring = self._capture_ring
+
         # Track frame index for synchronization tracking
         camera_frame_index = 0
 
-        while not self.stop_acquisition_event.is_set():
-            try:
-                # === STEP 1: CAPTURE CAMERA FRAME ===
-                frame = self.capture_frame()
+        try:
+            while not self.stop_acquisition_event.is_set():
+                try:
+                    # Read straight into the next ring slot's buffer
+                    slot = ring.begin_write()
+                    frame = self.capture_frame(out=slot.frame)
+
+                    if frame is None:
+                        time.sleep(CAPTURE_RETRY_SEC)
+                        continue
 
-                if frame is not None:
                     # Get hardware timestamp if available, otherwise check development mode
                     hardware_timestamp = self.get_camera_hardware_timestamp_us()
 
@@ -662,14 +742,6 @@ class CameraManager:
                         # Hardware timestamp available - use it
                         capture_timestamp = hardware_timestamp
                     else:
-                        # No hardware timestamp - check if development mode allows software timestamps
-                        system_params = (
-                            self.config.get_parameter_group("system")
-                            if hasattr(self.config, "get_parameter_group")
-                            else {}
-                        )
-                        development_mode = system_params.get("development_mode", False)
-
                         if not development_mode:
                             raise RuntimeError(
                                 "Camera does not support hardware timestamps. "
@@ -684,91 +756,211 @@ class CameraManager:
                         # Development mode enabled - use software timestamp with warning
                         capture_timestamp = int(time.time() * 1_000_000)
 
-                    # === STEP 2: PROCESS CAMERA FRAME ===
-                    # Crop to square
-                    cropped = self.crop_to_square(frame)
+                    ring.publish(slot, frame, capture_timestamp, camera_frame_index)
+                    self._update_capture_rate(capture_timestamp)
+                    camera_frame_index += 1
 
-                    # Convert BGR (OpenCV) to RGBA for frontend
-                    if len(cropped.shape) == 3 and cropped.shape[2] == 3:
-                        rgba = cv2.cvtColor(cropped, cv2.COLOR_BGR2RGBA)
+                except Exception as e:
+                    # Check if we're in record mode (scientifically rigorous mode)
+                    data_recorder = self.get_data_recorder()
+                    is_recording = data_recorder and data_recorder.is_recording
+
+                    if is_recording:
+                        # RECORD MODE: Fail hard to preserve scientific validity
+                        # Do NOT continue on errors - acquisition must stop immediately
+                        logger.critical(
+                            f"FATAL ERROR in acquisition loop during RECORD mode: {e}\n"
+                            f"Acquisition MUST stop to prevent corrupted data.\n"
+                            f"System will NOT continue with invalid/partial data.",
+                            exc_info=True,
+                        )
+                        self.stop_acquisition_event.set()
+                        # Re-raise to stop acquisition
+                        raise RuntimeError(
+                            f"Acquisition failed during record mode: {e}. "
+                            f"System halted to preserve scientific validity."
+                        ) from e
                     else:
-                        # Grayscale - convert to RGBA
-                        rgba = cv2.cvtColor(cropped, cv2.COLOR_GRAY2RGBA)
+                        # PREVIEW MODE: Log error but continue (user can retry)
+                        logger.error(
+                            f"Error in acquisition loop (preview mode): {e}", exc_info=True
+                        )
+                        time.sleep(0.1)  # Prevent tight error loop
+        finally:
+            # Wake the recording and preview stages so they exit too
+            ring.close()
+            logger.info("Camera acquisition loop stopped")
+
+    def _recording_loop(self):
+        """Recording stage: convert captured frames to grayscale and hand them to the recorder.
+
+        Follows every frame in the capture ring. If it falls a whole ring
+        behind, the overwritten frames are skipped and counted, and their
+        indices are recorded in the session metadata; camera frame_index
+        values keep their capture numbering so gaps stay visible in the
+        recorded data.
+        """
+        ring = self._capture_ring
+        cursor = ring.head
 
-                    # Store original frame with thread safety
-                    with self.acquisition_lock:
-                        self.current_frame = frame  # Original frame for histogram
-                        self.last_capture_timestamp = capture_timestamp
+        while not self.stop_acquisition_event.is_set():
+            item = ring.wait_next(cursor, STAGE_WAIT_TIMEOUT_SEC)
+            if item is None:
+                if ring.closed:
+                    break
+                continue
 
-                    # === STEP 3: RECORD DATA (CAMERA ONLY) ===
-                    # Thread-safe access to data recorder
-                    data_recorder = self.get_data_recorder()
-                    if data_recorder and data_recorder.is_recording:
-                        # Convert to grayscale for recording (single channel)
-                        # Intrinsic signal imaging requires grayscale data
-                        if len(frame.shape) == 3:
-                            frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                        else:
-                            frame_gray = frame
-
-                        # Record camera frame
-                        data_recorder.record_camera_frame(
-                            timestamp_us=capture_timestamp,
-                            frame_index=camera_frame_index,
-                            frame_data=frame_gray,  # Single-channel grayscale
-                        )
+            slot, sequence, skipped = item
+            cursor = sequence
 
-                    # === STEP 4: WRITE TO SHARED MEMORY FOR FRONTEND DISPLAY ===
-                    if self.shared_memory:
-                        # Write camera frame
-                        camera_name = "unknown"
-                        for cam in self.detected_cameras:
-                            if cam.index == getattr(self.active_camera, "index", -1):
-                                camera_name = cam.name
-                                break
-
-                        self.shared_memory.write_camera_frame(
-                            rgba,
-                            camera_name=camera_name,
-                            capture_timestamp_us=capture_timestamp,
-                        )
+            # Thread-safe access to data recorder
+            data_recorder = self.get_data_recorder()
+            if not (data_recorder and data_recorder.is_recording):
+                continue
 
-                    camera_frame_index += 1
+            try:
+                frame = slot.frame
+                capture_timestamp = slot.timestamp_us
+                frame_index = slot.frame_index
+
+                # Pooled grayscale buffers sized from the camera resolution
+                pool = self._recording_pool
+                if pool is None or not pool.matches(frame.shape[:2]):
+                    pool = FrameBufferPool(frame.shape[:2], np.uint8, RECORDING_POOL_MAX_BUFFERS)
+                    self._recording_pool = pool
+                frame_gray = pool.acquire(timeout=RECORDING_POOL_TIMEOUT_SEC)
+                if frame_gray is None:
+                    raise RuntimeError(
+                        f"No free camera recording buffer after {RECORDING_POOL_TIMEOUT_SEC}s "
+                        f"({pool.allocated} in use) - writer is not keeping up"
+                    )
 
-                # Small sleep to control frame rate (30 FPS)
-                time.sleep(1.0 / 30.0)
+                # Convert to grayscale for recording (single channel)
+                # Intrinsic signal imaging requires grayscale data
+                if len(frame.shape) == 3:
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=frame_gray)
+                else:
+                    np.copyto(frame_gray, frame)
+
+                if not ring.is_current(slot, sequence):
+                    # Overwritten while converting
+                    pool.release(frame_gray)
+                    self._count_skipped("recording", skipped + 1)
+                    data_recorder.record_camera_gap(list(range(frame_index - skipped, frame_index + 1)))
+                    continue
+                if skipped:
+                    self._count_skipped("recording", skipped)
+                    data_recorder.record_camera_gap(list(range(frame_index - skipped, frame_index)))
+
+                # Feed online analysis (queues a copy - never blocks capture)
+                online_analysis = self._online_analysis
+                if online_analysis is not None and online_analysis.is_collecting:
+                    online_analysis.add_frame(frame_gray, capture_timestamp)
+
+                # Record camera frame; the recorder returns the buffer to the
+                # pool once the writer has staged it for disk
+                data_recorder.record_camera_frame(
+                    timestamp_us=capture_timestamp,
+                    frame_index=frame_index,
+                    frame_data=frame_gray,  # Single-channel grayscale
+                    release=pool.release,
+                )
 
             except Exception as e:
-                # Check if we're in record mode (scientifically rigorous mode)
-                data_recorder = self.get_data_recorder()
-                is_recording = data_recorder and data_recorder.is_recording
-
-                if is_recording:
-                    # RECORD MODE: Fail hard to preserve scientific validity
-                    # Do NOT continue on errors - acquisition must stop immediately
+                if data_recorder.is_recording:
+                    # RECORD MODE: stop the whole acquisition rather than continue with partial data
                     logger.critical(
-                        f"FATAL ERROR in acquisition loop during RECORD mode: {e}\n"
-                        f"Acquisition MUST stop to prevent corrupted data.\n"
-                        f"System will NOT continue with invalid/partial data.",
+                        f"FATAL ERROR in camera recording stage during RECORD mode: {e}\n"
+                        f"Acquisition MUST stop to prevent corrupted data.",
                         exc_info=True,
                     )
-                    # Re-raise to stop acquisition
-                    raise RuntimeError(
-                        f"Acquisition failed during record mode: {e}. "
-                        f"System halted to preserve scientific validity."
-                    ) from e
-                else:
-                    # PREVIEW MODE: Log error but continue (user can retry)
-                    logger.error(
-                        f"Error in acquisition loop (preview mode): {e}", exc_info=True
-                    )
-                    time.sleep(0.1)  # Prevent tight error loop
+                    self.stop_acquisition_event.set()
+                    ring.close()
+                    break
+                logger.error(f"Error in camera recording stage: {e}", exc_info=True)
+
+    def _preview_loop(self):
+        """Preview stage: publish the newest captured frame to shared memory.
+
+        Always jumps to the most recent frame, so a busy frontend only lowers
+        the preview rate, never the capture or recording rate. Frames are
+        rate-limited, downscaled and converted per the preview profile before
+        the shared memory write.
+        """
+        ring = self._capture_ring
+        cursor = ring.head
+        last_publish = 0.0
+
+        while not self.stop_acquisition_event.is_set():
+            item = ring.wait_latest(cursor, STAGE_WAIT_TIMEOUT_SEC)
+            if item is None:
+                if ring.closed:
+                    break
+                continue
+
+            slot, sequence, skipped = item
+            cursor = sequence
+            if skipped:
+                self._count_skipped("preview", skipped)
+
+            if not self.shared_memory:
+                continue
+
+            # Decimate to the preview rate (not counted as skipped)
+            profile = self.preview_profile
+            now = time.monotonic()
+            if now - last_publish < profile.min_interval_sec:
+                continue
+
+            try:
+                capture_timestamp = slot.timestamp_us
+
+                # Crop to square, downscale, convert to grayscale/RGBA
+                preview = render_preview(slot.frame, profile)
+
+                if not ring.is_current(slot, sequence):
+                    self._count_skipped("preview", 1)
+                    continue
+
+                self.shared_memory.write_camera_frame(
+                    preview,
+                    camera_name=self._active_camera_name,
+                    capture_timestamp_us=capture_timestamp,
+                )
+                last_publish = now
+            except Exception as e:
+                logger.error(f"Error in camera preview stage: {e}", exc_info=True)
+                time.sleep(0.1)  # Prevent tight error loop
 
-        logger.info("Camera acquisition loop stopped")
+    def _update_capture_rate(self, capture_timestamp: int) -> None:
+        """Track the measured capture rate (exponential moving average)."""
+        with self.acquisition_lock:
+            previous = self.last_capture_timestamp
+            self.last_capture_timestamp = capture_timestamp
+            if previous is None or capture_timestamp <= previous:
+                return
+            fps = 1_000_000.0 / (capture_timestamp - previous)
+            self.capture_fps = fps if self.capture_fps == 0.0 else 0.9 * self.capture_fps + 0.1 * fps
+
+    def _count_skipped(self, stage: str, count: int) -> None:
+        """Count frames a stage skipped because the capture ring overtook it."""
+        with self.acquisition_lock:
+            self.frames_skipped[stage] += count
+            total = self.frames_skipped[stage]
+        if stage == "recording":
+            logger.error(
+                f"Camera recording stage fell behind capture: {count} frame(s) skipped "
+                f"({total} total this acquisition)"
+            )
+        elif total % 100 < count:
+            logger.warning(f"Camera preview skipped {total} frames (capture unaffected)")
 
     def start_acquisition(self) -> bool:
         """Start continuous camera acquisition.
 
+        Starts the capture stage plus the recording and preview stages that
+        consume its ring.
+
         Returns:
             True if started successfully
         """
@@ -780,10 +972,29 @@ class CameraManager:
             logger.debug("Camera acquisition already running (no action needed)")
             return True
 
-        # Reset stop event
+        # Reset stop event and per-acquisition state
         self.stop_acquisition_event.clear()
+        self._capture_ring = FrameCaptureRing(self.capture_ring_frames)
+        with self.acquisition_lock:
+            self.last_capture_timestamp = None
+            self.capture_fps = 0.0
+            self.frames_skipped = {"recording": 0, "preview": 0}
+
+        # Resolve the camera name once, not per frame
+        self._active_camera_name = next(
+            (cam.name for cam in self.detected_cameras if cam.index == self._active_camera_index),
+            "unknown",
+        )
 
-        # Start acquisition thread
+        # Consumer stages first so they are waiting when the first frame lands
+        self._stage_threads = [
+            threading.Thread(target=self._recording_loop, daemon=True, name="CameraRecording"),
+            threading.Thread(target=self._preview_loop, daemon=True, name="CameraPreview"),
+        ]
+        for thread in self._stage_threads:
+            thread.start()
+
+        # Start acquisition (capture) thread
         self.acquisition_thread = threading.Thread(
             target=self._acquisition_loop, daemon=True, name="CameraAcquisition"
         )
@@ -798,12 +1009,16 @@ class CameraManager:
         if not self.is_streaming:
             return
 
-        # Signal thread to stop
+        # Signal threads to stop and wake any stage waiting for frames
         self.stop_acquisition_event.set()
+        if self._capture_ring is not None:
+            self._capture_ring.close()
 
-        # Wait for thread to finish
-        if self.acquisition_thread and self.acquisition_thread.is_alive():
-            self.acquisition_thread.join(timeout=2.0)
+        # Wait for threads to finish
+        for thread in [self.acquisition_thread, *self._stage_threads]:
+            if thread and thread.is_alive():
+                thread.join(timeout=2.0)
+        self._stage_threads = []
 
         self.is_streaming = False
 
@@ -824,12 +1039,21 @@ class CameraManager:
         """Get the latest captured frame.
 
         Returns:
-            Latest frame or None if not available
+            Copy of the newest frame in the capture ring, or None if not available
         """
-        with self.acquisition_lock:
-            if self.current_frame is not None:
-                return self.current_frame.copy()
-        return None
+        ring = self._capture_ring
+        if ring is None:
+            return None
+
+        latest = ring.latest()
+        if latest is None:
+            return None
+
+        slot, sequence = latest
+        frame = slot.frame.copy()
+        if not ring.is_current(slot, sequence):
+            return None  # Overwritten while copying - caller polls again
+        return frame
 
     def get_latest_frame_info(self) -> Dict[str, Any]:
         """Get information about the latest frame.
@@ -837,18 +1061,21 @@ class CameraManager:
         Returns:
             Dictionary with frame information
         """
-        with self.acquisition_lock:
-            if self.current_frame is None:
-                return {
-                    "success": False,
-                    "error": "No frame available",
-                }
+        latest = self._capture_ring.latest() if self._capture_ring is not None else None
+        if latest is None:
+            return {
+                "success": False,
+                "error": "No frame available",
+            }
 
+        with self.acquisition_lock:
             return {
                 "success": True,
                 "timestamp_us": self.last_capture_timestamp,
-                "shape": self.current_frame.shape,
+                "shape": latest[0].frame.shape,
                 "is_streaming": self.is_streaming,
+                "capture_fps": self.capture_fps,
+                "frames_skipped": dict(self.frames_skipped),
             }
 
     def shutdown(self):
@@ -0,0 +1,278 @@
+"""Capture ring shared by the camera pipeline stages.
+
+The capture thread only grabs frames and timestamps into a preallocated ring of
+slots; the recording and preview stages each follow the ring with their own
+cursor. A stage that falls more than a ring behind skips ahead (and counts the
+skipped frames) instead of slowing capture down, so disk or frontend stalls
+never change the camera cadence.
+
+Slots are reused in place: a stage must check that the slot still holds the
+frame it started with (``is_current``) after reading from it.
+
+The preview stage renders frames through a PreviewProfile (size, rate, pixel
+format) before they reach shared memory; recording always gets full-resolution,
+full-rate grayscale, converted into buffers from a FrameBufferPool that the
+HDF5 writer recycles once each frame is staged for disk.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from parameters.constants import PREVIEW_COLORS
+
+# ~0.3 s of slack at 100 fps before a stalled stage starts skipping frames
+DEFAULT_CAPTURE_RING_FRAMES = 32
+
+
+@dataclass(frozen=True)
+class PreviewProfile:
+    """How captured frames are reduced for the live preview."""
+
+    max_size_px: int = 512  # Longest side after square crop (0 = full resolution)
+    max_fps: float = 30.0  # Publish rate cap (0 = every captured frame)
+    color: str = "grayscale"  # One of PREVIEW_COLORS
+
+    @classmethod
+    def from_params(cls, system_params: Dict[str, Any]) -> "PreviewProfile":
+        """Build a profile from the system parameter group (missing keys use defaults)."""
+        defaults = cls()
+        color = system_params.get("camera_preview_color", defaults.color)
+        return cls(
+            max_size_px=int(system_params.get("camera_preview_max_px", defaults.max_size_px)),
+            max_fps=float(system_params.get("camera_preview_max_fps", defaults.max_fps)),
+            color=color if color in PREVIEW_COLORS else defaults.color,
+        )
+
+    @property
+    def min_interval_sec(self) -> float:
+        """Minimum time between published preview frames."""
+        return 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+
+
+def render_preview(frame: np.ndarray, profile: PreviewProfile) -> np.ndarray:
+    """Center-crop a captured frame to square, downscale and convert it for preview.
+
+    Grayscale previews are converted before downscaling (one channel to
+    resample); downscaling uses an integer-factor area reduction followed by a
+    small linear resize, which is several times faster than a fractional
+    INTER_AREA resize.
+
+    Args:
+        frame: Captured frame ([H, W] grayscale or [H, W, 3] BGR)
+        profile: Preview profile
+
+    Returns:
+        New [S, S] grayscale or [S, S, 4] RGBA uint8 array (never a view of frame)
+    """
+    height, width = frame.shape[:2]
+    size = min(height, width)
+    y_start = (height - size) // 2
+    x_start = (width - size) // 2
+    preview = frame[y_start : y_start + size, x_start : x_start + size]
+
+    is_color = preview.ndim == 3 and preview.shape[2] == 3
+    if profile.color == "grayscale" and is_color:
+        preview = cv2.cvtColor(preview, cv2.COLOR_BGR2GRAY)
+        is_color = False
+
+    target = profile.max_size_px
+    if target and size > target:
+        factor = size // target
+        if factor > 1:
+            preview = cv2.resize(
+                preview, (size // factor, size // factor), interpolation=cv2.INTER_AREA
+            )
+        if preview.shape[0] != target:
+            preview = cv2.resize(preview, (target, target), interpolation=cv2.INTER_LINEAR)
+
+    if profile.color == "rgba":
+        return cv2.cvtColor(preview, cv2.COLOR_BGR2RGBA if is_color else cv2.COLOR_GRAY2RGBA)
+    # Grayscale: copy only if no conversion/resize produced a new array yet
+    return preview.copy() if np.shares_memory(preview, frame) else preview
+
+
+class CaptureSlot:
+    """One ring slot: a reusable frame buffer plus its capture metadata."""
+
+    __slots__ = ("frame", "timestamp_us", "frame_index", "sequence")
+
+    def __init__(self):
+        self.frame: Optional[np.ndarray] = None
+        self.timestamp_us = 0
+        self.frame_index = 0
+        self.sequence = 0  # 0 = empty or being overwritten
+
+
+class FrameCaptureRing:
+    """Single-producer, multi-consumer ring of captured frames."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPTURE_RING_FRAMES):
+        """Create the ring.
+
+        Args:
+            capacity: Number of slots (at least 2)
+        """
+        if capacity < 2:
+            raise ValueError(f"Capture ring needs at least 2 slots, got {capacity}")
+        self.capacity = capacity
+        self.slots: List[CaptureSlot] = [CaptureSlot() for _ in range(capacity)]
+        self._head = 0  # Sequence of the newest published frame
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def closed(self) -> bool:
+        """True once close() was called."""
+        return self._closed
+
+    @property
+    def head(self) -> int:
+        """Sequence number of the newest published frame (0 = none yet)."""
+        return self._head
+
+    def begin_write(self) -> CaptureSlot:
+        """Claim the slot for the next frame (producer only).
+
+        The slot is marked invalid until publish() so readers still holding it
+        detect the overwrite.
+        """
+        slot = self.slots[(self._head + 1) % self.capacity]
+        with self._condition:
+            slot.sequence = 0
+        return slot
+
+    def publish(self, slot: CaptureSlot, frame: np.ndarray, timestamp_us: int, frame_index: int) -> int:
+        """Publish a filled slot and wake waiting stages (producer only).
+
+        Args:
+            slot: Slot returned by begin_write()
+            frame: Captured frame (normally slot.frame, filled in place)
+            timestamp_us: Capture timestamp in microseconds
+            frame_index: Camera frame index
+
+        Returns:
+            Sequence number of the published frame
+        """
+        with self._condition:
+            self._head += 1
+            slot.frame = frame
+            slot.timestamp_us = timestamp_us
+            slot.frame_index = frame_index
+            slot.sequence = self._head
+            self._condition.notify_all()
+            return self._head
+
+    def wait_next(self, cursor: int, timeout: float) -> Optional[Tuple[CaptureSlot, int, int]]:
+        """Wait for the next frame after cursor.
+
+        Args:
+            cursor: Sequence of the last frame this stage consumed
+            timeout: Seconds to wait for a new frame
+
+        Returns:
+            (slot, sequence, skipped) where skipped counts frames overwritten
+            before this stage reached them, or None on timeout / close
+        """
+        with self._condition:
+            if self._head <= cursor and not self._closed:
+                self._condition.wait(timeout)
+            if self._closed or self._head <= cursor:
+                return None
+
+            # The slot after head may already be mid-overwrite
+            oldest = max(cursor + 1, self._head - self.capacity + 2)
+            return self.slots[oldest % self.capacity], oldest, oldest - (cursor + 1)
+
+    def wait_latest(self, cursor: int, timeout: float) -> Optional[Tuple[CaptureSlot, int, int]]:
+        """Wait for a frame newer than cursor and return the newest one.
+
+        For stages that only care about the freshest frame (preview).
+
+        Returns:
+            (slot, sequence, skipped) or None on timeout / close
+        """
+        with self._condition:
+            if self._head <= cursor and not self._closed:
+                self._condition.wait(timeout)
+            if self._closed or self._head <= cursor:
+                return None
+            return self.slots[self._head % self.capacity], self._head, self._head - cursor - 1
+
+    def latest(self) -> Optional[Tuple[CaptureSlot, int]]:
+        """Newest published slot and its sequence, or None if nothing captured."""
+        with self._condition:
+            if self._head == 0:
+                return None
+            return self.slots[self._head % self.capacity], self._head
+
+    @staticmethod
+    def is_current(slot: CaptureSlot, sequence: int) -> bool:
+        """True if slot still holds the frame with this sequence."""
+        return slot.sequence == sequence
+
+    def close(self) -> None:
+        """Wake all waiting stages; wait_next() returns None from now on."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class FrameBufferPool:
+    """Recycled fixed-shape frame buffers for the recording path.
+
+    Buffers are allocated on demand up to max_buffers and returned with
+    release() once their consumer is done, so steady-state recording does no
+    per-frame allocation and memory is bounded by the actual writer backlog.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype: Any = np.uint8, max_buffers: int = 8):
+        """Create an empty pool.
+
+        Args:
+            shape: Shape of every buffer, e.g. (H, W)
+            dtype: Buffer dtype
+            max_buffers: Maximum buffers alive at once
+        """
+        self.shape = tuple(int(d) for d in shape)
+        self.dtype = np.dtype(dtype)
+        self.max_buffers = max_buffers
+        self.allocated = 0
+        self._free: "queue.LifoQueue[np.ndarray]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Take a free buffer, allocating one if the pool is below max_buffers.
+
+        Args:
+            timeout: Seconds to wait for a release when the pool is exhausted
+
+        Returns:
+            Buffer (contents undefined), or None if none became free in time
+        """
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self.allocated < self.max_buffers:
+                self.allocated += 1
+                return np.empty(self.shape, dtype=self.dtype)
+
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, buffer: np.ndarray) -> None:
+        """Return a buffer obtained from acquire()."""
+        self._free.put(buffer)
+
+    def matches(self, shape: Tuple[int, ...], dtype: Any = np.uint8) -> bool:
+        """True if this pool's buffers have the given shape and dtype."""
+        return self.shape == tuple(shape) and self.dtype == np.dtype(dtype)
@@ -41,6 +41,8 @@ class SharedMemoryConfig:
     metadata_port: int  # Port for stimulus frame metadata
     camera_metadata_port: int  # Port for camera frame metadata
     analysis_metadata_port: int  # Port for analysis frame metadata
+    ring_slots: int = 8  # Frame slots per channel ring buffer
+    notify_mode: str = "json"  # Per-frame notification: "json", "binary" or "none"
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -50,6 +52,8 @@ class SharedMemoryConfig:
             "metadata_port": self.metadata_port,
             "camera_metadata_port": self.camera_metadata_port,
             "analysis_metadata_port": self.analysis_metadata_port,
+            "ring_slots": self.ring_slots,
+            "notify_mode": self.notify_mode,
         }
 
 
@@ -172,6 +176,9 @@ class AnalysisConfig:
     vfs_threshold_sd: float  # Statistical threshold for VFS (alternative method)
     area_min_size_mm2: float  # Minimum area size (noise filtering)
 
+    # Boundary rendering
+    boundary_skeletonize: bool = False  # Thin area boundaries to single pixels (Zhang-Suen)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -184,6 +191,7 @@ class AnalysisConfig:
             "response_threshold_percent": self.response_threshold_percent,
             "vfs_threshold_sd": self.vfs_threshold_sd,
             "area_min_size_mm2": self.area_min_size_mm2,
+            "boundary_skeletonize": self.boundary_skeletonize,
         }
 
 
@@ -342,6 +350,7 @@ class AppConfig:
                 response_threshold_percent=current.get("analysis", {}).get("response_threshold_percent", 20),
                 vfs_threshold_sd=current.get("analysis", {}).get("vfs_threshold_sd", 2.0),
                 area_min_size_mm2=current.get("analysis", {}).get("area_min_size_mm2", 0.1),
+                boundary_skeletonize=current.get("analysis", {}).get("boundary_skeletonize", False),
             ),
             session=SessionConfig(
                 session_name=current.get("session", {}).get("session_name", ""),
@@ -433,6 +442,7 @@ class AppConfig:
                 response_threshold_percent=defaults.get("analysis", {}).get("response_threshold_percent", 20),
                 vfs_threshold_sd=defaults.get("analysis", {}).get("vfs_threshold_sd", 2.0),
                 area_min_size_mm2=defaults.get("analysis", {}).get("area_min_size_mm2", 0.1),
+                boundary_skeletonize=defaults.get("analysis", {}).get("boundary_skeletonize", False),
             ),
             session=SessionConfig(
                 session_name=defaults.get("session", {}).get("session_name", ""),
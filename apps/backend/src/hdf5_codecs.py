@@ -0,0 +1,135 @@
+"""HDF5 compression codecs and chunk-shape policy for frame stacks.
+
+Camera recordings and the stimulus library are large uint8 (N, H, W) stacks.
+gzip level 4 is the slowest common codec for both writing and reading them;
+LZ4 / Zstd (via the optional hdf5plugin package) are several times faster at a
+similar ratio on ISI data.
+
+Usage:
+    kwargs = compression_kwargs("lz4")
+    f.create_dataset("frames", ..., chunks=time_series_chunks(shape, dtype), **kwargs)
+
+Importing this module also registers the hdf5plugin filters (if installed), so
+any module that READS codec-compressed files must import it before opening them.
+
+Falls back to gzip (with a warning) when hdf5plugin is not installed.
+"""
+
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from parameters.constants import HDF5_CODECS
+
+logger = logging.getLogger(__name__)
+
+# Optional dependency: hdf5plugin provides LZ4/Zstd/Blosc HDF5 filters
+try:
+    import hdf5plugin
+
+    HDF5PLUGIN_AVAILABLE = True
+except ImportError:
+    hdf5plugin = None
+    HDF5PLUGIN_AVAILABLE = False
+
+# Codecs accepted by compression_kwargs (system.hdf5_codec parameter)
+CODECS = HDF5_CODECS
+PLUGIN_CODECS = {"lz4", "zstd", "blosc-lz4", "blosc-zstd"}
+DEFAULT_CODEC = "gzip"
+
+# Chunk-shape policy: whole frames, time-blocked to roughly this many bytes
+DEFAULT_CHUNK_TARGET_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_CHUNK_FRAMES = 64
+
+
+def compression_kwargs(codec: Optional[str] = None, level: Optional[int] = None) -> Dict[str, Any]:
+    """Build h5py create_dataset() keyword arguments for a codec.
+
+    Args:
+        codec: One of CODECS (None = DEFAULT_CODEC)
+        level: Optional compression level (codec-specific; None = codec default)
+
+    Returns:
+        Dict of create_dataset kwargs (compression, compression_opts, shuffle, ...)
+
+    Raises:
+        ValueError: If codec is unknown
+    """
+    codec = (codec or DEFAULT_CODEC).lower()
+    if codec not in CODECS:
+        raise ValueError(f"Unknown HDF5 codec: {codec}. Must be one of {CODECS}")
+
+    if codec in PLUGIN_CODECS and not HDF5PLUGIN_AVAILABLE:
+        logger.warning(
+            f"HDF5 codec '{codec}' requires hdf5plugin (pip install hdf5plugin) - "
+            f"falling back to gzip"
+        )
+        codec = "gzip"
+        level = None
+
+    if codec == "none":
+        return {}
+    if codec == "gzip":
+        return {"compression": "gzip", "compression_opts": 4 if level is None else level}
+    if codec == "lzf":
+        return {"compression": "lzf"}
+    if codec == "lz4":
+        return dict(hdf5plugin.LZ4())
+    if codec == "zstd":
+        return dict(hdf5plugin.Zstd() if level is None else hdf5plugin.Zstd(clevel=level))
+
+    # Blosc with byte shuffle (helps multi-byte data; neutral for uint8 frames)
+    cname = "lz4" if codec == "blosc-lz4" else "zstd"
+    return dict(
+        hdf5plugin.Blosc(
+            cname=cname,
+            clevel=5 if level is None else level,
+            shuffle=hdf5plugin.Blosc.SHUFFLE,
+        )
+    )
+
+
+def resolve_codec(codec: Optional[str]) -> str:
+    """Return the codec that compression_kwargs will actually use.
+
+    Args:
+        codec: Requested codec (None = DEFAULT_CODEC)
+
+    Returns:
+        Effective codec name (after hdf5plugin fallback)
+    """
+    codec = (codec or DEFAULT_CODEC).lower()
+    if codec in PLUGIN_CODECS and not HDF5PLUGIN_AVAILABLE:
+        return "gzip"
+    return codec
+
+
+def time_series_chunks(
+    frame_shape: Tuple[int, ...],
+    dtype: Any = np.uint8,
+    target_bytes: int = DEFAULT_CHUNK_TARGET_BYTES,
+    max_frames: int = DEFAULT_MAX_CHUNK_FRAMES,
+    n_frames: Optional[int] = None,
+) -> Tuple[int, ...]:
+    """Chunk shape for (N, *frame_shape) stacks read as blocks of whole frames.
+
+    Analysis streams frames in time blocks and playback reads whole frames, so
+    chunks span complete frames and as many consecutive frames as fit in
+    target_bytes (at least 1, at most max_frames).
+
+    Args:
+        frame_shape: Shape of one frame, e.g. (H, W)
+        dtype: Frame dtype
+        target_bytes: Approximate bytes per chunk
+        max_frames: Upper bound on frames per chunk
+        n_frames: Dataset length, for fixed-size datasets (chunks may not exceed it)
+
+    Returns:
+        Chunk shape (frames_per_chunk, *frame_shape)
+    """
+    frame_bytes = int(np.prod(frame_shape)) * np.dtype(dtype).itemsize
+    frames_per_chunk = int(min(max_frames, max(1, target_bytes // max(frame_bytes, 1))))
+    if n_frames is not None:
+        frames_per_chunk = max(1, min(frames_per_chunk, int(n_frames)))
+    return (frames_per_chunk,) + tuple(int(d) for d in frame_shape)
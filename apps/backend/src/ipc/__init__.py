@@ -2,10 +2,16 @@
 
 from .channels import MultiChannelIPC, ChannelType, ChannelConfig
 from .shared_memory import SharedMemoryService
+from .ring_buffer import FrameRingBuffer
+from .bulk import BULK_TRANSPORTS, encode_array, decode_array
 
 __all__ = [
     "MultiChannelIPC",
     "ChannelType",
     "ChannelConfig",
     "SharedMemoryService",
+    "FrameRingBuffer",
+    "BULK_TRANSPORTS",
+    "encode_array",
+    "decode_array",
 ]
@@ -0,0 +1,85 @@
+"""Bulk array payloads for control-channel responses.
+
+Control responses are JSON lines on stdout, which is fine for small results
+but expands NumPy arrays into lists of Python numbers (a 1024x1024 playback
+frame becomes a million-element nested list). Commands that return arrays
+accept a ``transport`` field to negotiate how those arrays are sent:
+
+- "json": array.tolist() inline (default; backwards compatible)
+- "shm": raw bytes written to the shared memory bulk ring; the response
+  carries a small descriptor instead of the data
+
+Descriptor (the "shm" encoding of an array)::
+
+    {
+        "transport": "shm",
+        "shm_path": "/tmp/stimulus_stream_bulk_shm",
+        "offset_bytes": 1216,
+        "data_size_bytes": 1048576,
+        "frame_id": 42,
+        "layout_gen": 1,
+        "dtype": "<u1",
+        "shape": [1024, 1024],
+    }
+
+Readers copy data_size_bytes from shm_path at offset_bytes (the same read the
+frontend already does for frame channels) and interpret them as a C-order
+array of dtype/shape. Bulk slots are recycled, so a descriptor is only valid
+until a few more bulk payloads have been written; read it right away. A
+payload larger than a slot re-lays out the ring, which moves every slot, so
+readers must reject descriptors whose layout_gen no longer matches the ring
+file header or whose slot seq is no longer 2 * frame_id
+(FrameRingBuffer.read_payload; the Electron shared memory reader checks the
+same fields when given frame_id and layout_gen).
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+BULK_TRANSPORTS = ("json", "shm")
+
+
+def resolve_transport(command: Dict[str, Any]) -> str:
+    """Transport requested by a command (unknown values fall back to "json")."""
+    transport = command.get("transport", "json")
+    return transport if transport in BULK_TRANSPORTS else "json"
+
+
+def encode_array(
+    array: Optional[np.ndarray],
+    transport: str,
+    shared_memory=None,
+    label: str = "",
+) -> Any:
+    """Encode an array for a control response.
+
+    Args:
+        array: Array to send (None passes through)
+        transport: One of BULK_TRANSPORTS
+        shared_memory: SharedMemoryService providing the bulk ring (required for "shm")
+        label: Payload label stored in the slot header (e.g. "playback_frame")
+
+    Returns:
+        Nested list for "json", descriptor dict for "shm", or None
+    """
+    if array is None:
+        return None
+    if transport == "shm":
+        if shared_memory is None:
+            raise RuntimeError("Shared memory transport requested but no shared memory service")
+        return shared_memory.write_bulk_array(array, label)
+    return array.tolist()
+
+
+def decode_array(buffer: Any, descriptor: Dict[str, Any]) -> np.ndarray:
+    """Rebuild an array from the bytes a descriptor points at.
+
+    Args:
+        buffer: Bytes-like object holding exactly data_size_bytes
+        descriptor: Descriptor returned by encode_array(..., "shm")
+
+    Returns:
+        Array view of buffer with the descriptor's dtype and shape
+    """
+    return np.frombuffer(buffer, dtype=np.dtype(descriptor["dtype"])).reshape(descriptor["shape"])
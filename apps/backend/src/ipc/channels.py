@@ -86,6 +86,7 @@ class MultiChannelIPC:
         self._channels: Dict[ChannelType, Dict[str, Any]] = {}
         self._running = False
         self._lock = threading.RLock()
+        self._control_lock = threading.Lock()  # One stdout line per control message
 
         self._health_thread: Optional[threading.Thread] = None
         self._health_callback: Optional[Callable[[HealthStatus], None]] = None
@@ -282,7 +283,8 @@ class MultiChannelIPC:
             import json
 
             json_str = json.dumps(message)
-            print(json_str, file=sys.stdout, flush=True)
+            with self._control_lock:
+                print(json_str, file=sys.stdout, flush=True)
             return True
         except Exception as exc:
             logger.error("Failed to send control message: %s", exc)
@@ -0,0 +1,187 @@
+"""Concurrent command dispatch for the control channel.
+
+The stdin reader hands each command to CommandDispatcher, which runs it on a
+single-thread executor per subsystem (camera, stimulus, acquisition, playback,
+analysis, parameters, system). Commands for the same subsystem keep their
+arrival order; commands for different subsystems run concurrently, so a slow
+analysis render no longer holds up camera or parameter commands. Responses
+go out as soon as each handler finishes and are matched to their request by
+the echoed messageId.
+
+Trivial read-only queries (ping, status getters) are on a fast path and run
+inline on the reader thread, so they answer even while every executor is busy.
+Clients that need ordering across subsystems must await each response before
+sending the next command (the frontend's sendCommand already does).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUBSYSTEM = "system"
+
+# Per-subsystem backlog above which queueing is logged as a warning
+QUEUE_WARNING_DEPTH = 16
+
+
+class CommandDispatcher:
+    """Routes control commands to per-subsystem executors."""
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]],
+        send_response: Callable[[Dict[str, Any]], bool],
+        routes: Optional[Dict[str, str]] = None,
+        fast_path: Iterable[str] = (),
+    ):
+        """Create the dispatcher (executors are started lazily).
+
+        Args:
+            handlers: Command type -> handler mapping
+            send_response: Sends one response message (must be thread-safe)
+            routes: Command type -> subsystem name (unlisted commands use DEFAULT_SUBSYSTEM)
+            fast_path: Command types answered inline on the calling thread
+        """
+        self.handlers = handlers
+        self.send_response = send_response
+        self.routes = dict(routes or {})
+        self.fast_path = frozenset(fast_path)
+
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._pending: Dict[str, int] = {}  # Queued or running commands per subsystem
+        self._pending_lock = threading.Lock()
+        self._closed = False
+
+    def subsystem_for(self, command_type: str) -> str:
+        """Subsystem whose executor runs command_type."""
+        return self.routes.get(command_type, DEFAULT_SUBSYSTEM)
+
+    def dispatch(self, command: Dict[str, Any]) -> None:
+        """Execute a command inline (fast path) or queue it on its subsystem.
+
+        Args:
+            command: Parsed command (type, optional messageId, arguments)
+        """
+        command_type = command.get("type", "")
+
+        if self._closed:
+            self._respond(command, {"success": False, "error": "Backend is shutting down"})
+            return
+
+        if not command_type or command_type in self.fast_path:
+            self._run(command)
+            return
+
+        subsystem = self.subsystem_for(command_type)
+        executor = self._executors.get(subsystem)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"Cmd-{subsystem}")
+            self._executors[subsystem] = executor
+
+        with self._pending_lock:
+            pending = self._pending.get(subsystem, 0) + 1
+            self._pending[subsystem] = pending
+        if pending >= QUEUE_WARNING_DEPTH:
+            logger.warning(f"{pending} commands queued for {subsystem} (latest: {command_type})")
+
+        future = executor.submit(self._run_queued, subsystem, command)
+        future.add_done_callback(lambda f: self._on_queued_done(f, subsystem, command))
+
+    def pending(self) -> Dict[str, int]:
+        """Queued or running commands per subsystem."""
+        with self._pending_lock:
+            return dict(self._pending)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting commands and cancel those not yet started.
+
+        Each cancelled command is answered with a "Backend is shutting down"
+        error, so its sender does not wait for its own timeout.
+
+        Args:
+            wait: Block until running handlers finish
+        """
+        self._closed = True
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+        self._executors.clear()
+
+    def _on_queued_done(self, future: Future, subsystem: str, command: Dict[str, Any]) -> None:
+        """Answer a queued command that was cancelled before it started."""
+        if not future.cancelled():
+            return
+        with self._pending_lock:
+            self._pending[subsystem] -= 1
+        command_type = command.get("type", "")
+        logger.info(f"Command {command_type} cancelled by shutdown")
+        self._respond(command, {
+            "success": False,
+            "error": "Backend is shutting down",
+            "type": f"{command_type}_response",
+        })
+
+    def _run_queued(self, subsystem: str, command: Dict[str, Any]) -> None:
+        """Executor entry point: run the command and update the backlog count."""
+        try:
+            self._run(command)
+        finally:
+            with self._pending_lock:
+                self._pending[subsystem] -= 1
+
+    def _run(self, command: Dict[str, Any]) -> None:
+        """Run a command's handler and send its response."""
+        command_type = command.get("type", "")
+
+        if not command_type:
+            self._respond(command, {"success": False, "error": "Command type is required"})
+            return
+
+        handler = self.handlers.get(command_type)
+        if handler is None:
+            logger.warning(f"Unknown command type: {command_type}")
+            self._respond(command, {"success": False, "error": f"Unknown command: {command_type}"})
+            return
+
+        try:
+            logger.info(f"Processing command: {command_type}")
+            response = handler(command)
+
+            # Ensure response has type field
+            if "type" not in response:
+                response["type"] = f"{command_type}_response"
+
+            logger.info(f"Command {command_type} completed")
+        except Exception as e:
+            logger.error(f"Handler error for {command_type}: {e}", exc_info=True)
+            response = {
+                "success": False,
+                "error": str(e),
+                "type": f"{command_type}_response",
+            }
+
+        self._respond(command, response)
+
+    def _respond(self, command: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Send a response tagged with the command's messageId."""
+        message_id = command.get("messageId")
+        if message_id:
+            response["messageId"] = message_id
+
+        try:
+            if not self.send_response(response):
+                # Serialization failed - send simpler error message
+                error_response = {
+                    "success": False,
+                    "error": "Failed to serialize response (check backend logs)",
+                    "type": f"{command.get('type', '')}_response",
+                }
+                if message_id:
+                    error_response["messageId"] = message_id
+                self.send_response(error_response)
+        except Exception as e:
+            logger.error(f"Critical error sending response: {e}", exc_info=True)
@@ -0,0 +1,359 @@
+"""Single-producer frame ring buffer in a shared memory file.
+
+Each frame channel (stimulus, camera, analysis) is one file split into
+fixed-size slots. Frames are copied straight into their slot through a NumPy
+view of the mmap (no intermediate bytes object), and all frame metadata is
+packed binary in the slot header, so readers can poll the file without any
+per-frame JSON.
+
+Layout (little-endian):
+
+    File header (FILE_HEADER_SIZE bytes at offset 0)
+        magic           8s   b"ISIRING1"
+        version         u32
+        slot_count      u32
+        slot_size       u64  bytes per slot (slot header + payload capacity)
+        header_size     u32  SLOT_HEADER_SIZE
+        layout_gen      u32  incremented whenever slots are re-laid out
+        write_seq       u64  frame_id of the last completed frame (0 = none)
+
+    Slot i at FILE_HEADER_SIZE + i * slot_size
+        seq                   u64  seqlock: odd while writing, 2 * frame_id when complete
+        frame_id              u64
+        timestamp_us          i64
+        capture_timestamp_us  i64
+        exposure_us           i64  (-1 = unknown)
+        width_px              u32
+        height_px             u32
+        channels              u32
+        data_size_bytes       u32
+        frame_index           i32
+        total_frames          i32
+        angle_degrees         f64
+        start_angle           f64
+        end_angle             f64
+        gain                  f32  (NaN = unknown)
+        label                 32s  direction / camera name / source (UTF-8, NUL padded)
+        payload at slot + SLOT_HEADER_SIZE (data_size_bytes, row-major uint8)
+
+Frame N is written to slot (N - 1) % slot_count. Readers use the seqlock: read
+seq, skip if odd (or not 2 * the wanted frame_id), copy header and payload,
+then re-read seq and discard the copy if it changed.
+
+A frame that does not fit its slot re-lays out the ring (fewer, larger slots)
+and bumps layout_gen; offsets handed out before then point into the old
+layout. Readers holding an (offset, frame_id, layout_gen) triple check
+layout_gen in the file header together with the slot seq (see read_payload).
+
+One writer per channel; writes to the same channel from several threads must
+be serialized by the caller.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RING_MAGIC = b"ISIRING1"
+RING_VERSION = 1
+FILE_HEADER_SIZE = 64
+SLOT_HEADER_SIZE = 128
+SLOT_ALIGN = 64
+DEFAULT_SLOT_COUNT = 8
+
+_FILE_HEADER = struct.Struct("<8sIIQIIQ")
+_LAYOUT_GEN_OFFSET = 28
+_WRITE_SEQ_OFFSET = 32
+_SLOT_FIELDS = struct.Struct("<QqqqIIIIiidddf32s")  # slot header after the seq word
+LABEL_BYTES = 32
+
+
+class SlotHeader(NamedTuple):
+    """Decoded slot header of a completed frame."""
+
+    frame_id: int
+    timestamp_us: int
+    capture_timestamp_us: int
+    exposure_us: int
+    width_px: int
+    height_px: int
+    channels: int
+    data_size_bytes: int
+    frame_index: int
+    total_frames: int
+    angle_degrees: float
+    start_angle: float
+    end_angle: float
+    gain: float
+    label: str
+    data_offset: int
+
+
+class FrameRingBuffer:
+    """Fixed-slot frame ring buffer backed by a memory-mapped file."""
+
+    def __init__(self, path: str, size_bytes: int, slot_count: int = DEFAULT_SLOT_COUNT):
+        """Create (truncate) the backing file and lay out the slots.
+
+        Args:
+            path: Shared memory file path
+            size_bytes: Total file size
+            slot_count: Number of frame slots (reduced automatically if a frame
+                does not fit in a slot)
+
+        Raises:
+            ValueError: If the buffer is too small for a single slot
+        """
+        self.path = path
+        self.size_bytes = int(size_bytes)
+        self.slot_count = 0
+        self.slot_size = 0
+        self.layout_gen = 0
+        self.last_frame_id = 0
+
+        self._fd = os.open(path, os.O_CREAT | os.O_RDWR | os.O_TRUNC, 0o666)
+        os.ftruncate(self._fd, self.size_bytes)
+        self._mmap = mmap.mmap(self._fd, self.size_bytes, access=mmap.ACCESS_WRITE)
+        # 8-byte aligned view for single-store updates of seq / write_seq words
+        self._words = np.ndarray((self.size_bytes // 8,), dtype="<u8", buffer=self._mmap)
+
+        self._layout(slot_count)
+
+    @property
+    def capacity_bytes(self) -> int:
+        """Maximum payload size per slot."""
+        return self.slot_size - SLOT_HEADER_SIZE
+
+    def slot_offset(self, frame_id: int) -> int:
+        """Byte offset of the slot holding frame_id."""
+        return FILE_HEADER_SIZE + ((frame_id - 1) % self.slot_count) * self.slot_size
+
+    def write(
+        self,
+        frame: np.ndarray,
+        timestamp_us: int,
+        capture_timestamp_us: Optional[int] = None,
+        exposure_us: Optional[int] = None,
+        channels: int = 1,
+        frame_index: int = 0,
+        total_frames: int = 0,
+        angle_degrees: float = 0.0,
+        start_angle: float = 0.0,
+        end_angle: float = 0.0,
+        gain: Optional[float] = None,
+        label: str = "",
+    ) -> Tuple[int, int]:
+        """Copy a frame into the next slot and publish its header.
+
+        Args:
+            frame: Frame array ([H, W] or [H, W, C]); non-uint8 data is cast
+            timestamp_us: Publish timestamp in microseconds
+            capture_timestamp_us: Capture timestamp (defaults to timestamp_us)
+            exposure_us: Exposure time in microseconds, if known
+            channels: Channels per pixel (1 = grayscale, 4 = RGBA)
+            frame_index: Frame index within its dataset
+            total_frames: Frames in the dataset
+            angle_degrees: Stimulus angle
+            start_angle: Dataset start angle
+            end_angle: Dataset end angle
+            gain: Camera gain, if known
+            label: Direction, camera name or source (truncated to 32 bytes)
+
+        Returns:
+            (frame_id, payload byte offset in the file)
+
+        Raises:
+            ValueError: If the frame cannot fit even in a single-slot layout
+        """
+        data_size = int(frame.size)
+        if data_size > self.capacity_bytes:
+            self._fit(data_size)
+
+        frame_id = self.last_frame_id + 1
+        base = self.slot_offset(frame_id)
+        data_offset = base + SLOT_HEADER_SIZE
+
+        # Seqlock: odd while the slot is being rewritten
+        self._words[base // 8] = 2 * frame_id - 1
+
+        destination = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._mmap, offset=data_offset)
+        np.copyto(destination, frame, casting="unsafe")
+
+        height = frame.shape[0] if frame.ndim >= 2 else 1
+        width = frame.shape[1] if frame.ndim >= 2 else frame.shape[0]
+        _SLOT_FIELDS.pack_into(
+            self._mmap,
+            base + 8,
+            frame_id,
+            int(timestamp_us),
+            int(timestamp_us if capture_timestamp_us is None else capture_timestamp_us),
+            -1 if exposure_us is None else int(exposure_us),
+            width,
+            height,
+            int(channels),
+            data_size,
+            int(frame_index),
+            int(total_frames),
+            float(angle_degrees),
+            float(start_angle),
+            float(end_angle),
+            float("nan") if gain is None else float(gain),
+            label.encode("utf-8")[:LABEL_BYTES],
+        )
+
+        # Publish: even sequence, then the file-level latest frame id
+        self._words[base // 8] = 2 * frame_id
+        self._words[_WRITE_SEQ_OFFSET // 8] = frame_id
+        self.last_frame_id = frame_id
+
+        return frame_id, data_offset
+
+    def read_header(self, frame_id: int) -> Optional[SlotHeader]:
+        """Read the header of frame_id if its slot still holds it.
+
+        Args:
+            frame_id: Frame to look up
+
+        Returns:
+            SlotHeader, or None if the frame was overwritten or is being written
+        """
+        if frame_id <= 0 or frame_id > self.last_frame_id:
+            return None
+
+        base = self.slot_offset(frame_id)
+        seq = int(self._words[base // 8])
+        if seq != 2 * frame_id:
+            return None
+
+        fields = _SLOT_FIELDS.unpack_from(self._mmap, base + 8)
+        if int(self._words[base // 8]) != seq:
+            return None
+
+        label = fields[-1].rstrip(b"\x00").decode("utf-8", errors="replace")
+        return SlotHeader(*fields[:-1], label, base + SLOT_HEADER_SIZE)
+
+    def read_frame(self, frame_id: int) -> Optional[Tuple[SlotHeader, np.ndarray]]:
+        """Copy a frame out of the ring (seqlock-validated).
+
+        Args:
+            frame_id: Frame to read
+
+        Returns:
+            (header, frame array [H, W] or [H, W, C]) or None if no longer available
+        """
+        header = self.read_header(frame_id)
+        if header is None:
+            return None
+
+        shape = (header.height_px, header.width_px)
+        if header.channels > 1:
+            shape += (header.channels,)
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=self._mmap, offset=header.data_offset).copy()
+
+        if int(self._words[self.slot_offset(frame_id) // 8]) != 2 * frame_id:
+            return None
+        return header, frame
+
+    def read_payload(
+        self, frame_id: int, offset_bytes: int, size_bytes: int, layout_gen: int
+    ) -> Optional[bytes]:
+        """Copy payload bytes located by a descriptor, rejecting stale descriptors.
+
+        Args:
+            frame_id: Frame the descriptor was issued for
+            offset_bytes: Payload offset from the descriptor
+            size_bytes: Payload size from the descriptor
+            layout_gen: Layout generation from the descriptor
+
+        Returns:
+            Payload bytes, or None if the ring was re-laid out since the
+            descriptor was issued or the slot no longer holds frame_id
+        """
+        if layout_gen != self._file_layout_gen():
+            return None
+        if frame_id <= 0 or offset_bytes != self.slot_offset(frame_id) + SLOT_HEADER_SIZE:
+            return None
+
+        seq_index = self.slot_offset(frame_id) // 8
+        if int(self._words[seq_index]) != 2 * frame_id:
+            return None
+        payload = bytes(self._mmap[offset_bytes:offset_bytes + size_bytes])
+        if int(self._words[seq_index]) != 2 * frame_id or layout_gen != self._file_layout_gen():
+            return None
+        return payload
+
+    def clear(self) -> None:
+        """Invalidate all slots and restart frame ids at 1."""
+        self.last_frame_id = 0
+        self._layout(self.slot_count)
+
+    def close(self, unlink: bool = True) -> None:
+        """Unmap and close the backing file.
+
+        Args:
+            unlink: Also remove the file
+        """
+        self._words = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if unlink and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _file_layout_gen(self) -> int:
+        """layout_gen as published in the file header."""
+        return struct.unpack_from("<I", self._mmap, _LAYOUT_GEN_OFFSET)[0]
+
+    def _fit(self, data_size: int) -> None:
+        """Re-lay out with fewer, larger slots so a frame of data_size fits."""
+        needed = -(-(SLOT_HEADER_SIZE + data_size) // SLOT_ALIGN) * SLOT_ALIGN
+        slot_count = (self.size_bytes - FILE_HEADER_SIZE) // needed
+        if slot_count < 1:
+            raise ValueError(
+                f"Frame of {data_size} bytes does not fit in shared memory buffer "
+                f"{self.path} ({self.size_bytes} bytes)"
+            )
+        logger.warning(
+            f"Frame of {data_size / 1024 ** 2:.1f} MB exceeds slot capacity in {self.path}; "
+            f"re-laying out ring with {slot_count} slots (was {self.slot_count})"
+        )
+        self._layout(slot_count)
+
+    def _layout(self, slot_count: int) -> None:
+        """Write the file header for slot_count slots and invalidate every slot."""
+        slot_size = (self.size_bytes - FILE_HEADER_SIZE) // max(1, slot_count)
+        slot_size = slot_size // SLOT_ALIGN * SLOT_ALIGN
+        if slot_size <= SLOT_HEADER_SIZE:
+            raise ValueError(
+                f"Shared memory buffer {self.path} too small for {slot_count} slots "
+                f"({self.size_bytes} bytes)"
+            )
+
+        self.slot_count = int(slot_count)
+        self.slot_size = int(slot_size)
+        self.layout_gen += 1
+
+        for slot in range(self.slot_count):
+            self._words[(FILE_HEADER_SIZE + slot * self.slot_size) // 8] = 0
+
+        _FILE_HEADER.pack_into(
+            self._mmap,
+            0,
+            RING_MAGIC,
+            RING_VERSION,
+            self.slot_count,
+            self.slot_size,
+            SLOT_HEADER_SIZE,
+            self.layout_gen,
+            self.last_frame_id,
+        )
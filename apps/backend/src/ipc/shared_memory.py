@@ -1,14 +1,15 @@
 """Shared Memory Frame Streaming System.
 
 Provides ultra-high performance binary frame data transfer between backend and frontend.
+Frames live in per-channel ring buffers (see ring_buffer.py) with binary slot headers.
 Simplified from original implementation: accepts config in constructor, no service locator or globals.
 """
 
 from __future__ import annotations
 
 import logging
-import mmap
-import os
+import math
+import struct
 import threading
 import time
 from dataclasses import dataclass, asdict
@@ -17,8 +18,16 @@ from typing import Dict, Any, Optional
 import numpy as np
 import zmq
 
+from .ring_buffer import DEFAULT_SLOT_COUNT, FrameRingBuffer
+
 logger = logging.getLogger(__name__)
 
+# Per-frame notification formats on the metadata sockets
+NOTIFY_MODES = ("json", "binary", "none")
+
+# Binary notification: frame_id u64, offset_bytes u64, slot u32, layout_gen u32
+BINARY_NOTIFICATION = struct.Struct("<QQII")
+
 
 @dataclass
 class FrameMetadata:
@@ -95,6 +104,19 @@ class SharedMemoryFrameStream:
     - Camera frames (port 5559)
     - Analysis frames (port 5561)
 
+    Each channel is a FrameRingBuffer: frames are copied directly into a fixed
+    slot and their metadata is packed into the slot header, so readers can
+    poll the file (seqlock-validated) without per-frame JSON. The metadata
+    sockets still announce each frame according to notify_mode:
+
+    - "json": full metadata dict (default; what the Electron frontend reads)
+    - "binary": packed (frame_id, offset_bytes, slot, layout_gen) message
+    - "none": no notification, readers poll the ring's write_seq header word
+
+    A fourth ring (bulk) carries array payloads of control-channel responses
+    that negotiated the "shm" transport (see bulk.py). It has no metadata
+    socket: the response itself holds the descriptor.
+
     Simplified implementation using constructor injection.
     """
 
@@ -104,7 +126,9 @@ class SharedMemoryFrameStream:
         buffer_size_mb: int = 100,
         metadata_port: int = 5557,
         camera_metadata_port: int = 5559,
-        analysis_metadata_port: int = 5561
+        analysis_metadata_port: int = 5561,
+        ring_slots: int = DEFAULT_SLOT_COUNT,
+        notify_mode: str = "json",
     ):
         """Initialize shared memory stream with explicit configuration.
 
@@ -114,76 +138,78 @@ class SharedMemoryFrameStream:
             metadata_port: Port for stimulus frame metadata
             camera_metadata_port: Port for camera frame metadata
             analysis_metadata_port: Port for analysis frame metadata
+            ring_slots: Frame slots per channel ring buffer
+            notify_mode: Per-frame notification format (one of NOTIFY_MODES)
         """
+        if notify_mode not in NOTIFY_MODES:
+            raise ValueError(f"Unknown notify_mode: {notify_mode}. Must be one of {NOTIFY_MODES}")
+
         self.stream_name = stream_name
         self.buffer_size_bytes = buffer_size_mb * 1024 * 1024
         self.metadata_port = metadata_port
         self.camera_metadata_port = camera_metadata_port
         self.analysis_metadata_port = analysis_metadata_port
+        self.ring_slots = ring_slots
+        self.notify_mode = notify_mode
 
-        # Stimulus frame tracking
-        self.frame_counter = 0
-        self.write_offset = 0
-        self.ring_buffer_frames = 100
-        self.frame_registry = {}
-        self.preview_frame_registry = {}
-
-        # Camera frame tracking (separate from stimulus)
-        self.camera_frame_counter = 0
-        self.camera_write_offset = 0
-        self.camera_ring_buffer_frames = 100
-        self.camera_frame_registry = {}
-
-        # Analysis frame tracking (separate from stimulus and camera)
-        self.analysis_frame_counter = 0
-        self.analysis_write_offset = 0
-        self.analysis_ring_buffer_frames = 100
-        self.analysis_frame_registry = {}
+        self.stimulus_path = f"/tmp/{self.stream_name}_stimulus_shm"
+        self.camera_path = f"/tmp/{self.stream_name}_camera_shm"
+        self.analysis_path = f"/tmp/{self.stream_name}_analysis_shm"
+        self.bulk_path = f"/tmp/{self.stream_name}_bulk_shm"
 
         self.zmq_context = zmq.Context()
         self.metadata_socket = None  # Stimulus metadata
         self.camera_metadata_socket = None  # Camera metadata
         self.analysis_metadata_socket = None  # Analysis metadata
 
-        # Separate shared memory buffers for stimulus, camera, and analysis
-        self.stimulus_shm_fd = None
-        self.stimulus_shm_mmap = None
-        self.camera_shm_fd = None
-        self.camera_shm_mmap = None
-        self.analysis_shm_fd = None
-        self.analysis_shm_mmap = None
+        # Separate ring buffers for stimulus, camera, and analysis
+        self.stimulus_ring: Optional[FrameRingBuffer] = None
+        self.camera_ring: Optional[FrameRingBuffer] = None
+        self.analysis_ring: Optional[FrameRingBuffer] = None
+        self.bulk_ring: Optional[FrameRingBuffer] = None
 
+        # Analysis session path does not fit the fixed slot header
+        self._analysis_session_path: Optional[str] = None
+
+        # _lock guards setup/teardown; each ring has its own writer lock so the
+        # stimulus, camera and analysis producers never contend with each other
         self._lock = threading.RLock()
+        self._stimulus_lock = threading.Lock()
+        self._camera_lock = threading.Lock()
+        self._analysis_lock = threading.Lock()
+        self._bulk_lock = threading.Lock()
         self._running = False
 
+    @property
+    def frame_counter(self) -> int:
+        """Last stimulus frame ID written."""
+        return self.stimulus_ring.last_frame_id if self.stimulus_ring else 0
+
+    @property
+    def camera_frame_counter(self) -> int:
+        """Last camera frame ID written."""
+        return self.camera_ring.last_frame_id if self.camera_ring else 0
+
+    @property
+    def analysis_frame_counter(self) -> int:
+        """Last analysis frame ID written."""
+        return self.analysis_ring.last_frame_id if self.analysis_ring else 0
+
     def initialize(self) -> None:
-        """Initialize shared memory buffers and ZeroMQ sockets."""
+        """Initialize shared memory ring buffers and ZeroMQ sockets."""
         try:
             with self._lock:
-                # Initialize STIMULUS shared memory buffer
-                stimulus_path = f"/tmp/{self.stream_name}_stimulus_shm"
-                self.stimulus_shm_fd = os.open(
-                    stimulus_path, os.O_CREAT | os.O_RDWR | os.O_TRUNC, 0o666
+                self.stimulus_ring = FrameRingBuffer(
+                    self.stimulus_path, self.buffer_size_bytes, self.ring_slots
                 )
-                os.ftruncate(self.stimulus_shm_fd, self.buffer_size_bytes)
-
-                self.stimulus_shm_mmap = mmap.mmap(
-                    self.stimulus_shm_fd,
-                    self.buffer_size_bytes,
-                    access=mmap.ACCESS_WRITE,
+                self.camera_ring = FrameRingBuffer(
+                    self.camera_path, self.buffer_size_bytes, self.ring_slots
                 )
-
-                # Initialize CAMERA shared memory buffer
-                camera_path = f"/tmp/{self.stream_name}_camera_shm"
-                self.camera_shm_fd = os.open(
-                    camera_path, os.O_CREAT | os.O_RDWR | os.O_TRUNC, 0o666
+                self.analysis_ring = FrameRingBuffer(
+                    self.analysis_path, self.buffer_size_bytes, self.ring_slots
                 )
-                os.ftruncate(self.camera_shm_fd, self.buffer_size_bytes)
-
-                self.camera_shm_mmap = mmap.mmap(
-                    self.camera_shm_fd,
-                    self.buffer_size_bytes,
-                    access=mmap.ACCESS_WRITE,
+                self.bulk_ring = FrameRingBuffer(
+                    self.bulk_path, self.buffer_size_bytes, self.ring_slots
                 )
 
                 # Stimulus metadata socket
@@ -196,19 +222,6 @@ class SharedMemoryFrameStream:
                     f"tcp://*:{self.camera_metadata_port}"
                 )
 
-                # Initialize ANALYSIS shared memory buffer
-                analysis_path = f"/tmp/{self.stream_name}_analysis_shm"
-                self.analysis_shm_fd = os.open(
-                    analysis_path, os.O_CREAT | os.O_RDWR | os.O_TRUNC, 0o666
-                )
-                os.ftruncate(self.analysis_shm_fd, self.buffer_size_bytes)
-
-                self.analysis_shm_mmap = mmap.mmap(
-                    self.analysis_shm_fd,
-                    self.buffer_size_bytes,
-                    access=mmap.ACCESS_WRITE,
-                )
-
                 # Analysis metadata socket (separate channel)
                 self.analysis_metadata_socket = self.zmq_context.socket(zmq.PUB)
                 self.analysis_metadata_socket.bind(
@@ -219,10 +232,14 @@ class SharedMemoryFrameStream:
 
                 self._running = True
                 logger.info(
-                    "SharedMemoryFrameStream initialised: stimulus=%s, camera=%s, analysis=%s (ports: stimulus=%d, camera=%d, analysis=%d)",
-                    stimulus_path,
-                    camera_path,
-                    analysis_path,
+                    "SharedMemoryFrameStream initialised: stimulus=%s, camera=%s, analysis=%s "
+                    "(%d slots x %.1f MB, notify=%s; ports: stimulus=%d, camera=%d, analysis=%d)",
+                    self.stimulus_path,
+                    self.camera_path,
+                    self.analysis_path,
+                    self.stimulus_ring.slot_count,
+                    self.stimulus_ring.capacity_bytes / (1024 * 1024),
+                    self.notify_mode,
                     self.metadata_port,
                     self.camera_metadata_port,
                     self.analysis_metadata_port,
@@ -233,7 +250,7 @@ class SharedMemoryFrameStream:
             raise
 
     def write_frame(self, frame_data: np.ndarray, metadata: Dict[str, Any]) -> int:
-        """Write frame to shared memory with zero-copy operation.
+        """Write stimulus frame directly into the next ring slot.
 
         Args:
             frame_data: Frame data as numpy array
@@ -242,42 +259,26 @@ class SharedMemoryFrameStream:
         Returns:
             Frame ID
         """
+        # Validate critical metadata fields
+        frame_index = metadata.get("frame_index")
+        if frame_index is None or not isinstance(frame_index, int):
+            raise ValueError(
+                f"frame_index is required in metadata for shared memory write. "
+                f"Received metadata: {metadata}"
+            )
+
+        total_frames = metadata.get("total_frames")
+        if total_frames is None or not isinstance(total_frames, int) or total_frames <= 0:
+            raise ValueError(
+                f"total_frames is required in metadata and must be > 0. "
+                f"Received metadata: {metadata}"
+            )
+
         try:
-            with self._lock:
+            with self._stimulus_lock:
                 if not self._running:
                     raise RuntimeError("SharedMemoryFrameStream not initialized")
 
-                if frame_data.dtype != np.uint8:
-                    frame_data = frame_data.astype(np.uint8)
-
-                frame_bytes = frame_data.tobytes()
-                data_size = len(frame_bytes)
-
-                if self.write_offset + data_size > self.buffer_size_bytes:
-                    self.write_offset = 0  # Wrap to beginning
-
-                self.stimulus_shm_mmap[
-                    self.write_offset : self.write_offset + data_size
-                ] = frame_bytes
-
-                self.frame_counter += 1
-                timestamp_us = int(time.time() * 1_000_000)
-
-                # Validate critical metadata fields
-                frame_index = metadata.get("frame_index")
-                if frame_index is None or not isinstance(frame_index, int):
-                    raise ValueError(
-                        f"frame_index is required in metadata for shared memory write. "
-                        f"Received metadata: {metadata}"
-                    )
-
-                total_frames = metadata.get("total_frames")
-                if total_frames is None or not isinstance(total_frames, int) or total_frames <= 0:
-                    raise ValueError(
-                        f"total_frames is required in metadata and must be > 0. "
-                        f"Received metadata: {metadata}"
-                    )
-
                 # Other fields can have sensible defaults
                 direction = metadata.get("direction", "LR")
                 angle_degrees = metadata.get("angle_degrees", 0.0)
@@ -285,40 +286,40 @@ class SharedMemoryFrameStream:
                 end_angle = metadata.get("end_angle", 0.0)
                 channels = metadata.get("channels", 1)  # Default to grayscale
 
-                frame_metadata = FrameMetadata(
-                    frame_id=self.frame_counter,
-                    timestamp_us=timestamp_us,
+                timestamp_us = int(time.time() * 1_000_000)
+                frame_id, offset_bytes = self.stimulus_ring.write(
+                    frame_data,
+                    timestamp_us,
+                    channels=channels,
                     frame_index=frame_index,
-                    direction=direction,
-                    angle_degrees=angle_degrees,
-                    width_px=frame_data.shape[1] if len(frame_data.shape) >= 2 else frame_data.shape[0],
-                    height_px=frame_data.shape[0] if len(frame_data.shape) >= 2 else 1,
-                    data_size_bytes=data_size,
-                    offset_bytes=self.write_offset,
                     total_frames=total_frames,
+                    angle_degrees=angle_degrees,
                     start_angle=start_angle,
                     end_angle=end_angle,
-                    channels=channels,
-                )
-
-                self.frame_registry[self.frame_counter] = frame_metadata
-
-                if len(self.frame_registry) > self.ring_buffer_frames:
-                    oldest_frame_id = min(self.frame_registry.keys())
-                    del self.frame_registry[oldest_frame_id]
-
-                metadata_msg = frame_metadata.to_dict(
-                    f"/tmp/{self.stream_name}_stimulus_shm"
+                    label=direction,
                 )
 
-                try:
-                    self.metadata_socket.send_json(metadata_msg, zmq.NOBLOCK)
-                except zmq.Again:
-                    logger.warning("Metadata send queue full, dropping frame metadata")
-
-                self.write_offset += data_size
+                if self.notify_mode == "json":
+                    frame_metadata = FrameMetadata(
+                        frame_id=frame_id,
+                        timestamp_us=timestamp_us,
+                        frame_index=frame_index,
+                        direction=direction,
+                        angle_degrees=angle_degrees,
+                        width_px=frame_data.shape[1] if frame_data.ndim >= 2 else frame_data.shape[0],
+                        height_px=frame_data.shape[0] if frame_data.ndim >= 2 else 1,
+                        data_size_bytes=int(frame_data.size),
+                        offset_bytes=offset_bytes,
+                        total_frames=total_frames,
+                        start_angle=start_angle,
+                        end_angle=end_angle,
+                        channels=channels,
+                    )
+                    self._notify_json(self.metadata_socket, frame_metadata.to_dict(self.stimulus_path), "Metadata")
+                elif self.notify_mode == "binary":
+                    self._notify_binary(self.metadata_socket, self.stimulus_ring, frame_id, offset_bytes, "Metadata")
 
-                return frame_metadata.frame_id
+                return frame_id
         except Exception as e:
             logger.error(f"Error writing frame to shared memory: {e}")
             raise
@@ -335,10 +336,7 @@ class SharedMemoryFrameStream:
         Returns:
             Frame ID
         """
-        frame_id = self.write_frame(frame_data, metadata)
-        with self._lock:
-            self.preview_frame_registry[frame_id] = metadata
-        return frame_id
+        return self.write_frame(frame_data, metadata)
 
     def write_camera_frame(
         self,
@@ -348,7 +346,7 @@ class SharedMemoryFrameStream:
         exposure_us: Optional[int] = None,
         gain: Optional[float] = None,
     ) -> int:
-        """Write camera frame to shared memory on separate channel.
+        """Write camera frame directly into the next camera ring slot.
 
         Args:
             frame_data: Frame data as numpy array
@@ -361,64 +359,48 @@ class SharedMemoryFrameStream:
             Frame ID
         """
         try:
-            with self._lock:
+            with self._camera_lock:
                 if not self._running:
                     raise RuntimeError("SharedMemoryFrameStream not initialized")
 
-                if frame_data.dtype != np.uint8:
-                    frame_data = frame_data.astype(np.uint8)
-
-                frame_bytes = frame_data.tobytes()
-                data_size = len(frame_bytes)
-
-                # Use separate offset for camera frames to avoid collisions
-                if self.camera_write_offset + data_size > self.buffer_size_bytes:
-                    self.camera_write_offset = 0  # Wrap to beginning
-
-                self.camera_shm_mmap[
-                    self.camera_write_offset : self.camera_write_offset + data_size
-                ] = frame_bytes
-
-                self.camera_frame_counter += 1
                 timestamp_us = int(time.time() * 1_000_000)
 
                 # Use capture timestamp if provided, otherwise use current time
                 if capture_timestamp_us is None:
                     capture_timestamp_us = timestamp_us
 
-                camera_metadata = CameraFrameMetadata(
-                    frame_id=self.camera_frame_counter,
-                    timestamp_us=timestamp_us,
+                frame_id, offset_bytes = self.camera_ring.write(
+                    frame_data,
+                    timestamp_us,
                     capture_timestamp_us=capture_timestamp_us,
-                    width_px=frame_data.shape[1],
-                    height_px=frame_data.shape[0],
-                    data_size_bytes=data_size,
-                    offset_bytes=self.camera_write_offset,
-                    camera_name=camera_name,
                     exposure_us=exposure_us,
+                    channels=frame_data.shape[2] if frame_data.ndim == 3 else 1,
                     gain=gain,
+                    label=camera_name,
                 )
 
-                self.camera_frame_registry[self.camera_frame_counter] = camera_metadata
-
-                if len(self.camera_frame_registry) > self.camera_ring_buffer_frames:
-                    oldest_frame_id = min(self.camera_frame_registry.keys())
-                    del self.camera_frame_registry[oldest_frame_id]
-
-                metadata_msg = camera_metadata.to_dict(
-                    f"/tmp/{self.stream_name}_camera_shm"
-                )
-
-                try:
-                    self.camera_metadata_socket.send_json(metadata_msg, zmq.NOBLOCK)
-                except zmq.Again:
-                    logger.warning(
-                        "Camera metadata send queue full, dropping frame metadata"
+                if self.notify_mode == "json":
+                    camera_metadata = CameraFrameMetadata(
+                        frame_id=frame_id,
+                        timestamp_us=timestamp_us,
+                        capture_timestamp_us=capture_timestamp_us,
+                        width_px=frame_data.shape[1],
+                        height_px=frame_data.shape[0],
+                        data_size_bytes=int(frame_data.size),
+                        offset_bytes=offset_bytes,
+                        camera_name=camera_name,
+                        exposure_us=exposure_us,
+                        gain=gain,
+                    )
+                    self._notify_json(
+                        self.camera_metadata_socket, camera_metadata.to_dict(self.camera_path), "Camera metadata"
+                    )
+                elif self.notify_mode == "binary":
+                    self._notify_binary(
+                        self.camera_metadata_socket, self.camera_ring, frame_id, offset_bytes, "Camera metadata"
                     )
 
-                self.camera_write_offset += data_size
-
-                return camera_metadata.frame_id
+                return frame_id
         except Exception as e:
             logger.error(f"Error writing camera frame to shared memory: {e}")
             raise
@@ -429,7 +411,7 @@ class SharedMemoryFrameStream:
         source: str = "analysis_composite",
         session_path: Optional[str] = None,
     ) -> int:
-        """Write analysis frame to shared memory on separate channel.
+        """Write analysis frame directly into the next analysis ring slot.
 
         Args:
             frame_data: Frame data as numpy array
@@ -440,72 +422,87 @@ class SharedMemoryFrameStream:
             Frame ID
         """
         try:
-            with self._lock:
+            with self._analysis_lock:
                 if not self._running:
                     raise RuntimeError("SharedMemoryFrameStream not initialized")
 
-                if frame_data.dtype != np.uint8:
-                    frame_data = frame_data.astype(np.uint8)
-
-                frame_bytes = frame_data.tobytes()
-                data_size = len(frame_bytes)
-
-                # Use separate offset for analysis frames to avoid collisions
-                if self.analysis_write_offset + data_size > self.buffer_size_bytes:
-                    self.analysis_write_offset = 0  # Wrap to beginning
-
-                self.analysis_shm_mmap[
-                    self.analysis_write_offset : self.analysis_write_offset + data_size
-                ] = frame_bytes
-
-                self.analysis_frame_counter += 1
                 timestamp_us = int(time.time() * 1_000_000)
-
-                analysis_metadata = AnalysisFrameMetadata(
-                    frame_id=self.analysis_frame_counter,
-                    timestamp_us=timestamp_us,
-                    width_px=frame_data.shape[1],
-                    height_px=frame_data.shape[0],
-                    data_size_bytes=data_size,
-                    offset_bytes=self.analysis_write_offset,
-                    source=source,
-                    session_path=session_path,
-                )
-
-                self.analysis_frame_registry[self.analysis_frame_counter] = analysis_metadata
-
-                if len(self.analysis_frame_registry) > self.analysis_ring_buffer_frames:
-                    oldest_frame_id = min(self.analysis_frame_registry.keys())
-                    del self.analysis_frame_registry[oldest_frame_id]
-
-                metadata_msg = analysis_metadata.to_dict(
-                    f"/tmp/{self.stream_name}_analysis_shm"
+                frame_id, offset_bytes = self.analysis_ring.write(
+                    frame_data,
+                    timestamp_us,
+                    channels=frame_data.shape[2] if frame_data.ndim == 3 else 1,
+                    label=source,
                 )
-
-                try:
-                    self.analysis_metadata_socket.send_json(metadata_msg, zmq.NOBLOCK)
-                except zmq.Again:
-                    logger.warning(
-                        "Analysis metadata send queue full, dropping frame metadata"
+                self._analysis_session_path = session_path
+
+                if self.notify_mode == "json":
+                    analysis_metadata = AnalysisFrameMetadata(
+                        frame_id=frame_id,
+                        timestamp_us=timestamp_us,
+                        width_px=frame_data.shape[1],
+                        height_px=frame_data.shape[0],
+                        data_size_bytes=int(frame_data.size),
+                        offset_bytes=offset_bytes,
+                        source=source,
+                        session_path=session_path,
+                    )
+                    self._notify_json(
+                        self.analysis_metadata_socket,
+                        analysis_metadata.to_dict(self.analysis_path),
+                        "Analysis metadata",
+                    )
+                elif self.notify_mode == "binary":
+                    self._notify_binary(
+                        self.analysis_metadata_socket, self.analysis_ring, frame_id, offset_bytes, "Analysis metadata"
                     )
 
-                self.analysis_write_offset += data_size
-
-                return analysis_metadata.frame_id
+                return frame_id
         except Exception as e:
             logger.error(f"Error writing analysis frame to shared memory: {e}")
             raise
 
+    def write_bulk_array(self, array: np.ndarray, label: str = "") -> Dict[str, Any]:
+        """Copy an array payload into the bulk ring for a control response.
+
+        Args:
+            array: Array of any dtype and shape
+            label: Payload label stored in the slot header
+
+        Returns:
+            Descriptor dict (see bulk.py) locating the raw C-order bytes
+        """
+        array = np.ascontiguousarray(array)
+        # The ring stores raw bytes; non-uint8 arrays are written as a flat byte view
+        payload = array if array.dtype == np.uint8 and array.ndim in (2, 3) else array.reshape(-1).view(np.uint8)
+
+        with self._bulk_lock:
+            if not self._running:
+                raise RuntimeError("SharedMemoryFrameStream not initialized")
+
+            frame_id, offset_bytes = self.bulk_ring.write(
+                payload,
+                int(time.time() * 1_000_000),
+                channels=payload.shape[2] if payload.ndim == 3 else 1,
+                label=label,
+            )
+            layout_gen = self.bulk_ring.layout_gen
+
+        return {
+            "transport": "shm",
+            "shm_path": self.bulk_path,
+            "offset_bytes": offset_bytes,
+            "data_size_bytes": int(array.nbytes),
+            "frame_id": frame_id,
+            "layout_gen": layout_gen,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+
     def clear_stimulus_frames(self) -> None:
-        """Clear stimulus shared memory buffer and metadata."""
-        with self._lock:
-            self.frame_counter = 0
-            self.write_offset = 0
-            self.frame_registry.clear()
-            if self.stimulus_shm_mmap:
-                self.stimulus_shm_mmap.seek(0)
-                self.stimulus_shm_mmap.write(b"\x00" * self.buffer_size_bytes)
-                self.stimulus_shm_mmap.flush()
+        """Invalidate all stimulus slots and restart stimulus frame IDs."""
+        with self._stimulus_lock:
+            if self.stimulus_ring:
+                self.stimulus_ring.clear()
         logger.debug("Stimulus shared memory frames cleared")
 
     def publish_black_frame(self, width: int, height: int, luminance: float = 0.0) -> int:
@@ -546,40 +543,100 @@ class SharedMemoryFrameStream:
         return self.write_frame(frame, metadata)
 
     def get_frame_info(self, frame_id: int) -> Optional[FrameMetadata]:
-        """Get stimulus frame metadata by ID.
+        """Get stimulus frame metadata by ID from its slot header.
 
         Args:
             frame_id: Frame ID
 
         Returns:
-            Frame metadata or None if not found
+            Frame metadata or None if the slot no longer holds this frame
         """
-        with self._lock:
-            return self.frame_registry.get(frame_id)
+        header = self.stimulus_ring.read_header(frame_id) if self.stimulus_ring else None
+        if header is None:
+            return None
+        return FrameMetadata(
+            frame_id=header.frame_id,
+            timestamp_us=header.timestamp_us,
+            frame_index=header.frame_index,
+            direction=header.label,
+            angle_degrees=header.angle_degrees,
+            width_px=header.width_px,
+            height_px=header.height_px,
+            data_size_bytes=header.data_size_bytes,
+            offset_bytes=header.data_offset,
+            total_frames=header.total_frames,
+            start_angle=header.start_angle,
+            end_angle=header.end_angle,
+            channels=header.channels,
+        )
 
     def get_camera_frame_info(self, frame_id: int) -> Optional[CameraFrameMetadata]:
-        """Get camera frame metadata by ID.
+        """Get camera frame metadata by ID from its slot header.
 
         Args:
             frame_id: Frame ID
 
         Returns:
-            Camera frame metadata or None if not found
+            Camera frame metadata or None if the slot no longer holds this frame
         """
-        with self._lock:
-            return self.camera_frame_registry.get(frame_id)
+        header = self.camera_ring.read_header(frame_id) if self.camera_ring else None
+        if header is None:
+            return None
+        return CameraFrameMetadata(
+            frame_id=header.frame_id,
+            timestamp_us=header.timestamp_us,
+            capture_timestamp_us=header.capture_timestamp_us,
+            width_px=header.width_px,
+            height_px=header.height_px,
+            data_size_bytes=header.data_size_bytes,
+            offset_bytes=header.data_offset,
+            camera_name=header.label,
+            exposure_us=None if header.exposure_us < 0 else header.exposure_us,
+            gain=None if math.isnan(header.gain) else header.gain,
+        )
 
     def get_analysis_frame_info(self, frame_id: int) -> Optional[AnalysisFrameMetadata]:
-        """Get analysis frame metadata by ID.
+        """Get analysis frame metadata by ID from its slot header.
 
         Args:
             frame_id: Frame ID
 
         Returns:
-            Analysis frame metadata or None if not found
+            Analysis frame metadata or None if the slot no longer holds this frame
         """
-        with self._lock:
-            return self.analysis_frame_registry.get(frame_id)
+        header = self.analysis_ring.read_header(frame_id) if self.analysis_ring else None
+        if header is None:
+            return None
+        return AnalysisFrameMetadata(
+            frame_id=header.frame_id,
+            timestamp_us=header.timestamp_us,
+            width_px=header.width_px,
+            height_px=header.height_px,
+            data_size_bytes=header.data_size_bytes,
+            offset_bytes=header.data_offset,
+            source=header.label,
+            session_path=self._analysis_session_path,
+        )
+
+    def _notify_json(self, socket, message: Dict[str, Any], channel: str) -> None:
+        """Send full JSON frame metadata without blocking the producer."""
+        try:
+            socket.send_json(message, zmq.NOBLOCK)
+        except zmq.Again:
+            logger.warning(f"{channel} send queue full, dropping frame metadata")
+
+    def _notify_binary(
+        self, socket, ring: FrameRingBuffer, frame_id: int, offset_bytes: int, channel: str
+    ) -> None:
+        """Send a packed frame notification; readers take the rest from the slot header."""
+        slot = (frame_id - 1) % ring.slot_count
+        try:
+            socket.send(
+                BINARY_NOTIFICATION.pack(frame_id, offset_bytes, slot, ring.layout_gen),
+                zmq.NOBLOCK,
+            )
+        except zmq.Again:
+            logger.warning(f"{channel} send queue full, dropping frame notification")
 
     def cleanup(self):
         """Clean up shared memory and ZeroMQ resources."""
@@ -602,52 +659,23 @@ class SharedMemoryFrameStream:
                     self.analysis_metadata_socket.close()
                     self.analysis_metadata_socket = None
 
-                # Close stimulus shared memory
-                if self.stimulus_shm_mmap:
-                    self.stimulus_shm_mmap.close()
-                    self.stimulus_shm_mmap = None
-
-                if self.stimulus_shm_fd:
-                    os.close(self.stimulus_shm_fd)
-                    self.stimulus_shm_fd = None
-
-                # Close camera shared memory
-                if self.camera_shm_mmap:
-                    self.camera_shm_mmap.close()
-                    self.camera_shm_mmap = None
-
-                if self.camera_shm_fd:
-                    os.close(self.camera_shm_fd)
-                    self.camera_shm_fd = None
-
-                # Close analysis shared memory
-                if self.analysis_shm_mmap:
-                    self.analysis_shm_mmap.close()
-                    self.analysis_shm_mmap = None
-
-                if self.analysis_shm_fd:
-                    os.close(self.analysis_shm_fd)
-                    self.analysis_shm_fd = None
-
-                # Remove stimulus shared memory file
-                stimulus_path = f"/tmp/{self.stream_name}_stimulus_shm"
-                if os.path.exists(stimulus_path):
-                    os.unlink(stimulus_path)
-
-                # Remove camera shared memory file
-                camera_path = f"/tmp/{self.stream_name}_camera_shm"
-                if os.path.exists(camera_path):
-                    os.unlink(camera_path)
-
-                # Remove analysis shared memory file
-                analysis_path = f"/tmp/{self.stream_name}_analysis_shm"
-                if os.path.exists(analysis_path):
-                    os.unlink(analysis_path)
+                # Unmap and remove ring buffer files (after in-flight writes finish)
+                for lock, attr in (
+                    (self._stimulus_lock, "stimulus_ring"),
+                    (self._camera_lock, "camera_ring"),
+                    (self._analysis_lock, "analysis_ring"),
+                    (self._bulk_lock, "bulk_ring"),
+                ):
+                    with lock:
+                        ring = getattr(self, attr)
+                        if ring is not None:
+                            ring.close(unlink=True)
+                            setattr(self, attr, None)
 
                 self.zmq_context.term()
 
                 logger.info(
-                    "SharedMemoryFrameStream cleaned up (stimulus, camera, and analysis buffers)"
+                    "SharedMemoryFrameStream cleaned up (stimulus, camera, analysis and bulk buffers)"
                 )
 
         except Exception as e:
@@ -666,7 +694,9 @@ class SharedMemoryService:
         buffer_size_mb: int = 100,
         metadata_port: int = 5557,
         camera_metadata_port: int = 5559,
-        analysis_metadata_port: int = 5561
+        analysis_metadata_port: int = 5561,
+        ring_slots: int = DEFAULT_SLOT_COUNT,
+        notify_mode: str = "json",
     ):
         """Initialize shared memory service with explicit configuration.
 
@@ -676,12 +706,16 @@ class SharedMemoryService:
             metadata_port: Port for stimulus frame metadata
             camera_metadata_port: Port for camera frame metadata
             analysis_metadata_port: Port for analysis frame metadata
+            ring_slots: Frame slots per channel ring buffer
+            notify_mode: Per-frame notification format ("json", "binary" or "none")
         """
         self._stream_name = stream_name
         self._buffer_size_mb = buffer_size_mb
         self._metadata_port = metadata_port
         self._camera_metadata_port = camera_metadata_port
         self._analysis_metadata_port = analysis_metadata_port
+        self._ring_slots = ring_slots
+        self._notify_mode = notify_mode
 
         self._stream: Optional[SharedMemoryFrameStream] = None
         self._last_stimulus_timestamp: Optional[int] = None  # Microseconds
@@ -697,7 +731,9 @@ class SharedMemoryService:
                 buffer_size_mb=self._buffer_size_mb,
                 metadata_port=self._metadata_port,
                 camera_metadata_port=self._camera_metadata_port,
-                analysis_metadata_port=self._analysis_metadata_port
+                analysis_metadata_port=self._analysis_metadata_port,
+                ring_slots=self._ring_slots,
+                notify_mode=self._notify_mode,
             )
             self._stream.initialize()
         return self._stream
@@ -742,6 +778,10 @@ class SharedMemoryService:
             frame_data, source, session_path
         )
 
+    def write_bulk_array(self, array: np.ndarray, label: str = "") -> Dict[str, Any]:
+        """Write a control-response array payload to the bulk channel."""
+        return self.stream.write_bulk_array(array, label)
+
     def publish_black_frame(self, width: int, height: int, luminance: float = 0.0) -> int:
         """Publish a solid RGBA frame to shared memory with specified luminance."""
         return self.stream.publish_black_frame(width, height, luminance)
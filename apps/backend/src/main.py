@@ -22,6 +22,8 @@ from typing import Dict, Any, Optional
 from config import AppConfig
 from ipc.channels import MultiChannelIPC
 from ipc.shared_memory import SharedMemoryService
+from ipc.bulk import resolve_transport
+from ipc.dispatcher import CommandDispatcher
 from camera.manager import CameraManager
 from stimulus.generator import StimulusGenerator
 from acquisition.manager import AcquisitionManager
@@ -30,9 +32,14 @@ from acquisition.sync_tracker import TimestampSynchronizationTracker
 from acquisition.recorder import create_session_recorder
 from acquisition.modes import PlaybackModeController
 from acquisition.unified_stimulus import UnifiedStimulusController
-from analysis.manager import AnalysisManager
+from analysis.manager import AnalysisManager, camera_mean_frame, direction_limits
+from analysis.online import OnlineAnalysisEngine
 from analysis.pipeline import AnalysisPipeline
 from analysis.renderer import AnalysisRenderer
+from analysis.sweep import ParameterSweepController
+from analysis.batch import BatchAnalysisController
+from analysis.worker import AnalysisWorkerProcess
+from analysis.job_queue import AnalysisJobClient
 
 # Import parameter manager
 from parameters import ParameterManager
@@ -71,6 +78,8 @@ def create_services(config: AppConfig) -> Dict[str, Any]:
         metadata_port=config.shared_memory.metadata_port,
         camera_metadata_port=config.shared_memory.camera_metadata_port,
         analysis_metadata_port=config.shared_memory.analysis_metadata_port,
+        ring_slots=config.shared_memory.ring_slots,
+        notify_mode=config.shared_memory.notify_mode,
     )
     logger.info("  [2/11] SharedMemoryService created")
 
@@ -122,15 +131,57 @@ def create_services(config: AppConfig) -> Dict[str, Any]:
     )
     logger.info("  [7/11] AnalysisRenderer created")
 
+    # Offline analysis runs in its own process so it cannot perturb acquisition timing,
+    # on a shared analysis service if one is configured (local worker as fallback)
+    analysis_worker = AnalysisWorkerProcess()
+
+    max_direction_workers, direction_memory_budget_bytes = direction_limits(
+        param_manager.get_parameter_group("system")
+    )
     analysis_manager = AnalysisManager(
         param_manager=param_manager,
         ipc=ipc,
         shared_memory=shared_memory,
         pipeline=analysis_pipeline,
+        max_direction_workers=max_direction_workers,
+        direction_memory_budget_bytes=direction_memory_budget_bytes,
+        worker=_analysis_worker_for(
+            param_manager.get_parameter_group("system").get("analysis_service_endpoint", ""),
+            analysis_worker,
+        ),
     )
+
+    # Follow system.analysis_service_endpoint edits from the next analysis on
+    def _handle_analysis_service_changed(group_name: str, updates: Dict[str, Any]):
+        endpoint = updates.get("analysis_service_endpoint")
+        if endpoint is not None and endpoint != getattr(analysis_manager.worker, "endpoint", ""):
+            analysis_manager.set_worker(
+                _analysis_worker_for(endpoint, analysis_worker)
+            )
+
+    param_manager.subscribe("system", _handle_analysis_service_changed)
     # Note: Renderer callback can be wired later if needed for incremental visualization
     logger.info("  [8/11] AnalysisManager created")
 
+    online_analysis = OnlineAnalysisEngine(
+        pipeline=analysis_pipeline, renderer=analysis_renderer, ipc=ipc
+    )
+    logger.info("  [8a/11] OnlineAnalysisEngine created")
+
+    # Sweeps and batches take the current analysis parameters from the manager
+    analysis_sweeps = ParameterSweepController(
+        ipc=ipc,
+        renderer=analysis_renderer,
+        config_provider=analysis_manager.build_analysis_config,
+    )
+    analysis_batches = BatchAnalysisController(
+        param_manager=param_manager,
+        ipc=ipc,
+        pipeline=analysis_pipeline,
+        config_provider=analysis_manager.build_analysis_config,
+    )
+    logger.info("  [8b/11] Parameter sweep and batch analysis controllers created")
+
     # =========================================================================
     # Layer 4: Acquisition subsystems (depend on core systems)
     # =========================================================================
@@ -140,7 +191,10 @@ def create_services(config: AppConfig) -> Dict[str, Any]:
 
     # Playback controller (shared between IPC handlers and acquisition manager)
     playback_controller = PlaybackModeController(
-        state_coordinator=state_coordinator, shared_memory=shared_memory, ipc=ipc
+        state_coordinator=state_coordinator,
+        shared_memory=shared_memory,
+        ipc=ipc,
+        param_manager=param_manager,
     )
     logger.info("  [10/11] PlaybackModeController created")
 
@@ -158,6 +212,7 @@ def create_services(config: AppConfig) -> Dict[str, Any]:
         unified_stimulus=unified_stimulus,  # NEW: Unified stimulus for both preview and record
         data_recorder=None,  # Created dynamically when acquisition starts
         param_manager=param_manager,
+        online_analysis=online_analysis,
     )
     # Wire playback controller (property injection needed for circular dependency)
     acquisition.playback_controller = playback_controller
@@ -174,7 +229,11 @@ def create_services(config: AppConfig) -> Dict[str, Any]:
         "unified_stimulus": unified_stimulus,
         "acquisition": acquisition,
         "analysis_manager": analysis_manager,
+        "analysis_worker": analysis_worker,
+        "analysis_sweeps": analysis_sweeps,
+        "analysis_batches": analysis_batches,
         "analysis_renderer": analysis_renderer,
+        "online_analysis": online_analysis,
         "playback_controller": playback_controller,
         "param_manager": param_manager,
     }
@@ -195,6 +254,9 @@ def create_handlers(services: Dict[str, Any]) -> Dict[str, Any]:
     camera = services["camera"]
     acquisition = services["acquisition"]
     analysis = services["analysis_manager"]
+    analysis_sweeps = services["analysis_sweeps"]
+    analysis_batches = services["analysis_batches"]
+    online_analysis = services["online_analysis"]
     playback = services["playback_controller"]
     unified_stimulus = services["unified_stimulus"]
     config = services["config"]
@@ -300,12 +362,16 @@ def create_handlers(services: Dict[str, Any]) -> Dict[str, Any]:
             session_path=cmd.get("session_path")
         ),
         "get_session_data": lambda cmd: playback.get_session_data(
-            direction=cmd.get("direction")
+            direction=cmd.get("direction"), transport=resolve_transport(cmd)
         ),
         "unload_session": lambda cmd: playback.deactivate(),
         "get_playback_frame": lambda cmd: playback.get_playback_frame(
-            direction=cmd.get("direction"), frame_index=cmd.get("frame_index", 0)
+            direction=cmd.get("direction"),
+            frame_index=cmd.get("frame_index", 0),
+            transport=resolve_transport(cmd),
+            publish=cmd.get("publish", False),
         ),
+        "get_playback_cache_status": lambda cmd: playback.get_playback_cache_status(),
         "start_playback_sequence": lambda cmd: playback.start_playback_sequence(),
         "stop_playback_sequence": lambda cmd: playback.stop_playback_sequence(),
         # =====================================================================
@@ -354,8 +420,9 @@ def create_handlers(services: Dict[str, Any]) -> Dict[str, Any]:
             else {"success": True}
         ),
         "unified_stimulus_save_library": lambda cmd: unified_stimulus.save_library_to_disk(
-            save_path=cmd.get("save_path")
+            save_path=cmd.get("save_path"), codec=cmd.get("codec")
         ),
+        "unified_stimulus_cache_status": lambda cmd: unified_stimulus.get_library_cache_status(),
         "unified_stimulus_load_library": lambda cmd: unified_stimulus.load_library_from_disk(
             load_path=cmd.get("load_path"), force=cmd.get("force", False)
         ),
@@ -377,15 +444,43 @@ def create_handlers(services: Dict[str, Any]) -> Dict[str, Any]:
         # =====================================================================
         # Analysis commands
         # =====================================================================
-        "start_analysis": lambda cmd: analysis.start_analysis(cmd.get("session_path")),
+        "start_analysis": lambda cmd: analysis.start_analysis(
+            cmd.get("session_path"), priority=cmd.get("priority", 0)
+        ),
         "stop_analysis": lambda cmd: analysis.stop_analysis(),
         "get_analysis_status": lambda cmd: analysis.get_status(),
+        "start_analysis_sweep": lambda cmd: analysis_sweeps.start(
+            cmd.get("session_path"),
+            grid=cmd.get("grid"),
+            parameter_sets=cmd.get("parameter_sets"),
+            workers=cmd.get("workers"),
+        ),
+        "stop_analysis_sweep": lambda cmd: analysis_sweeps.stop(),
+        "get_analysis_sweep_status": lambda cmd: analysis_sweeps.get_status(),
+        "get_analysis_sweep_results": lambda cmd: analysis_sweeps.get_results(
+            store_path=cmd.get("store_path"),
+            session_path=cmd.get("session_path"),
+            include_images=cmd.get("include_images", False),
+        ),
+        "start_batch_analysis": lambda cmd: analysis_batches.start(
+            base_dir=cmd.get("base_dir"),
+            session_paths=cmd.get("session_paths"),
+            workers=cmd.get("workers"),
+            memory_budget_mb=cmd.get("memory_budget_mb"),
+            force=cmd.get("force", False),
+        ),
+        "stop_batch_analysis": lambda cmd: analysis_batches.stop(),
+        "get_batch_analysis_status": lambda cmd: analysis_batches.get_status(),
         "capture_anatomical": lambda cmd: _capture_anatomical(camera, param_manager),
         "get_analysis_results": lambda cmd: _get_analysis_results(analysis, cmd),
         "get_analysis_layer": lambda cmd: _get_analysis_layer(analysis, cmd),
         "get_analysis_composite_image": lambda cmd: _get_analysis_composite_image(
             services["analysis_renderer"], cmd
         ),
+        "get_online_analysis_status": lambda cmd: online_analysis.get_status(),
+        "set_online_analysis_enabled": lambda cmd: online_analysis.set_enabled(
+            cmd.get("enabled", True)
+        ),
         # =====================================================================
         # Parameter management commands
         # =====================================================================
@@ -446,6 +541,121 @@ def create_handlers(services: Dict[str, Any]) -> Dict[str, Any]:
     return handlers
 
 
+# =============================================================================
+# Command Routing (see ipc/dispatcher.py)
+# =============================================================================
+
+# Commands run in order on one executor per subsystem. Every handler is listed
+# here or in FAST_PATH_COMMANDS; the dispatcher's "system" default only
+# catches unknown commands.
+COMMAND_SUBSYSTEMS = {
+    "system": (
+        "get_system_health",
+        "shared_memory_readers_ready",
+        "camera_subscriber_confirmed",
+    ),
+    "camera": (
+        "detect_cameras",
+        "get_camera_capabilities",
+        "camera_stream_started",
+        "camera_stream_stopped",
+        "camera_capture",
+        "start_camera_acquisition",
+        "stop_camera_acquisition",
+        "get_camera_histogram",
+        "capture_anatomical",
+    ),
+    "acquisition": (
+        "start_acquisition",
+        "stop_acquisition",
+        "set_acquisition_mode",
+        "start_preview",
+        "stop_preview",
+        "get_synchronization_data",
+        "get_correlation_data",
+    ),
+    "playback": (
+        "list_sessions",
+        "load_session",
+        "get_session_data",
+        "unload_session",
+        "get_playback_frame",
+        "get_playback_cache_status",
+        "start_playback_sequence",
+        "stop_playback_sequence",
+    ),
+    "stimulus": (
+        "get_stimulus_info",
+        "get_stimulus_frame",
+        "generate_stimulus_preview",
+        "set_presentation_stimulus_enabled",
+        "display_timestamp",
+        "unified_stimulus_pregenerate",
+        "unified_stimulus_start_playback",
+        "unified_stimulus_stop_playback",
+        "unified_stimulus_get_frame",
+        "unified_stimulus_clear_log",
+        "unified_stimulus_save_library",
+        "unified_stimulus_cache_status",
+        "unified_stimulus_load_library",
+        "detect_displays",
+        "get_display_capabilities",
+        "select_display",
+        "test_presentation_monitor",
+        "stop_monitor_test",
+    ),
+    "analysis": (
+        "start_analysis",
+        "stop_analysis",
+        "get_analysis_results",
+        "get_analysis_layer",
+        "get_analysis_composite_image",
+        "set_online_analysis_enabled",
+        "start_analysis_sweep",
+        "stop_analysis_sweep",
+        "get_analysis_sweep_results",
+        "start_batch_analysis",
+        "stop_batch_analysis",
+    ),
+    "parameters": (
+        "get_stimulus_parameters",
+        "update_stimulus_parameters",
+        "get_spatial_configuration",
+        "update_spatial_configuration",
+        "update_parameter_group",
+        "reset_to_defaults",
+        "reload_parameters",
+        # Handshake: writes detected hardware into the camera/monitor parameters
+        "frontend_ready",
+    ),
+}
+
+COMMAND_ROUTES = {
+    command_type: subsystem
+    for subsystem, command_types in COMMAND_SUBSYSTEMS.items()
+    for command_type in command_types
+}
+
+# Cheap, thread-safe queries answered inline by the stdin reader so they never
+# wait behind a busy subsystem
+FAST_PATH_COMMANDS = (
+    "ping",
+    "health_check",
+    "get_system_status",
+    "get_acquisition_status",
+    "get_presentation_state",
+    "get_stimulus_status",
+    "unified_stimulus_get_status",
+    "get_analysis_status",
+    "get_analysis_sweep_status",
+    "get_batch_analysis_status",
+    "get_online_analysis_status",
+    "get_all_parameters",
+    "get_parameter_group",
+    "get_parameter_info",
+)
+
+
 # =============================================================================
 # Stimulus Handler Helpers
 # =============================================================================
@@ -807,7 +1017,8 @@ def _unified_stimulus_pregenerate_handler(
     result = unified_stimulus.pre_generate_all_directions()
 
     # If pre-generation succeeded, automatically save to disk IN BACKGROUND
-    if result.get("success"):
+    # (not needed when the library was mapped from the on-disk cache)
+    if result.get("success") and not result.get("from_cache"):
         logger.info("Pre-generation successful, starting background auto-save...")
 
         # Start background save thread (non-blocking)
@@ -1155,6 +1366,15 @@ def _capture_anatomical(camera, param_manager) -> Dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
+def _analysis_worker_for(endpoint: str, local_worker: AnalysisWorkerProcess):
+    """Offline analysis worker: the shared job service if an endpoint is set, else the local process."""
+    if not endpoint:
+        logger.info("Offline analysis in the local worker process")
+        return local_worker
+    logger.info(f"Offline analysis via job service at {endpoint}")
+    return AnalysisJobClient(endpoint, fallback=local_worker)
+
+
 def _get_analysis_results(analysis, cmd: Dict[str, Any]) -> Dict[str, Any]:
     """Get analysis results metadata."""
     import numpy as np
@@ -1296,6 +1516,9 @@ def _get_analysis_composite_image(renderer, cmd: Dict[str, Any]) -> Dict[str, An
                 anatomical_path = Path(session_path) / "anatomical.npy"
                 if anatomical_path.exists():
                     anatomical = np.load(str(anatomical_path))
+                else:
+                    # Sessions without one: mean frame from optimized camera files
+                    anatomical = camera_mean_frame(Path(session_path))
 
             # Load signal layer if visible
             signal_config = layers.get("signal", {})
@@ -2046,6 +2269,14 @@ def _handle_frontend_ready(
     # triggers subscriber callbacks. No reload needed.
     logger.info("Hardware parameters updated in runtime memory (volatile params not persisted to disk)")
 
+    # 2.5. Map cached stimulus library (instant if generated with the detected monitor/stimulus params)
+    try:
+        cache_result = services["unified_stimulus"].load_library_cache()
+        if not cache_result.get("success"):
+            logger.info(f"No usable stimulus library cache: {cache_result.get('error')}")
+    except Exception as e:
+        logger.warning(f"Failed to map stimulus library cache: {e}")
+
     # Note: Camera acquisition NOT started here
     # Will be started after frontend sends shared_memory_readers_ready signal
     # This prevents ZeroMQ "slow joiner" problem where frames are published before subscribers connect
@@ -2234,6 +2465,12 @@ class ISIMacroscopeBackend:
         self.services = services
         self.handlers = handlers
         self.running = False
+        self.dispatcher = CommandDispatcher(
+            handlers,
+            send_response=services["ipc"].send_control_message,
+            routes=COMMAND_ROUTES,
+            fast_path=FAST_PATH_COMMANDS,
+        )
 
         logger.info("ISI Macroscope Backend initialized")
 
@@ -2360,7 +2597,7 @@ class ISIMacroscopeBackend:
             }
         )
 
-        # Simple event loop: receive → lookup → execute → respond
+        # Event loop: receive → route → execute on subsystem executor → respond
         while self.running:
             try:
                 # Read command from stdin (IPC control channel)
@@ -2383,69 +2620,8 @@ class ISIMacroscopeBackend:
                     ipc.send_control_message(response)
                     continue
 
-                # Extract command type
-                command_type = command.get("type", "")
-                message_id = command.get("messageId")
-
-                if not command_type:
-                    response = {"success": False, "error": "Command type is required"}
-                    if message_id:
-                        response["messageId"] = message_id
-                    ipc.send_control_message(response)
-                    continue
-
-                # Lookup handler
-                handler = self.handlers.get(command_type)
-
-                if handler is None:
-                    logger.warning(f"Unknown command type: {command_type}")
-                    response = {
-                        "success": False,
-                        "error": f"Unknown command: {command_type}",
-                    }
-                else:
-                    # Execute handler
-                    try:
-                        logger.info(f"Processing command: {command_type}")
-                        result = handler(command)
-
-                        # Ensure response has type field
-                        if "type" not in result:
-                            result["type"] = f"{command_type}_response"
-
-                        response = result
-                        logger.info(f"Command {command_type} completed")
-
-                    except Exception as e:
-                        logger.error(
-                            f"Handler error for {command_type}: {e}", exc_info=True
-                        )
-                        response = {
-                            "success": False,
-                            "error": str(e),
-                            "type": f"{command_type}_response",
-                        }
-
-                # Add message ID for correlation
-                if message_id:
-                    response["messageId"] = message_id
-
-                # Send response - check for serialization errors
-                try:
-                    success = ipc.send_control_message(response)
-                    if not success:
-                        # Serialization failed - send simpler error message
-                        error_response = {
-                            "success": False,
-                            "error": "Failed to serialize response (check backend logs)",
-                            "type": f"{command_type}_response",
-                        }
-                        if message_id:
-                            error_response["messageId"] = message_id
-                        # Try to send error response (using minimal data)
-                        ipc.send_control_message(error_response)
-                except Exception as e:
-                    logger.error(f"Critical error sending response: {e}", exc_info=True)
+                # Responses are sent by the dispatcher, tagged with messageId
+                self.dispatcher.dispatch(command)
 
             except KeyboardInterrupt:
                 logger.info("Received interrupt signal")
@@ -2462,6 +2638,9 @@ class ISIMacroscopeBackend:
         logger.info("Shutting down ISI Macroscope Backend...")
         self.running = False
 
+        # Let in-flight commands finish before services go away
+        self.dispatcher.shutdown(wait=True)
+
         # Stop services
         camera = self.services.get("camera")
         if camera:
@@ -2471,6 +2650,14 @@ class ISIMacroscopeBackend:
         if acquisition and acquisition.is_running:
             acquisition.stop_acquisition()
 
+        online_analysis = self.services.get("online_analysis")
+        if online_analysis:
+            online_analysis.cleanup()
+
+        analysis_worker = self.services.get("analysis_worker")
+        if analysis_worker:
+            analysis_worker.shutdown()
+
         # Stop unified stimulus controller if running
         unified_stimulus = self.services.get("unified_stimulus")
         if unified_stimulus:
@@ -0,0 +1,12 @@
+"""Allowed values of choice parameters.
+
+Kept free of third-party imports so that parameter validation (and any tool
+that loads parameters) does not pull in the camera or HDF5 stacks that use
+these values.
+"""
+
+# HDF5 compression codecs (system.hdf5_codec, see hdf5_codecs)
+HDF5_CODECS = ("gzip", "lzf", "lz4", "zstd", "blosc-lz4", "blosc-zstd", "none")
+
+# Preview pixel formats (system.camera_preview_color, see camera.pipeline)
+PREVIEW_COLORS = ("grayscale", "rgba")
@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import Dict, Any, Callable, List
 from datetime import datetime
 
+from .constants import HDF5_CODECS, PREVIEW_COLORS
+
 logger = logging.getLogger(__name__)
 
 
@@ -442,3 +444,49 @@ class ParameterManager:
 
             if fps != -1 and fps <= 0:
                 raise ValueError(f"Invalid camera frame rate: {fps}")
+
+        # System parameter validation
+        elif group_name == "system":
+            codec = params.get("hdf5_codec")
+            if codec is not None and codec not in HDF5_CODECS:
+                raise ValueError(f"Invalid HDF5 codec: {codec}. Must be one of {list(HDF5_CODECS)}")
+
+            budget_gb = params.get("stimulus_cache_budget_gb")
+            if budget_gb is not None and budget_gb < 0:
+                raise ValueError(f"Invalid stimulus cache budget: {budget_gb} GB")
+
+            preview_px = params.get("camera_preview_max_px")
+            if preview_px is not None and preview_px < 0:
+                raise ValueError(f"Invalid camera preview size: {preview_px} px")
+
+            preview_fps = params.get("camera_preview_max_fps")
+            if preview_fps is not None and preview_fps < 0:
+                raise ValueError(f"Invalid camera preview rate: {preview_fps} fps")
+
+            preview_color = params.get("camera_preview_color")
+            if preview_color is not None and preview_color not in PREVIEW_COLORS:
+                raise ValueError(
+                    f"Invalid camera preview color: {preview_color}. Must be one of {list(PREVIEW_COLORS)}"
+                )
+
+            cache_mb = params.get("playback_cache_mb")
+            if cache_mb is not None and cache_mb < 0:
+                raise ValueError(f"Invalid playback cache size: {cache_mb} MB")
+
+            read_ahead = params.get("playback_read_ahead_frames")
+            if read_ahead is not None and read_ahead < 0:
+                raise ValueError(f"Invalid playback read-ahead: {read_ahead} frames")
+
+            direction_workers = params.get("analysis_direction_workers")
+            if direction_workers is not None and (direction_workers < 0 or direction_workers != int(direction_workers)):
+                raise ValueError(f"Invalid analysis direction workers: {direction_workers} (0 = default)")
+
+            analysis_budget_gb = params.get("analysis_memory_budget_gb")
+            if analysis_budget_gb is not None and analysis_budget_gb <= 0:
+                raise ValueError(f"Invalid analysis memory budget: {analysis_budget_gb} GB")
+
+            endpoint = params.get("analysis_service_endpoint")
+            if endpoint and not endpoint.startswith(("tcp://", "ipc://")):
+                raise ValueError(
+                    f"Invalid analysis service endpoint: {endpoint} (expected tcp://host:port or ipc://path)"
+                )
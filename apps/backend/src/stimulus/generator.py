@@ -23,6 +23,11 @@ from .transform import SphericalTransform
 
 logger = logging.getLogger(__name__)
 
+# Frames rendered per tensor operation when generating a sweep. Each batch needs
+# ~7 bytes/pixel/frame of temporaries (float32 bar distance + bool mask + uint8
+# checkerboard and result), i.e. ~200 MB for 8 frames at 2560x1440.
+DEFAULT_SWEEP_BATCH_FRAMES = 8
+
 
 def get_device() -> torch.device:
     """Detect and return the best available device for GPU acceleration.
@@ -167,6 +172,8 @@ class StimulusGenerator:
         self.pixel_azimuth = None
         self.pixel_altitude = None
         self.base_checkerboard = None
+        self.checker_phase_patterns = None
+        self.background_uint8 = None
 
         # Check if monitor parameters are valid before initializing
         monitor_params = self.param_manager.get_parameter_group("monitor")
@@ -380,6 +387,24 @@ class StimulusGenerator:
         altitude_checks = (self.pixel_altitude / checker_size_degrees).to(torch.int64)
         self.base_checkerboard = (azimuth_checks + altitude_checks) % 2
 
+        # Pre-compute both counter-phase checkerboards (contrast applied) and the
+        # background as display-ready uint8, so rendering a frame is a pure select
+        phases = torch.stack([self.base_checkerboard, 1 - self.base_checkerboard]).bool()
+        pattern = torch.clamp(
+            torch.where(
+                phases,
+                self.background_luminance + self.contrast,
+                self.background_luminance - self.contrast,
+            ),
+            0,
+            1,
+        )
+        self.checker_phase_patterns = torch.clamp(pattern * 255, 0, 255).to(torch.uint8)
+        background = torch.full(
+            (), self.background_luminance, dtype=torch.float32, device=self.device
+        )
+        self.background_uint8 = torch.clamp(background * 255, 0, 255).to(torch.uint8)
+
         logger.info(
             f"Pre-computation complete on {self.device} - spherical coordinates and checkerboard cached"
         )
@@ -517,36 +542,9 @@ class StimulusGenerator:
             self.spatial_config.screen_width_pixels,
         )
 
-        # Start with background (on GPU)
-        frame = torch.full(
-            (h, w),
-            self.background_luminance,
-            dtype=torch.float32,
-            device=self.device,
-        )
-
-        # Get checkerboard with phase (uses pre-computed base pattern on GPU)
-        checkerboard = self._get_checkerboard_with_phase(frame_index)
-
-        if not show_bar_mask:
-            # Use checkerboard pattern across entire frame without bar mask
-            frame = checkerboard
-        else:
-            # Create bar mask using PRE-COMPUTED spherical coordinates (already on GPU!)
-            if direction in ["LR", "RL"]:
-                coordinate_map = self.pixel_azimuth
-            else:  # TB, BT
-                coordinate_map = self.pixel_altitude
-
-            # Vectorized bar mask calculation (GPU-accelerated)
-            bar_half_width = self.bar_width_deg / 2
-            bar_mask = torch.abs(coordinate_map - angle) <= bar_half_width
-
-            # Apply checkerboard within bar using vectorized operation (GPU)
-            frame[bar_mask] = checkerboard[bar_mask]
-
-        # Convert to uint8
-        frame_uint8 = torch.clamp(frame * 255, 0, 255).to(torch.uint8)
+        frame_uint8 = self._render_frames(
+            direction, [angle], [frame_index], show_bar_mask
+        )[0]
 
         if output_format == "grayscale":
             # Return grayscale (for efficient storage - 4x smaller than RGBA)
@@ -612,58 +610,109 @@ class StimulusGenerator:
             logger.error(f"Error generating frame at index {frame_index}: {e}")
             raise
 
-    def _get_checkerboard_with_phase(self, frame_index: int) -> torch.Tensor:
-        """Get checkerboard pattern with counter-phase flip on GPU.
+    def _render_frames(
+        self,
+        direction: str,
+        angles: List[float],
+        frame_indices: List[int],
+        show_bar_mask: bool = True,
+    ) -> torch.Tensor:
+        """Render a batch of frames on GPU in one set of tensor operations.
 
-        Uses pre-computed base pattern for performance.
+        Uses the pre-computed spherical coordinates, counter-phase checkerboards
+        and background; the bar mask is broadcast over the vector of angles.
 
         Args:
-            frame_index: Current frame index for flicker phase
+            direction: Sweep direction
+            angles: Bar angle in degrees for each frame
+            frame_indices: Frame index for each frame (selects flicker phase)
+            show_bar_mask: Whether to show bar mask
 
         Returns:
-            Checkerboard pattern tensor on GPU
+            Grayscale uint8 tensor of shape (K, H, W) on self.device
         """
-        # Use PRE-COMPUTED base checkerboard pattern on GPU (no expensive calculations!)
-        checkerboard = self.base_checkerboard.clone()
-
-        # Counter-phase flickering - simple inversion
-        fps = self.spatial_config.fps
-        flicker_frequency_hz = self.strobe_rate_hz
-        flicker_period_frames = (
-            int(fps / flicker_frequency_hz)
-            if flicker_frequency_hz > 0
-            else float("inf")
-        )
+        indices = torch.as_tensor(frame_indices, dtype=torch.int64, device=self.device)
+        checkerboard = self.checker_phase_patterns[self._flicker_phase(indices)]
 
-        if flicker_period_frames != float("inf"):
-            phase_flip = (frame_index // flicker_period_frames) % 2
-            if phase_flip:
-                checkerboard = (
-                    1 - checkerboard
-                )  # Vectorized inversion on GPU (instant!)
-
-        # Apply contrast using vectorized torch.where (GPU-accelerated)
-        pattern = torch.where(
-            checkerboard.bool(),
-            self.background_luminance + self.contrast,
-            self.background_luminance - self.contrast,
-        )
+        if not show_bar_mask:
+            # Checkerboard pattern across entire frame without bar mask
+            return checkerboard
+
+        # Bar mask using PRE-COMPUTED spherical coordinates, broadcast over (K, H, W)
+        if direction in ["LR", "RL"]:
+            coordinate_map = self.pixel_azimuth
+        else:  # TB, BT
+            coordinate_map = self.pixel_altitude
+
+        angle_tensor = torch.as_tensor(
+            angles, dtype=coordinate_map.dtype, device=self.device
+        ).view(-1, 1, 1)
+        bar_half_width = self.bar_width_deg / 2
+        bar_distance = coordinate_map.unsqueeze(0) - angle_tensor
+        bar_mask = bar_distance.abs_() <= bar_half_width
+
+        # Checkerboard within bar, background elsewhere
+        return torch.where(bar_mask, checkerboard, self.background_uint8)
 
-        return torch.clamp(pattern, 0, 1)
+    def _flicker_phase(self, frame_indices: torch.Tensor) -> torch.Tensor:
+        """Counter-phase flicker state (0 or 1) for each frame index.
+
+        Args:
+            frame_indices: int64 tensor of frame indices
+
+        Returns:
+            int64 tensor of phase indices into checker_phase_patterns
+        """
+        if self.strobe_rate_hz <= 0:
+            return torch.zeros_like(frame_indices)
+
+        flicker_period_frames = int(self.spatial_config.fps / self.strobe_rate_hz)
+        return (frame_indices // flicker_period_frames) % 2
+
+    def get_sweep_shape(
+        self, direction: str, output_format: str = "grayscale"
+    ) -> Tuple[int, ...]:
+        """Shape of the frame array generate_sweep produces for a direction.
+
+        Args:
+            direction: Sweep direction ("LR", "RL", "TB", "BT")
+            output_format: "grayscale" (N, H, W) or "rgba" (N, H, W, 4)
+
+        Returns:
+            Frame array shape
+        """
+        dataset_info = self.get_dataset_info(direction)
+        if "error" in dataset_info:
+            raise Exception(dataset_info["error"])
+
+        shape = (
+            dataset_info["total_frames"],
+            self.spatial_config.screen_height_pixels,
+            self.spatial_config.screen_width_pixels,
+        )
+        return shape if output_format == "grayscale" else shape + (4,)
 
     def generate_sweep(
         self,
         direction: str,
-        output_format: str = "grayscale"
-    ) -> Tuple[List[np.ndarray], List[float]]:
+        output_format: str = "grayscale",
+        out: Optional[np.ndarray] = None,
+        batch_frames: int = DEFAULT_SWEEP_BATCH_FRAMES,
+    ) -> Tuple[np.ndarray, List[float]]:
         """Generate a complete sweep sequence (one cycle) for pre-generation.
 
+        Renders batch_frames frames per tensor operation and copies each batch
+        into a preallocated output array (one device-to-host transfer per batch).
+
         Args:
             direction: Sweep direction ("LR", "RL", "TB", "BT")
             output_format: "grayscale" or "rgba"
+            out: Optional preallocated uint8 array of shape get_sweep_shape()
+                (e.g. a memory-mapped file); allocated if None
+            batch_frames: Frames rendered per batch
 
         Returns:
-            Tuple of (frames_list, angles_list)
+            Tuple of (frames array (N, H, W) or (N, H, W, 4), angles_list)
         """
         # Get dataset info for one cycle
         dataset_info = self.get_dataset_info(direction)
@@ -677,26 +726,37 @@ class StimulusGenerator:
         logger.info(f"Generating {direction} sweep: {total_frames} frames at {self.spatial_config.fps} fps")
         logger.info(f"  Duration: {dataset_info['duration_sec']:.2f}s, Angle range: {start_angle:.1f}° to {end_angle:.1f}°")
 
-        frames = []
-        angles = []
+        shape = self.get_sweep_shape(direction, output_format)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(f"Output array must be uint8 {shape}, got {out.dtype} {out.shape}")
 
-        for frame_index in range(total_frames):
-            angle = self.calculate_frame_angle(direction, frame_index, total_frames)
-            frame = self.generate_frame_at_angle(
-                direction=direction,
-                angle=angle,
-                show_bar_mask=True,
-                frame_index=frame_index,
-                output_format=output_format
+        angles = [
+            self.calculate_frame_angle(direction, frame_index, total_frames)
+            for frame_index in range(total_frames)
+        ]
+        batch_frames = max(1, int(batch_frames))
+
+        for batch_start in range(0, total_frames, batch_frames):
+            batch_end = min(batch_start + batch_frames, total_frames)
+            frames_uint8 = self._render_frames(
+                direction,
+                angles[batch_start:batch_end],
+                list(range(batch_start, batch_end)),
             )
-            frames.append(frame)
-            angles.append(angle)
 
-            if frame_index % 100 == 0:
-                logger.debug(f"  Generated frame {frame_index}/{total_frames}")
+            if output_format == "grayscale":
+                out[batch_start:batch_end] = frames_uint8.cpu().numpy()
+            else:  # rgba
+                batch_out = out[batch_start:batch_end]
+                batch_out[..., :3] = frames_uint8.cpu().numpy()[..., np.newaxis]
+                batch_out[..., 3] = 255
+
+            logger.debug(f"  Generated frames {batch_start}-{batch_end}/{total_frames}")
 
-        logger.info(f"Sweep generation complete: {len(frames)} frames")
-        return frames, angles
+        logger.info(f"Sweep generation complete: {total_frames} frames")
+        return out, angles
 
     def generate_full_dataset(
         self, direction: str, num_cycles: int = 10
@@ -738,17 +798,19 @@ class StimulusGenerator:
                 self.spatial_config.screen_height_pixels,
                 self.spatial_config.screen_width_pixels,
             )
-            frames = np.zeros((total_frames, h, w, 4), dtype=np.uint8)
-
-            for i, current_angle in enumerate(angles):
-                # Generate frame at this angle
-                frame = self.generate_frame_at_angle(
-                    direction, current_angle, show_bar_mask=True, frame_index=i
+            frames = np.empty((total_frames, h, w, 4), dtype=np.uint8)
+            frames[..., 3] = 255
+
+            for batch_start in range(0, total_frames, DEFAULT_SWEEP_BATCH_FRAMES):
+                batch_end = min(batch_start + DEFAULT_SWEEP_BATCH_FRAMES, total_frames)
+                frames_uint8 = self._render_frames(
+                    direction,
+                    angles[batch_start:batch_end].tolist(),
+                    list(range(batch_start, batch_end)),
                 )
-                frames[i] = frame
+                frames[batch_start:batch_end, :, :, :3] = frames_uint8.cpu().numpy()[..., np.newaxis]
 
-                if i % 100 == 0:  # Progress logging
-                    logger.debug("  Generated frame %d/%d", i, total_frames)
+                logger.debug("  Generated frames %d-%d/%d", batch_start, batch_end, total_frames)
 
             logger.debug("Dataset generation complete: %d frames", total_frames)
             return frames, angles, timestamps
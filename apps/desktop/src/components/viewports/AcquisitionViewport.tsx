@@ -6,6 +6,7 @@ import {
   ScanEye,
   Monitor,
   Camera,
+  BrainCog,
   type LucideIcon
 } from 'lucide-react'
 import {
@@ -26,7 +27,7 @@ import type { CameraParameters, StimulusParameters, MonitorParameters, Acquisiti
 import { componentLogger } from '../../utils/logger'
 import { ModeIndicatorBadge } from '../ModeIndicatorBadge'
 import { FilterWarningModal } from '../FilterWarningModal'
-import { useFrameRenderer } from '../../hooks/useFrameRenderer'
+import { useFrameRenderer, frameToImageData } from '../../hooks/useFrameRenderer'
 
 
 const acquisitionModes = ['preview', 'record', 'playback'] as const
@@ -136,6 +137,12 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
   // Track if stimulus is currently being pre-generated (async)
   const [isPreGeneratingStimulus, setIsPreGeneratingStimulus] = useState(false)
 
+  // Online analysis (incremental maps while recording)
+  const [onlineAnalysisEnabled, setOnlineAnalysisEnabled] = useState<boolean | null>(null)
+  const onlineAnalysisSessionRef = useRef<string | null>(null)
+  const [onlineAnalysisPreviews, setOnlineAnalysisPreviews] = useState<Record<string, string>>({})
+  const [onlineAnalysisDirections, setOnlineAnalysisDirections] = useState<string[]>([])
+
   // Derive isPreviewing and isAcquiring from backend state (Single Source of Truth)
   // isPreviewing = user explicitly started preview (not just idle camera)
   // isAcquiring = acquisition IS running
@@ -591,6 +598,41 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
     }
   }, [systemState?.isConnected, sendCommand])
 
+  // Query online analysis state on connect
+  useEffect(() => {
+    if (systemState?.isConnected && sendCommand) {
+      sendCommand({ type: 'get_online_analysis_status' })
+        .then(result => {
+          if (result.success) {
+            setOnlineAnalysisEnabled(result.enabled)
+          } else {
+            componentLogger.error('Failed to get online analysis status:', result.error)
+          }
+        })
+        .catch(err => {
+          componentLogger.error('Error querying online analysis status:', err)
+        })
+    }
+  }, [systemState?.isConnected, sendCommand])
+
+  const toggleOnlineAnalysis = async () => {
+    if (!sendCommand || onlineAnalysisEnabled === null) return
+    try {
+      const result = await sendCommand({
+        type: 'set_online_analysis_enabled',
+        enabled: !onlineAnalysisEnabled
+      })
+      if (result.success) {
+        setOnlineAnalysisEnabled(result.enabled)
+        componentLogger.info(`Online analysis ${result.enabled ? 'enabled' : 'disabled'}`)
+      } else {
+        componentLogger.error('Failed to toggle online analysis:', result.error)
+      }
+    } catch (error) {
+      componentLogger.error('Error toggling online analysis:', error)
+    }
+  }
+
   // REMOVED: Direction changes during preview mode
   // Preview mode now runs the full acquisition sequence (all directions)
   // If user wants to change direction, they must stop and restart preview
@@ -647,7 +689,6 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
           metadata.shm_path
         )
 
-        // Create ImageData from RGBA buffer
         const canvas = cameraCanvasRef.current
         if (!canvas) {
           componentLogger.warn('Canvas ref not available')
@@ -667,12 +708,9 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
         const ctx = canvas.getContext('2d')
         if (!ctx) return
 
-        // Create ImageData directly from RGBA bytes
-        const imageData = new ImageData(
-          new Uint8ClampedArray(frameDataBuffer),
-          width,
-          height
-        )
+        // Preview is grayscale (1 byte/pixel) or RGBA per system.camera_preview_color
+        const imageData = frameToImageData(new Uint8Array(frameDataBuffer), width, height)
+        if (!imageData) return
 
         // Render to canvas
         ctx.putImageData(imageData, 0, 0)
@@ -919,6 +957,31 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
         updateCorrelationChart(message.data)
       }
 
+      // Online analysis previews (pushed while recording); a new session replaces the old maps
+      if (message.type === 'online_analysis_preview' || message.type === 'online_analysis_direction_complete') {
+        if (message.session_path !== onlineAnalysisSessionRef.current) {
+          onlineAnalysisSessionRef.current = message.session_path
+          setOnlineAnalysisPreviews({})
+          setOnlineAnalysisDirections([])
+        }
+      }
+
+      if (message.type === 'online_analysis_preview') {
+        setOnlineAnalysisPreviews(previews => ({
+          ...previews,
+          [message.layer_name]: `data:image/${message.format};base64,${message.image_base64}`
+        }))
+      }
+
+      if (message.type === 'online_analysis_direction_complete') {
+        componentLogger.info('Online analysis direction complete', {
+          direction: message.direction,
+          frames: message.frames,
+          frames_dropped: message.frames_dropped
+        })
+        setOnlineAnalysisDirections(message.completed_directions)
+      }
+
       // Playback progress updates
       if (message.type === 'playback_progress') {
         componentLogger.debug('Playback progress update', message)
@@ -1037,14 +1100,24 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
     const loadFrame = async () => {
       setIsLoadingFrame(true)
       try {
+        // Frame pixels come back through shared memory (descriptor only in the JSON response)
         const result = await sendCommand?.({
           type: 'get_playback_frame',
           direction: loadedSessionData.direction,
-          frame_index: playbackFrameIndex
+          frame_index: playbackFrameIndex,
+          transport: 'shm'
         })
 
         if (result?.success && result?.frame_data) {
-          setCurrentPlaybackFrame(result)
+          const descriptor = result.frame_data
+          const frameDataBuffer = await window.electronAPI.readSharedMemoryFrame(
+            descriptor.offset_bytes,
+            descriptor.data_size_bytes,
+            descriptor.shm_path,
+            descriptor.frame_id,
+            descriptor.layout_gen
+          )
+          setCurrentPlaybackFrame({ ...result, frame_data: new Uint8Array(frameDataBuffer) })
         } else {
           componentLogger.error('Failed to load playback frame', { error: result?.error })
         }
@@ -1094,9 +1167,9 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
     const frameData = currentPlaybackFrame.frame_data
     if (!frameData) return
 
-    // Frame data is shape [height, width] grayscale
-    const height = frameData.length
-    const width = frameData[0]?.length || 0
+    // Frame data is row-major [height, width] grayscale bytes
+    const width = currentPlaybackFrame.width_px
+    const height = currentPlaybackFrame.height_px
 
     if (canvas.width !== width || canvas.height !== height) {
       canvas.width = width
@@ -1108,15 +1181,13 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
 
     // Convert grayscale to RGBA
     const imageData = ctx.createImageData(width, height)
-    for (let y = 0; y < height; y++) {
-      for (let x = 0; x < width; x++) {
-        const idx = (y * width + x) * 4
-        const value = frameData[y][x]
-        imageData.data[idx] = value     // R
-        imageData.data[idx + 1] = value // G
-        imageData.data[idx + 2] = value // B
-        imageData.data[idx + 3] = 255   // A
-      }
+    for (let i = 0; i < width * height; i++) {
+      const idx = i * 4
+      const value = frameData[i]
+      imageData.data[idx] = value     // R
+      imageData.data[idx + 1] = value // G
+      imageData.data[idx + 2] = value // B
+      imageData.data[idx + 3] = 255   // A
     }
 
     ctx.putImageData(imageData, 0, 0)
@@ -1522,6 +1593,38 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
               </div>
             )}
 
+            {/* Online Analysis - live maps of the session being recorded */}
+            {acquisitionMode === 'record' && onlineAnalysisEnabled && (
+              <div className="border-t border-sci-secondary-600 pt-2 mt-2">
+                <div className="text-xs font-medium text-sci-secondary-300 mb-2">
+                  Online Analysis
+                  {onlineAnalysisDirections.length > 0 && (
+                    <span className="ml-2 text-sci-secondary-400 font-normal">
+                      Complete: {onlineAnalysisDirections.join(', ')}
+                    </span>
+                  )}
+                </div>
+                {Object.keys(onlineAnalysisPreviews).length === 0 ? (
+                  <div className="text-xs text-sci-secondary-500 px-2">
+                    Maps appear here while recording
+                  </div>
+                ) : (
+                  <div className="grid grid-cols-3 gap-2">
+                    {Object.entries(onlineAnalysisPreviews).sort(([a], [b]) => a.localeCompare(b)).map(([layerName, url]) => (
+                      <div key={layerName} className="flex flex-col items-center gap-1">
+                        <img
+                          src={url}
+                          alt={layerName}
+                          className="w-full aspect-square object-contain bg-black rounded border border-sci-secondary-600"
+                        />
+                        <span className="text-[10px] text-sci-secondary-400">{layerName}</span>
+                      </div>
+                    ))}
+                  </div>
+                )}
+              </div>
+            )}
+
           </div>
 
           {/* Stimulus Preview - Same height as camera */}
@@ -1717,6 +1820,22 @@ const AcquisitionViewport: React.FC<AcquisitionViewportProps> = ({
             </button>
           )}
 
+          {/* Online Analysis Toggle - applies to the next recording */}
+          {acquisitionMode === 'record' && !isAcquiring && onlineAnalysisEnabled !== null && (
+            <button
+              type="button"
+              onClick={toggleOnlineAnalysis}
+              className={`flex items-center gap-2 px-3 py-1.5 rounded text-sm font-medium border transition-colors ${
+                onlineAnalysisEnabled
+                  ? 'bg-sci-accent-600 border-sci-accent-500 text-white hover:bg-sci-accent-500'
+                  : 'bg-sci-secondary-700 border-sci-secondary-500 text-sci-secondary-200 hover:bg-sci-secondary-600'
+              }`}
+            >
+              <BrainCog className="w-4 h-4" />
+              Online Analysis {onlineAnalysisEnabled ? 'On' : 'Off'}
+            </button>
+          )}
+
           {/* Anatomical Capture Button - available in preview mode */}
           {acquisitionMode === 'preview' && (
             <button
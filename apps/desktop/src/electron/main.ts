@@ -431,6 +431,10 @@ class MultiChannelIPCManager {
       // Silently forward correlation updates - don't log (sent every frame during acquisition)
     } else if (message.type === 'acquisition_progress') {
       // Silently forward acquisition progress - don't log (sent every frame during recording)
+    } else if (message.type === 'online_analysis_preview') {
+      // Silently forward online analysis previews - don't log (PNG payload every few seconds)
+    } else if (message.type === 'online_analysis_direction_complete') {
+      mainLogger.info(`ONLINE ANALYSIS COMPLETE: ${(message as any).direction}`)
     } else {
       // Log unexpected message types for debugging
       mainLogger.debug('Received SYNC channel message:', message)
@@ -1103,15 +1107,45 @@ ipcMain.handle('emergency-stop', async () => {
   return await backendManager.sendCommand({ type: 'emergency_stop' })
 })
 
-ipcMain.handle('read-shared-memory-frame', async (_event, offset: number, size: number, shmPath: string) => {
+// Ring buffer layout (see backend src/ipc/ring_buffer.py)
+const RING_LAYOUT_GEN_OFFSET = 28
+const RING_SLOT_HEADER_SIZE = 128
+
+// True if the ring still holds frameId at offset under layoutGen
+function ringSlotMatches(fd: number, offset: number, frameId: number, layoutGen: number): boolean {
+  const header = Buffer.alloc(4)
+  fs.readSync(fd, header, 0, 4, RING_LAYOUT_GEN_OFFSET)
+  if (header.readUInt32LE(0) !== layoutGen) return false
+
+  const seq = Buffer.alloc(8)
+  fs.readSync(fd, seq, 0, 8, offset - RING_SLOT_HEADER_SIZE)
+  return seq.readBigUInt64LE(0) === BigInt(2 * frameId)
+}
+
+ipcMain.handle('read-shared-memory-frame', async (
+  _event,
+  offset: number,
+  size: number,
+  shmPath: string,
+  frameId?: number,
+  layoutGen?: number
+) => {
   try {
     // Read directly from the specified shared memory file
     if (!fs.existsSync(shmPath)) {
       throw new Error(`Shared memory file does not exist: ${shmPath}`)
     }
 
+    // Descriptors carrying frame_id/layout_gen are validated against the ring
+    // (slots move when the ring is re-laid out, and are recycled)
+    const expected = frameId !== undefined && layoutGen !== undefined ? { frameId, layoutGen } : null
+
     const fd = fs.openSync(shmPath, 'r')
     try {
+      if (expected && !ringSlotMatches(fd, offset, expected.frameId, expected.layoutGen)) {
+        throw new Error(`Stale shared memory descriptor (frame ${frameId}, layout ${layoutGen})`)
+      }
+
       const buffer = Buffer.alloc(size)
       const bytesRead = fs.readSync(fd, buffer, 0, size, offset)
 
@@ -1119,6 +1153,10 @@ ipcMain.handle('read-shared-memory-frame', async (_event, offset: number, size:
         throw new Error(`Expected to read ${size} bytes, but read ${bytesRead}`)
       }
 
+      if (expected && !ringSlotMatches(fd, offset, expected.frameId, expected.layoutGen)) {
+        throw new Error(`Shared memory slot overwritten while reading frame ${frameId}`)
+      }
+
       // Return as ArrayBuffer for efficient transfer
       return buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.byteLength)
     } finally {
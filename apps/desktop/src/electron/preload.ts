@@ -31,7 +31,7 @@ export interface ElectronAPI {
   onSharedMemoryFrame: (callback: (frameData: SharedMemoryFrameData) => void) => () => void
   onCameraFrame: (callback: (frameData: SharedMemoryFrameData) => void) => () => void
   onAnalysisFrame: (callback: (frameData: SharedMemoryFrameData) => void) => () => void
-  readSharedMemoryFrame: (offset: number, size: number, shmPath: string) => Promise<ArrayBuffer>
+  readSharedMemoryFrame: (offset: number, size: number, shmPath: string, frameId?: number, layoutGen?: number) => Promise<ArrayBuffer>
   removeSharedMemoryListener: () => void
   removeCameraFrameListener: () => void
   removeAnalysisFrameListener: () => void
@@ -79,7 +79,8 @@ const electronAPI: ElectronAPI = {
     ipcRenderer.on('analysis-frame', listener)
     return () => ipcRenderer.off('analysis-frame', listener)
   },
-  readSharedMemoryFrame: (offset: number, size: number, shmPath: string) => ipcRenderer.invoke('read-shared-memory-frame', offset, size, shmPath),
+  readSharedMemoryFrame: (offset: number, size: number, shmPath: string, frameId?: number, layoutGen?: number) =>
+    ipcRenderer.invoke('read-shared-memory-frame', offset, size, shmPath, frameId, layoutGen),
   removeSharedMemoryListener: () => {
     ipcRenderer.removeAllListeners('shared-memory-frame')
   },
@@ -12,6 +12,38 @@ interface FrameData {
   frame_data: ArrayBuffer | Buffer
 }
 
+/**
+ * Convert a raw frame (1 channel grayscale or 4 channel RGBA, inferred from
+ * the buffer size) to ImageData for the Canvas API.
+ * Grayscale is expanded here, in the frontend, not in the backend hot loops.
+ *
+ * @returns ImageData, or null if the channel count is not 1 or 4
+ */
+export function frameToImageData(pixels: Uint8Array, width: number, height: number): ImageData | null {
+  const totalPixels = width * height
+  const channels = pixels.length / totalPixels
+  const imageData = new ImageData(width, height)
+
+  if (channels === 4) {
+    // RGBA format - direct transfer
+    imageData.data.set(pixels)
+  } else if (channels === 1) {
+    const rgbaData = imageData.data
+    for (let i = 0; i < totalPixels; i++) {
+      const gray = pixels[i]
+      const rgbaIndex = i * 4
+      rgbaData[rgbaIndex] = gray     // R
+      rgbaData[rgbaIndex + 1] = gray // G
+      rgbaData[rgbaIndex + 2] = gray // B
+      rgbaData[rgbaIndex + 3] = 255  // A
+    }
+  } else {
+    hookLogger.error(`Unexpected channel count: ${channels}. Expected 1 (grayscale) or 4 (RGBA).`)
+    return null
+  }
+  return imageData
+}
+
 /**
  * Hook for rendering raw binary frame data to a canvas element
  * Provides high-performance direct rendering for stimulus frames
@@ -105,28 +137,8 @@ export function useFrameRenderer() {
     })
 
     // Create ImageData for canvas rendering
-    const imageData = ctx.createImageData(width_px, height_px)
-
-    if (channels === 4) {
-      // RGBA format - direct transfer (legacy support)
-      imageData.data.set(uint8Array)
-    } else if (channels === 1) {
-      // Grayscale format (NEW: optimized for zero-overhead backend)
-      // Convert grayscale to RGBA for Canvas API
-      // This happens in the frontend, not in the critical backend playback loop!
-      const rgbaData = imageData.data
-      for (let i = 0; i < totalPixels; i++) {
-        const gray = uint8Array[i]
-        const rgbaIndex = i * 4
-        rgbaData[rgbaIndex] = gray     // R
-        rgbaData[rgbaIndex + 1] = gray // G
-        rgbaData[rgbaIndex + 2] = gray // B
-        rgbaData[rgbaIndex + 3] = 255  // A
-      }
-    } else {
-      hookLogger.error(`Unexpected channel count: ${channels}. Expected 1 (grayscale) or 4 (RGBA).`)
-      return
-    }
+    const imageData = frameToImageData(uint8Array, width_px, height_px)
+    if (!imageData) return
 
     // Cache the converted image (limit cache size)
     if (frameCache.current.size > 100) {
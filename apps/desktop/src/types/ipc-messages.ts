@@ -127,6 +127,25 @@ export interface AnalysisErrorMessage extends ISIMessage {
   session_path: string
 }
 
+export interface OnlineAnalysisPreviewMessage extends ISIMessage {
+  type: 'online_analysis_preview'
+  layer_name: string
+  image_base64: string
+  width: number
+  height: number
+  format: string
+  session_path: string | null
+}
+
+export interface OnlineAnalysisDirectionCompleteMessage extends ISIMessage {
+  type: 'online_analysis_direction_complete'
+  direction: string
+  frames: number
+  frames_dropped: number
+  completed_directions: string[]
+  session_path: string | null
+}
+
 // Session information
 export interface SessionInfo {
   session_name: string
@@ -207,6 +226,8 @@ export type SyncMessage =
   | AnalysisLayerReadyMessage
   | AnalysisCompleteMessage
   | AnalysisErrorMessage
+  | OnlineAnalysisPreviewMessage
+  | OnlineAnalysisDirectionCompleteMessage
   | GenericMessage
 
 // Type guards
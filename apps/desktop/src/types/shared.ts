@@ -94,6 +94,7 @@ export interface AnalysisParameters {
   gradient_window_size: number
   area_min_size_mm2: number
   response_threshold_percent: number
+  boundary_skeletonize: boolean
 }
 
 export interface AllParameters {